@@ -1576,18 +1576,21 @@ class ContainerManager:
             return (0, [])
         try:
             self._catalog._activate_project(proj)
-            from tumblepipe.pipe.scene_build import generate_root_version
+            from tumblepipe.pipe.scene_build import generate_root_versions
         except Exception:
             log.exception("rebuild_root_assigned_shots: imports failed")
             return (0, list(shots))
+        # Roots whose content is unchanged keep their current version; the
+        # staged build below still runs for every shot that did not fail.
+        roots = generate_root_versions(list(shots), skip_unchanged=True)
         ok = 0
         failed: list = []
         for shot_uri in shots:
-            try:
-                generate_root_version(shot_uri)
-            except Exception:
-                log.exception(
-                    "generate_root_version failed for %s", shot_uri,
+            error = roots.failed.get(shot_uri)
+            if error is not None:
+                log.error(
+                    "generate_root_version failed for %s",
+                    shot_uri, exc_info=error,
                 )
                 failed.append(shot_uri)
                 continue
@@ -17,10 +17,10 @@ the same entities. The form is then a shared override applied to every
 checked entity; per-entity overrides remain out of scope (the retired
 Project Browser's ``JobSubmissionDialog`` had a per-entity grid for that).
 
-Submission is synchronous and per-entity — each call to
-``tumblepipe.farm.jobs.houdini.batch_submit.submit_entity_batch`` runs on the
-caller's thread, and the dialog reports a single success/failure summary at the
-end. For a richer per-task progress UI, use the ProcessDialog flow in
+Submission is synchronous: ``tumblepipe.farm.jobs.houdini.batch_submit.
+submit_entities`` prepares the entities on a small worker pool and submits each
+batch as soon as it is ready, while the caller's thread waits, and the dialog
+reports a single success/failure summary at the end. For a richer per-task progress UI, use the ProcessDialog flow in
 ``tumblepipe.pipe.houdini.ui.process_dialog``.
 """
 
@@ -968,7 +968,7 @@ class SubmitJobsDialog(QDialog):
 
         try:
             from tumblepipe.farm.jobs.houdini.batch_submit import (
-                submit_entity_batch,
+                submit_entities,
             )
         except Exception as exc:
             QMessageBox.critical(
@@ -979,8 +979,8 @@ class SubmitJobsDialog(QDialog):
 
         successes: list[tuple[str, list[str]]] = []
         failures: list[tuple[str, str]] = []
-        for uri, name in zip(self._entity_uris, self._entity_names):
-            config = {
+        configs = [
+            {
                 'entity': {
                     'uri': str(uri),
                     'name': name,
@@ -988,12 +988,23 @@ class SubmitJobsDialog(QDialog):
                 },
                 'settings': settings,
             }
-            try:
-                job_ids = submit_entity_batch(config)
-                successes.append((name, list(job_ids or [])))
-            except Exception as exc:
-                log.exception("submit_entity_batch failed for %s", uri)
-                failures.append((name, str(exc)))
+            for uri, name in zip(self._entity_uris, self._entity_names)
+        ]
+        try:
+            results = submit_entities(configs)
+        except Exception as exc:
+            log.exception("submit_entities failed")
+            results = []
+            failures = [(name, str(exc)) for name in self._entity_names]
+        for name, result in zip(self._entity_names, results):
+            if result.error is not None:
+                failures.append((name, result.error))
+                continue
+            log.info(
+                "Submitted %s: prepared in %.1fs, submitted in %.1fs",
+                name, result.prepare_seconds, result.submit_seconds,
+            )
+            successes.append((name, result.job_ids))
 
         # Summary
         lines: list[str] = []
@@ -1,5 +1,6 @@
 from pathlib import Path
 import importlib.util
+import types
 import platform
 import os
 import threading
@@ -10,6 +11,12 @@ def _load_module(path: Path):
     spec.loader.exec_module(module)
     return module
 
+def _load_module_source(path: Path, source: str):
+    module = types.ModuleType(path.stem)
+    module.__file__ = str(path)
+    exec(compile(source, str(path), 'exec'), module.__dict__)
+    return module
+
 def to_wsl_path(path: Path):
     # Legacy /mnt mapping. The farm no longer bridges any tool to WSL (image/video
     # processing runs on Houdini's native hoiiotool/hffmpeg), so this is only used
@@ -47,7 +54,18 @@ def path_str(path: Path):
     return str(path).replace('\\', '/')
 
 class Client:
-    def __init__(self, project_path, pipeline_path, config_path):
+    def __init__(self, project_path, pipeline_path, config_path, snapshot=None):
+        """Client over the project at the given paths.
+
+        With a *snapshot* (see ``tumblepipe.config.snapshot``) nothing is read
+        from the paths: the conventions are loaded from the snapshot's source
+        and the config is a read-only ``FrozenConfigStore`` over its trees.
+        """
+        if snapshot is not None:
+            self._init_from_snapshot(
+                project_path, pipeline_path, config_path, snapshot
+            )
+            return
 
         # Set project path
         self.PROJECT_PATH = local_path(project_path)
@@ -85,6 +103,37 @@ class Client:
         _config_module = _load_module(self.CONFIG_CONVENTION_PATH)
         self.config = _config_module.create()
 
+    def _init_from_snapshot(self, project_path, pipeline_path, config_path, snapshot):
+        from tumblepipe.config.snapshot import FrozenConfigStore
+
+        # Set paths, unchecked: the snapshot stands in for what they hold
+        self.PROJECT_PATH = local_path(project_path)
+        self.PIPELINE_PATH = local_path(pipeline_path)
+        self.CONFIG_PATH = local_path(config_path)
+
+        # Load naming and storage conventions from the snapshot
+        conventions = snapshot['conventions']
+        self.NAMING_CONVENTION_PATH = config_path / 'naming_convention.py'
+        _naming_module = _load_module_source(
+            self.NAMING_CONVENTION_PATH,
+            conventions['naming_convention']
+        )
+        self.naming = _naming_module.create()
+        self.STORAGE_CONVENTION_PATH = config_path / 'storage_convention.py'
+        _storage_module = _load_module_source(
+            self.STORAGE_CONVENTION_PATH,
+            conventions['storage_convention']
+        )
+        self.storage = _storage_module.create()
+
+        # Read-only config over the frozen trees
+        self.CONFIG_CONVENTION_PATH = config_path / 'config_convention.py'
+        self.config = FrozenConfigStore(
+            self.CONFIG_PATH,
+            snapshot['purposes'],
+            snapshot.get('properties')
+        )
+
 def _env(key):
     assert key in os.environ, f'{key} environment variable not set'
     return local_path(Path(os.environ[key]))
@@ -134,6 +183,10 @@ def default_client():
     This ensures all modules share the same cached data.
 
     To reset the client (e.g., when switching projects), call reset_default_client().
+
+    When ``TH_CONFIG_SNAPSHOT`` names a config snapshot (farm tasks of a
+    batch submitted with one), the client is built read-only from it — see
+    ``tumblepipe.config.snapshot``.
     """
     global _default_client_instance
     if _default_client_instance is None:
@@ -143,9 +196,17 @@ def default_client():
                 project_path = _env('TH_PROJECT_PATH')
                 pipeline_path = _env('TH_PIPELINE_PATH')
                 config_path = _env('TH_CONFIG_PATH')
-                _default_client_instance = Client(project_path, pipeline_path, config_path)
+                _default_client_instance = Client(
+                    project_path, pipeline_path, config_path,
+                    snapshot=_env_snapshot()
+                )
     return _default_client_instance
 
+def _env_snapshot():
+    if not os.environ.get('TH_CONFIG_SNAPSHOT'): return None
+    from tumblepipe.config.snapshot import snapshot_path, load_snapshot
+    return load_snapshot(snapshot_path())
+
 class _LazyClient:
     """Attribute-forwarding proxy to the global client (``default_client()``).
 
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from pathlib import Path
 import concurrent.futures
 import subprocess
+import threading
 import platform
 import asyncio
 import logging
@@ -76,16 +77,58 @@ def call(
     try:
         logging.debug(' '.join(command))
         process = subprocess.Popen(command, **_args)
-        result = ''
         with process.stdout:
-            for line in process.stdout:
-                result += line
+            result = ''.join(process.stdout)
         process.wait()
         return result
     except KeyboardInterrupt:
         process.send_signal(signal.SIGINT)
         return None
 
+def call_lines(
+    command: Command,
+    cwd: Optional[Path] = None,
+    env: Optional[dict[str, str]] = None
+    ) -> Iterator[str]:
+    """Like `call`, but yields the output line by line as it is produced.
+
+    For commands with large outputs that the caller parses incrementally
+    instead of holding the whole text. Closing the generator early kills
+    the process.
+    """
+
+    # Prepare env
+    _env = os.environ.copy()
+    _env['PYTHONUNBUFFERED'] = '1'
+    if env is not None:
+        _env.update(env)
+
+    # Prepare args
+    _args = dict(
+        stdout = subprocess.PIPE,
+        stderr = subprocess.STDOUT,
+        text = True,
+        bufsize = 1,
+        env = _env
+    )
+    if platform.system() == 'Windows':
+        _args['creationflags'] = subprocess.CREATE_NO_WINDOW
+    if cwd is not None:
+        _args['cwd'] = str(cwd)
+
+    # Run command
+    logging.debug(' '.join(command))
+    process = subprocess.Popen(command, **_args)
+    finished = False
+    try:
+        with process.stdout:
+            yield from process.stdout
+        finished = True
+    finally:
+        if not finished:
+            process.kill()
+        process.wait()
+
 def run_capture(
     command: Command,
     cwd: Optional[Path] = None,
@@ -131,6 +174,70 @@ def run_capture(
         process.send_signal(signal.SIGINT)
         return 1, ''
 
+def run_feed(
+    command: Command,
+    chunks: Iterable[bytes],
+    cwd: Optional[Path] = None,
+    env: Optional[dict[str, str]] = None
+    ) -> int:
+    """Like `run`, but writes *chunks* to the command's stdin as it runs.
+
+    The output is streamed from a thread of its own, so a command that
+    writes while it reads never blocks on a full pipe. When the command
+    exits before taking every chunk, the rest are not produced.
+    """
+
+    # Prepare env
+    _env = os.environ.copy()
+    _env['PYTHONUNBUFFERED'] = '1'
+    if env is not None:
+        _env.update(env)
+
+    # Prepare args
+    _args = dict(
+        stdin = subprocess.PIPE,
+        stdout = subprocess.PIPE,
+        stderr = subprocess.STDOUT,
+        env = _env
+    )
+    if platform.system() == 'Windows':
+        _args['creationflags'] = subprocess.CREATE_NO_WINDOW
+    if cwd is not None:
+        _args['cwd'] = str(cwd)
+
+    def _print_output(stdout):
+        with stdout:
+            for line in stdout:
+                print(line.decode('utf-8', errors = 'replace'), end='')
+                sys.stdout.flush()
+
+    # Run command
+    logging.debug(' '.join(command))
+    process = subprocess.Popen(command, **_args)
+    output_thread = threading.Thread(
+        target = _print_output,
+        args = (process.stdout,),
+        daemon = True
+    )
+    output_thread.start()
+    try:
+        with process.stdin:
+            for chunk in chunks:
+                process.stdin.write(chunk)
+    except BrokenPipeError:
+        pass
+    except KeyboardInterrupt:
+        process.send_signal(signal.SIGINT)
+        process.wait()
+        return 1
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        output_thread.join()
+    return process.wait()
+
 async def run_async(
     command: Command,
     cwd: Optional[Path] = None,
@@ -160,10 +267,17 @@ async def run_async(
             line = await process.stdout.readline()
             if not line: break
             yield line
-    async for line in aiter(_read_lines()):
-        print(line.decode('utf-8'), end='')
-        sys.stdout.flush()
-    return await process.wait()
+    try:
+        async for line in aiter(_read_lines()):
+            print(line.decode('utf-8'), end='')
+            sys.stdout.flush()
+        return await process.wait()
+    except asyncio.CancelledError:
+        # A cancelled run takes its process with it
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
 
 async def call_async(
     command: Command,
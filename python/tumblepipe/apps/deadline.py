@@ -1,17 +1,34 @@
 from pathlib import Path
 from uuid import uuid4
 import platform
+import hashlib
 import logging
-import shutil
+import os
+import time
 import re
 
 from tumblepipe.api import local_path, to_windows_path, path_str, get_user_name
-from tumblepipe.apps import app
+from tumblepipe.apps import app, job_data
 
 # Farm plugin. 'HPM' runs the task from a package resolved on the worker
 # (see deadline-hpm-plugin).
 PLUGIN = 'HPM'
 
+# Path to a deadlinecommand to use instead of the %DEADLINE_PATH% install.
+COMMAND_ENV = 'TH_DEADLINE_COMMAND'
+
+# Set to 0 to submit one job per deadlinecommand call.
+MULTIPLE_JOBS_ENV = 'TH_DEADLINE_MULTIPLE_JOBS'
+
+# Seconds a job/task query result is reused before asking Deadline again.
+QUERY_CACHE_TTL = 5.0
+
+# Job statuses that never change without someone acting on the job (a
+# resume or requeue), which JobPoller therefore re-fetches only every
+# SETTLED_REFRESH_SECONDS.
+SETTLED_STATUSES = {'Completed', 'Failed', 'Suspended'}
+SETTLED_REFRESH_SECONDS = 60.0
+
 # Matches the .hpm/packages/<name>@<version>/<relative...> segment of a script
 # path, regardless of whether it's a Windows (C:/...) or WSL (/mnt/c/...) form.
 _HPM_PACKAGE_RE = re.compile(r'(?:^|/)\.hpm/packages/([^/]+@[^/]+)/(.+)$')
@@ -63,28 +80,6 @@ def log_progress(iterable):
             print(f'Progress: {progress}')
             prev_progress = progress
 
-def _walk_path(path: Path):
-    if path.is_file(): yield path; return
-    for subpath in path.iterdir():
-        for subsubpath in _walk_path(subpath):
-            yield subsubpath
-
-def _copy_path(from_path: Path, to_path: Path):
-    if from_path.is_file():
-        to_path.parent.mkdir(parents = True, exist_ok = True)
-        shutil.copyfile(
-            from_path,
-            to_path
-        )
-        return
-    for from_file_path in _walk_path(from_path):
-        to_file_path = to_path / from_file_path.relative_to(from_path)
-        to_file_path.parent.mkdir(parents = True, exist_ok = True)
-        shutil.copyfile(
-            from_file_path,
-            to_file_path
-        )
-
 def _write_key_value(path, data):
     with open(path, 'w') as file:
         for key, value in data.items():
@@ -96,22 +91,122 @@ def _parse_submission(output):
         return line[6:].strip()
     raise ValueError('JobID not found')
 
-def _parse_output(output):
-    raw_jobs = list(filter(
-        lambda part: len(part) != 0,
-        map(
-            lambda part: part.strip(),
-            output.replace('\r\n', '\n').split('\n\n')
-        )
-    ))
-    return list(map(
-        lambda raw_job: dict([
-            tuple(part.split('=', 1))
-            for part in raw_job.split('\n')
-        ]),
-        raw_jobs
+def _parse_submissions(output):
+    return [
+        line[6:].strip()
+        for line in output.replace('\r\n', '\n').split('\n')
+        if line.startswith('JobID=')
+    ]
+
+def _dependency_placeholder(job_index):
+    return f'<job:{str(job_index).zfill(2)}>'
+
+_DEPENDENCY_PLACEHOLDER_RE = re.compile(r'<job:(\d+)>')
+
+def _resolve_dependency_placeholders(job_info_path, job_ids):
+    """Replace in-batch dependency placeholders with submitted job ids."""
+    text = job_info_path.read_text()
+    if '<job:' not in text: return
+    job_info_path.write_text(_DEPENDENCY_PLACEHOLDER_RE.sub(
+        lambda match: job_ids[int(match.group(1))],
+        text
     ))
 
+def _submission_levels(batch, job_files):
+    """Group the jobs to submit into dependency levels.
+
+    A job's level is one past the deepest of its dependencies that is itself
+    being submitted, so every level only depends on earlier levels and on
+    already existing jobs.
+    """
+    levels = dict()
+    for job_index in batch.topological_order():
+        if job_index not in job_files: continue
+        levels[job_index] = 1 + max([
+            levels[dep_index]
+            for dep_index in batch.get_deps(job_index)
+            if dep_index in levels
+        ], default = -1)
+    return [
+        [job_index for job_index, level in levels.items() if level == depth]
+        for depth in range(max(levels.values(), default = -1) + 1)
+    ]
+
+def _submit_single(job_info_path, plugin_info_path):
+    return _parse_submission(app.call([
+        str(DEADLINE_PATH),
+        str(to_windows_path(job_info_path)),
+        str(to_windows_path(plugin_info_path))
+    ]))
+
+def _submit_multiple(job_indices, job_files):
+    """Submit several jobs in one ``-SubmitMultipleJobs`` call.
+
+    Returns the new job ids in order, or None when the call submitted
+    nothing (e.g. a Deadline without multi-job support) so the caller can
+    fall back to one call per job. A call that submitted only some of the
+    jobs raises instead, as retrying would duplicate the ones that went in.
+    """
+    command = [str(DEADLINE_PATH), '-SubmitMultipleJobs']
+    for job_index in job_indices:
+        job_info_path, plugin_info_path = job_files[job_index]
+        command += [
+            '-job',
+            str(to_windows_path(job_info_path)),
+            str(to_windows_path(plugin_info_path))
+        ]
+    output = app.call(command) or ''
+    job_ids = _parse_submissions(output)
+    if len(job_ids) == 0:
+        logging.warning(
+            'Multi-job submission returned no job ids, '
+            'falling back to one submission per job'
+        )
+        return None
+    if len(job_ids) != len(job_indices):
+        raise ValueError(
+            f'Multi-job submission returned {len(job_ids)} job ids '
+            f'for {len(job_indices)} jobs: {", ".join(job_ids)}'
+        )
+    return job_ids
+
+def _iter_blocks(lines, filters = None):
+    """Parse ``deadlinecommand`` key/value output one block at a time.
+
+    Blocks are separated by blank lines and yielded as soon as they end,
+    and only blocks matching *filters* are yielded, so a large listing is
+    never held in full. Lines without a ``=`` (banners, warnings) are
+    skipped; an ``Error`` line raises `DeadlineQueryError`.
+    """
+    block = dict()
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0:
+            if len(block) != 0 and _matches(block, filters):
+                yield block
+            block = dict()
+            continue
+        if '=' not in line:
+            if line.startswith('Error'):
+                raise DeadlineQueryError(line)
+            continue
+        key, value = line.split('=', 1)
+        block[key] = value
+    if len(block) != 0 and _matches(block, filters):
+        yield block
+
+def _matches(item, filters):
+    if not filters: return True
+    return all(
+        item.get(key) == value
+        for key, value in filters.items()
+    )
+
+def _job_id(job):
+    for key in ('JobID', 'JobId', 'ID'):
+        if key in job: return job[key]
+    return None
+
 def _parse_groups(output):
     return list(filter(
         lambda item: len(item) != 0,
@@ -124,7 +219,76 @@ def _parse_pools(output):
         output.replace('\r\n', '\n').split('\n')
     ))
 
+class DeadlineQueryError(RuntimeError):
+    """``deadlinecommand`` reported an error instead of query results."""
+
+# Parsed job/task query results, keyed by command, as (time, results).
+_QUERY_CACHE = dict()
+
+# Whether deadlinecommand accepts the *Filter variants of the job queries;
+# None until the first filtered query finds out.
+_SERVER_FILTERS = None
+
+def _invalidate_queries():
+    _QUERY_CACHE.clear()
+
+def _query(command, filters, max_age):
+    """Run a key/value query through the short-lived query cache.
+
+    *filters* are applied while parsing, so only matching blocks are kept.
+    Results younger than *max_age* seconds are served from the cache; the
+    cache is dropped whenever this process changes farm state.
+    """
+    if max_age is None: max_age = QUERY_CACHE_TTL
+    key = (tuple(command), tuple(sorted((filters or {}).items())))
+    now = time.monotonic()
+    cached = _QUERY_CACHE.get(key)
+    if cached is not None and now - cached[0] <= max_age:
+        return [dict(item) for item in cached[1]]
+    results = list(_iter_blocks(
+        app.call_lines([str(DEADLINE_PATH)] + list(command)),
+        filters
+    ))
+    _QUERY_CACHE[key] = (now, results)
+    return [dict(item) for item in results]
+
+def _query_jobs(filters, max_age):
+    """Jobs matching *filters*, filtered by Deadline where it can.
+
+    With filters this asks for ``GetJobsFilter`` so the repository does the
+    matching; the same filters are re-applied while parsing, which keeps the
+    result exact either way. A Deadline that rejects the filtered command
+    falls back to the full ``GetJobs`` listing for the rest of the session.
+    """
+    global _SERVER_FILTERS
+    if len(filters) == 0 or _SERVER_FILTERS is False:
+        return _query(['GetJobs'], filters, max_age)
+    try:
+        jobs = _query(
+            ['GetJobsFilter'] + [
+                f'{key}={value}'
+                for key, value in sorted(filters.items())
+            ],
+            filters,
+            max_age
+        )
+    except DeadlineQueryError:
+        if _SERVER_FILTERS: raise
+        logging.warning(
+            'deadlinecommand rejected GetJobsFilter, '
+            'filtering the full job listing instead'
+        )
+        _SERVER_FILTERS = False
+        return _query(['GetJobs'], filters, max_age)
+    _SERVER_FILTERS = True
+    return jobs
+
 def _get_deadline_path():
+    # An explicit command (e.g. scripts/fake_deadlinecommand.py) for running
+    # submission paths without a Deadline install.
+    override_path = os.environ.get(COMMAND_ENV)
+    if override_path:
+        return Path(override_path)
     raw_path = app.call(['cmd.exe', '/c', 'echo', '%DEADLINE_PATH%']).splitlines()[-1]
     assert raw_path is not None, 'Deadline path not found'
     bin_path = local_path(Path(raw_path.replace('\\', '/')))
@@ -251,16 +415,42 @@ class Job:
         self.env = dict()
         self.paths = dict()
         self.output_paths = list()
+        # Optional task history key (entity, department, job_type) the job's
+        # tasks record their runtimes under; see farm.task_stats.
+        self.stats = None
         # Optional hpm.toml content the caller provides for the HPM plugin;
         # submit() writes it into the job dir and hands the plugin its path.
         self.manifest = None
         self._script_path = script_path
         self._requirements_path = requirements_path
         self._args = args
-    
+
+    @property
+    def script_path(self) -> Path:
+        return self._script_path
+
+    @property
+    def args(self) -> list[str]:
+        """The task arguments, as the plugin passes them (empty ones dropped)."""
+        return [arg for arg in self._args if len(arg) != 0]
+
     def _frames(self):
         if len(self.frames) != 0: return ','.join(map(str, self.frames))
         return f'{self.start_frame}-{self.end_frame}x{self.step_size}'
+
+    def frame_list(self) -> list[int]:
+        """Every frame of the job, in order."""
+        if len(self.frames) != 0: return list(self.frames)
+        return list(range(self.start_frame, self.end_frame + 1, self.step_size))
+
+    def task_frames(self) -> list[list[int]]:
+        """The frames of each task, chunked by ``chunk_size`` as Deadline does."""
+        frames = self.frame_list()
+        chunk_size = max(1, self.chunk_size)
+        return [
+            frames[index:index + chunk_size]
+            for index in range(0, len(frames), chunk_size)
+        ]
     
     def job_info(self) -> dict:
         assert self.name is not None, 'Job name not set'
@@ -371,37 +561,27 @@ class Deadline:
         ]))
         return GROUP_NAMES.copy()
     
-    def find_jobs(self, **filters):
-        all_jobs = _parse_output(app.call([
-            str(DEADLINE_PATH),
-            'GetJobs'
-        ]))
-        if len(filters) == 0: return all_jobs
-        return list(filter(
-            lambda job: all(
-                job[key] == value
-                for key, value in filters.items()
-            ),
-            all_jobs
-        ))
+    def find_jobs(self, max_age = None, **filters):
+        """Jobs whose key/values equal *filters* (e.g. ``BatchName=...``).
+
+        Filtering happens in Deadline where supported, and results are
+        cached for *max_age* seconds (default `QUERY_CACHE_TTL`); pass
+        ``max_age=0`` to force a fresh query.
+        """
+        return _query_jobs(filters, max_age)
+
+    def find_tasks(self, job_id, max_age = None, **filters):
+        """Tasks of *job_id* whose key/values equal *filters*, cached like
+        `find_jobs`."""
+        return _query(['GetJobTasks', job_id], filters, max_age)
+
+    def poller(self, **filters):
+        """A `JobPoller` tracking the jobs that match *filters*."""
+        return JobPoller(self, **filters)
 
-    def find_tasks(self, job_id, **filters):
-        all_tasks = _parse_output(app.call([
-            str(DEADLINE_PATH),
-            'GetJobTasks',
-            job_id
-        ]))
-        if len(filters) == 0: return all_tasks
-        return list(filter(
-            lambda task: all(
-                task[key] == value
-                for key, value in filters.items()
-            ),
-            all_tasks
-        ))
-    
     def suspend_jobs(self, *job_ids):
         if len(job_ids) == 0: return False
+        _invalidate_queries()
         return_code = app.run([
             str(DEADLINE_PATH),
             'SuspendJob',
@@ -411,6 +591,7 @@ class Deadline:
 
     def resume_jobs(self, *job_ids):
         if len(job_ids) == 0: return False
+        _invalidate_queries()
         return_code = app.run([
             str(DEADLINE_PATH),
             'ResumeJob',
@@ -419,6 +600,7 @@ class Deadline:
         return return_code == 0
     
     def remove_job(self, job_id):
+        _invalidate_queries()
         app.run([
             str(DEADLINE_PATH),
             'DeleteJob',
@@ -427,6 +609,7 @@ class Deadline:
     
     def suspend_tasks(self, job_id, *task_ids):
         if len(task_ids) == 0: return False
+        _invalidate_queries()
         return_code = app.run([
             str(DEADLINE_PATH),
             'SuspendJobTasks',
@@ -437,6 +620,7 @@ class Deadline:
     
     def resume_tasks(self, job_id, *task_ids):
         if len(task_ids) == 0: return False
+        _invalidate_queries()
         return_code = app.run([
             str(DEADLINE_PATH),
             'ResumeJobTasks',
@@ -447,8 +631,35 @@ class Deadline:
 
     def submit(self,
         batch,
-        jobs_path
+        jobs_path,
+        multiple_jobs = None,
+        dry_run = False
         ):
+        """Submit *batch*, returning the Deadline job ids in submission order.
+
+        Every job's files (job info, environment, plugin info, manifest, data)
+        are written to a fresh job dir first; data goes through the
+        content-addressed store in `job_data`, so unchanged payloads are
+        linked rather than copied again. Jobs are then submitted level by
+        level through the dependency graph: each level goes to Deadline in one
+        ``-SubmitMultipleJobs`` call, since a ``deadlinecommand`` start-up
+        costs seconds and a shot batch holds dozens of jobs. Dependencies on
+        jobs of the same batch are written as placeholders and filled in with
+        the real ids once the level they depend on has been submitted.
+
+        ``multiple_jobs=False`` (or ``TH_DEADLINE_MULTIPLE_JOBS=0``) submits
+        one job per call, as does the rest of a batch once a multi-job call
+        returned no ids.
+
+        ``dry_run=True`` writes and submits nothing, and returns the
+        ``farm.estimate.BatchEstimate`` of the batch instead.
+        """
+        if dry_run:
+            from tumblepipe.farm.estimate import estimate_batch
+            return estimate_batch(batch, jobs_path)
+
+        if multiple_jobs is None:
+            multiple_jobs = os.environ.get(MULTIPLE_JOBS_ENV, '1') != '0'
 
         # Open work directory
         job_path = _find_free_job_path(jobs_path)
@@ -458,9 +669,14 @@ class Deadline:
         job_data_path.mkdir(parents=True, exist_ok=True)
         logging.debug(f'Creating job path: {job_path}')
 
-        # Job creation order
+        _invalidate_queries()
+
+        # Write every job's files up front
+        order = batch.topological_order()
         job_ids = dict()
-        for job_index in batch.topological_order():
+        job_files = dict()
+        data_files = dict()
+        for job_index in order:
             job = batch.get_job(job_index)
 
             # Handle existing jobs
@@ -468,57 +684,164 @@ class Deadline:
                 job_ids[job_index] = job
                 continue
 
-            # Prepare job info
-            job_info_path = (
-                job_path /
-                f'{str(job_index).zfill(2)}_job_info.job'
+            job_files[job_index] = self._write_job_files(
+                batch, job_index, job_path, job_ids, data_files
             )
-            job_info = job.job_info() | {
-                'BatchName': batch.get_name(),
-                'NetworkRoot': path_str(to_windows_path(REPOSITORY_PATH))
-            }
-            job_deps = batch.get_deps(job_index)
-            if len(job_deps) != 0:
-                job_info['JobDependencies'] = ','.join([
-                    job_ids[dep_index]
-                    for dep_index in job_deps
-                ])
-            _write_key_value(job_info_path, job_info)
-            
-            # Prepare environment file
-            env_file_path = job_path / f'{str(job_index).zfill(2)}.env'
-            _write_key_value(env_file_path, job.env)
-
-            # Prepare plugin info
-            plugin_info_path = (
-                job_path /
-                f'{str(job_index).zfill(2)}_plugin_info.job'
-            )
-            plugin_info = job.plugin_info(job_path, env_file_path)
-
-            # Write the caller-provided manifest into the shared job dir (a
-            # reachable job artifact) and point the plugin at it via Manifest.
-            if job.manifest is not None:
-                manifest_path = (
-                    job_path /
-                    f'{str(job_index).zfill(2)}_hpm.toml'
+
+        # Only bytes the job data store has not seen are transferred
+        job_data.store_job_data(job_path, data_files, jobs_path)
+
+        # Submit one dependency level at a time
+        for level in _submission_levels(batch, job_files):
+            for job_index in level:
+                _resolve_dependency_placeholders(
+                    job_files[job_index][0], job_ids
                 )
+            submitted = None
+            if multiple_jobs and len(level) > 1:
+                submitted = _submit_multiple(level, job_files)
+                multiple_jobs = submitted is not None
+            if submitted is None:
+                submitted = [
+                    _submit_single(*job_files[job_index])
+                    for job_index in level
+                ]
+            job_ids.update(zip(level, submitted))
+
+        return [job_ids[job_index] for job_index in order]
+
+    def _write_job_files(self, batch, job_index, job_path, job_ids, data_files):
+        job = batch.get_job(job_index)
+
+        # Prepare job info
+        job_info_path = (
+            job_path /
+            f'{str(job_index).zfill(2)}_job_info.job'
+        )
+        job_info = job.job_info() | {
+            'BatchName': batch.get_name(),
+            'NetworkRoot': path_str(to_windows_path(REPOSITORY_PATH))
+        }
+        job_deps = batch.get_deps(job_index)
+        if len(job_deps) != 0:
+            job_info['JobDependencies'] = ','.join([
+                job_ids.get(dep_index, _dependency_placeholder(dep_index))
+                for dep_index in sorted(job_deps)
+            ])
+        _write_key_value(job_info_path, job_info)
+
+        # Prepare environment file
+        env_file_path = job_path / f'{str(job_index).zfill(2)}.env'
+        _write_key_value(env_file_path, job.env)
+
+        # Prepare plugin info
+        plugin_info_path = (
+            job_path /
+            f'{str(job_index).zfill(2)}_plugin_info.job'
+        )
+        plugin_info = job.plugin_info(job_path, env_file_path)
+
+        # Write the caller-provided manifest into the shared job dir (a
+        # reachable job artifact) and point the plugin at it via Manifest.
+        # Most jobs of a batch carry the same manifest, so each distinct one
+        # is written once, named by its content, and shared.
+        if job.manifest is not None:
+            digest = hashlib.sha256(job.manifest.encode('utf-8')).hexdigest()
+            manifest_path = job_path / f'{digest[:16]}_hpm.toml'
+            if not manifest_path.exists():
                 manifest_path.write_text(job.manifest)
-                plugin_info['Manifest'] = path_str(to_windows_path(manifest_path))
-
-            _write_key_value(plugin_info_path, plugin_info)
-
-            # Copy files to workspace
-            for from_path, rel_to_path in job.paths.items():
-                to_path = job_data_path / rel_to_path
-                if to_path.exists(): continue
-                _copy_path(from_path, to_path)
-            
-            # Submit job
-            job_ids[job_index] = _parse_submission(app.call([
-                str(DEADLINE_PATH),
-                str(to_windows_path(job_info_path)),
-                str(to_windows_path(plugin_info_path))
-            ]))
-
-        return list(job_ids.values())
\ No newline at end of file
+            plugin_info['Manifest'] = path_str(to_windows_path(manifest_path))
+
+        _write_key_value(plugin_info_path, plugin_info)
+
+        # Collect files for the workspace; the first job to claim a
+        # relative path wins
+        for rel_path, from_path in job_data.expand_paths(job.paths).items():
+            data_files.setdefault(rel_path, from_path)
+
+        return job_info_path, plugin_info_path
+
+
+class JobPoller:
+    """Tracks a set of jobs, re-fetching only the ones that can still change.
+
+    The first `poll` lists every job matching the filters. Later polls ask
+    Deadline only for the matching job ids (to pick up new and removed jobs)
+    and then fetch full details just for new jobs and jobs not in a
+    `SETTLED_STATUSES` state, instead of re-downloading the whole listing.
+    Settled jobs are still re-fetched every `settled_seconds`, so one that
+    was resumed or requeued is picked up.
+    """
+
+    def __init__(self, deadline, **filters):
+        self._deadline = deadline
+        self._filters = filters
+        self._jobs = None
+        self._fetched = dict()
+        self.settled_seconds = SETTLED_REFRESH_SECONDS
+
+    def jobs(self):
+        """The jobs as of the last poll, by job id."""
+        return dict(self._jobs or {})
+
+    def poll(self):
+        """Refresh the tracked jobs; returns the ids that changed.
+
+        Changed covers new jobs, removed jobs and jobs whose key/values
+        differ from the previous poll.
+        """
+        now = time.time()
+        if self._jobs is None:
+            self._jobs = {
+                _job_id(job): job
+                for job in _query_jobs(self._filters, 0)
+            }
+            self._fetched = dict.fromkeys(self._jobs, now)
+            return set(self._jobs.keys())
+
+        current_ids = self._job_ids()
+        removed_ids = set(self._jobs.keys()) - current_ids
+        refresh_ids = {
+            job_id for job_id in current_ids
+            if job_id not in self._jobs
+            or self._jobs[job_id].get('Status') not in SETTLED_STATUSES
+            or now - self._fetched.get(job_id, 0) >= self.settled_seconds
+        }
+        changed = set(removed_ids)
+        for job_id in removed_ids:
+            del self._jobs[job_id]
+            self._fetched.pop(job_id, None)
+        if len(refresh_ids) == 0: return changed
+        for job in _iter_blocks(app.call_lines([
+            str(DEADLINE_PATH),
+            'GetJob',
+            ','.join(sorted(refresh_ids))
+        ])):
+            job_id = _job_id(job)
+            if self._jobs.get(job_id) != job:
+                changed.add(job_id)
+            self._jobs[job_id] = job
+            self._fetched[job_id] = now
+        return changed
+
+    def _job_ids(self):
+        if len(self._filters) != 0 and _SERVER_FILTERS is False:
+            # No filtered id listing either; take the ids off the jobs.
+            return {
+                _job_id(job)
+                for job in _query_jobs(self._filters, 0)
+            }
+        command = (
+            ['GetJobIds'] if len(self._filters) == 0 else
+            ['GetJobIdsFilter'] + [
+                f'{key}={value}'
+                for key, value in sorted(self._filters.items())
+            ]
+        )
+        job_ids = set()
+        for line in app.call_lines([str(DEADLINE_PATH)] + command):
+            line = line.strip()
+            if len(line) == 0 or '=' in line: continue
+            if line.startswith('Error'): raise DeadlineQueryError(line)
+            job_ids.update(filter(None, line.split(',')))
+        return job_ids
@@ -3,7 +3,10 @@ from dataclasses import dataclass
 from typing import Optional
 from pathlib import Path
 import datetime as dt
+import threading
+import logging
 import shutil
+import struct
 import os
 
 from tumblepipe.api import (
@@ -31,6 +34,70 @@ def _run(command, **kwargs):
 def _call(command, **kwargs):
     return _oiiotool().call(command[1:], **kwargs)
 
+class OIIOChain:
+    """One oiiotool invocation, built up step by step.
+
+    oiiotool keeps its image stack in memory, so steps that used to be
+    separate calls -- each re-reading and re-writing a full EXR -- can run
+    as one: every input is read once and every output written once. An
+    input read with ``keep=True`` is labelled, and reading it again starts
+    from the loaded image instead of the file.
+    """
+
+    def __init__(self):
+        self.args = ['oiiotool']
+        self._labels = dict()
+
+    def read(self, input_path: Path, keep: bool = False) -> 'OIIOChain':
+        raw_path = path_str(local_path(input_path))
+        label = self._labels.get(raw_path)
+        if label is not None:
+            self.args.append(label)
+            return self
+        self.args.append(raw_path)
+        if keep:
+            label = f'input{len(self._labels)}'
+            self._labels[raw_path] = label
+            self.args += ['--label', label]
+        return self
+
+    def select_subimage(self, name: str) -> 'OIIOChain':
+        # Makes a new image of the one subimage, leaving a labelled input
+        # as it was for the steps after
+        self.args += ['--subimage', name]
+        return self
+
+    def select_channels(self, selector: str) -> 'OIIOChain':
+        self.args += ['--ch', selector]
+        return self
+
+    def rename_channels(self, names: list[str]) -> 'OIIOChain':
+        self.args += ['--chnames', ','.join(names)]
+        return self
+
+    def append_channels(self) -> 'OIIOChain':
+        self.args.append('--chappend')
+        return self
+
+    def stamp_acescg(self) -> 'OIIOChain':
+        self.args += ACESCG_ATTRIB_ARGS
+        return self
+
+    def compress(self, compression: str) -> 'OIIOChain':
+        self.args += ['--compression', compression]
+        return self
+
+    def write(self, output_path: Path) -> 'OIIOChain':
+        self.args += ['-o', path_str(local_path(output_path))]
+        return self
+
+    def pop(self) -> 'OIIOChain':
+        self.args.append('--pop')
+        return self
+
+    def run(self) -> int:
+        return _run(self.args)
+
 # ACEScg stamp for every EXR the pipeline publishes. Two attributes, because
 # consumers disagree on which to trust: RV/Nuke key off the EXR-spec
 # `chromaticities` (absent means Rec.709 primaries BY SPEC, so an unstamped
@@ -56,11 +123,233 @@ class ImageInfo:
     compression: str
     compression_level: int
 
+# Native header reading. The ImageInfo of an EXR only needs its header, so
+# it is parsed here from the first few kilobytes of the file rather than by
+# spawning oiiotool per file (thousands of times per shot in split, denoise
+# and slapcomp). Results are cached per path and stamp (mtime, size); oiiotool
+# is the fallback for anything the parser does not accept.
+# `TH_EXR_NATIVE_HEADERS=0` always asks oiiotool.
+NATIVE_HEADERS_ENV = 'TH_EXR_NATIVE_HEADERS'
+
+_EXR_MAGIC = 20000630
+_EXR_VERSION = 2
+_MULTIPART_FLAG = 0x1000
+_HEADER_READ_SIZE = 16 * 1024
+
+# OpenEXR compression enum, named as OIIO reports it
+_COMPRESSION_NAMES = [
+    'none', 'rle', 'zips', 'zip', 'piz', 'pxr24',
+    'b44', 'b44a', 'dwaa', 'dwab', 'htj2k'
+]
+
+# OIIO lists the channels of each layer with these suffixes first, in this
+# order and matched case-insensitively, then the rest in file (alphabetical)
+# order; match it, since callers rename and select channels by position
+_SPECIAL_CHANNELS = [
+    'r', 'red', 'g', 'green', 'b', 'blue', 'y', 'real', 'imag',
+    'a', 'alpha', 'ar', 'ra', 'ag', 'ga', 'ab', 'ba', 'z', 'depth', 'zback'
+]
+
+class ExrHeaderError(ValueError):
+    pass
+
+class _TruncatedHeader(ExrHeaderError):
+    pass
+
+class _HeaderReader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def take(self, size: int) -> bytes:
+        end = self.offset + size
+        if end > len(self.data): raise _TruncatedHeader()
+        result = self.data[self.offset:end]
+        self.offset = end
+        return result
+
+    def string(self) -> str:
+        end = self.data.find(b'\0', self.offset)
+        if end == -1: raise _TruncatedHeader()
+        result = self.data[self.offset:end]
+        self.offset = end + 1
+        return result.decode('utf-8', errors = 'replace')
+
+    def int32(self) -> int:
+        return struct.unpack('<i', self.take(4))[0]
+
+def _read_attributes(reader: _HeaderReader) -> dict[str, tuple[str, bytes]]:
+    """One header's attributes, up to its terminating null byte."""
+    attributes = dict()
+    while True:
+        name = reader.string()
+        if len(name) == 0: return attributes
+        type_name = reader.string()
+        size = reader.int32()
+        if size < 0: raise ExrHeaderError(f'Bad size for attribute {name}')
+        attributes[name] = (type_name, reader.take(size))
+
+def _ordered_channels(names: list[str]) -> list[str]:
+    def _key(item):
+        index, name = item
+        layer, dot, suffix = name.rpartition('.')
+        suffix = suffix.lower()
+        special = (
+            _SPECIAL_CHANNELS.index(suffix)
+            if suffix in _SPECIAL_CHANNELS else
+            len(_SPECIAL_CHANNELS)
+        )
+        return layer + dot, special, index
+    return [name for _, name in sorted(enumerate(names), key = _key)]
+
+def _parse_channels(raw: bytes) -> list[str]:
+    reader = _HeaderReader(raw)
+    names = list()
+    while True:
+        name = reader.string()
+        if len(name) == 0: break
+
+        # pixel type, pLinear + reserved, x and y sampling
+        reader.take(16)
+        names.append(name)
+    return _ordered_channels(names)
+
+def _header_image_info(attributes: dict[str, tuple[str, bytes]]) -> ImageInfo:
+    def _value(name, type_name):
+        entry = attributes.get(name)
+        if entry is None or entry[0] != type_name: return None
+        return entry[1]
+
+    def _string(name):
+        raw = _value(name, 'string')
+        if raw is None: return None
+        return raw.rstrip(b'\0').decode('utf-8', errors = 'replace')
+
+    def _float(name):
+        raw = _value(name, 'float')
+        if raw is None or len(raw) != 4: return None
+        return struct.unpack('<f', raw)[0]
+
+    name = _string('name')
+
+    date = None
+    raw_date = _string('capDate')
+    if raw_date is not None:
+        try:
+            date = dt.datetime.strptime(raw_date, '%Y:%m:%d %H:%M:%S')
+        except ValueError:
+            pass
+
+    width = height = None
+    data_window = _value('dataWindow', 'box2i')
+    if data_window is not None and len(data_window) == 16:
+        x_min, y_min, x_max, y_max = struct.unpack('<4i', data_window)
+        width = x_max - x_min + 1
+        height = y_max - y_min + 1
+
+    channels = None
+    raw_channels = _value('channels', 'chlist')
+    if raw_channels is not None:
+        channels = _parse_channels(raw_channels)
+
+    compression = None
+    raw_compression = _value('compression', 'compression')
+    if raw_compression is not None and len(raw_compression) == 1:
+        index = raw_compression[0]
+        if index < len(_COMPRESSION_NAMES):
+            compression = _COMPRESSION_NAMES[index]
+
+    compression_level = _float('dwaCompressionLevel')
+    if compression_level is not None:
+        compression_level = int(compression_level)
+
+    return ImageInfo(
+        name = name.lower() if name is not None else None,
+        date = date,
+        width = width,
+        height = height,
+        channels = channels,
+        aspect_ratio = _float('pixelAspectRatio'),
+        compression = compression,
+        compression_level = compression_level
+    )
+
+def _parse_headers(data: bytes) -> list[ImageInfo]:
+    reader = _HeaderReader(data)
+    magic = reader.int32()
+    if magic != _EXR_MAGIC: raise ExrHeaderError('Not an OpenEXR file')
+    version = reader.int32()
+    if version & 0xff != _EXR_VERSION:
+        raise ExrHeaderError(f'Unsupported OpenEXR version {version & 0xff}')
+
+    # Single part files have one header; multipart ones a list of headers
+    # closed by an empty one
+    if not version & _MULTIPART_FLAG:
+        return [_header_image_info(_read_attributes(reader))]
+    result = list()
+    while True:
+        attributes = _read_attributes(reader)
+        if len(attributes) == 0: break
+        result.append(_header_image_info(attributes))
+    return result
+
+def read_exr_headers(input_path: Path) -> list[ImageInfo]:
+    """ImageInfo of every part of an EXR, read from its header alone.
+
+    Handles single part and multipart, scanline, tiled and deep files.
+    Raises `ExrHeaderError` for anything else.
+    """
+    with open(input_path, 'rb') as input_file:
+        data = input_file.read(_HEADER_READ_SIZE)
+        while True:
+            try:
+                return _parse_headers(data)
+            except _TruncatedHeader:
+                more = input_file.read(len(data) * 3)
+                if len(more) == 0:
+                    raise ExrHeaderError('Truncated OpenEXR header')
+                data += more
+
+_IMAGE_INFO_CACHE_SIZE = 4096
+_image_info_cache: dict[str, tuple[tuple[int, int], list[ImageInfo]]] = dict()
+_image_info_lock = threading.Lock()
+
+def _cached_image_info(input_path: Path) -> Optional[list[ImageInfo]]:
+    try:
+        stat = os.stat(input_path)
+    except OSError:
+        return None
+    key = str(input_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _image_info_lock:
+        entry = _image_info_cache.get(key)
+    if entry is not None and entry[0] == stamp: return list(entry[1])
+    try:
+        image_infos = read_exr_headers(input_path)
+    except (OSError, ExrHeaderError) as error:
+        logging.debug(f'Reading EXR header natively failed for {input_path}: {error}')
+        return None
+    with _image_info_lock:
+        if len(_image_info_cache) >= _IMAGE_INFO_CACHE_SIZE:
+            del _image_info_cache[next(iter(_image_info_cache))]
+        _image_info_cache[key] = (stamp, image_infos)
+    return list(image_infos)
+
 def get_image_info(input_path: Path) -> Optional[list[ImageInfo]]:
 
     # Check if input path is an EXR file
     if input_path.suffix.lower() != '.exr': return None
 
+    # Read the header natively when possible
+    if os.environ.get(NATIVE_HEADERS_ENV, '1') != '0':
+        image_infos = _cached_image_info(local_path(input_path))
+        if image_infos is not None: return image_infos
+
+    # Fall back to oiiotool
+    return _oiiotool_image_info(input_path)
+
+def _oiiotool_image_info(input_path: Path) -> list[ImageInfo]:
+
     # Helpers
     def _split(delim: str, raw: str) -> list[str]:
         return list(filter(
@@ -297,7 +586,7 @@ def combine_aovs(
     normalized is warned about and dropped), or None if oiiotool failed.
     """
     included = []
-    command = ['oiiotool']
+    chain = OIIOChain()
     for aov_name, aov_path in input_paths.items():
         channel_count = channel_counts.get(aov_name)
         if channel_count is None:
@@ -310,18 +599,15 @@ def combine_aovs(
                 f'cannot normalize {channel_count} channels to RGB'
             )
             continue
-        command += [
-            path_str(local_path(aov_path)),
-            '--ch', selector,
-            '--chnames', f'{aov_name}.R,{aov_name}.G,{aov_name}.B'
-        ]
+        chain.read(aov_path)
+        chain.select_channels(selector)
+        chain.rename_channels([f'{aov_name}.R', f'{aov_name}.G', f'{aov_name}.B'])
         if len(included) > 0:
-            command += ['--chappend']
+            chain.append_channels()
         included.append(aov_name)
 
     if len(included) == 0: return None
-    command += ['-o', path_str(local_path(output_path))]
-    if _run(command) != 0: return None
+    if chain.write(output_path).run() != 0: return None
     if not local_path(output_path).exists(): return None
     return included
 
@@ -334,13 +620,17 @@ def extract_aov(input_path: Path, aov_name: str, output_path: Path) -> int:
     consumers index positionally, so the names are cosmetic, but the shape is
     not something to change by accident.
     """
-    return _run([
-        'oiiotool',
-        path_str(local_path(input_path)),
-        '--subimage', aov_name,
-        '--chnames', 'R,G,B',
-        '-o', path_str(local_path(output_path))
-    ])
+    chain = OIIOChain().read(input_path)
+    _extract_steps(chain, aov_name)
+    return chain.write(output_path).run()
+
+def _extract_steps(chain: OIIOChain, aov_name: str):
+    chain.select_subimage(aov_name)
+    chain.rename_channels(['R', 'G', 'B'])
+
+def _dwab_steps(chain: OIIOChain):
+    chain.stamp_acescg()
+    chain.compress('dwab:45')
 
 def dwab_encode(input_path, output_path):
 
@@ -349,12 +639,39 @@ def dwab_encode(input_path, output_path):
 
     # DWAB compress. This is the publish step of the denoise chain, whose
     # channel shuffles dropped the colorspace metadata -- re-stamp it here.
-    return _run([
-        'oiiotool', path_str(local_path(input_path)),
-        *ACESCG_ATTRIB_ARGS,
-        '--compression', 'dwab:45',
-        '-o', path_str(local_path(output_path))
-    ])
+    chain = OIIOChain().read(input_path)
+    _dwab_steps(chain)
+    return chain.write(output_path).run()
+
+def publish_aovs(
+    source_paths: dict[str, Path],
+    output_paths: dict[str, Path]
+    ) -> int:
+    """`extract_aov` then `dwab_encode` for every AOV, in one oiiotool call.
+
+    *source_paths* maps each AOV to the idenoise result holding its plane
+    (AOVs usually share one); each result is read once, and each AOV's
+    published file is the only file written -- no per-AOV intermediates.
+    The outputs match the two calls per AOV they replace. On failure some
+    outputs may have been written; callers redo the AOVs one by one.
+    """
+    chain = OIIOChain()
+    for aov_name, source_path in source_paths.items():
+        chain.read(source_path, keep = True)
+        _extract_steps(chain, aov_name)
+        _dwab_steps(chain)
+        chain.write(output_paths[aov_name]).pop()
+    return chain.run()
+
+# Note: Using --ociodisplay with empty string for view uses the OCIO config's default view
+_JPEG_COLOR_ARGS = ['--iscolorspace', 'acescg', '--ociodisplay', 'sRGB - Display', '']
+
+def jpeg_settings() -> dict:
+    """What `to_jpeg` output depends on besides the input image."""
+    return dict(
+        args = list(_JPEG_COLOR_ARGS),
+        ocio = os.environ.get('OCIO')
+    )
 
 def to_jpeg(input_path, output_path):
 
@@ -365,12 +682,10 @@ def to_jpeg(input_path, output_path):
     if output_path.suffix.lower() != '.jpg': return None
 
     # Convert to JPEG
-    # Note: Using --ociodisplay with empty string for view uses the OCIO config's default view
     iconvert = houdini.IConvert()
     return iconvert.run(
         [
-            '--iscolorspace', 'acescg',
-            '--ociodisplay', 'sRGB - Display', '',
+            *_JPEG_COLOR_ARGS,
             path_str(to_windows_path(input_path)),
             path_str(to_windows_path(output_path))
         ],
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterable, Optional
 from pathlib import Path
 import platform
 import asyncio
@@ -7,7 +7,7 @@ import os
 
 from tumblepipe.api import path_str, to_windows_path
 from tumblepipe.util import ipc
-from tumblepipe.apps import app
+from tumblepipe.apps import hython_pool, app
 
 
 class UsdStitchError(Exception):
@@ -63,20 +63,139 @@ def flatten_sidecar_directories(export_path: Path) -> None:
             item.rmdir()
 
 
-def stitch_usd_files(input_files: list[Path], output_file: Path) -> None:
+# Env var setting how many worker processes ``stitch_usd_files`` may fan
+# pairwise stitches out to. Unset (or ``1``) keeps the sequential fold.
+STITCH_WORKERS_ENV = 'TH_STITCH_WORKERS'
+
+def _default_stitch_workers() -> int:
+    value = os.environ.get(STITCH_WORKERS_ENV, '')
+    if not value.isdigit(): return 1
+    return max(1, int(value))
+
+def _open_layer(path: Path):
+    """Open ``path`` as a private, writable copy of the file's content.
+
+    ``Sdf.Layer.FindOrOpen`` would hand back the registry's shared instance,
+    so stitching into it would leak the merge into every later open of the
+    same file in this process.
+    """
+    from pxr import Sdf
+
+    layer = Sdf.Layer.OpenAsAnonymous(str(path))
+    if layer is None:
+        raise UsdStitchError(f"Failed to open input file: {path}")
+    return layer
+
+def _stitch_file_pair(strong_path: str, weak_path: str, output_path: str) -> str:
+    """Process-pool entry point: stitch two files on disk into a third."""
+    from pxr import UsdUtils
+
+    result_layer = _open_layer(Path(strong_path))
+    UsdUtils.StitchLayers(result_layer, _open_layer(Path(weak_path)))
+    if not result_layer.Export(output_path):
+        raise UsdStitchError(f"Failed to write stitched layer: {output_path}")
+    return output_path
+
+def _pair_up(items: list) -> tuple[list[tuple], list]:
+    """Split one reduction round into (strong, weak) pairs and an odd tail.
+
+    Pairs are formed from neighbours so the earlier input always stays the
+    stronger side, which is what keeps the tree equivalent to the left fold.
+    """
+    pairs = [
+        (items[index], items[index + 1])
+        for index in range(0, len(items) - 1, 2)
+    ]
+    tail = [items[-1]] if len(items) % 2 == 1 else []
+    return pairs, tail
+
+def _stitch_sequential(input_files: list[Path], output_file: Path) -> None:
+    from pxr import UsdUtils
+
+    # Open first file as the base layer
+    result_layer = _open_layer(input_files[0])
+
+    # Stitch remaining files into the result layer
+    for input_file in input_files[1:]:
+        # StitchLayers merges weak_layer INTO result_layer
+        # Time samples are merged as a union (what we want)
+        UsdUtils.StitchLayers(result_layer, _open_layer(input_file))
+
+    # Export the stitched result
+    result_layer.Export(str(output_file))
+
+def _stitch_tree(
+    input_files: list[Path],
+    output_file: Path,
+    workers: int
+    ) -> None:
+    import concurrent.futures
+    import multiprocessing
+    import tempfile
+
+    # Intermediate rounds go to crate files in local temp space; only the
+    # final pair writes the real output, in the output's own format.
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='th_stitch_') as temp_dir:
+        temp_path = Path(temp_dir)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers = workers,
+            mp_context = context
+            ) as pool:
+            paths = [str(path) for path in input_files]
+            round_index = 0
+            while len(paths) > 1:
+                pairs, tail = _pair_up(paths)
+                final_round = len(pairs) == 1 and len(tail) == 0
+                futures = [
+                    pool.submit(
+                        _stitch_file_pair,
+                        strong_path,
+                        weak_path,
+                        (
+                            str(output_file) if final_round else
+                            str(temp_path / f'{round_index:02d}_{pair_index:04d}.usdc')
+                        )
+                    )
+                    for pair_index, (strong_path, weak_path) in enumerate(pairs)
+                ]
+                paths = [future.result() for future in futures] + tail
+                round_index += 1
+
+def stitch_usd_files(
+    input_files: list[Path],
+    output_file: Path,
+    workers: Optional[int] = None
+    ) -> None:
     """Stitch multiple USD files into one using USD Python API.
 
     Uses pxr.UsdUtils.StitchLayers which properly merges time samples
     from multiple files without spawning external processes.
 
+    With ``workers > 1`` the inputs are merged as a pairwise tree instead of
+    folded one by one into a single accumulator: each round stitches
+    disjoint neighbour pairs (earlier file stronger) in parallel worker
+    processes through temporary crate files, so the critical path is
+    log2(n) rounds. StitchLayers keeps the strong side's opinions and
+    unions time samples, so the grouping produces the same layer as the
+    sequential fold. Whether that wins depends on the USD build: where
+    StitchLayers re-copies the accumulator's sample map per merge the fold
+    is O(n^2), where it merges in place the fold is already linear and the
+    tree only pays for the temp-file round trips. Run
+    ``scripts/verify_usd_stitch_tree.py`` against the farm's Houdini before
+    raising ``TH_STITCH_WORKERS``. If the pool cannot start (e.g. an
+    embedded interpreter that cannot spawn) the sequential fold runs instead.
+
     Args:
         input_files: List of USD files to stitch together (in order).
         output_file: Path for the combined output file.
+        workers: Worker processes for the tree reduction. Defaults to
+            ``TH_STITCH_WORKERS``; ``1`` (the default) folds sequentially.
 
     Raises:
         UsdStitchError: If stitching fails.
     """
-    from pxr import Sdf, UsdUtils
+    from concurrent.futures.process import BrokenProcessPool
 
     if not input_files:
         raise UsdStitchError("No input files provided for stitching")
@@ -86,33 +205,99 @@ def stitch_usd_files(input_files: list[Path], output_file: Path) -> None:
         if not f.exists():
             raise UsdStitchError(f"Input file does not exist: {f}")
 
-    # Open first file as the base layer
-    result_layer = Sdf.Layer.FindOrOpen(str(input_files[0]))
-    if result_layer is None:
-        raise UsdStitchError(f"Failed to open first input file: {input_files[0]}")
-
-    # Stitch remaining files into the result layer
-    for input_file in input_files[1:]:
-        weak_layer = Sdf.Layer.FindOrOpen(str(input_file))
-        if weak_layer is None:
-            raise UsdStitchError(f"Failed to open input file: {input_file}")
-
-        # StitchLayers merges weak_layer INTO result_layer
-        # Time samples are merged as a union (what we want)
-        UsdUtils.StitchLayers(result_layer, weak_layer)
+    if workers is None:
+        workers = _default_stitch_workers()
+    workers = min(workers, len(input_files) // 2)
 
-    # Export the stitched result
-    result_layer.Export(str(output_file))
+    if len(input_files) > 2 and workers > 1:
+        try:
+            _stitch_tree(input_files, output_file, workers)
+        except (BrokenProcessPool, OSError):
+            _stitch_sequential(input_files, output_file)
+    else:
+        _stitch_sequential(input_files, output_file)
 
     if not output_file.exists():
         raise UsdStitchError(f"Failed to create output file: {output_file}")
 
 
+def _timed_stitch(input_paths: list[str], output_path: str) -> float:
+    """Process-pool entry point: stitch one layer name, return its seconds."""
+    import time
+
+    input_files = list(map(Path, input_paths))
+    for f in input_files:
+        if not f.exists():
+            raise UsdStitchError(f"Input file does not exist: {f}")
+    start = time.perf_counter()
+    _stitch_sequential(input_files, Path(output_path))
+    if not Path(output_path).exists():
+        raise UsdStitchError(f"Failed to create output file: {output_path}")
+    return time.perf_counter() - start
+
+def _timed_copy(input_path: Path, output_path: Path) -> float:
+    import shutil
+    import time
+
+    start = time.perf_counter()
+    shutil.copy(input_path, output_path)
+    return time.perf_counter() - start
+
+def _stitch_jobs_in_workers(
+    stitch_jobs: list[tuple[Path, list[Path]]],
+    copy_jobs: list[tuple[Path, Path]],
+    output_dir: Path,
+    workers: int
+    ) -> dict[Path, float]:
+    """Run the per-layer stitches in a process pool, copies in a thread pool.
+
+    At most ``workers`` stitches are in flight at once, so no more than that
+    many stitched layers are ever held in memory, however many sidecars the
+    export carries. Copies need no CPU and stream alongside on threads.
+    """
+    import concurrent.futures
+    import multiprocessing
+
+    timings = dict()
+    context = multiprocessing.get_context('spawn')
+    with (
+        concurrent.futures.ProcessPoolExecutor(
+            max_workers = workers,
+            mp_context = context
+        ) as stitch_pool,
+        concurrent.futures.ThreadPoolExecutor(max_workers = 4) as copy_pool
+        ):
+        copy_futures = {
+            copy_pool.submit(_timed_copy, input_path, output_dir / rel_path): rel_path
+            for rel_path, input_path in copy_jobs
+        }
+        pending = dict()
+        remaining = list(reversed(stitch_jobs))
+        while remaining or pending:
+            while remaining and len(pending) < workers:
+                rel_path, files = remaining.pop()
+                future = stitch_pool.submit(
+                    _timed_stitch,
+                    [str(path) for path in files],
+                    str(output_dir / rel_path)
+                )
+                pending[future] = rel_path
+            done, _ = concurrent.futures.wait(
+                pending,
+                return_when = concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                timings[pending.pop(future)] = future.result()
+        for future, rel_path in copy_futures.items():
+            timings[rel_path] = future.result()
+    return timings
+
 def stitch_usd_directories(
     chunk_dirs: list[Path],
     main_filename: str,
-    output_dir: Path
-) -> None:
+    output_dir: Path,
+    workers: Optional[int] = None
+) -> dict[Path, float]:
     """Stitch multiple chunk directories into one output directory.
 
     Each chunk directory should contain:
@@ -124,15 +309,27 @@ def stitch_usd_directories(
     content (e.g. flattened .usd.textures) through to the output,
     preserving the directory structure.
 
+    Every layer name is stitched independently of the others, so with
+    ``workers > 1`` the main layer and the USD sidecars are stitched
+    concurrently in worker processes (at most ``workers`` in flight) while
+    the copies stream on threads. Each layer is still a sequential fold of
+    its own chunks, so the output is byte-identical to the serial path.
+
     Args:
         chunk_dirs: List of chunk directories to merge (in order).
         main_filename: Name of the main USD file in each chunk (e.g., "layer.usd").
         output_dir: Output directory for merged result.
+        workers: Worker processes for the per-layer stitches. Defaults to
+            ``TH_STITCH_WORKERS``; ``1`` (the default) runs serially.
+
+    Returns:
+        Seconds spent per output path (relative to ``output_dir``), for
+        every stitched or copied layer.
 
     Raises:
         UsdStitchError: If stitching fails.
     """
-    import shutil
+    from concurrent.futures.process import BrokenProcessPool
 
     if not chunk_dirs:
         raise UsdStitchError("No chunk directories provided")
@@ -140,12 +337,7 @@ def stitch_usd_directories(
     output_dir.mkdir(parents=True, exist_ok=True)
     main_rel = Path(main_filename)
 
-    # 1. Stitch main USD files
-    main_files = [d / main_filename for d in chunk_dirs]
-    output_main = output_dir / main_filename
-    stitch_usd_files(main_files, output_main)
-
-    # 2. Group every non-main sidecar file across all chunks by its path
+    # 1. Group every non-main sidecar file across all chunks by its path
     # relative to its chunk. USD files (.usd) are stitched; everything else
     # (textures, volumes, ...) is carried through so it is not silently
     # dropped. Skip only the top-level main file - a like-named file deeper
@@ -158,29 +350,49 @@ def stitch_usd_directories(
                 continue
             rel_path = path.relative_to(chunk_dir)
             if rel_path == main_rel:
-                continue  # top-level main file, already stitched
+                continue  # top-level main file, stitched below
             bucket = usd_sidecars if path.suffix == ".usd" else other_sidecars
             bucket.setdefault(rel_path, []).append(path)
 
-    # 3. Stitch each USD sidecar (union its time samples across chunks)
+    # 2. Plan the work. The main USD files and every USD sidecar found in
+    # more than one chunk are stitched (union of their time samples); a
+    # sidecar only one chunk has is just copied. Non-USD sidecars are
+    # carried through: frame-varying assets carry a frame number in their
+    # name (distinct rel paths, all preserved); frame-independent ones
+    # repeat identically per chunk, so last-wins is a straight copy of the
+    # same bytes.
+    stitch_jobs = [(main_rel, [d / main_filename for d in chunk_dirs])]
+    copy_jobs = []
     for rel_path, files in usd_sidecars.items():
-        output_sidecar = output_dir / rel_path
-        output_sidecar.parent.mkdir(parents=True, exist_ok=True)
         if len(files) == 1:
-            # Only one chunk has this file, just copy it
-            shutil.copy(files[0], output_sidecar)
+            copy_jobs.append((rel_path, files[0]))
         else:
-            # Multiple chunks have this file, stitch them
-            stitch_usd_files(files, output_sidecar)
-
-    # 4. Carry non-USD sidecars through. Frame-varying assets carry a frame
-    # number in their name (distinct rel paths, all preserved);
-    # frame-independent ones repeat identically per chunk, so last-wins is
-    # a straight copy of the same bytes.
+            stitch_jobs.append((rel_path, files))
     for rel_path, files in other_sidecars.items():
-        output_sidecar = output_dir / rel_path
-        output_sidecar.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy(files[-1], output_sidecar)
+        copy_jobs.append((rel_path, files[-1]))
+    for rel_path, _ in stitch_jobs + copy_jobs:
+        (output_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+
+    # 3. Stitch and copy
+    if workers is None:
+        workers = _default_stitch_workers()
+    workers = min(workers, len(stitch_jobs))
+    if workers > 1:
+        try:
+            return _stitch_jobs_in_workers(
+                stitch_jobs, copy_jobs, output_dir, workers
+            )
+        except BrokenProcessPool:
+            pass  # the interpreter cannot spawn; redo serially below
+    timings = dict()
+    for rel_path, files in stitch_jobs:
+        timings[rel_path] = _timed_stitch(
+            [str(path) for path in files],
+            str(output_dir / rel_path)
+        )
+    for rel_path, input_path in copy_jobs:
+        timings[rel_path] = _timed_copy(input_path, output_dir / rel_path)
+    return timings
 
 
 DEFAULT_HOUDINI_VERSION = '21.0.559'
@@ -257,6 +469,11 @@ def _scan_path_for_versions(root_path) -> dict[str, dict[str, Path]]:
         )
     return result
 
+# Extra root scanned for ``Program Files/Side Effects Software/Houdini *``
+# installs, taking precedence over the drives — e.g. the stub install the local farm
+# (tumblepipe.apps.local_farm) runs tasks against off-farm.
+HOUDINI_ROOT_ENV = 'TH_HOUDINI_ROOT'
+
 HOUDINI_VERSIONS = None
 def _scan_drives_for_versions() -> dict[str, dict[str, Path]]:
     global HOUDINI_VERSIONS
@@ -276,9 +493,21 @@ def _scan_drives_for_versions() -> dict[str, dict[str, Path]]:
             if not drive_path.exists(): continue
             _versions |= _scan_path_for_versions(drive_path)
 
+    # Scanned last so its installs win over a drive's of the same version
+    extra_root = os.environ.get(HOUDINI_ROOT_ENV)
+    if extra_root:
+        _versions |= _scan_path_for_versions(Path(extra_root))
+
     HOUDINI_VERSIONS = _versions
     return _versions
 
+def list_installed_versions() -> list[str]:
+    """Houdini versions found on this machine, oldest first."""
+    return sorted(
+        _scan_drives_for_versions().keys(),
+        key = lambda version: tuple(map(int, version.split('.')))
+    )
+
 def _find_appropriate_version(
     version_name: str,
     versions: dict[str, dict[str, Path]]
@@ -346,6 +575,10 @@ class Hython:
         env: Optional[dict[str, str]] = None
         ) -> int:
 
+        # Prefer a warm worker; without one, start hython for this script
+        result = await hython_pool.run_pooled(self._hython, script_path, args, cwd, env)
+        if result is not None: return result
+
         async def _from_runner(_message):
             return json.dumps({
                 'cwd': None if cwd is None else path_str(cwd),
@@ -586,6 +819,15 @@ class FFmpeg:
         ) -> int:
         return app.run([path_str(self._ffmpeg), *args], cwd, env)
 
+    def run_feed(self,
+        args: list[str],
+        chunks: Iterable[bytes],
+        cwd: Optional[Path] = None,
+        env: Optional[dict[str, str]] = None
+        ) -> int:
+        """Run with *chunks* written to stdin, for a ``-i -`` input."""
+        return app.run_feed([path_str(self._ffmpeg), *args], chunks, cwd, env)
+
 
 class UsdStitch:
     """Wrapper for Houdini's bundled usdstitch tool."""
@@ -0,0 +1,653 @@
+"""Warm hython workers shared by the scripts run on a machine.
+
+`Hython.run` used to start a fresh hython for every script, and a farm task
+paid for Houdini's start, the ``tumblepipe`` imports and USD's plugin loading
+on every export, stage, publish and composite. With ``TH_HYTHON_POOL`` set to
+a worker count, `Hython.run` hands its script to a `HythonPool` instead: a
+process that keeps that many hythons running ``hython_worker.py`` and feeds
+them scripts over `tumblepipe.util.ipc`.
+
+- The first task to need a pool starts one in the background (``python -m
+  tumblepipe.apps.hython_pool``); later tasks on the machine find it from its
+  state file in the temp dir. A pool is only shared by tasks whose hython
+  and start-up environment (``PATH``, ``PYTHON*``, ``HOUDINI*``, ``PXR_*``,
+  ``OCIO``) are the same, and it exits once it has been idle for
+  ``TH_HYTHON_POOL_IDLE`` seconds (default 600).
+- Every job runs with the caller's whole environment and working dir, in a
+  cleared hip session (see ``hython_worker.py``); its output is written to a
+  log file that the caller prints as it grows, and its exit code is returned
+  as a one-shot hython's would be.
+- A worker is replaced after ``TH_HYTHON_POOL_JOBS`` jobs (default 20), when
+  it holds ``TH_HYTHON_POOL_GROWTH_MB`` (default 2048) more memory than it did
+  once warm, or when it dies; a job whose worker dies fails with the
+  worker's exit code.
+- The pool runs outside the Deadline task, so a caller keeps asking after
+  its job: a job whose caller has not asked for ``LEASE_SECONDS`` (a task
+  that was cancelled, requeued or killed) is cancelled and its worker
+  killed, as a one-shot hython would have been.
+- When no pool can take a job (none starts, none is reachable, or its
+  workers cannot start), the script runs one-shot as before.
+
+The protocol is plain JSON, one message per connection. Every request but
+``ping`` carries the pool's secret token: callers read it from the state
+file, which only its user can read, and workers get it in their
+environment. A worker sends
+``ready`` (with the result of its last job) and gets a ``job`` or ``stop``;
+a caller sends ``submit`` and gets the job id, then ``wait`` until the reply
+is the job's ``result`` rather than ``waiting``. The result is null when the
+job never ran. A caller that gives up sends ``cancel``; ``ping`` and
+``stop`` serve callers and admins. Any program that speaks it can stand in
+for hython; ``scripts/verify_hython_pool.py`` uses plain Python.
+"""
+
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from collections import deque
+from typing import Optional
+from pathlib import Path
+from uuid import uuid4
+import subprocess
+import tempfile
+import platform
+import hashlib
+import secrets
+import hmac
+import asyncio
+import logging
+import json
+import time
+import sys
+import os
+
+from tumblepipe.api import path_str, to_windows_path
+from tumblepipe.util import ipc
+
+# Number of warm workers; unset or 0 runs every script one-shot
+POOL_ENV = 'TH_HYTHON_POOL'
+
+# Jobs a worker runs before it is replaced
+JOBS_ENV = 'TH_HYTHON_POOL_JOBS'
+DEFAULT_JOBS = 20
+
+# Memory a worker may gain over its warm size before it is replaced
+GROWTH_ENV = 'TH_HYTHON_POOL_GROWTH_MB'
+DEFAULT_GROWTH_MB = 2048
+
+# Seconds a background pool waits for work before it exits
+IDLE_ENV = 'TH_HYTHON_POOL_IDLE'
+DEFAULT_IDLE_SECONDS = 600
+
+WORKER_SCRIPT_PATH = Path(__file__).parent / 'hython_worker.py'
+
+# Hands the pool's token to its workers
+TOKEN_ENV = 'TH_HYTHON_POOL_TOKEN'
+
+# Environment that a warm hython has already acted on
+STARTUP_ENV_KEYS = ('PATH', 'OCIO')
+STARTUP_ENV_PREFIXES = ('PYTHON', 'HOUDINI', 'PXR_')
+
+START_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 10.0
+
+# A state lock older than this was left by a pool that died holding it
+LOCK_SECONDS = 10.0
+
+# A wait is answered within WAIT_SECONDS; a job nobody waited on for
+# LEASE_SECONDS has lost its caller
+WAIT_SECONDS = 5.0
+LEASE_SECONDS = 30.0
+
+CLOSE_TIMEOUT = 10.0
+POLL_SECONDS = 0.2
+
+# Workers that may die before their first job before the pool gives up
+MAX_START_FAILURES = 3
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value: return max(0, int(value))
+    return default
+
+def pool_size() -> int:
+    return _env_int(POOL_ENV, 0)
+
+def startup_key(hython_path: Path, env: dict[str, str]) -> str:
+    """Tells apart the pools a job with *env* may and may not run in."""
+    startup_env = {
+        key: value
+        for key, value in env.items()
+        if key in STARTUP_ENV_KEYS or key.startswith(STARTUP_ENV_PREFIXES)
+    }
+    startup_env.pop('PYTHONUNBUFFERED', None)
+    data = json.dumps([path_str(hython_path), startup_env], sort_keys = True)
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+def state_path(key: str) -> Path:
+    """Where the pool for *key* records its port and token."""
+    return Path(tempfile.gettempdir()) / f'th_hython_pool_{key}.json'
+
+@dataclass
+class _Job:
+    job_id: str
+    task: dict
+    future: asyncio.Future
+    lease: Optional[float] = None
+
+@dataclass
+class _Worker:
+    worker_id: str
+    process: asyncio.subprocess.Process
+    jobs: int = 0
+    warm_memory: Optional[int] = None
+    job: Optional[_Job] = None
+    retired: bool = False
+
+class HythonPool:
+    """Up to *size* warm hython workers and the jobs queued for them.
+
+    Workers are started when the first job is submitted and replaced as
+    they retire, for as long as the pool is open.
+    """
+
+    def __init__(self,
+        hython_path: Path,
+        size: int,
+        max_jobs: Optional[int] = None,
+        max_growth_mb: Optional[int] = None,
+        log_path: Optional[Path] = None,
+        lease_seconds: float = LEASE_SECONDS
+        ):
+        self.port = ipc.free_port()
+        self.token = secrets.token_hex(16)
+        self._hython = hython_path
+        self._size = max(1, size)
+        self._max_jobs = _env_int(JOBS_ENV, DEFAULT_JOBS) if max_jobs is None else max_jobs
+        self._max_growth = (
+            _env_int(GROWTH_ENV, DEFAULT_GROWTH_MB) if max_growth_mb is None else max_growth_mb
+        ) * 1024 ** 2
+        self._log_path = log_path
+        self._lease_seconds = lease_seconds
+        self._reaper = None
+        self._server = ipc.Server('localhost', self.port, self._on_message)
+        self._changed = None
+        self._stopped = None
+        self._workers = {}
+        self._watchers = set()
+        self._jobs = {}
+        self._pending = deque()
+        self._closing = False
+        self._start_failures = 0
+        self._last_active = time.time()
+
+    async def __aenter__(self):
+        self._changed = asyncio.Condition()
+        self._stopped = asyncio.Event()
+        await self._server.__aenter__()
+        self._reaper = asyncio.create_task(self._reap())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._closing = True
+        self._reaper.cancel()
+        await self._fail_pending()
+        processes = [worker.process for worker in self._workers.values()]
+        if len(processes) > 0:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(process.wait() for process in processes)),
+                    CLOSE_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                for process in processes:
+                    if process.returncode is None: process.kill()
+        if len(self._watchers) > 0:
+            await asyncio.gather(*self._watchers)
+        # Let the last replies out before the server goes
+        await asyncio.sleep(POLL_SECONDS)
+        await self._server.__aexit__(exc_type, exc, tb)
+
+    def stats(self) -> dict:
+        return dict(
+            workers = len(self._workers),
+            busy = sum(1 for worker in self._workers.values() if worker.job is not None),
+            pending = len(self._pending)
+        )
+
+    async def run(self,
+        script_path: Path,
+        args: list[str],
+        cwd: Path,
+        env: dict[str, str],
+        log_path: Path
+        ) -> Optional[int]:
+        """Run a script in a worker; None when the pool could not run it."""
+        job = await self._submit(dict(
+            cwd = path_str(cwd),
+            env = env,
+            path = path_str(script_path),
+            args = args,
+            log = str(log_path)
+        ))
+        return await self._wait(job.job_id)
+
+    async def serve(self, idle_seconds: float):
+        """Serve until stopped, or idle for *idle_seconds*."""
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            if self._busy(): continue
+            if time.time() - self._last_active > idle_seconds: break
+
+    def _busy(self) -> bool:
+        if len(self._pending) > 0: return True
+        return any(worker.job is not None for worker in self._workers.values())
+
+    async def _on_message(self, message: str) -> str:
+        try:
+            request = json.loads(message)
+            kind = request.get('kind')
+            if kind != 'ping' and not self._authorized(request):
+                reply = dict(kind = 'error', message = 'Not authorized')
+            elif kind == 'ready': reply = await self._on_ready(request)
+            elif kind == 'submit': reply = await self._on_submit(request)
+            elif kind == 'wait': reply = await self._on_wait(request)
+            elif kind == 'cancel': reply = await self._on_cancel(request)
+            elif kind == 'ping': reply = dict(kind = 'pong', **self.stats())
+            elif kind == 'stop':
+                self._stopped.set()
+                reply = dict(kind = 'stopping')
+            else: reply = dict(kind = 'error', message = f'Unknown request: {kind}')
+        except Exception as error:
+            logging.exception('Hython pool request failed')
+            reply = dict(kind = 'error', message = str(error))
+        return json.dumps(reply)
+
+    def _authorized(self, request: dict) -> bool:
+        token = request.get('token')
+        if not isinstance(token, str): return False
+        return hmac.compare_digest(token, self.token)
+
+    async def _on_ready(self, request: dict) -> dict:
+        worker = self._workers.get(request['worker'])
+        if worker is None: return dict(kind = 'stop')
+
+        # Finish the last job
+        if worker.job is not None:
+            if not worker.job.future.done():
+                worker.job.future.set_result(request.get('result'))
+            worker.job = None
+            worker.jobs += 1
+            self._last_active = time.time()
+
+        # Retire a worker that ran enough or grew too much
+        memory = request.get('memory')
+        if worker.warm_memory is None:
+            worker.warm_memory = memory
+            self._start_failures = 0
+        elif memory is not None and memory - worker.warm_memory > self._max_growth:
+            logging.info(f'Retiring hython worker {worker.worker_id}: memory grew to {memory}')
+            worker.retired = True
+        if self._max_jobs > 0 and worker.jobs >= self._max_jobs:
+            worker.retired = True
+        if worker.retired: return dict(kind = 'stop')
+
+        # Wait for the next job
+        async with self._changed:
+            await self._changed.wait_for(lambda: (
+                self._closing or worker.retired or len(self._pending) > 0
+            ))
+            if self._closing or worker.retired: return dict(kind = 'stop')
+            job = self._pending.popleft()
+        worker.job = job
+        return dict(kind = 'job', job = job.job_id, task = job.task)
+
+    async def _on_submit(self, request: dict) -> dict:
+        job = await self._submit(request['task'], lease = time.time())
+        return dict(kind = 'accepted', job = job.job_id)
+
+    async def _on_wait(self, request: dict) -> dict:
+        job = self._jobs.get(request['job'])
+        if job is None: return dict(kind = 'result', result = None)
+        job.lease = time.time()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job.future), WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            job.lease = time.time()
+            return dict(kind = 'waiting')
+        self._jobs.pop(job.job_id, None)
+        return dict(kind = 'result', result = result)
+
+    async def _on_cancel(self, request: dict) -> dict:
+        job = self._jobs.get(request['job'])
+        if job is not None:
+            await self._cancel(job, 'its caller cancelled it')
+        return dict(kind = 'cancelled')
+
+    async def _cancel(self, job: _Job, reason: str):
+        """Drop *job*, killing the worker that runs it."""
+        self._jobs.pop(job.job_id, None)
+        if job.future.done(): return
+        logging.warning(f'Cancelling hython job {job.job_id}: {reason}')
+        job.future.set_result(None)
+        async with self._changed:
+            self._pending = deque(other for other in self._pending if other is not job)
+        for worker in self._workers.values():
+            if worker.job is not job: continue
+            worker.retired = True
+            if worker.process.returncode is None: worker.process.kill()
+
+    async def _reap(self):
+        """Cancel the jobs whose callers stopped waiting for them."""
+        while True:
+            await asyncio.sleep(1.0)
+            now = time.time()
+            for job in list(self._jobs.values()):
+                if job.lease is None: continue
+                if now - job.lease <= self._lease_seconds: continue
+                await self._cancel(job, 'its caller stopped waiting')
+
+    async def _submit(self, task: dict, lease: Optional[float] = None) -> _Job:
+        job = _Job(
+            job_id = uuid4().hex,
+            task = task,
+            future = asyncio.get_running_loop().create_future(),
+            lease = lease
+        )
+        self._jobs[job.job_id] = job
+        self._last_active = time.time()
+        if self._closing:
+            job.future.set_result(None)
+            return job
+        async with self._changed:
+            self._pending.append(job)
+            self._changed.notify_all()
+        await self._fill()
+        return job
+
+    async def _wait(self, job_id: str) -> Optional[int]:
+        job = self._jobs.get(job_id)
+        if job is None: return None
+        try:
+            return await asyncio.shield(job.future)
+        finally:
+            if job.future.done(): self._jobs.pop(job_id, None)
+
+    async def _fail_pending(self):
+        async with self._changed:
+            while len(self._pending) > 0:
+                self._pending.popleft().future.set_result(None)
+            self._changed.notify_all()
+
+    async def _fill(self):
+        while not self._closing and len(self._workers) < self._size:
+            if self._start_failures >= MAX_START_FAILURES: break
+            await self._spawn()
+
+    async def _spawn(self):
+        worker_id = uuid4().hex[:8]
+        env = os.environ.copy()
+        env['PYTHONUNBUFFERED'] = '1'
+        env[TOKEN_ENV] = self.token
+        output = subprocess.DEVNULL
+        if self._log_path is not None:
+            output = self._log_path.open('ab')
+        try:
+            process = await asyncio.create_subprocess_exec(
+                path_str(self._hython),
+                path_str(to_windows_path(WORKER_SCRIPT_PATH)),
+                str(self.port),
+                worker_id,
+                stdin = subprocess.DEVNULL,
+                stdout = output,
+                stderr = subprocess.STDOUT,
+                env = env
+            )
+        except OSError:
+            logging.exception('Failed to start a hython worker')
+            self._start_failures += 1
+            return
+        finally:
+            if output is not subprocess.DEVNULL: output.close()
+        worker = _Worker(worker_id = worker_id, process = process)
+        self._workers[worker_id] = worker
+        watcher = asyncio.create_task(self._watch(worker))
+        self._watchers.add(watcher)
+        watcher.add_done_callback(self._watchers.discard)
+
+    async def _watch(self, worker: _Worker):
+        return_code = await worker.process.wait()
+        self._workers.pop(worker.worker_id, None)
+        if worker.warm_memory is None and not self._closing:
+            logging.warning(f'Hython worker exited with {return_code} before it was ready')
+            self._start_failures += 1
+        job, worker.job = worker.job, None
+        if job is not None and not job.future.done():
+            logging.warning(f'Hython worker died running a job: exit code {return_code}')
+            job.future.set_result(return_code if return_code != 0 else 1)
+        async with self._changed:
+            worker.retired = True
+            self._changed.notify_all()
+        if self._closing: return
+        if self._start_failures >= MAX_START_FAILURES:
+            if len(self._workers) == 0: await self._fail_pending()
+            return
+        await self._fill()
+
+async def _request(port: int, message: dict, timeout: Optional[float] = REQUEST_TIMEOUT) -> dict:
+    async def _exchange():
+        async with ipc.Client('localhost', port) as client:
+            await client.send(json.dumps(message))
+            return json.loads(await client.receive())
+    return await asyncio.wait_for(_exchange(), timeout)
+
+async def _live_pool(path: Path) -> Optional[dict]:
+    """The port and token of the pool recorded at *path*, if it answers."""
+    try:
+        state = json.loads(path.read_text())
+        port = state['port']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    try:
+        reply = await _request(port, dict(kind = 'ping'), 2.0)
+    except (OSError, ValueError, asyncio.TimeoutError):
+        return None
+    if reply.get('kind') != 'pong': return None
+    return state
+
+def _pool_command(hython_path: Path, path: Path, size: int) -> list[str]:
+    return [
+        sys.executable, '-m', 'tumblepipe.apps.hython_pool',
+        path_str(hython_path), str(path), str(size)
+    ]
+
+def _start_pool(hython_path: Path, path: Path, size: int, env: dict[str, str]):
+    env = env.copy()
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [
+        str(Path(__file__).parent.parent.parent),
+        env.get('PYTHONPATH')
+    ]))
+    args = dict(
+        stdin = subprocess.DEVNULL,
+        stdout = subprocess.DEVNULL,
+        stderr = subprocess.DEVNULL,
+        env = env
+    )
+    if platform.system() == 'Windows':
+        # Outlive the task, and the job object Deadline runs it in, if allowed
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        try:
+            subprocess.Popen(
+                _pool_command(hython_path, path, size),
+                creationflags = flags | subprocess.CREATE_BREAKAWAY_FROM_JOB,
+                **args
+            )
+            return
+        except OSError:
+            args['creationflags'] = flags
+    else:
+        args['start_new_session'] = True
+    subprocess.Popen(_pool_command(hython_path, path, size), **args)
+
+async def _pool_state(hython_path: Path, size: int, env: dict[str, str]) -> Optional[dict]:
+    """The port and token of a pool for this hython and *env*, started if need be."""
+    path = state_path(startup_key(hython_path, env))
+    state = await _live_pool(path)
+    if state is not None: return state
+    try:
+        _start_pool(hython_path, path, size, env)
+    except OSError:
+        logging.exception('Failed to start a hython pool')
+        return None
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        await asyncio.sleep(POLL_SECONDS)
+        state = await _live_pool(path)
+        if state is not None: return state
+    logging.warning('No hython pool started in time')
+    return None
+
+async def _print_log(log_path: Path, done: asyncio.Event):
+    with log_path.open('rb') as log_file:
+        while True:
+            finished = done.is_set()
+            chunk = log_file.read()
+            if len(chunk) > 0:
+                print(chunk.decode('utf-8', errors = 'replace'), end = '')
+                sys.stdout.flush()
+                continue
+            if finished: break
+            await asyncio.sleep(POLL_SECONDS)
+
+async def run_pooled(
+    hython_path: Path,
+    script_path: Path,
+    args: list[str],
+    cwd: Optional[Path] = None,
+    env: Optional[dict[str, str]] = None
+    ) -> Optional[int]:
+    """Run a script in this machine's warm pool and print its output.
+
+    Returns the script's exit code, or None when no pool could run it and
+    the caller should run it one-shot.
+    """
+    size = pool_size()
+    if size == 0: return None
+
+    # The job gets what a one-shot hython would have inherited
+    _env = os.environ.copy()
+    _env['PYTHONUNBUFFERED'] = '1'
+    if env is not None:
+        _env.update(env)
+    state = await _pool_state(hython_path, size, _env)
+    if state is None: return None
+    port, token = state['port'], state.get('token')
+
+    # Queue the job
+    log_fd, log_name = tempfile.mkstemp(prefix = 'th_hython_', suffix = '.log')
+    os.close(log_fd)
+    log_path = Path(log_name)
+    try:
+        try:
+            reply = await _request(port, dict(kind = 'submit', token = token, task = dict(
+                cwd = path_str(Path.cwd() if cwd is None else cwd),
+                env = _env,
+                path = path_str(script_path),
+                args = args,
+                log = log_name
+            )))
+        except (OSError, ValueError, asyncio.TimeoutError) as error:
+            logging.warning(f'Hython pool did not take the job: {error}')
+            return None
+        if reply.get('kind') != 'accepted': return None
+
+        # Print its output until it is done
+        job_id = reply['job']
+        done = asyncio.Event()
+        printer = asyncio.create_task(_print_log(log_path, done))
+        try:
+            while True:
+                reply = await _request(
+                    port, dict(kind = 'wait', token = token, job = job_id),
+                    REQUEST_TIMEOUT + WAIT_SECONDS
+                )
+                if reply.get('kind') != 'waiting': return reply.get('result')
+        except (OSError, ValueError, asyncio.TimeoutError) as error:
+            logging.error(f'Lost the hython pool running {script_path}: {error}')
+            return 1
+        except BaseException:
+            # Take the job down with this task
+            with suppress(Exception):
+                await _request(port, dict(kind = 'cancel', token = token, job = job_id))
+            raise
+        finally:
+            done.set()
+            await printer
+    finally:
+        log_path.unlink(missing_ok = True)
+
+@asynccontextmanager
+async def _locked(path: Path):
+    """Hold the lock on the state file at *path*."""
+    lock_path = path.with_suffix('.lock')
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            break
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - lock_path.stat().st_mtime > LOCK_SECONDS:
+                lock_path.unlink(missing_ok = True)
+        except OSError:
+            pass
+        await asyncio.sleep(POLL_SECONDS)
+    try:
+        yield
+    finally:
+        lock_path.unlink(missing_ok = True)
+
+def _write_state(path: Path, state: dict):
+    # Created for this user only; the token in it lets a caller run code
+    fd, temp_name = tempfile.mkstemp(prefix = path.name, suffix = '.tmp', dir = path.parent)
+    try:
+        with os.fdopen(fd, 'w') as state_file:
+            state_file.write(json.dumps(state))
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok = True)
+        raise
+
+async def _claim(path: Path, pool: HythonPool) -> bool:
+    """Record *pool* at *path*, unless a live one already is."""
+    async with _locked(path):
+        if await _live_pool(path) is not None: return False
+        _write_state(path, dict(port = pool.port, pid = os.getpid(), token = pool.token))
+        return True
+
+async def _release(path: Path, port: int):
+    async with _locked(path):
+        try:
+            if json.loads(path.read_text())['port'] != port: return
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        path.unlink(missing_ok = True)
+
+async def _serve(hython_path: Path, path: Path, size: int) -> int:
+    if await _live_pool(path) is not None: return 0
+    log_path = path.with_suffix('.log')
+    async with HythonPool(hython_path, size, log_path = log_path) as pool:
+        if not await _claim(path, pool): return 0
+        try:
+            await pool.serve(_env_int(IDLE_ENV, DEFAULT_IDLE_SECONDS))
+        finally:
+            await _release(path, pool.port)
+    return 0
+
+def main(args: list[str]) -> int:
+    hython_path, path, size = Path(args[0]), Path(args[1]), int(args[2])
+    return asyncio.run(_serve(hython_path, path, size))
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
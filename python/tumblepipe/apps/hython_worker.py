@@ -0,0 +1,213 @@
+"""Warm hython worker of `tumblepipe.apps.hython_pool`.
+
+Started by a pool as ``hython hython_worker.py <port> <worker id>``. It loads
+the modules named by ``TH_HYTHON_POOL_PRELOAD`` once, then asks the pool for
+scripts over `tumblepipe.util.ipc`, showing the token it was started with in
+``TH_HYTHON_POOL_TOKEN``, and runs them one after another, the way
+``houdini_runner.py`` runs its single script. Each job runs in isolation:
+
+- ``os.environ`` is replaced by the job's environment and the working dir
+  set to the job's;
+- output, including that of Houdini itself, goes to the job's log file;
+- afterwards the hip session is cleared, the environment, working dir and
+  ``sys.path`` are restored, the ``tumblepipe`` modules the job imported are
+  dropped and the shared API client is reset.
+
+The result of a job goes to the pool with the next request, along with the
+memory the worker holds; the pool answers with the next job or tells the
+worker to exit. Nothing here needs Houdini: under plain Python, ``hou`` is
+simply not there to clear.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from unittest.mock import patch
+from typing import Optional
+from pathlib import Path
+import traceback
+import importlib
+import asyncio
+import json
+import sys
+import os
+
+# Add tumblepipe python packages path
+tumblepipe_packages_path = Path(__file__).parent.parent.parent
+if tumblepipe_packages_path not in sys.path:
+    sys.path.append(str(tumblepipe_packages_path))
+
+from tumblepipe.util.system import process_memory
+from tumblepipe.util import ipc
+from tumblepipe.api import local_path, reset_default_client
+
+# The pool's token, which no job gets to see
+TOKEN_ENV = 'TH_HYTHON_POOL_TOKEN'
+
+# Modules loaded before the first job; the slow part of a hython start
+PRELOAD_ENV = 'TH_HYTHON_POOL_PRELOAD'
+DEFAULT_PRELOAD = 'hou,pxr.Usd'
+
+def _headline(msg):
+    print(f' {msg} '.center(80, '='))
+    sys.stdout.flush()
+
+@dataclass
+class Task:
+    cwd: Optional[Path]
+    env: dict[str, str]
+    path: Path
+    args: list[str]
+    log: Path
+
+def _task_decode(raw_task: dict) -> Task:
+    def _maybe_path(value: Optional[str]) -> Optional[Path]:
+        if value is None: return None
+        return Path(value)
+    return Task(
+        cwd = _maybe_path(raw_task['cwd']),
+        env = raw_task['env'],
+        path = Path(raw_task['path']),
+        args = raw_task['args'],
+        log = Path(raw_task['log'])
+    )
+
+def _preload():
+    names = os.environ.get(PRELOAD_ENV, DEFAULT_PRELOAD)
+    for name in filter(None, map(str.strip, names.split(','))):
+        try:
+            importlib.import_module(name)
+        except ImportError as error:
+            print(f'Not preloading {name}: {error}')
+    sys.stdout.flush()
+
+def _read_script_file(script_file_path: Path):
+    with script_file_path.open("r") as script_file:
+        return script_file.read()
+
+def _run_script(script_file_path: Path, args: list[str]) -> int:
+    _headline('Hython Worker: Running script')
+    print(f'Script path: {script_file_path}')
+    print(f'Arguments: {args}')
+    sys.stdout.flush()
+    script = _read_script_file(script_file_path)
+    try:
+        with patch.object(sys, 'argv', [sys.argv[0], str(script_file_path), *args]):
+            exec(
+                compile(script, script_file_path, "exec"),
+                { '__name__': '__main__' }
+            )
+    except SystemExit as exit:
+        # Exit codes as a one-shot hython would report them
+        if exit.code is None: return 0
+        if isinstance(exit.code, int): return exit.code
+        print(exit.code, file = sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    _headline('Hython Worker: Done')
+    return 0
+
+def _clear_session():
+    hou = sys.modules.get('hou')
+    if hou is None: return
+    try:
+        hou.hipFile.clear(suppress_save_prompt = True)
+    except Exception:
+        traceback.print_exc()
+
+@contextmanager
+def _redirected(log_path: Path):
+    """Send fds 1 and 2, and so every print of the job, to *log_path*."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    with open(log_path, 'ab', buffering = 0) as log_file:
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+
+def _drop_module(name: str):
+    module = sys.modules.pop(name)
+
+    # A warm parent package still holds it, and `from parent import name` would find it
+    parent_name, _, child_name = name.rpartition('.')
+    parent = sys.modules.get(parent_name)
+    if parent is not None and getattr(parent, child_name, None) is module:
+        delattr(parent, child_name)
+
+@contextmanager
+def _isolated(task: Task):
+    saved_env = dict(os.environ)
+    saved_cwd = os.getcwd()
+    saved_path = list(sys.path)
+    saved_modules = set(sys.modules)
+    saved_streams = sys.stdout, sys.stderr
+    os.environ.clear()
+    os.environ.update(task.env)
+    try:
+        if task.cwd is not None:
+            os.chdir(local_path(task.cwd))
+        yield
+    finally:
+        _clear_session()
+        sys.stdout, sys.stderr = saved_streams
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        for name in set(sys.modules) - saved_modules:
+            if name != 'tumblepipe' and not name.startswith('tumblepipe.'): continue
+            _drop_module(name)
+        reset_default_client()
+
+def _task_run(task: Task) -> int:
+    with _redirected(task.log):
+        try:
+            with _isolated(task):
+                return _run_script(task.path, task.args)
+        except Exception:
+            traceback.print_exc()
+            return 1
+
+async def _exchange(port: int, message: dict) -> dict:
+    async with ipc.Client('localhost', port) as client:
+        await client.send(json.dumps(message))
+        return json.loads(await client.receive())
+
+def _worker():
+    port = int(sys.argv[-2])
+    worker_id = sys.argv[-1]
+    token = os.environ.pop(TOKEN_ENV, None)
+
+    # Load what every job would otherwise load again
+    _preload()
+
+    # Run jobs until the pool is done with this worker
+    message = dict(kind = 'ready', token = token, worker = worker_id, job = None, result = None)
+    while True:
+        message['memory'] = process_memory()
+        reply = asyncio.run(_exchange(port, message))
+        if reply.get('kind') != 'job': return 0
+        result = _task_run(_task_decode(reply['task']))
+        message = dict(
+            kind = 'ready',
+            token = token,
+            worker = worker_id,
+            job = reply['job'],
+            result = result
+        )
+
+if __name__ == '__main__':
+    sys.exit(_worker())
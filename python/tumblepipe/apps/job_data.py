@@ -0,0 +1,338 @@
+"""Content-addressed store for Deadline job data.
+
+Every submission gets a fresh ``<jobs root>/<uuid>/data/`` dir holding the
+files its tasks read (workfiles, collapsed stages, render settings, configs).
+Resubmitting a shot used to copy the same payload to the repository share all
+over again. Instead, each file is now hashed on the submitting machine and
+stored once, read-only, under ``<jobs root>/_blobs/<xx>/<sha256>``. The
+job's ``data/`` entry is a hardlink to that blob, so only bytes the store has
+not seen yet cross the network.
+
+Each job dir also gets a ``data_manifest.json`` (relative path -> digest),
+written before any blob is stored. It records which blobs the job references,
+and lets `collect_unreferenced_blobs` (``scripts/gc_job_blobs.py``) find blobs
+no job refers to any more once old job dirs are cleaned up.
+
+Link support is probed once per jobs root. Where the share refuses hardlinks,
+blobs are still stored once each but ``data/`` is left without them: the job
+resolves its data from the manifest instead, with `materialize` copying each
+listed blob into ``data/`` on the worker before the task starts (see
+``tumblepipe.farm.tasks.launch``).
+
+Files under ``data/`` may be links to shared blobs: tasks must treat them as
+read-only and replace rather than rewrite them.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+import threading
+import logging
+import hashlib
+import shutil
+import stat
+import json
+import time
+import os
+
+BLOBS_DIR = '_blobs'
+MANIFEST_NAME = 'data_manifest.json'
+
+# Set to 0 to copy job data straight into each job dir, without the store.
+STORE_ENV = 'TH_DEADLINE_BLOB_STORE'
+
+_CHUNK_SIZE = 1 << 20
+
+# Digests of source files this process already hashed, keyed by path and
+# stat stamp, so resubmitting from the same session skips re-reading them.
+_DIGESTS = dict()
+
+# Whether each jobs root (by path) takes hardlinks; probed on first use.
+_LINK_SUPPORT = dict()
+_LINK_SUPPORT_LOCK = threading.Lock()
+
+@dataclass
+class StoreStats:
+    files: int = 0
+    new_bytes: int = 0
+    reused_bytes: int = 0
+    copied_files: int = 0
+    # Files left for the worker to copy from the store (no hardlinks)
+    manifest_files: int = 0
+
+def _walk_path(path: Path):
+    if path.is_file(): yield path; return
+    for subpath in path.iterdir():
+        for subsubpath in _walk_path(subpath):
+            yield subsubpath
+
+def expand_paths(paths: dict[Path, Path]) -> dict[Path, Path]:
+    """Flatten a ``job.paths`` mapping to ``{relative file path: source}``.
+
+    Directory entries expand to every file below them; when two entries map
+    to the same relative path the first one wins.
+    """
+    result = dict()
+    for from_path, rel_to_path in paths.items():
+        for from_file_path in _walk_path(from_path):
+            rel_path = (
+                Path(rel_to_path) if from_file_path == from_path else
+                Path(rel_to_path) / from_file_path.relative_to(from_path)
+            )
+            result.setdefault(rel_path, from_file_path)
+    return result
+
+def file_digest(path: Path) -> str:
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _DIGESTS.get(key)
+    if digest is not None: return digest
+    hasher = hashlib.sha256()
+    with path.open('rb') as file:
+        while True:
+            chunk = file.read(_CHUNK_SIZE)
+            if not chunk: break
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    _DIGESTS[key] = digest
+    return digest
+
+def blob_path(jobs_path: Path, digest: str) -> Path:
+    return jobs_path / BLOBS_DIR / digest[:2] / digest
+
+def _store_blob(source_path: Path, target_path: Path) -> bool:
+    """Copy *source_path* into the store; False if the blob already exists.
+
+    Written to a temp name, made read-only and renamed into place, so a
+    concurrent submit never links a half-written blob and no job can rewrite
+    one through its link.
+    """
+    if target_path.exists():
+        # Touch it so a GC grace period counts from the last use
+        try: os.utime(target_path)
+        except OSError: pass
+        return False
+    target_path.parent.mkdir(parents = True, exist_ok = True)
+    temp_path = target_path.with_name(f'{target_path.name}.{uuid4().hex}.tmp')
+    try:
+        shutil.copyfile(source_path, temp_path)
+        os.chmod(temp_path, 0o444)
+        try:
+            os.replace(temp_path, target_path)
+        except PermissionError:
+            # A concurrent submit stored the same (read-only) blob first
+            if not target_path.exists(): raise
+            _unlink(temp_path)
+            return False
+    except BaseException:
+        _unlink(temp_path)
+        raise
+    return True
+
+def _unlink(path: Path):
+    try:
+        path.unlink(missing_ok = True)
+    except PermissionError:
+        # Read-only files cannot be deleted on Windows
+        os.chmod(path, stat.S_IWRITE)
+        path.unlink(missing_ok = True)
+
+def _probe_links(jobs_path: Path) -> bool:
+    probe_dir = jobs_path / BLOBS_DIR
+    probe_dir.mkdir(parents = True, exist_ok = True)
+    probe_path = probe_dir / f'.link_probe.{uuid4().hex}'
+    link_path = probe_path.with_name(f'{probe_path.name}.link')
+    try:
+        probe_path.write_bytes(b'')
+        os.link(probe_path, link_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        link_path.unlink(missing_ok = True)
+        probe_path.unlink(missing_ok = True)
+
+def links_supported(jobs_path: Path) -> bool:
+    """Whether *jobs_path*'s share takes hardlinks; probed once per root."""
+    key = str(jobs_path)
+    with _LINK_SUPPORT_LOCK:
+        supported = _LINK_SUPPORT.get(key)
+        if supported is None:
+            supported = _probe_links(jobs_path)
+            _LINK_SUPPORT[key] = supported
+            if not supported:
+                logging.info(f'No hardlinks under {jobs_path}; job data resolves from manifests')
+    return supported
+
+def store_requested() -> bool:
+    """Whether job data should go through the blob store at all."""
+    return os.environ.get(STORE_ENV, '1') != '0'
+
+def _link_file(digest, rel_path, data_path, jobs_path) -> bool:
+    """Hardlink blob *digest* to ``data_path/rel_path``; False if refused."""
+    to_path = data_path / rel_path
+    to_path.parent.mkdir(parents = True, exist_ok = True)
+    try:
+        os.link(blob_path(jobs_path, digest), to_path)
+    except OSError:
+        return False
+    return True
+
+def _copy_blob(digest: str, to_path: Path, jobs_path: Path):
+    to_path.parent.mkdir(parents = True, exist_ok = True)
+    temp_path = to_path.with_name(f'{to_path.name}.{uuid4().hex}.tmp')
+    try:
+        shutil.copyfile(blob_path(jobs_path, digest), temp_path)
+        os.replace(temp_path, to_path)
+    except BaseException:
+        temp_path.unlink(missing_ok = True)
+        raise
+
+def _copy_files(files, data_path, stats):
+    for rel_path, source_path in files.items():
+        to_path = data_path / rel_path
+        to_path.parent.mkdir(parents = True, exist_ok = True)
+        shutil.copyfile(source_path, to_path)
+        stats.files += 1
+        stats.copied_files += 1
+        stats.new_bytes += source_path.stat().st_size
+
+def store_job_data(
+    job_path: Path,
+    files: dict[Path, Path],
+    jobs_path: Path,
+    max_workers: int = 8
+    ) -> StoreStats:
+    """Place *files* (``{relative path: source}``) under ``job_path/data``.
+
+    Files are hashed on a thread pool and the manifest is written, so a GC
+    running meanwhile sees the job's blobs as referenced; then blobs are
+    stored and linked, again on the pool. Where the jobs root takes no
+    hardlinks, ``data/`` is left for `materialize` to fill on the worker.
+    """
+    data_path = job_path / 'data'
+    stats = StoreStats()
+    if len(files) == 0: return stats
+    if not store_requested():
+        _copy_files(files, data_path, stats)
+        return stats
+
+    workers = max(1, min(max_workers, len(files)))
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+
+        # Hash
+        digests = dict(zip(
+            files.keys(),
+            executor.map(file_digest, files.values())
+        ))
+        manifest = {
+            Path(rel_path).as_posix(): digest
+            for rel_path, digest in digests.items()
+        }
+        job_path.mkdir(parents = True, exist_ok = True)
+        (job_path / MANIFEST_NAME).write_text(json.dumps(manifest, indent = 4))
+
+        # Store
+        is_new = dict(zip(
+            files.keys(),
+            executor.map(
+                lambda rel_path: _store_blob(
+                    files[rel_path], blob_path(jobs_path, digests[rel_path])
+                ),
+                files.keys()
+            )
+        ))
+
+        # Link
+        linked = dict.fromkeys(files.keys(), False)
+        if links_supported(jobs_path):
+            linked = dict(zip(
+                files.keys(),
+                executor.map(
+                    lambda rel_path: _link_file(
+                        digests[rel_path], rel_path, data_path, jobs_path
+                    ),
+                    files.keys()
+                )
+            ))
+
+    for rel_path, source_path in files.items():
+        size = source_path.stat().st_size
+        stats.files += 1
+        stats.manifest_files += int(not linked[rel_path])
+        if is_new[rel_path]: stats.new_bytes += size
+        else: stats.reused_bytes += size
+    logging.debug(
+        f'Job data: {stats.files} files, '
+        f'{stats.new_bytes} new bytes, {stats.reused_bytes} reused bytes, '
+        f'{stats.manifest_files} left to the manifest'
+    )
+    return stats
+
+def materialize(data_path: Path, max_workers: int = 8) -> int:
+    """Copy the blobs a job's manifest lists into *data_path*.
+
+    *data_path* is the ``data/`` dir of a job dir directly under the jobs
+    root. Only files missing from it are copied, so this is a no-op for jobs
+    whose data was hardlinked and cheap to repeat for every task of a job.
+    Returns the number of files copied.
+    """
+    manifest_path = data_path.parent / MANIFEST_NAME
+    if not manifest_path.exists(): return 0
+    jobs_path = data_path.parent.parent
+    manifest = json.loads(manifest_path.read_text())
+    missing = {
+        data_path / rel_path: digest
+        for rel_path, digest in manifest.items()
+        if not (data_path / rel_path).exists()
+    }
+    if len(missing) == 0: return 0
+    workers = max(1, min(max_workers, len(missing)))
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        list(executor.map(
+            lambda to_path: _copy_blob(missing[to_path], to_path, jobs_path),
+            missing.keys()
+        ))
+    logging.debug(f'Job data: copied {len(missing)} files from {jobs_path}')
+    return len(missing)
+
+def _referenced_digests(jobs_path: Path) -> set[str]:
+    digests = set()
+    for manifest_path in jobs_path.glob(f'*/{MANIFEST_NAME}'):
+        try:
+            digests.update(json.loads(manifest_path.read_text()).values())
+        except (OSError, ValueError):
+            logging.warning(f'Unreadable job data manifest: {manifest_path}')
+    return digests
+
+def collect_unreferenced_blobs(
+    jobs_path: Path,
+    grace_seconds: float = 24 * 60 * 60,
+    dry_run: bool = False
+    ) -> tuple[int, int]:
+    """Delete blobs no job refers to; returns ``(blob count, bytes)``.
+
+    A blob is kept while any job manifest lists it, while it still has
+    other hardlinks, or while it was stored or reused within
+    *grace_seconds* — the last guards blobs a submission still in flight
+    has stored but not yet listed. Left-over temp files older than the grace
+    period go too.
+    """
+    blobs_path = jobs_path / BLOBS_DIR
+    if not blobs_path.exists(): return 0, 0
+    referenced = _referenced_digests(jobs_path)
+    cutoff = time.time() - grace_seconds
+    count, size = 0, 0
+    for path in blobs_path.glob('*/*'):
+        if not path.is_file(): continue
+        stat = path.stat()
+        if stat.st_mtime > cutoff: continue
+        is_temp = path.suffix == '.tmp'
+        if not is_temp and (path.name in referenced or stat.st_nlink > 1):
+            continue
+        count += 1
+        size += stat.st_size
+        if dry_run: continue
+        _unlink(path)
+    return count, size
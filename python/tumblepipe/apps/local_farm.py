@@ -0,0 +1,381 @@
+"""Run Deadline batches on this machine, without a Deadline repository.
+
+`LocalFarm` takes the same `Batch`/`Job` objects as `Deadline.submit` and runs
+them as local subprocesses, so farm tasks, dependency ordering and chunking
+can be exercised and profiled off-farm. Each job is split into tasks by its
+``chunk_size`` the way Deadline splits it, and a task runs the job's script
+as ``python <script> <args...> <first frame> <last frame>`` — the command
+line the HPM plugin gives it on a worker — with its working directory and
+``TH_FARM_DATA`` pointing at the job's ``data/`` dir. Jobs wait for their
+dependencies to complete; the dependents of a failed job stay ``Pending``,
+as they would on Deadline.
+
+`find_jobs` / `find_tasks` return the same key/value dicts as the `Deadline`
+queries, with per-task timings added, and every batch dir gets a
+``local_timings.json`` once its tasks finish.
+
+Where no Houdini is installed, tasks run against stub executables instead
+(see `install_stub_houdini`): they log their arguments, sleep for
+``TH_STUB_SECONDS`` and exit with ``TH_STUB_EXIT_CODE``. The stubs are Python
+scripts with a shebang, so they only run on POSIX hosts.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from pathlib import Path
+from uuid import uuid4
+import subprocess
+import threading
+import logging
+import json
+import time
+import sys
+import os
+
+from tumblepipe.apps import job_data
+from tumblepipe.apps.deadline import Batch, Job
+from tumblepipe.apps.houdini import (
+    DEFAULT_HOUDINI_VERSION,
+    HOUDINI_VERSION_ENV,
+    HOUDINI_ROOT_ENV,
+    list_installed_versions
+)
+
+# Number of tasks run at once when no worker count is given.
+WORKERS_ENV = 'TH_LOCAL_FARM_WORKERS'
+
+TIMINGS_NAME = 'local_timings.json'
+STUB_APPS_DIR = '_stub_houdini'
+
+# Executables a stub install provides; the first three are what
+# `apps.houdini` requires to accept an install.
+STUB_APP_NAMES = [
+    'hython.exe',
+    'husk.exe',
+    'iconvert.exe',
+    'itilestitch.exe',
+    'usdstitch.cmd',
+    'hoiiotool.exe',
+    'hffmpeg.exe',
+    'idenoise.exe'
+]
+
+_STUB_SCRIPT = '''#!{python}
+import json, os, sys, time
+log_path = os.environ.get('TH_STUB_LOG')
+if log_path:
+    with open(log_path, 'a') as log_file:
+        log_file.write(json.dumps(sys.argv) + '\\n')
+print('stub: ' + ' '.join(sys.argv))
+time.sleep(float(os.environ.get('TH_STUB_SECONDS', '0')))
+sys.exit(int(os.environ.get('TH_STUB_EXIT_CODE', '0')))
+'''
+
+def install_stub_houdini(
+    root_path: Path,
+    version: str = DEFAULT_HOUDINI_VERSION
+    ) -> Path:
+    """Write a stub Houdini install under *root_path*; returns its bin dir.
+
+    The layout matches what `apps.houdini` scans for, so pointing
+    ``TH_HOUDINI_ROOT`` at *root_path* makes `Hython`, `Husk` and friends
+    resolve to the stubs.
+    """
+    bin_path = (
+        root_path / 'Program Files' / 'Side Effects Software' /
+        f'Houdini {version}' / 'bin'
+    )
+    bin_path.mkdir(parents = True, exist_ok = True)
+    script = _STUB_SCRIPT.format(python = sys.executable)
+    for name in STUB_APP_NAMES:
+        stub_path = bin_path / name
+        if stub_path.exists(): continue
+        stub_path.write_text(script)
+        stub_path.chmod(0o755)
+    return bin_path
+
+def _default_workers() -> int:
+    value = os.environ.get(WORKERS_ENV)
+    if value: return max(1, int(value))
+    return max(1, (os.cpu_count() or 1) // 2)
+
+@dataclass
+class _Task:
+    task_id: str
+    frames: list[int]
+    status: str = 'Pending'
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    return_code: Optional[int] = None
+    log_path: Optional[Path] = None
+
+    def seconds(self) -> Optional[float]:
+        if self.started is None or self.finished is None: return None
+        return self.finished - self.started
+
+    def info(self) -> dict:
+        seconds = self.seconds()
+        return {
+            'TaskID': self.task_id,
+            'Frames': ','.join(map(str, self.frames)),
+            'Status': self.status,
+            'StartTime': '' if self.started is None else str(self.started),
+            'Seconds': '' if seconds is None else f'{seconds:.3f}',
+            'ExitCode': (
+                '' if self.return_code is None else
+                str(self.return_code)
+            ),
+            'Log': '' if self.log_path is None else str(self.log_path)
+        }
+
+@dataclass
+class _Job:
+    job_id: str
+    name: str
+    batch_name: str
+    job: Job
+    job_path: Path
+    dependencies: list[str]
+    tasks: list[_Task]
+    env: dict[str, str]
+    status: str = 'Pending'
+    remaining: int = 0
+    dependents: list[str] = field(default_factory = list)
+
+    def info(self) -> dict:
+        return {
+            'JobID': self.job_id,
+            'Name': self.name,
+            'BatchName': self.batch_name,
+            'Pool': self.job.pool or '',
+            'Group': self.job.group or '',
+            'Status': self.status,
+            'JobDependencies': ','.join(self.dependencies),
+            'Frames': ','.join(
+                ','.join(map(str, task.frames))
+                for task in self.tasks
+            ),
+            'TaskCount': str(len(self.tasks)),
+            'Seconds': f'{sum(task.seconds() or 0.0 for task in self.tasks):.3f}'
+        }
+
+class LocalFarm:
+    """Runs batches as local subprocesses on *workers* concurrent tasks.
+
+    *stub_apps* picks the Houdini the tasks see: ``None`` uses stubs only
+    when no Houdini is installed, ``True`` always and ``False`` never.
+    """
+
+    def __init__(self,
+        workers: Optional[int] = None,
+        stub_apps: Optional[bool] = None
+        ):
+        self._workers = workers or _default_workers()
+        self._stub_apps = (
+            len(list_installed_versions()) == 0
+            if stub_apps is None else
+            stub_apps
+        )
+        self._executor = ThreadPoolExecutor(max_workers = self._workers)
+        self._lock = threading.Condition()
+        self._jobs = dict()
+        self._batches = dict()
+        self._running = 0
+
+    def list_pools(self, refresh = False):
+        return ['none']
+
+    def list_groups(self, refresh = False):
+        return ['none']
+
+    def submit(self, batch: Batch, jobs_path: Path) -> list[str]:
+        """Queue *batch*, returning its local job ids in topological order.
+
+        Job data is laid out as on Deadline (through `job_data`), then every
+        job whose dependencies are met starts right away; `wait` blocks until
+        the farm is idle.
+        """
+        batch_path = jobs_path / str(uuid4())
+        batch_path.mkdir(parents = True)
+        data_path = batch_path / 'data'
+        data_path.mkdir()
+        logs_path = batch_path / 'logs'
+        logs_path.mkdir()
+
+        order = batch.topological_order()
+        data_files = dict()
+        for job_index in order:
+            job = batch.get_job(job_index)
+            if isinstance(job, str): continue
+            for rel_path, from_path in job_data.expand_paths(job.paths).items():
+                data_files.setdefault(rel_path, from_path)
+        job_data.store_job_data(batch_path, data_files, jobs_path)
+        # Stands in for the worker-side launcher (tumblepipe.farm.tasks.launch)
+        job_data.materialize(data_path)
+
+        job_ids = dict()
+        new_jobs = list()
+        for job_index in order:
+            job = batch.get_job(job_index)
+            if isinstance(job, str):
+                job_ids[job_index] = job
+                continue
+            job_id = f'local_{uuid4().hex[:16]}'
+            job_ids[job_index] = job_id
+            tasks = [
+                _Task(
+                    task_id = str(task_index),
+                    frames = frames,
+                    log_path = (
+                        logs_path /
+                        f'{str(job_index).zfill(2)}_{task_index}.log'
+                    )
+                )
+                for task_index, frames in enumerate(job.task_frames())
+            ]
+            new_jobs.append(_Job(
+                job_id = job_id,
+                name = job.name or f'job {job_index}',
+                batch_name = batch.get_name(),
+                job = job,
+                job_path = batch_path,
+                dependencies = [
+                    job_ids[dep_index]
+                    for dep_index in sorted(batch.get_deps(job_index))
+                ],
+                tasks = tasks,
+                env = self._task_env(job, jobs_path, data_path),
+                remaining = len(tasks)
+            ))
+
+        with self._lock:
+            self._batches[batch_path] = [job.job_id for job in new_jobs]
+            for job in new_jobs:
+                self._jobs[job.job_id] = job
+                for dep_id in job.dependencies:
+                    if dep_id in self._jobs:
+                        self._jobs[dep_id].dependents.append(job.job_id)
+            for job in new_jobs:
+                self._start_if_ready(job)
+        return [job_ids[job_index] for job_index in order]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no task is queued or running; False on timeout."""
+        with self._lock:
+            return self._lock.wait_for(
+                lambda: self._running == 0,
+                timeout = timeout
+            )
+
+    def shutdown(self):
+        self._executor.shutdown(wait = True)
+
+    def find_jobs(self, max_age = None, **filters):
+        """Jobs whose key/values equal *filters*; *max_age* is ignored."""
+        with self._lock:
+            jobs = [job.info() for job in self._jobs.values()]
+        return [job for job in jobs if _matches(job, filters)]
+
+    def find_tasks(self, job_id, max_age = None, **filters):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None: return []
+            tasks = [task.info() for task in job.tasks]
+        return [task for task in tasks if _matches(task, filters)]
+
+    def _task_env(self, job, jobs_path, data_path):
+        python_path = str(Path(__file__).parent.parent.parent)
+        env = os.environ.copy()
+        env.update(job.env)
+        env['PYTHONUNBUFFERED'] = '1'
+        env['TH_FARM_DATA'] = str(data_path)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [
+            python_path,
+            env.get('PYTHONPATH')
+        ]))
+        if self._stub_apps:
+            stub_root = jobs_path / STUB_APPS_DIR
+            install_stub_houdini(
+                stub_root,
+                job.env.get(HOUDINI_VERSION_ENV, DEFAULT_HOUDINI_VERSION)
+            )
+            env[HOUDINI_ROOT_ENV] = str(stub_root)
+        return env
+
+    def _is_ready(self, job):
+        for dep_id in job.dependencies:
+            dep = self._jobs.get(dep_id)
+            # Ids not submitted here (existing Deadline jobs) count as met
+            if dep is None: continue
+            if dep.status != 'Completed': return False
+        return True
+
+    def _start_if_ready(self, job):
+        if job.status != 'Pending' or not self._is_ready(job): return
+        job.status = 'Active'
+        if len(job.tasks) == 0:
+            self._finish_job(job)
+            return
+        for task in job.tasks:
+            task.status = 'Queued'
+            self._running += 1
+            self._executor.submit(self._run_task, job, task)
+
+    def _run_task(self, job, task):
+        command = [
+            sys.executable,
+            str(job.job.script_path),
+            *job.job.args,
+            str(min(task.frames)),
+            str(max(task.frames))
+        ]
+        with self._lock:
+            task.status = 'Rendering'
+            task.started = time.time()
+        try:
+            with task.log_path.open('w') as log_file:
+                return_code = subprocess.run(
+                    command,
+                    cwd = job.env['TH_FARM_DATA'],
+                    env = job.env,
+                    stdout = log_file,
+                    stderr = subprocess.STDOUT
+                ).returncode
+        except Exception:
+            logging.exception(f'Failed to run task {task.task_id} of {job.name}')
+            return_code = -1
+        with self._lock:
+            task.finished = time.time()
+            task.return_code = return_code
+            task.status = 'Completed' if return_code == 0 else 'Failed'
+            job.remaining -= 1
+            if job.remaining == 0:
+                self._finish_job(job)
+            self._running -= 1
+            self._lock.notify_all()
+
+    def _finish_job(self, job):
+        failed = any(task.status == 'Failed' for task in job.tasks)
+        job.status = 'Failed' if failed else 'Completed'
+        if failed:
+            logging.warning(f'Local job failed: {job.name}')
+        else:
+            for dependent_id in job.dependents:
+                self._start_if_ready(self._jobs[dependent_id])
+        self._write_timings(job.job_path)
+
+    def _write_timings(self, batch_path):
+        jobs = [self._jobs[job_id] for job_id in self._batches[batch_path]]
+        timings = [
+            job.info() | {'Tasks': [task.info() for task in job.tasks]}
+            for job in jobs
+            if job.status in ('Completed', 'Failed')
+        ]
+        (batch_path / TIMINGS_NAME).write_text(json.dumps(timings, indent = 4))
+
+def _matches(item, filters):
+    return all(
+        item.get(key) == value
+        for key, value in filters.items()
+    )
@@ -1,7 +1,10 @@
+from contextlib import contextmanager
 from tempfile import TemporaryDirectory
+from typing import Iterator, Optional
 from pathlib import Path
 import logging
 import shutil
+import os
 
 from tumblepipe.api import (
     path_str,
@@ -16,88 +19,185 @@ from tumblepipe.apps import houdini
 # mode keeps the notify "shrink to fit Discord" path shrinking with resolution.
 # Output is standard yuv420p H.264, universally playable. -q:v is tunable.
 _H264_ENCODE = ['-c:v', 'libopenh264', '-rc_mode', 'quality', '-q:v', '22']
+
+# Pads odd frame sizes to even, which yuv420p needs
+_JPG_ENCODE = [
+    '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+    *_H264_ENCODE,
+    '-pix_fmt', 'yuv420p'
+]
+
+def encode_settings(frame_range: BlockRange, framerate: int) -> dict:
+    """What `from_jpg` output depends on besides the frames."""
+    return dict(
+        framerate = framerate,
+        first_frame = frame_range.first_frame,
+        last_frame = frame_range.last_frame,
+        step_size = frame_range.step_size,
+        args = list(_JPG_ENCODE)
+    )
     
-def from_jpg(
+# How `from_jpg` hands the frames to ffmpeg:
+#   link - a dir of hard (else sym) links named as one contiguous sequence,
+#          made beside the frames so hardlinks stay on their volume
+#   pipe - the frame bytes streamed to ffmpeg's stdin, nothing staged
+#   copy - the frames copied into a temp dir, as before links
+INPUT_MODE_ENV = 'TH_MP4_INPUT'
+INPUT_MODES = ('link', 'pipe', 'copy')
+DEFAULT_INPUT_MODE = 'link'
+
+def _input_mode(input_mode: Optional[str]) -> str:
+    input_mode = input_mode or os.environ.get(INPUT_MODE_ENV) or DEFAULT_INPUT_MODE
+    assert input_mode in INPUT_MODES, f'Invalid mp4 input mode: {input_mode}'
+    return input_mode
+
+def _frame_sources(
     framestack_path: Path,
     frame_range: BlockRange,
-    framerate: int,
-    output_mp4_path: Path,
-    repeat_missing_frames: bool = True
-    ):
-    
+    repeat_missing_frames: bool
+    ) -> dict[int, Path]:
+    """The JPEG to show on each frame from first to last frame.
+
+    Frames before the first available one hold it, and frames after it hold
+    the last available frame before them.
+    """
+
     # List frame stack
     framestack_name, _, framestack_suffix = framestack_path.name.split('.')
     assert framestack_suffix in ['jpg', 'jpeg'], (
         'Invalid framestack suffix: '
         f'{framestack_suffix}'
     )
-    input_frames = list(sorted(framestack_path.parent.glob(
-        f'{framestack_name}.*.{framestack_suffix}'
-    )))
+    input_frames = {
+        int(frame.name.split('.')[-2]): frame
+        for frame in framestack_path.parent.glob(
+            f'{framestack_name}.*.{framestack_suffix}'
+        )
+    }
 
     # Find missing frames
     # frame_count is the number of *rendered* frames (step-aware) and is only
-    # used for the missing-frame check below. The gap-fill logic further down
-    # expands the JPGs into a contiguous 1-per-frame sequence spanning
+    # used for the missing-frame check below. The gap-fill logic expands the
+    # JPGs into a contiguous 1-per-frame sequence spanning
     # first_frame..last_frame, so the encoder must be told to emit the full
     # contiguous span, not the stepped count (otherwise a step>1 render yields
     # an mp4 truncated to the front 1/step_size of the range).
     frame_count = len(frame_range)
-    span_frame_count = frame_range.last_frame - frame_range.first_frame + 1
-    available_frame_indices = {
-        int(frame.name.split('.')[-2])
-        for frame in input_frames
-    }
+    available_frame_indices = set(input_frames)
     first_available_frame_index = min(available_frame_indices)
     if (not repeat_missing_frames and
         len(available_frame_indices) != frame_count):
         missing_frame_indices = list(sorted(set(frame_range) - available_frame_indices))
         raise ValueError(f'Missing frames: {missing_frame_indices}')
 
-    # Open temporary workspace
-    base_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    base_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(base_temp_path)) as temp_dir:
-        temp_dir_path = Path(temp_dir)
-        
-        # Copy over framestack
-        for input_frame in input_frames:
-            frame_index = int(input_frame.name.split('.')[-2])
-            temp_frame_path = temp_dir_path / f'frame.{frame_index:04d}.jpg'
-            logging.info(f'Copying to {temp_frame_path}')
-            shutil.copyfile(input_frame, temp_frame_path)
-        
-        # Pre-fill in missing frames using next frame as fill in
-        first_available_frame = (
-            temp_dir_path /
-            f'frame.{first_available_frame_index:04d}.jpg'
+    # Fill in missing frames, before the first available frame with it and
+    # after it with the previous available frame
+    earlier_frame_indices = [
+        frame_index
+        for frame_index in available_frame_indices
+        if frame_index <= frame_range.first_frame
+    ]
+    previous_frame = input_frames[max(
+        earlier_frame_indices,
+        default = first_available_frame_index
+    )]
+    frame_sources = dict()
+    for frame_index in range(frame_range.first_frame, frame_range.last_frame + 1):
+        if frame_index in input_frames:
+            previous_frame = input_frames[frame_index]
+        else:
+            logging.info(f'Filling in frame {frame_index} with {previous_frame.name}')
+        frame_sources[frame_index] = previous_frame
+    return frame_sources
+
+def _link_frame(source_path: Path, target_path: Path):
+    try:
+        os.link(source_path, target_path)
+        return
+    except OSError:
+        pass
+    try:
+        os.symlink(source_path.resolve(), target_path)
+        return
+    except OSError:
+        pass
+    shutil.copyfile(source_path, target_path)
+
+@contextmanager
+def _staging_dir(framestack_path: Path, input_mode: str) -> Iterator[Path]:
+    temp_dir = None
+    if input_mode == 'link':
+        try:
+            temp_dir = TemporaryDirectory(
+                prefix = '.mp4_',
+                dir = path_str(framestack_path.parent)
+            )
+        except OSError:
+            logging.info(f'Cannot link beside {framestack_path.parent}; using temp:/')
+    if temp_dir is None:
+        base_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
+        base_temp_path.mkdir(parents=True, exist_ok=True)
+        temp_dir = TemporaryDirectory(dir=path_str(base_temp_path))
+    with temp_dir:
+        yield Path(temp_dir.name)
+
+def _frame_bytes(frame_sources: dict[int, Path]) -> Iterator[bytes]:
+    # Held frames repeat one file; read it once
+    previous_path, previous_bytes = None, b''
+    for frame_index in sorted(frame_sources):
+        frame_path = frame_sources[frame_index]
+        if frame_path != previous_path:
+            previous_path, previous_bytes = frame_path, frame_path.read_bytes()
+        yield previous_bytes
+
+def from_jpg(
+    framestack_path: Path,
+    frame_range: BlockRange,
+    framerate: int,
+    output_mp4_path: Path,
+    repeat_missing_frames: bool = True,
+    input_mode: Optional[str] = None
+    ):
+    """Encode the JPEGs matching *framestack_path* to an mp4.
+
+    *input_mode* (else ``TH_MP4_INPUT``, else ``link``) picks how the frames
+    reach ffmpeg; see `INPUT_MODES`. Every mode encodes the same frames.
+    """
+    input_mode = _input_mode(input_mode)
+    frame_sources = _frame_sources(framestack_path, frame_range, repeat_missing_frames)
+    span_frame_count = len(frame_sources)
+    output_mp4_path.parent.mkdir(exist_ok=True, parents=True)
+
+    # Stream the frames, writing next to the output and renaming into place
+    if input_mode == 'pipe':
+        partial_mp4_path = output_mp4_path.with_name(
+            f'.{output_mp4_path.stem}.partial{output_mp4_path.suffix}'
         )
-        previous_frame = first_available_frame
-        for frame_index in range(frame_range.first_frame, first_available_frame_index):
-            temp_frame_path = temp_dir_path / f'frame.{frame_index:04d}.jpg'
-            logging.info(f'Prefilling in {temp_frame_path}')
-            shutil.copyfile(previous_frame, temp_frame_path)
-        
-        # Post-fill in missing frames using the previous frame as fill in
-        for frame_index in range(
-            first_available_frame_index + 1,
-            frame_range.last_frame + 1):
-            temp_frame_path = temp_dir_path / f'frame.{frame_index:04d}.jpg'
-            if frame_index in available_frame_indices:
-                previous_frame = temp_frame_path
-            else:
-                logging.info(f'Postfilling in {temp_frame_path}')
-                shutil.copyfile(previous_frame, temp_frame_path)
-        
-        # Verify that all frames are present
-        for frame_index in frame_range:
+        exit_code = houdini.FFmpeg().run_feed([
+            '-y',
+            '-framerate', str(framerate),
+            '-f', 'image2pipe',
+            '-c:v', 'mjpeg',
+            '-i', '-',
+            '-frames:v', str(span_frame_count),
+            *_JPG_ENCODE,
+            path_str(local_path(partial_mp4_path))
+        ], _frame_bytes(frame_sources))
+        if exit_code != 0 or not partial_mp4_path.exists():
+            partial_mp4_path.unlink(missing_ok=True)
+            raise RuntimeError(f'Failed to encode {output_mp4_path}')
+        os.replace(partial_mp4_path, output_mp4_path)
+        return
+
+    # Open temporary workspace
+    with _staging_dir(framestack_path, input_mode) as temp_dir_path:
+
+        # Stage the frames as one contiguous sequence
+        stage_frame = _link_frame if input_mode == 'link' else shutil.copyfile
+        for frame_index, frame_path in frame_sources.items():
             temp_frame_path = temp_dir_path / f'frame.{frame_index:04d}.jpg'
-            if temp_frame_path.exists(): continue
-            raise RuntimeError(
-                'Failed to fill in missing frame: '
-                f'{temp_frame_path}'
-            )
-        
+            stage_frame(frame_path, temp_frame_path)
+
         # Combine JPEGs into video
         temp_framestack_path = temp_dir_path / 'frame.%04d.jpg'
         temp_output_mp4_path = temp_dir_path / 'output.mp4'
@@ -108,12 +208,9 @@ def from_jpg(
             '-start_number', str(frame_range.first_frame),
             '-i', path_str(local_path(temp_framestack_path)),
             '-frames:v', str(span_frame_count),
-            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
-            *_H264_ENCODE,
-            '-pix_fmt', 'yuv420p',
+            *_JPG_ENCODE,
             path_str(local_path(temp_output_mp4_path))
         ])
-        output_mp4_path.parent.mkdir(exist_ok=True, parents=True)
         shutil.copyfile(temp_output_mp4_path, output_mp4_path)
 
 def scale(
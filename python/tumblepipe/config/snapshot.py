@@ -0,0 +1,150 @@
+"""Frozen config snapshots shipped with farm jobs.
+
+Every farm task process builds its own client: it imports the project's
+naming and storage conventions from ``_config/`` and loads
+``_config/db/*.json`` over the network share — and a batch of a few hundred
+render tasks does that all at once, at task start, against the same files.
+
+At submission the config is instead frozen into one compact JSON file that
+travels with the job data (``config_snapshot.json``): every purpose tree, the
+resolved properties of the submitted entities and their ancestors, and the
+source of the naming and storage conventions. A task started with
+``TH_CONFIG_SNAPSHOT`` pointing at it gets a read-only client built from the
+file alone (see ``api.default_client``): no convention imports from the share,
+no ``db`` stats or reads, and the config the job was submitted against rather
+than whatever it has become by the time the task runs.
+"""
+
+import copy
+import json
+import os
+import time
+from pathlib import Path
+
+from tumblepipe.config.store import JsonConfigStore
+from tumblepipe.util.uri import Uri
+
+SNAPSHOT_ENV = 'TH_CONFIG_SNAPSHOT'
+SNAPSHOT_NAME = 'config_snapshot.json'
+SNAPSHOT_VERSION = 1
+
+# Convention modules frozen into a snapshot. The config convention is not:
+# a snapshot client always reads through ``FrozenConfigStore``.
+CONVENTION_NAMES = ('naming_convention', 'storage_convention')
+
+
+class ReadOnlyConfigError(RuntimeError):
+    """A write was attempted on a client built from a config snapshot."""
+    pass
+
+
+class FrozenConfigStore(JsonConfigStore):
+    """A ``JsonConfigStore`` over the purpose trees of a snapshot.
+
+    Never touches ``db/``: the trees are held in memory for the life of the
+    process, so the coherency stamps and generation never move and the
+    resolved properties captured at submission stay valid memo hits. Writes
+    raise ``ReadOnlyConfigError``.
+    """
+
+    def __init__(self, config_path: Path, purposes: dict, properties: dict | None = None):
+        super().__init__(config_path)
+        self._cache = dict(purposes)
+        for uri, result in (properties or {}).items():
+            self._memo[('properties', uri)] = (self._generation, result)
+
+    def _load(self, purpose: str) -> dict | None:
+        return self._cache.get(purpose)
+
+    def purposes(self) -> list[str]:
+        """Every purpose frozen into the snapshot."""
+        return sorted(self._cache)
+
+    def write_root(self, purpose: str, data: dict) -> None:
+        raise ReadOnlyConfigError(
+            f"Cannot write config '{purpose}': the client was built from a "
+            'config snapshot and is read-only'
+        )
+
+    def refresh_cache(self, purpose: str | None = None) -> None:
+        """No-op: a snapshot has no backing files to reload from."""
+        pass
+
+
+def _ancestors(uri: Uri) -> list[Uri]:
+    """``uri`` and every entity above it, root first."""
+    segments = uri.segments
+    return [
+        Uri(uri.purpose, segments[:index])
+        for index in range(len(segments) + 1)
+    ]
+
+
+def create_snapshot(entity_uris=(), api=None) -> dict:
+    """Freeze the config of ``api`` (default: the global client) into a dict.
+
+    Captures every purpose tree, the resolved properties of ``entity_uris``
+    and their ancestors, and the source of the naming and storage
+    conventions.
+    """
+    if api is None:
+        from tumblepipe.api import default_client
+        api = default_client()
+    config = api.config
+    with config.coherent():
+        purposes = {
+            purpose: copy.deepcopy(data)
+            for purpose in config.purposes()
+            if (data := config.root(purpose)) is not None
+        }
+        properties = dict()
+        for entity_uri in entity_uris:
+            for uri in _ancestors(entity_uri):
+                key = str(uri)
+                if key in properties:
+                    continue
+                properties[key] = config.get_properties(uri)
+    conventions = {
+        name: (api.CONFIG_PATH / f'{name}.py').read_text()
+        for name in CONVENTION_NAMES
+    }
+    return dict(
+        version=SNAPSHOT_VERSION,
+        created=round(time.time(), 3),
+        conventions=conventions,
+        purposes=purposes,
+        properties=properties
+    )
+
+
+def write_snapshot(path: Path, snapshot: dict) -> Path:
+    """Write ``snapshot`` compactly to ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(snapshot, separators=(',', ':')))
+    return path
+
+
+def load_snapshot(path: Path) -> dict:
+    snapshot = json.loads(path.read_text())
+    version = snapshot.get('version')
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(
+            f'Unsupported config snapshot version {version!r}: {path}'
+        )
+    return snapshot
+
+
+def snapshot_path() -> Path | None:
+    """The snapshot named by ``TH_CONFIG_SNAPSHOT``, if set.
+
+    A relative value is resolved against the job data dir (``TH_FARM_DATA``,
+    else the current directory), where the snapshot is bundled.
+    """
+    value = os.environ.get(SNAPSHOT_ENV)
+    if not value:
+        return None
+    path = Path(value)
+    if path.is_absolute():
+        return path
+    base = os.environ.get('TH_FARM_DATA')
+    return (Path(base) if base else Path.cwd()) / path
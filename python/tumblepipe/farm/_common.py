@@ -10,7 +10,8 @@ the copy-pasted parts:
 - ``error``                — uniform error-log-and-return-1
 - config-check primitives  — ``is_str``/``is_int``/``is_bool`` + ``check_*``
 - ``valid_entity``         — the universal ``{uri, department}`` entity block
-- ``run_task_cli``         — argparse + load + validate + main
+- ``run_task_cli``         — argparse + load + validate + main, optionally
+  inside a ``tumblepipe.util.timing`` report
 - ``configure_logging``    — the ``__main__`` logging setup
 
 ``farm/jobs/houdini/_common.py`` re-exports the primitives so the job modules
@@ -22,12 +23,13 @@ pulled in by worker scripts that must not require Deadline or ``tomli_w``.
 
 from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional
 import argparse
 import logging
 import sys
 
 from tumblepipe.util.io import load_json
+from tumblepipe.util import timing
 
 
 def error(msg: str) -> int:
@@ -70,10 +72,15 @@ def valid_entity(entity) -> bool:
 
 def run_task_cli(
     is_valid_config: Callable[[dict], bool],
-    main: Callable[[dict], int]
+    main: Callable[[dict], int],
+    task_name: Optional[str] = None,
+    report_dir: Optional[Path] = None
     ) -> int:
     """Standard worker CLI: parse a config path (plus the frame range Deadline
-    appends), load + validate the config, and run ``main``."""
+    appends), load + validate the config, and run ``main``.
+
+    Given a ``task_name`` and ``report_dir``, ``main`` runs inside a timing
+    report written to ``report_dir`` for the frame range."""
     parser = argparse.ArgumentParser()
     parser.add_argument('config_path', type=str)
     parser.add_argument('start_frame', type=int)
@@ -89,7 +96,15 @@ def run_task_cli(
         return error(f'Invalid config file: {config_path}')
 
     # Run main
-    return main(config)
+    if task_name is None or report_dir is None:
+        return main(config)
+    return timing.run_with_report(
+        task_name,
+        report_dir,
+        args.start_frame,
+        args.end_frame,
+        lambda: main(config)
+    )
 
 
 def configure_logging() -> None:
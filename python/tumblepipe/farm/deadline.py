@@ -30,6 +30,51 @@ _FALLBACK_REGISTRY = {
     'type': 'api',
 }
 
+# Worker entry point the task script runs its module through; it copies job
+# data left to the manifest (no hardlinks on the jobs root) into place first.
+LAUNCH_MODULE = 'tumblepipe.farm.tasks.launch'
+
+
+# Parsed manifest inputs, keyed by (reader, path) -> (file stamp, value).
+# batch_submit builds dozens of Tasks per submit, all from the same package
+# and mostly the same requirements files; re-read only when a file changes.
+_PARSED_INPUTS = {}
+
+# Rendered manifests keyed by their inputs; identical tasks (every render
+# chunk of every shot) share one string. The bases are the task-independent
+# head every manifest of a package starts with.
+_MANIFESTS = {}
+_MANIFEST_BASES = {}
+
+
+def _file_stamp(path: Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_cached(path: Path, parse):
+    """``parse(path)``, memoized per process until *path*'s stamp changes."""
+    key = (parse.__name__, str(path))
+    stamp = _file_stamp(path)
+    cached = _PARSED_INPUTS.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    value = parse(path)
+    _PARSED_INPUTS[key] = (stamp, value)
+    return value
+
+
+def _read_package_path(hpm_toml_path: Path):
+    try:
+        text = hpm_toml_path.read_text()
+    except OSError:
+        return None
+    path_match = re.search(r'(?m)^\s*path\s*=\s*["\']([^"\']+)["\']', text)
+    return path_match.group(1) if path_match is not None else None
+
 
 def _package_full_name(script_path, bare_name) -> str:
     """The registry-qualified `creator/slug` name of the running package.
@@ -45,12 +90,8 @@ def _package_full_name(script_path, bare_name) -> str:
     if match is None:
         return bare_name
     root = Path(to_windows_path(Path(match.group(1))))
-    try:
-        text = (root / 'hpm.toml').read_text()
-    except OSError:
-        return bare_name
-    path_match = re.search(r'(?m)^\s*path\s*=\s*["\']([^"\']+)["\']', text)
-    return path_match.group(1) if path_match is not None else bare_name
+    full_name = _read_cached(root / 'hpm.toml', _read_package_path)
+    return full_name if full_name is not None else bare_name
 
 
 def _parse_requirements(requirements_path) -> list:
@@ -64,10 +105,14 @@ def _parse_requirements(requirements_path) -> list:
     """
     if requirements_path is None:
         return []
+    return list(_read_cached(Path(requirements_path), _read_requirements))
+
+
+def _read_requirements(requirements_path: Path) -> tuple:
     try:
-        text = Path(requirements_path).read_text()
+        text = requirements_path.read_text()
     except OSError:
-        return []
+        return ()
     requirements = []
     for raw_line in text.splitlines():
         line = raw_line.strip()
@@ -79,7 +124,7 @@ def _parse_requirements(requirements_path) -> list:
             line = line[:hash_index].strip()
         if line:
             requirements.append(line)
-    return requirements
+    return tuple(requirements)
 
 
 def _script_module(relative_script: str) -> str:
@@ -106,6 +151,10 @@ def _submitter_registries() -> list:
     registries the submitter used, with no `hpm registry add` on the node.
     """
     config_path = Path(os.path.expanduser('~')) / '.hpm' / 'config.toml'
+    return _read_cached(config_path, _read_registries)
+
+
+def _read_registries(config_path: Path) -> list:
     try:
         import tomllib
         registries = tomllib.loads(config_path.read_text()).get('registries', [])
@@ -132,9 +181,11 @@ def hpm_task_manifest(script_path, requirements_path=None) -> str:
       is sent verbatim into the registry query and 404s.
     - `[scripts.task]` runs the task module inside the package-env (hpm >=0.22.2):
       `package-env = true` resolves the full env (the dependency package
-      importable + its [python_dependencies]) and runs `python -m <module>`. The
-      HPM plugin invokes it as `hpm run task -- <context> <first> <last>`; this
-      is what replaces the old hand-built uv venv + PYTHONPATH reconstruction.
+      importable + its [python_dependencies]) and runs the module through
+      `python -m tumblepipe.farm.tasks.launch <module>`, which first copies any
+      job data left to the manifest into place. The HPM plugin invokes it as
+      `hpm run task -- <context> <first> <last>`; this is what replaces the old
+      hand-built uv venv + PYTHONPATH reconstruction.
     - a task's per-task requirements.txt (e.g. notify's `discord.py`) becomes the
       script's `requirements` — package-env merges them on top of the package's
       [python_dependencies] as "extra requirements". Without this the package-env
@@ -146,26 +197,47 @@ def hpm_task_manifest(script_path, requirements_path=None) -> str:
     bare_name, _, version = package_spec.partition('@')
     full_name = _package_full_name(script_path, bare_name)
     module = _script_module(relative_script)
+    requirements = tuple(_parse_requirements(requirements_path))
+    registries = _submitter_registries()
+    key = (full_name, version, repr(registries), module, requirements)
+    manifest = _MANIFESTS.get(key)
+    if manifest is not None:
+        return manifest
     task_script = {
-        'cmd': f'python -m {module}',
+        'cmd': f'python -m {LAUNCH_MODULE} {module}',
         'package-env': True,
     }
-    requirements = _parse_requirements(requirements_path)
     if requirements:
-        task_script['requirements'] = requirements
-    return tomli_w.dumps({
+        task_script['requirements'] = list(requirements)
+    # `scripts` is the last table, so rendering it on its own and appending
+    # it to the shared base gives the same text as rendering the whole dict.
+    manifest = (
+        _manifest_base(full_name, version, registries) +
+        '\n' +
+        tomli_w.dumps({'scripts': {'task': task_script}})
+    )
+    _MANIFESTS[key] = manifest
+    return manifest
+
+
+def _manifest_base(full_name, version, registries) -> str:
+    """The task-independent part of the manifest, rendered once per package."""
+    key = (full_name, version, repr(registries))
+    base = _MANIFEST_BASES.get(key)
+    if base is not None:
+        return base
+    base = tomli_w.dumps({
         'package': {
             'path': 'local/deadline-hpm-job',
             'name': 'deadline-hpm-job',
             'version': '0.0.0',
         },
         'compat': {'houdini': '>=21, <99'},
-        'registries': _submitter_registries(),
+        'registries': registries,
         'dependencies': {full_name: version},
-        'scripts': {
-            'task': task_script,
-        },
     })
+    _MANIFEST_BASES[key] = base
+    return base
 
 
 def Task(script_path, requirements_path, *args, **kwargs):
@@ -0,0 +1,294 @@
+"""Dry-run cost estimates for farm batches.
+
+A submission used to be judged only once it was on Deadline. `estimate_batch`
+takes the same `Batch` the submit path builds and reports, without
+submitting or writing anything, what it would cost:
+
+- tasks and frames per job, from the job's frame list and chunk size;
+- farm seconds, from the task history of the job's key in
+  `tumblepipe.farm.task_stats` (jobs without history are counted as unknown);
+- job data bytes, deduplicated across the batch like `Deadline.submit` does,
+  and — given the jobs root — the bytes the content-addressed store has not
+  seen yet (see `tumblepipe.apps.job_data`);
+- output bytes, from the bytes per frame of the latest earlier version next
+  to the version the job writes.
+
+``batch_submit.submit_entities(..., dry_run=True)`` and
+``Deadline.submit(..., dry_run=True)`` build their batches as usual and hand
+them here; `dry_run_scope` marks the build so builders skip their side
+effects on the project (see ``_render_build``).
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+from pathlib import Path
+import threading
+import logging
+
+from tumblepipe.api import local_path, api
+from tumblepipe.apps import job_data
+from tumblepipe.farm import task_stats
+from tumblepipe.util.io import load_json
+
+_local = threading.local()
+
+def is_dry_run() -> bool:
+    """True while the current thread builds a batch for an estimate."""
+    return getattr(_local, 'depth', 0) > 0
+
+@contextmanager
+def dry_run_scope():
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+
+@dataclass
+class JobEstimate:
+    name: str
+    frames: int
+    tasks: int
+    chunk_size: int
+    depends_on: list[str] = field(default_factory = list)
+    farm_seconds: Optional[float] = None
+    history_samples: int = 0
+    data_files: int = 0
+    data_bytes: int = 0
+    new_data_bytes: Optional[int] = None
+    output_bytes: Optional[int] = None
+
+@dataclass
+class BatchEstimate:
+    name: str
+    jobs: list[JobEstimate] = field(default_factory = list)
+
+    @property
+    def tasks(self) -> int:
+        return sum(job.tasks for job in self.jobs)
+
+    @property
+    def frames(self) -> int:
+        return sum(job.frames for job in self.jobs)
+
+    @property
+    def farm_seconds(self) -> float:
+        """Farm seconds of the jobs with task history."""
+        return sum(
+            job.farm_seconds for job in self.jobs
+            if job.farm_seconds is not None
+        )
+
+    @property
+    def unestimated_jobs(self) -> list[str]:
+        return [job.name for job in self.jobs if job.farm_seconds is None]
+
+    @property
+    def data_bytes(self) -> int:
+        return sum(job.data_bytes for job in self.jobs)
+
+    @property
+    def new_data_bytes(self) -> Optional[int]:
+        if any(job.new_data_bytes is None for job in self.jobs): return None
+        return sum(job.new_data_bytes for job in self.jobs)
+
+    @property
+    def output_bytes(self) -> int:
+        """Output bytes of the jobs with an earlier version to go by."""
+        return sum(
+            job.output_bytes for job in self.jobs
+            if job.output_bytes is not None
+        )
+
+    def to_dict(self) -> dict:
+        return dict(
+            name = self.name,
+            jobs = [asdict(job) for job in self.jobs],
+            totals = dict(
+                jobs = len(self.jobs),
+                tasks = self.tasks,
+                frames = self.frames,
+                farm_hours = round(self.farm_seconds / 3600, 3),
+                unestimated_jobs = self.unestimated_jobs,
+                data_bytes = self.data_bytes,
+                new_data_bytes = self.new_data_bytes,
+                output_bytes = self.output_bytes
+            )
+        )
+
+    def format(self) -> str:
+        lines = [f'{self.name}']
+        for job in self.jobs:
+            farm = (
+                '?' if job.farm_seconds is None else
+                f'{job.farm_seconds / 3600:.2f}h'
+            )
+            output = (
+                '?' if job.output_bytes is None else
+                format_bytes(job.output_bytes)
+            )
+            lines.append(
+                f'  {job.name:<40} {job.tasks:>4} tasks {job.frames:>5} frames '
+                f'{farm:>8} farm  {format_bytes(job.data_bytes):>9} data '
+                f'{output:>9} out'
+            )
+        new_data = (
+            '' if self.new_data_bytes is None else
+            f' ({format_bytes(self.new_data_bytes)} new)'
+        )
+        lines.append(
+            f'  total: {len(self.jobs)} jobs, {self.tasks} tasks, '
+            f'{self.frames} frames, {self.farm_seconds / 3600:.2f} farm hours, '
+            f'{format_bytes(self.data_bytes)} job data{new_data}, '
+            f'{format_bytes(self.output_bytes)} output'
+        )
+        if len(self.unestimated_jobs) != 0:
+            lines.append(
+                '  no task history: ' + ', '.join(self.unestimated_jobs)
+            )
+        return '\n'.join(lines)
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(size) < 1024 or unit == 'TB': break
+        size /= 1024
+    return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+
+def _farm_seconds(job) -> tuple[Optional[float], int]:
+    if job.stats is None: return None, 0
+    model = task_stats.estimate_cost(task_stats.load_samples(
+        job.stats['entity'],
+        job.stats['department'],
+        job.stats['job_type']
+    ))
+    if model is None: return None, 0
+    seconds = sum(
+        model.task_seconds(len(frames))
+        for frames in job.task_frames()
+    )
+    return seconds, model.samples
+
+def _version_frame_count(version_path: Path) -> int:
+    """Frames an existing version holds, from its context or its files."""
+    context = load_json(version_path / 'context.json')
+    if context is not None and 'first_frame' in context:
+        step_size = max(1, context.get('step_size', 1))
+        return len(range(
+            context['first_frame'],
+            context['last_frame'] + 1,
+            step_size
+        ))
+    frames = set()
+    for path in version_path.iterdir():
+        parts = path.name.split('.')
+        if len(parts) >= 3 and parts[-2].isdigit():
+            frames.add(int(parts[-2]))
+    return len(frames)
+
+def _version_bytes(version_path: Path) -> int:
+    return sum(
+        path.stat().st_size
+        for path in version_path.rglob('*')
+        if path.is_file() and path.suffix != '.json'
+    )
+
+def _bytes_per_frame(output_path: Path, cache: dict) -> Optional[float]:
+    """Bytes per frame of the latest earlier version beside *output_path*."""
+    version_path = local_path(output_path).parent
+    if not api.naming.is_valid_version_name(version_path.name): return None
+    root_path = version_path.parent
+    if root_path in cache: return cache[root_path]
+    result = None
+    try:
+        version_paths = sorted(
+            (
+                path for path in root_path.iterdir()
+                if path.is_dir()
+                and path.name != version_path.name
+                and api.naming.is_valid_version_name(path.name)
+            ),
+            key = lambda path: api.naming.get_version_code(path.name),
+            reverse = True
+        ) if root_path.exists() else []
+        for path in version_paths:
+            frames = _version_frame_count(path)
+            if frames == 0: continue
+            size = _version_bytes(path)
+            if size == 0: continue
+            result = size / frames
+            break
+    except OSError as error:
+        logging.warning(f'Could not size earlier versions of {root_path}: {error}')
+    cache[root_path] = result
+    return result
+
+def _output_bytes(job, cache: dict) -> Optional[int]:
+    if len(job.output_paths) == 0: return None
+    bytes_per_frame = _bytes_per_frame(Path(job.output_paths[0]), cache)
+    if bytes_per_frame is None: return None
+    return round(bytes_per_frame * len(job.frame_list()))
+
+def estimate_batch(batch, jobs_path: Optional[Path] = None) -> BatchEstimate:
+    """Estimate what submitting *batch* would cost, without submitting it.
+
+    With *jobs_path* (the Deadline jobs root) the job data is hashed and
+    checked against the blob store, to tell the bytes a submit would
+    actually transfer; without it only the totals are reported. The jobs
+    root is only read, never written to.
+    """
+    use_store = (
+        jobs_path is not None and
+        job_data.store_requested()
+    )
+    estimate = BatchEstimate(name = batch.get_name())
+    order = batch.topological_order()
+    names = dict()
+    for job_index in order:
+        job = batch.get_job(job_index)
+        names[job_index] = (
+            job if isinstance(job, str) else
+            job.name or f'job {job_index}'
+        )
+    claimed = set()
+    digests = set()
+    output_cache = dict()
+    for job_index in order:
+        job = batch.get_job(job_index)
+
+        # Existing jobs cost nothing more
+        if isinstance(job, str): continue
+
+        task_frames = job.task_frames()
+        farm_seconds, samples = _farm_seconds(job)
+        job_estimate = JobEstimate(
+            name = names[job_index],
+            frames = sum(map(len, task_frames)),
+            tasks = len(task_frames),
+            chunk_size = job.chunk_size,
+            depends_on = [
+                names[dep_index]
+                for dep_index in sorted(batch.get_deps(job_index))
+            ],
+            farm_seconds = farm_seconds,
+            history_samples = samples,
+            new_data_bytes = 0 if use_store else None,
+            output_bytes = _output_bytes(job, output_cache)
+        )
+
+        # The first job to claim a relative path ships it, as in submit
+        for rel_path, from_path in job_data.expand_paths(job.paths).items():
+            if rel_path in claimed: continue
+            claimed.add(rel_path)
+            size = from_path.stat().st_size
+            job_estimate.data_files += 1
+            job_estimate.data_bytes += size
+            if not use_store: continue
+            digest = job_data.file_digest(from_path)
+            if digest in digests: continue
+            digests.add(digest)
+            if not job_data.blob_path(jobs_path, digest).exists():
+                job_estimate.new_data_bytes += size
+
+        estimate.jobs.append(job_estimate)
+    return estimate
@@ -39,6 +39,9 @@ from tumblepipe.util.io import (
 )
 from tumblepipe.util.uri import Uri
 from tumblepipe.config.timeline import BlockRange
+from tumblepipe.config import get_batch_size_range
+from tumblepipe.farm import task_stats
+from tumblepipe.farm.estimate import is_dry_run
 from tumblepipe.pipe.paths import (
     get_frame_path,
     get_next_frame_path,
@@ -51,6 +54,11 @@ import tumblepipe.farm.tasks.slapcomp.task as slapcomp_job
 import tumblepipe.farm.tasks.mp4.task as mp4_job
 import tumblepipe.farm.tasks.notify.task as notify_job
 
+def _store_framestack_context(context_path: Path, context: dict):
+    # A dry run builds the jobs without creating the versions they render to
+    if is_dry_run(): return
+    store_json(context_path, context)
+
 def build_partial_render_job(
     config: dict,
     paths: dict[Path, Path],
@@ -141,7 +149,7 @@ def build_partial_render_job(
 
     # Create the framestack context file
     context_path = receipt_path.parent / 'context.json'
-    store_json(context_path, dict(
+    _store_framestack_context(context_path, dict(
         entity = str(entity_uri),
         department = department_name,
         variant = variant_name,
@@ -181,6 +189,22 @@ def build_full_render_job(
     step_size = config['settings']['step_size']
     batch_size = config['settings']['batch_size']
 
+    # Size the chunks from this shot's render history, if it has any, unless
+    # the user picked a size of their own (or set adaptive_batch_size off).
+    # Keyed by task family ('render' / 'cloud_render'), their costs differ.
+    job_type = render_task.__name__.split('.')[-2]
+    _, max_batch_size, default_batch_size = get_batch_size_range()
+    adaptive = config['settings'].get(
+        'adaptive_batch_size',
+        batch_size == default_batch_size
+    )
+    if adaptive:
+        batch_size = task_stats.adaptive_batch_size(
+            str(entity_uri), department_name, job_type,
+            batch_size,
+            max_size = max_batch_size
+        )
+
     # Find receipt path and version name
     def _receipt_path(version_name):
         if version_name is None:
@@ -246,6 +270,11 @@ def build_full_render_job(
         frames = [],
         step_size = step_size,
         batch_size = batch_size,
+        stats = dict(
+            entity = str(entity_uri),
+            department = department_name,
+            job_type = job_type
+        ),
         input_path = path_str(to_windows_path(input_path)),
         receipt_path = path_str(to_windows_path(receipt_path)),
         output_paths = {
@@ -256,7 +285,7 @@ def build_full_render_job(
 
     # Create the framestack context file
     context_path = receipt_path.parent / 'context.json'
-    store_json(context_path, dict(
+    _store_framestack_context(context_path, dict(
         entity = str(entity_uri),
         department = department_name,
         variant = variant_name,
@@ -372,7 +401,7 @@ def build_partial_denoise_job(
 
     # Create the framestack context file
     context_path = receipt_path.parent / 'context.json'
-    store_json(context_path, dict(
+    _store_framestack_context(context_path, dict(
         entity = str(entity_uri),
         department = department_name,
         render_department_name = 'denoise',
@@ -480,7 +509,7 @@ def build_full_denoise_job(
 
     # Create the framestack context file
     context_path = receipt_path.parent / 'context.json'
-    store_json(context_path, dict(
+    _store_framestack_context(context_path, dict(
         entity = str(entity_uri),
         department = department_name,
         render_department_name = 'denoise',
@@ -585,7 +614,7 @@ def build_slapcomp_job(
 
     # Create the framestack context file
     context_path = receipt_path.parent / 'context.json'
-    store_json(context_path, dict(
+    _store_framestack_context(context_path, dict(
         entity = str(entity_uri),
         department = department_name,
         render_department_name = render_department_name,
@@ -4,10 +4,16 @@ This module orchestrates the creation and submission of publish and render jobs
 based on the job submission dialog configuration.
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from tempfile import TemporaryDirectory
+from typing import Callable, Optional
 from pathlib import Path
 import datetime as dt
 import logging
+import time
+import os
 
 from tumblepipe.api import (
     local_path,
@@ -18,7 +24,11 @@ from tumblepipe.api import (
 from tumblepipe.util.uri import Uri
 from tumblepipe.util.io import store_json, load_json, store_text
 from tumblepipe.pipe.context import get_aov_names_from_context, aggregate_aov_names_from_inputs
-from tumblepipe.config.department import list_departments, department_names_up_to
+from tumblepipe.config.department import (
+    Department,
+    list_departments,
+    department_names_up_to
+)
 from tumblepipe.apps.deadline import (
     Deadline,
     Batch
@@ -29,6 +39,17 @@ from tumblepipe.pipe.paths import (
 )
 from tumblepipe.pipe.usd import collapse_latest_references, excluded_staged_refs
 from tumblepipe.config.timeline import get_fps, get_frame_range
+from tumblepipe.farm.estimate import (
+    BatchEstimate,
+    dry_run_scope,
+    estimate_batch
+)
+from tumblepipe.config.snapshot import (
+    SNAPSHOT_ENV,
+    SNAPSHOT_NAME,
+    create_snapshot,
+    write_snapshot
+)
 import tumblepipe.farm.tasks.stage.task as stage_task
 import tumblepipe.farm.jobs.houdini.render.job as render_job
 import tumblepipe.farm.jobs.houdini.playblast.job as playblast_job
@@ -75,11 +96,62 @@ FLOAT_ATTRIBUTES = {
 }
 
 
+# Entities prepared concurrently by submit_all; 1 prepares them in order.
+SUBMIT_WORKERS_ENV = 'TH_SUBMIT_WORKERS'
+DEFAULT_SUBMIT_WORKERS = 4
+
+# Ship a frozen config snapshot with every batch; 0 lets farm tasks read the
+# live config from the share instead.
+CONFIG_SNAPSHOT_ENV = 'TH_SUBMIT_CONFIG_SNAPSHOT'
+
+
 class BatchSubmitError(Exception):
     """Error during batch submission."""
     pass
 
 
+@dataclass(frozen=True)
+class SharedSubmitConfig:
+    """Read-only lookups every entity of a multi-entity submit shares.
+
+    Taken once before the entities are prepared, so concurrent preparations
+    neither repeat these reads nor race on connecting to Deadline. A dry run
+    does not connect at all (``farm`` is None).
+    """
+    farm: Optional[Deadline]
+    jobs_dir: Path
+    departments: dict[str, tuple[Department, ...]]
+
+    @staticmethod
+    def take(contexts, dry_run: bool = False) -> 'SharedSubmitConfig':
+        farm = None
+        if not dry_run:
+            try:
+                farm = Deadline()
+            except Exception as e:
+                raise BatchSubmitError(f"Could not connect to Deadline: {e}")
+        return SharedSubmitConfig(
+            farm=farm,
+            jobs_dir=api.storage.resolve(Uri.parse_unsafe('export:/other/jobs')),
+            departments={
+                context: tuple(list_departments(context))
+                for context in set(contexts)
+            }
+        )
+
+
+@dataclass
+class EntitySubmitResult:
+    """Outcome of one entity of a multi-entity submit."""
+    entity_uri: str
+    job_ids: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+    prepare_seconds: float = 0.0
+    submit_seconds: float = 0.0
+    # Set instead of job_ids by a dry run
+    estimate: Optional[BatchEstimate] = None
+
+
 def _build_render_overrides(settings: dict) -> dict:
     """Build render overrides dict from job settings.
 
@@ -106,7 +178,12 @@ def _build_render_overrides(settings: dict) -> dict:
     return overrides
 
 
-def _get_aov_names(entity_uri: Uri, department: str, variants: list[str]) -> list[str]:
+def _get_aov_names(
+    entity_uri: Uri,
+    department: str,
+    variants: list[str],
+    departments: Optional[list[Department]] = None
+    ) -> list[str]:
     """Get AOV names from layer exports, including AOVs from referenced assets.
 
     Checks all shot departments for AOVs (since AOVs can be defined in any department),
@@ -116,6 +193,7 @@ def _get_aov_names(entity_uri: Uri, department: str, variants: list[str]) -> lis
         entity_uri: The entity URI for the shot/asset
         department: The render department name (unused, kept for API compatibility)
         variants: List of variant names to check
+        departments: The entity context's departments, if already listed
 
     Returns:
         List of unique AOV names from shot + all referenced assets, or empty list if not found
@@ -123,8 +201,10 @@ def _get_aov_names(entity_uri: Uri, department: str, variants: list[str]) -> lis
     aov_set = set()
 
     # Determine entity context for department list
-    entity_context = 'shots' if str(entity_uri).startswith('entity:/shots/') else 'assets'
-    all_departments = [d.name for d in list_departments(entity_context)]
+    if departments is None:
+        entity_context = 'shots' if str(entity_uri).startswith('entity:/shots/') else 'assets'
+        departments = list_departments(entity_context)
+    all_departments = [d.name for d in departments]
 
     # Try to get from layer exports - check ALL departments
     for variant in variants:
@@ -160,7 +240,13 @@ def _get_aov_names(entity_uri: Uri, department: str, variants: list[str]) -> lis
     return []
 
 
-def submit_entity_batch(config: dict) -> list[str]:
+def submit_entity_batch(
+    config: dict,
+    shared: Optional[SharedSubmitConfig] = None,
+    timings: Optional[dict[str, float]] = None,
+    dry_run: bool = False,
+    estimates: Optional[list[BatchEstimate]] = None
+    ) -> list[str]:
     """
     Submit a batch of jobs for a single entity based on configuration.
 
@@ -178,13 +264,32 @@ def submit_entity_batch(config: dict) -> list[str]:
                                   ('full' renders the whole range;
                                   'first_middle_last' renders 3 check
                                   frames via the partial_render chain)
+        shared: Lookups shared across a multi-entity submit (see
+            ``submit_all``); taken on the spot when omitted
+        timings: If given, receives the seconds spent preparing the batch
+            (``prepare``) and submitting it (``submit``)
+        dry_run: Build the batch but estimate it instead of submitting it
+            (see ``tumblepipe.farm.estimate``); nothing reaches Deadline and
+            no render versions are created
+        estimates: If given, receives the batch estimate of a dry run
 
     Returns:
-        List of submitted job IDs
+        List of submitted job IDs (empty for a dry run)
 
     Raises:
         BatchSubmitError: If submission fails
     """
+    with dry_run_scope() if dry_run else nullcontext():
+        return _submit_entity_batch(config, shared, timings, dry_run, estimates)
+
+
+def _submit_entity_batch(
+    config: dict,
+    shared: Optional[SharedSubmitConfig],
+    timings: Optional[dict[str, float]],
+    dry_run: bool,
+    estimates: Optional[list[BatchEstimate]]
+    ) -> list[str]:
     # Extract config
     entity_uri = Uri.parse_unsafe(config['entity']['uri'])
     entity_context = config['entity']['context']
@@ -229,6 +334,8 @@ def submit_entity_batch(config: dict) -> list[str]:
     if not do_publish and not do_render and not do_playblast:
         return []
 
+    prepare_start = time.perf_counter()
+
     # Playblast is a shots-only preview (mirrors the shot playblast HDAs). The
     # dialog only offers the section for the shots context, but guard here too.
     if do_playblast and entity_context != 'shots':
@@ -237,7 +344,11 @@ def submit_entity_batch(config: dict) -> list[str]:
         )
 
     # Get departments list
-    departments = list_departments(entity_context)
+    departments = (
+        list(shared.departments[entity_context])
+        if shared is not None and entity_context in shared.departments else
+        list_departments(entity_context)
+    )
     department_names = [d.name for d in departments]
     renderable_names = [d.name for d in departments if d.renderable]
 
@@ -295,10 +406,15 @@ def submit_entity_batch(config: dict) -> list[str]:
         )
 
     # Connect to Deadline
-    try:
-        farm = Deadline()
-    except Exception as e:
-        raise BatchSubmitError(f"Could not connect to Deadline: {e}")
+    if dry_run:
+        farm = None
+    elif shared is not None:
+        farm = shared.farm
+    else:
+        try:
+            farm = Deadline()
+        except Exception as e:
+            raise BatchSubmitError(f"Could not connect to Deadline: {e}")
 
     # Create batch
     project_name = api.PROJECT_PATH.name
@@ -323,10 +439,15 @@ def submit_entity_batch(config: dict) -> list[str]:
 
     # Helper to finalize and submit batch
     def _finalize_batch():
+        submit_start = time.perf_counter()
+        if timings is not None:
+            timings['prepare'] = submit_start - prepare_start
         if not jobs:
             logging.info(f"No jobs to submit for {entity_uri}")
             return []
 
+        _attach_config_snapshot(entity_uri, temp_path, jobs)
+
         indices = {}
         for job_name, job in jobs.items():
             indices[job_name] = batch.add_job(job)
@@ -337,8 +458,21 @@ def submit_entity_batch(config: dict) -> list[str]:
                     batch.add_dep(indices[job_name], indices[dep_name])
 
         # Submit batch
-        jobs_dir = api.storage.resolve(Uri.parse_unsafe('export:/other/jobs'))
+        jobs_dir = (
+            shared.jobs_dir if shared is not None else
+            api.storage.resolve(Uri.parse_unsafe('export:/other/jobs'))
+        )
+        if dry_run:
+            estimate = estimate_batch(batch, jobs_dir)
+            if estimates is not None:
+                estimates.append(estimate)
+            if timings is not None:
+                timings['submit'] = time.perf_counter() - submit_start
+            logging.info(f"Dry run for {entity_uri}:\n{estimate.format()}")
+            return []
         job_ids = farm.submit(batch, jobs_dir)
+        if timings is not None:
+            timings['submit'] = time.perf_counter() - submit_start
 
         logging.info(f"Submitted batch for {entity_uri}: {len(job_ids)} jobs")
         return job_ids
@@ -387,7 +521,7 @@ def submit_entity_batch(config: dict) -> list[str]:
             render_overrides = _build_render_overrides(settings)
 
             # Get AOV names from layer exports or root layer context
-            aov_names = _get_aov_names(entity_uri, render_department, variants)
+            aov_names = _get_aov_names(entity_uri, render_department, variants, departments)
 
             if not standalone:
                 # === DIRECT RENDER MODE (standalone=False) ===
@@ -622,10 +756,125 @@ def submit_entity_batch(config: dict) -> list[str]:
         return _finalize_batch()
 
 
+def _attach_config_snapshot(entity_uri: Uri, temp_path: Path, jobs: dict):
+    """Freeze the config into the batch and point every job's tasks at it.
+
+    The snapshot is bundled into the job data dir, where ``TH_CONFIG_SNAPSHOT``
+    (relative to ``TH_FARM_DATA``) finds it; the tasks then build their client
+    from it instead of loading the config from the share (see
+    ``tumblepipe.config.snapshot``). Best effort: a batch that cannot be
+    snapshotted is submitted to read the live config as before.
+    """
+    if os.environ.get(CONFIG_SNAPSHOT_ENV, '1') == '0':
+        return
+    try:
+        snapshot_path = write_snapshot(
+            temp_path / SNAPSHOT_NAME,
+            create_snapshot([entity_uri])
+        )
+    except Exception as e:
+        logging.warning(f"Could not snapshot config for {entity_uri}: {e}")
+        return
+    for job in jobs.values():
+        job.paths[snapshot_path] = Path(SNAPSHOT_NAME)
+        job.env[SNAPSHOT_ENV] = SNAPSHOT_NAME
+
+
+def _default_submit_workers() -> int:
+    value = os.environ.get(SUBMIT_WORKERS_ENV, '')
+    return max(1, int(value)) if value.isdigit() else DEFAULT_SUBMIT_WORKERS
+
+
+def _submit_one(
+    config: dict,
+    shared: SharedSubmitConfig,
+    dry_run: bool = False
+    ) -> EntitySubmitResult:
+    result = EntitySubmitResult(entity_uri=config['entity']['uri'])
+    timings = {}
+    estimates = []
+    start = time.perf_counter()
+    try:
+        result.job_ids = list(submit_entity_batch(
+            config, shared, timings, dry_run, estimates
+        ) or [])
+        if estimates:
+            result.estimate = estimates[0]
+    except Exception as e:
+        logging.exception(f"Failed to submit batch for {result.entity_uri}")
+        result.error = str(e)
+    result.prepare_seconds = timings.get('prepare', time.perf_counter() - start)
+    result.submit_seconds = timings.get('submit', 0.0)
+    return result
+
+
+def submit_entities(
+    configs: list[dict],
+    max_workers: Optional[int] = None,
+    on_result: Optional[Callable[[EntitySubmitResult], None]] = None,
+    dry_run: bool = False
+    ) -> list[EntitySubmitResult]:
+    """
+    Prepare and submit many entities' batches concurrently.
+
+    Each entity is prepared (frame ranges, render settings, collapsed
+    stages, job files) on a bounded thread pool and its batch submitted as
+    soon as it is ready, so the first renders start while later entities
+    are still being prepared. Lookups every entity needs (Deadline
+    connection, jobs dir, department lists) are taken once up front and
+    shared read-only.
+
+    A failing entity is reported in its result and does not stop the
+    others. Results are returned in the order of *configs*; *on_result* is
+    called with each one as it completes.
+
+    Args:
+        configs: List of job configurations (one per entity)
+        max_workers: Entities prepared at once; defaults to
+            ``TH_SUBMIT_WORKERS`` or ``DEFAULT_SUBMIT_WORKERS``
+        on_result: Optional progress callback, called on worker threads
+        dry_run: Build every batch but only estimate it; each result
+            carries its ``estimate`` and no job ids, and Deadline is never
+            contacted
+
+    Raises:
+        BatchSubmitError: If Deadline cannot be reached
+    """
+    if len(configs) == 0:
+        return []
+    if max_workers is None:
+        max_workers = _default_submit_workers()
+    shared = SharedSubmitConfig.take(
+        (config['entity']['context'] for config in configs),
+        dry_run=dry_run
+    )
+    results = [None] * len(configs)
+    workers = max(1, min(max_workers, len(configs)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_submit_one, config, shared, dry_run): index
+            for index, config in enumerate(configs)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            logging.info(
+                f"{result.entity_uri}: prepared in {result.prepare_seconds:.1f}s, "
+                f"submitted in {result.submit_seconds:.1f}s"
+                + (f" (failed: {result.error})" if result.error else "")
+            )
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
 def submit_all(configs: list[dict]) -> dict[str, list[str]]:
     """
     Submit batches for multiple entities.
 
+    Entities are prepared and submitted concurrently (see
+    ``submit_entities``).
+
     Args:
         configs: List of job configurations (one per entity)
 
@@ -635,14 +884,17 @@ def submit_all(configs: list[dict]) -> dict[str, list[str]]:
     results = {}
     errors = []
 
-    for config in configs:
-        entity_uri = config['entity']['uri']
-        try:
-            job_ids = submit_entity_batch(config)
-            results[entity_uri] = job_ids
-        except BatchSubmitError as e:
-            logging.error(f"Failed to submit batch for {entity_uri}: {e}")
-            errors.append((entity_uri, str(e)))
+    try:
+        entity_results = submit_entities(configs)
+    except BatchSubmitError as e:
+        logging.error(f"Failed to submit batches: {e}")
+        return results
+
+    for result in entity_results:
+        if result.error is not None:
+            errors.append((result.entity_uri, result.error))
+            continue
+        results[result.entity_uri] = result.job_ids
 
     if errors:
         logging.warning(f"Submission completed with {len(errors)} error(s)")
@@ -43,7 +43,8 @@ config = {
         'first_frame': 'int',
         'last_frame': 'int',
         'step_size': 'int',
-        'batch_size': 'int'
+        'batch_size': 'int',
+        'adaptive_batch_size': 'bool'  # optional; default: only when batch_size is the project default
     },
     'tasks': {
         'partial_render': {
@@ -89,6 +90,7 @@ def _is_valid_config(config):
         if not _check_int(settings, 'last_frame'): return False
         if not _check_int(settings, 'step_size'): return False
         if not _check_int(settings, 'batch_size'): return False
+        if 'adaptive_batch_size' in settings and not _check_bool(settings, 'adaptive_batch_size'): return False
         return True
     
     def _valid_jobs(tasks):
@@ -0,0 +1,205 @@
+"""Historical farm task runtimes and adaptive chunk sizing.
+
+Render jobs used to be chunked by a fixed ``batch_size``: a heavy shot got
+tasks that ran for hours, a light one paid the Houdini/husk start-up on every
+few frames. Farm tasks now record how long each finished task took for how
+many frames, keyed by entity, department and job type, and
+`adaptive_batch_size` turns that history into the chunk size that makes a
+task run for about ``TH_CHUNK_TARGET_SECONDS``. With no history for a key the
+static size is used unchanged.
+
+The store is a directory of append-only JSON-lines files, one per key, under
+``TH_TASK_STATS_PATH`` (default ``project:/_pipeline/task_stats``) — a shared
+location, so the submitting machine sees what the farm recorded.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+from pathlib import Path
+import statistics
+import logging
+import json
+import math
+import time
+import re
+import os
+
+from tumblepipe.api import local_path, api
+from tumblepipe.util.uri import Uri
+
+STATS_PATH_ENV = 'TH_TASK_STATS_PATH'
+TARGET_SECONDS_ENV = 'TH_CHUNK_TARGET_SECONDS'
+
+# Task duration the adaptive chunker aims for, when not configured.
+DEFAULT_TARGET_SECONDS = 20 * 60
+
+# Most recent samples a cost estimate is based on, so the model follows
+# a shot as it gets heavier or lighter.
+HISTORY_SIZE = 20
+
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+@dataclass(frozen=True)
+class TaskSample:
+    frames: int
+    seconds: float
+    time: float
+
+@dataclass(frozen=True)
+class CostModel:
+    """Task runtime as ``overhead_seconds + frames * seconds_per_frame``."""
+    overhead_seconds: float
+    seconds_per_frame: float
+    samples: int
+
+    def task_seconds(self, frames: int) -> float:
+        return self.overhead_seconds + frames * self.seconds_per_frame
+
+def stats_root() -> Path:
+    value = os.environ.get(STATS_PATH_ENV)
+    if value: return Path(value)
+    return local_path(api.storage.resolve(
+        Uri.parse_unsafe('project:/_pipeline/task_stats')
+    ))
+
+def _key_path(
+    root: Path,
+    entity: str,
+    department: str,
+    job_type: str
+    ) -> Path:
+    entity_name = _UNSAFE_RE.sub('_', str(entity)).strip('_')
+    return root / entity_name / department / f'{job_type}.jsonl'
+
+def record_task(
+    entity: str,
+    department: str,
+    job_type: str,
+    frames: int,
+    seconds: float,
+    root: Optional[Path] = None
+    ):
+    """Append one finished task to the history of its key.
+
+    Never raises for an unreachable store: losing a sample must not fail
+    the task that produced it.
+    """
+    if frames <= 0 or seconds <= 0: return
+    try:
+        path = _key_path(root or stats_root(), entity, department, job_type)
+        path.parent.mkdir(parents = True, exist_ok = True)
+        line = json.dumps(dict(
+            frames = frames,
+            seconds = round(seconds, 3),
+            time = round(time.time(), 3)
+        ))
+        # One short append per task; lines from concurrent tasks don't
+        # interleave
+        with path.open('a') as file:
+            file.write(line + '\n')
+    except Exception as error:
+        logging.warning(f'Could not record task stats: {error}')
+
+def load_samples(
+    entity: str,
+    department: str,
+    job_type: str,
+    limit: int = HISTORY_SIZE,
+    root: Optional[Path] = None
+    ) -> list[TaskSample]:
+    """The latest *limit* samples of a key, oldest first."""
+    try:
+        path = _key_path(root or stats_root(), entity, department, job_type)
+        if not path.exists(): return []
+        lines = path.read_text().splitlines()
+    except Exception as error:
+        logging.warning(f'Could not read task stats: {error}')
+        return []
+    samples = list()
+    for line in lines[-limit:]:
+        try:
+            data = json.loads(line)
+            samples.append(TaskSample(
+                frames = int(data['frames']),
+                seconds = float(data['seconds']),
+                time = float(data.get('time', 0.0))
+            ))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return samples
+
+def estimate_cost(samples: list[TaskSample]) -> Optional[CostModel]:
+    """Fit per-task overhead and per-frame cost to *samples*.
+
+    With tasks of different lengths in the history the two are separated by
+    a least-squares line through (frames, seconds). Otherwise, or when the
+    fit is degenerate, all time is counted as per-frame cost (the median
+    ``seconds / frames``), which sizes chunks on the safe side.
+    """
+    samples = [
+        sample for sample in samples
+        if sample.frames > 0 and sample.seconds > 0
+    ]
+    if len(samples) == 0: return None
+    fallback = CostModel(
+        overhead_seconds = 0.0,
+        seconds_per_frame = statistics.median(
+            sample.seconds / sample.frames
+            for sample in samples
+        ),
+        samples = len(samples)
+    )
+    if len({sample.frames for sample in samples}) < 2: return fallback
+    mean_frames = statistics.fmean(sample.frames for sample in samples)
+    mean_seconds = statistics.fmean(sample.seconds for sample in samples)
+    covariance = sum(
+        (sample.frames - mean_frames) * (sample.seconds - mean_seconds)
+        for sample in samples
+    )
+    variance = sum(
+        (sample.frames - mean_frames) ** 2
+        for sample in samples
+    )
+    seconds_per_frame = covariance / variance
+    overhead_seconds = mean_seconds - seconds_per_frame * mean_frames
+    if seconds_per_frame <= 0 or overhead_seconds < 0: return fallback
+    return CostModel(
+        overhead_seconds = overhead_seconds,
+        seconds_per_frame = seconds_per_frame,
+        samples = len(samples)
+    )
+
+def _target_seconds() -> float:
+    value = os.environ.get(TARGET_SECONDS_ENV)
+    if not value: return DEFAULT_TARGET_SECONDS
+    return max(1.0, float(value))
+
+def adaptive_batch_size(
+    entity: str,
+    department: str,
+    job_type: str,
+    static_size: int,
+    target_seconds: Optional[float] = None,
+    max_size: Optional[int] = None,
+    root: Optional[Path] = None
+    ) -> int:
+    """Frames per task that makes a task of this key take *target_seconds*.
+
+    Falls back to *static_size* when the key has no history, and leaves a
+    non-positive *static_size* (no batching) alone. The result is clamped
+    to ``[1, max_size]``.
+    """
+    if static_size <= 0: return static_size
+    model = estimate_cost(load_samples(entity, department, job_type, root = root))
+    if model is None: return static_size
+    if target_seconds is None: target_seconds = _target_seconds()
+    budget = max(0.0, target_seconds - model.overhead_seconds)
+    size = max(1, math.floor(budget / model.seconds_per_frame))
+    if max_size is not None: size = min(size, max_size)
+    logging.debug(
+        f'Adaptive chunk size for {entity} {department} {job_type}: '
+        f'{size} frames (static {static_size}, '
+        f'{model.seconds_per_frame:.1f}s/frame + '
+        f'{model.overhead_seconds:.1f}s overhead over {model.samples} tasks)'
+    )
+    return size
@@ -1,10 +1,9 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
 import logging
 import tarfile
-import shutil
 import math
 import json
+import time
 import sys
 import os
 
@@ -24,10 +23,12 @@ from tumblepipe.util.io import (
     store_json
 )
 from tumblepipe.config.timeline import BlockRange
-from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import Husk, ITileStitch
 from tumblepipe.apps import exr
+from tumblepipe.util import timing, transfer
 from tumblepipe.farm.tasks.env import get_base_env, ocio_value, print_env, job_data_dir
+from tumblepipe.farm.tasks.scratch import scratch_dir
+from tumblepipe.farm import task_stats
 
 def _headline(title):
     print(f' {title} '.center(80, '='))
@@ -57,8 +58,10 @@ def main(
     archive_path: Path,
     relative_input_path: Path,
     receipt_path: Path,
-    output_paths: dict[str, Path]
+    output_paths: dict[str, Path],
+    stats: dict | None = None
     ) -> int:
+    start_time = time.time()
 
     # Check that OCIO has been set
     assert os.environ.get('OCIO') is not None, (
@@ -71,10 +74,7 @@ def main(
     itilestitch = ITileStitch()
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Temp paths
         temp_frame_path = temp_path / 'render' / 'render.*.exr'
@@ -84,15 +84,16 @@ def main(
         # Copy the input archive to the temp path
         _headline('Unpack workspace archive')
         print(f'Transfering archive: {temp_archive_path}')
-        shutil.copyfile(local_path(archive_path), temp_archive_path)
-
-        # Unpack the input archive
-        with tarfile.open(temp_archive_path, 'r:gz') as archive_file:
-            for archive_member in archive_file:
-                archive_file.extract(archive_member, temp_path)
-                relative_file_path = Path(archive_member.name)
-                file_path = temp_path / relative_file_path
-                print(f'Unpacked: {file_path}')
+        with timing.span('unpack'):
+            transfer.copy_file(local_path(archive_path), temp_archive_path)
+
+            # Unpack the input archive
+            with tarfile.open(temp_archive_path, 'r:gz') as archive_file:
+                for archive_member in archive_file:
+                    archive_file.extract(archive_member, temp_path)
+                    relative_file_path = Path(archive_member.name)
+                    file_path = temp_path / relative_file_path
+                    print(f'Unpacked: {file_path}')
         
         # Check that the input file exists
         if not temp_input_path.exists():
@@ -123,30 +124,32 @@ def main(
         # Render tiles
         if tile_count == 1:
             # Single tile - render directly without tile flags
-            husk.run(
-                to_windows_path(temp_input_path),
-                base_args + [
-                    '--output', path_str(to_windows_path(
-                        _fix_frame_pattern(temp_frame_path, '$F4')
-                    ))
-                ],
-                env=env
-            )
-        else:
-            # Multiple tiles - render with tile flags
-            for tile_index in range(tile_count):
+            with timing.span('husk'):
                 husk.run(
                     to_windows_path(temp_input_path),
                     base_args + [
-                        '--tile-count', str(x_tiles), str(y_tiles),
-                        '--tile-index', str(tile_index),
-                        '--tile-suffix', '.%04d',
                         '--output', path_str(to_windows_path(
                             _fix_frame_pattern(temp_frame_path, '$F4')
                         ))
                     ],
                     env=env
                 )
+        else:
+            # Multiple tiles - render with tile flags
+            for tile_index in range(tile_count):
+                with timing.span('husk'):
+                    husk.run(
+                        to_windows_path(temp_input_path),
+                        base_args + [
+                            '--tile-count', str(x_tiles), str(y_tiles),
+                            '--tile-index', str(tile_index),
+                            '--tile-suffix', '.%04d',
+                            '--output', path_str(to_windows_path(
+                                _fix_frame_pattern(temp_frame_path, '$F4')
+                            ))
+                        ],
+                        env=env
+                    )
 
             # Stitch the tiles together to create the frames
             _headline('Stitching tiles')
@@ -157,11 +160,12 @@ def main(
                     for tile_index in range(tile_count)
                 ]
                 print(f'Stitching tiles for frame {frame_index}: {frame_path}')
-                itilestitch.run(
-                    [ path_str(to_windows_path(frame_path)) ] +
-                    [ path_str(to_windows_path(tile_path)) for tile_path in tile_paths ],
-                    env = dict(OCIO=ocio_value())
-                )
+                with timing.span('stitch', frame_index):
+                    itilestitch.run(
+                        [ path_str(to_windows_path(frame_path)) ] +
+                        [ path_str(to_windows_path(tile_path)) for tile_path in tile_paths ],
+                        env = dict(OCIO=ocio_value())
+                    )
 
         # Check that the frames were generated
         for frame_index in render_range:
@@ -177,9 +181,10 @@ def main(
             # Split the frame
             current_frame_path = _get_frame_path(temp_frame_path, frame_index)
             print(f'Splitting frame: {current_frame_path}')
-            split_frame_paths = exr.split_subimages(
-                current_frame_path, temp_path
-            )
+            with timing.span('split', frame_index):
+                split_frame_paths = exr.split_subimages(
+                    current_frame_path, temp_path
+                )
 
             # Check splitter output
             if split_frame_paths is None:
@@ -198,22 +203,35 @@ def main(
 
         # Copy frames to network
         _headline('Copying files to network')
+        copy_pairs = list()
         for aov_paths in framestack_aov_paths.values():
             for temp_aov_path, output_aov_path in aov_paths.values():
                 print(f'Copying file: {output_aov_path}')
-                output_aov_path = local_path(output_aov_path)
-                output_aov_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copyfile(temp_aov_path, output_aov_path)
+                copy_pairs.append((temp_aov_path, local_path(output_aov_path)))
+        with timing.span('copy'):
+            copy_stats = transfer.copy_files(copy_pairs)
+        print(f'Copied {copy_stats.summary()}')
         
         # Create the output receipts
         _headline('Creating output receipts')
-        for frame_index, aov_paths in framestack_aov_paths.items():
-            current_receipt_path = _get_frame_path(receipt_path, frame_index)
-            print(f'Creating receipt: {current_receipt_path}')
-            store_json(local_path(current_receipt_path), {
-                aov_name: path_str(output_aov_path)
-                for aov_name, (_, output_aov_path) in aov_paths.items()
-            })
+        with timing.span('receipts'):
+            for frame_index, aov_paths in framestack_aov_paths.items():
+                current_receipt_path = _get_frame_path(receipt_path, frame_index)
+                print(f'Creating receipt: {current_receipt_path}')
+                store_json(local_path(current_receipt_path), {
+                    aov_name: path_str(output_aov_path)
+                    for aov_name, (_, output_aov_path) in aov_paths.items()
+                })
+
+    # Record the task's runtime for adaptive chunk sizing
+    if stats is not None:
+        task_stats.record_task(
+            stats['entity'],
+            stats['department'],
+            stats['job_type'],
+            len(render_range),
+            time.time() - start_time
+        )
 
     # Done
     print('Success')
@@ -228,6 +246,11 @@ config = {
     'output_paths': {
         'diffuse': 'path/to/diffuse.####.exr',
         'specular': 'path/to/specular.####.exr'
+    },
+    'stats': {  # optional, see tumblepipe.farm.task_stats
+        'entity': 'entity:/shots/seq010/shot0010',
+        'department': 'lighting',
+        'job_type': 'cloud_render'
     }
 }
 """
@@ -299,14 +322,22 @@ def cli():
         for aov_name, aov_path in config['output_paths'].items()
     }
 
-    # Run main
-    return main(
-        tile_count,
-        render_range,
-        archive_path,
-        relative_input_path,
-        receipt_path,
-        output_paths
+    # Run main, timing its phases into a report next to the receipts
+    return timing.run_with_report(
+        'cloud_render',
+        local_path(receipt_path.parent),
+        first_frame,
+        last_frame,
+        lambda: main(
+            tile_count,
+            render_range,
+            archive_path,
+            relative_input_path,
+            receipt_path,
+            output_paths,
+            config.get('stats')
+        ),
+        tile_count = tile_count
     )
 
 if __name__ == '__main__':
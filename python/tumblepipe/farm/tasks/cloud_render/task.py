@@ -36,6 +36,11 @@ config = {
     'output_paths': {
         'diffuse': 'path/to/diffuse.####.exr',
         'depth': 'path/to/depth.####.exr'
+    },
+    'stats': {  # optional, see tumblepipe.farm.task_stats
+        'entity': 'entity:/shots/seq010/shot0010',
+        'department': 'lighting',
+        'job_type': 'cloud_render'
     }
 }
 """
@@ -105,7 +110,8 @@ def build(config, paths, staging_path):
         receipt_path = config['receipt_path'],
         archive_path = config['archive_path'],
         input_path = config['input_path'],
-        output_paths = config['output_paths']
+        output_paths = config['output_paths'],
+        stats = config.get('stats')
     ))
 
     # Paths to be packaged
@@ -142,6 +148,7 @@ def build(config, paths, staging_path):
         TH_PIPELINE_PATH = path_str(relative_pipeline_path),
     ))
     task.output_paths.append(to_windows_path(receipt_path))
+    task.stats = config.get('stats')
 
     # Done
     return task
\ No newline at end of file
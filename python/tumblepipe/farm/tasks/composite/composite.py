@@ -1,4 +1,3 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
 import logging
 import sys
@@ -20,9 +19,10 @@ from tumblepipe.util.io import (
     store_json
 )
 from tumblepipe.config.timeline import BlockRange
-from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import Hython
+from tumblepipe.util import timing
 from tumblepipe.farm.tasks.env import get_hython_env, print_env
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 def _error(msg):
     logging.error(msg)
@@ -91,10 +91,7 @@ def main(
     hython = Hython()
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Store composite config
         config_path = temp_path / 'config.json'
@@ -114,13 +111,14 @@ def main(
         ))
 
         # Run script in hython
-        hython.run(
-            to_windows_path(SCRIPT_PATH),
-            [
-                path_str(to_windows_path(config_path))
-            ],
-            env = get_hython_env(api)
-        )
+        with timing.span('hython'):
+            hython.run(
+                to_windows_path(SCRIPT_PATH),
+                [
+                    path_str(to_windows_path(config_path))
+                ],
+                env = get_hython_env(api)
+            )
 
     # Check if output receipts were generated
     for receipt_path in missing_receipt_paths:
@@ -215,15 +213,22 @@ def cli():
     # Get the entity
     entity_json = config['entity']
 
-    # Run the main function
-    return main(
-        render_range,
-        receipt_path,
-        input_path,
-        node_path,
-        layer_names,
-        output_paths,
-        entity_json
+    # Run the main function, timing its phases into a report next to the
+    # receipts
+    return timing.run_with_report(
+        'composite',
+        local_path(receipt_path.parent),
+        first_frame,
+        last_frame,
+        lambda: main(
+            render_range,
+            receipt_path,
+            input_path,
+            node_path,
+            layer_names,
+            output_paths,
+            entity_json
+        )
     )
 
 if __name__ == '__main__':
@@ -1,6 +1,4 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
-import shutil
 import json
 import os
 
@@ -8,7 +6,6 @@ import hou
 
 from tumblepipe.api import (
     path_str,
-    to_windows_path,
     api
 )
 from tumblepipe.util.io import (
@@ -17,8 +14,10 @@ from tumblepipe.util.io import (
 )
 from tumblepipe.config.timeline import BlockRange, get_fps
 from tumblepipe.util.uri import Uri
+from tumblepipe.util import transfer
 from tumblepipe.pipe.houdini import util
 from tumblepipe.apps.deadline import log_progress
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 def _headline(title):
     print(f' {title} '.center(80, '='))
@@ -87,10 +86,7 @@ def main(
     variant_names = properties.get('variants', [])
 
     # Open a temporary directory
-    root_temp_path = to_windows_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Render each layer separately
         all_layer_aov_paths = {}  # {frame_index: {layer_name: {aov_name: (temp_path, output_path)}}}
@@ -153,11 +149,13 @@ def main(
 
         # Copy to the output path
         _headline('Copying files to network')
+        copy_pairs = list()
         for frame_index, layer_paths in all_layer_aov_paths.items():
             for layer_name, (temp_path, output_path) in layer_paths.items():
                 print(f'Copying file: {output_path}')
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copyfile(temp_path, output_path)
+                copy_pairs.append((temp_path, output_path))
+        copy_stats = transfer.copy_files(copy_pairs)
+        print(f'Copied {copy_stats.summary()}')
 
         # Create the output receipts
         _headline('Creating output receipts')
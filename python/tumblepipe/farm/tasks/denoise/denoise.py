@@ -10,9 +10,9 @@ license token, so the whole job runs here in plain python. Per frame:
 merge the per-AOV EXRs into one multi-plane file (idenoise reads its
 normal/albedo guides as planes *inside* the input), denoise every AOV in one
 call, then split the planes back out and DWAB-compress them to their published
-paths. See designs/denoise-without-hython.md.
+paths in one more oiiotool call. See designs/denoise-without-hython.md.
 """
-from tempfile import TemporaryDirectory
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import logging
 import sys
@@ -25,20 +25,19 @@ if tumblepipe_packages_path not in sys.path:
 
 from tumblepipe.api import (
     path_str,
-    local_path,
-    api
+    local_path
 )
 from tumblepipe.util.io import (
     load_json,
     store_json
 )
 from tumblepipe.config.timeline import BlockRange
-from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import IDenoise
-from tumblepipe.apps.deadline import log_progress
 from tumblepipe.apps import exr
+from tumblepipe.util import timing, system
 from tumblepipe.farm.tasks.env import print_env
 from tumblepipe.farm.tasks.denoise import _spec
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 # The guide planes OIDN uses to preserve detail. idenoise resolves them by
 # plane name inside the merged frame, and they are denoised in their own right
@@ -50,6 +49,20 @@ GUIDE_AOV_NAMES = ('normal', 'albedo')
 # and exits 0. Treated as a failure here -- see _run_idenoise.
 MISSING_AOV_WARNING = "can't find specified AOV"
 
+# Frames denoised at once. Unset, the pool is sized from the node: a frame
+# per CORES_PER_FRAME cores, as many as fit in the available memory, and at
+# most GPU_FRAMES when idenoise runs on the GPU (the frames share one card;
+# the second overlaps its oiiotool steps with the first's denoise).
+WORKERS_ENV = 'TH_DENOISE_WORKERS'
+CORES_PER_FRAME = 4
+GPU_FRAMES = 2
+
+# Memory a frame in flight takes: the merged, denoised and OIDN working
+# copies of its float planes, plus the idenoise process itself
+FRAME_COPIES = 3
+FRAME_OVERHEAD_BYTES = 1024 ** 3
+DEFAULT_FRAME_BYTES = 4 * 1024 ** 3
+
 def _headline(title):
     print(f' {title} '.center(80, '='))
 
@@ -88,6 +101,36 @@ def _is_critical_aov(aov_name):
     if name.startswith('holdout_'): return True
     return False
 
+def _frame_memory_bytes(probe_frame_paths: dict[str, Path]) -> int:
+    """Memory one frame in flight needs, from the probed frame's headers."""
+    plane_bytes = 0
+    for aov_path in probe_frame_paths.values():
+        image_infos = exr.get_image_info(local_path(aov_path))
+        if not image_infos: return DEFAULT_FRAME_BYTES
+        image_info = image_infos[0]
+        if image_info.width is None or image_info.height is None:
+            return DEFAULT_FRAME_BYTES
+
+        # combine_aovs normalizes every AOV to 3 float channels
+        plane_bytes += image_info.width * image_info.height * 3 * 4
+    return FRAME_COPIES * plane_bytes + FRAME_OVERHEAD_BYTES
+
+def _frame_workers(
+    frame_count: int,
+    probe_frame_paths: dict[str, Path],
+    force_cpu: bool
+    ) -> int:
+    value = os.environ.get(WORKERS_ENV)
+    if value: return max(1, min(int(value), frame_count))
+    workers = max(1, system.usable_cpu_count() // CORES_PER_FRAME)
+    available_bytes = system.available_memory()
+    if available_bytes is not None:
+        frame_bytes = _frame_memory_bytes(probe_frame_paths)
+        workers = min(workers, max(1, available_bytes // frame_bytes))
+    if not force_cpu:
+        workers = min(workers, GPU_FRAMES)
+    return max(1, min(workers, frame_count))
+
 def _run_idenoise(idenoise, input_path, output_path, aov_names, force_cpu) -> int:
     args = [
         path_str(local_path(input_path)),
@@ -144,7 +187,8 @@ def _denoise_frame(
 
     # Merge the per-AOV files into the one multi-plane file idenoise reads
     combined_path = frame_temp_path / 'combined.exr'
-    included = exr.combine_aovs(frame_input_paths, channel_counts, combined_path)
+    with timing.span('combine', frame_index):
+        included = exr.combine_aovs(frame_input_paths, channel_counts, combined_path)
     if included is None:
         print(f'  ERROR: Failed to combine AOVs for frame {frame_index}')
         return dict(), set(input_paths.keys())
@@ -158,31 +202,55 @@ def _denoise_frame(
     # bad AOV costs only itself instead of the frame.
     denoised_path = frame_temp_path / 'denoised.exr'
     source_paths = dict()
-    if _run_idenoise(idenoise, combined_path, denoised_path, included, force_cpu) == 0:
+    with timing.span('idenoise', frame_index):
+        exit_code = _run_idenoise(
+            idenoise, combined_path, denoised_path, included, force_cpu
+        )
+    if exit_code == 0:
         source_paths = {aov_name: denoised_path for aov_name in included}
     else:
         print(f'  Batch denoise failed for frame {frame_index}, isolating per AOV')
         for aov_name in included:
             aov_denoised_path = frame_temp_path / f'{aov_name}_denoised.exr'
-            if _run_idenoise(
-                idenoise, combined_path, aov_denoised_path, [aov_name], force_cpu
-                ) != 0:
+            with timing.span('idenoise_retry', frame_index):
+                exit_code = _run_idenoise(
+                    idenoise, combined_path, aov_denoised_path, [aov_name], force_cpu
+                )
+            if exit_code != 0:
                 print(f'  ERROR: Failed to denoise AOV {aov_name}')
                 failed.add(aov_name)
                 continue
             source_paths[aov_name] = aov_denoised_path
 
-    # Split the denoised planes back out to their published paths
-    written = dict()
-    for aov_name, source_path in source_paths.items():
-        extracted_path = frame_temp_path / f'{aov_name}.exr'
-        if exr.extract_aov(source_path, aov_name, extracted_path) != 0:
-            print(f'  ERROR: Failed to extract AOV {aov_name}')
-            failed.add(aov_name)
-            continue
+    # Split the denoised planes back out to their published paths. One
+    # oiiotool call reads the denoised frame once and writes each published
+    # file once; on failure, redo it AOV by AOV so a bad plane costs only
+    # itself.
+    output_frame_paths = dict()
+    for aov_name in source_paths.keys():
         output_frame_path = _get_frame_path(output_paths[aov_name], frame_index)
         local_path(output_frame_path).parent.mkdir(parents = True, exist_ok = True)
-        exr.dwab_encode(extracted_path, output_frame_path)
+        output_frame_paths[aov_name] = output_frame_path
+    with timing.span('publish', frame_index):
+        exit_code = exr.publish_aovs(source_paths, output_frame_paths)
+    if exit_code != 0:
+        print(f'  Batch publish failed for frame {frame_index}, isolating per AOV')
+        for aov_name, source_path in source_paths.items():
+            extracted_path = frame_temp_path / f'{aov_name}.exr'
+            with timing.span('extract', frame_index):
+                exit_code = exr.extract_aov(source_path, aov_name, extracted_path)
+            if exit_code != 0:
+                print(f'  ERROR: Failed to extract AOV {aov_name}')
+                failed.add(aov_name)
+                local_path(output_frame_paths[aov_name]).unlink(missing_ok = True)
+                continue
+            with timing.span('encode', frame_index):
+                exr.dwab_encode(extracted_path, output_frame_paths[aov_name])
+
+    # Check the published files
+    written = dict()
+    for aov_name, output_frame_path in output_frame_paths.items():
+        if aov_name in failed: continue
         if not local_path(output_frame_path).exists():
             print(f'  ERROR: Frame not written: {output_frame_path}')
             failed.add(aov_name)
@@ -259,24 +327,25 @@ def main(
     # The channel layout is a property of the render, not of a frame, so probe
     # one real frame once instead of once per AOV per frame. The paths above are
     # frame *patterns*; the probe needs the concrete frame checked for existence.
-    channel_counts = exr.get_channel_counts(probe_frame_paths)
-
-    idenoise = IDenoise()
+    with timing.span('setup'):
+        channel_counts = exr.get_channel_counts(probe_frame_paths)
+        idenoise = IDenoise()
     failed_aovs = set()
     output_frame_paths = {
         frame_index: dict()
         for frame_index in render_range
     }
 
-    # Denoise the input frames
-    _headline('Denoising')
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
-        for frame_index in log_progress(missing_frames):
-            print(f'Denoising frame {frame_index}')
-            written, failed = _denoise_frame(
+    # Denoise the input frames, several at a time. Each frame works in its
+    # own temp dir and isolates its own failures; results are gathered here
+    # and the receipts written in frame order below, once all are done.
+    workers = _frame_workers(len(missing_frames), probe_frame_paths, force_cpu)
+    _headline(f'Denoising ({workers} frame(s) at a time)')
+
+    def _denoise(frame_index):
+        print(f'Denoising frame {frame_index}')
+        with timing.span('frame', frame_index):
+            return _denoise_frame(
                 idenoise,
                 temp_path,
                 frame_index,
@@ -285,8 +354,30 @@ def main(
                 channel_counts,
                 force_cpu
             )
-            output_frame_paths[frame_index] = written
-            failed_aovs |= failed
+
+    # Each frame keeps a combined and a denoised copy of its target AOVs
+    # until the task ends, sized from the frames being denoised
+    frame_bytes = sum(
+        local_path(frame_path).stat().st_size
+        for frame_path in probe_frame_paths.values()
+    )
+    required_bytes = len(missing_frames) * frame_bytes * 2
+
+    with scratch_dir(required_bytes) as temp_path:
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            futures = {
+                executor.submit(_denoise, frame_index): frame_index
+                for frame_index in missing_frames
+            }
+            prev_progress = 0
+            for done_count, future in enumerate(as_completed(futures), 1):
+                written, failed = future.result()
+                output_frame_paths[futures[future]] = written
+                failed_aovs |= failed
+                progress = int(done_count / len(futures) * 100)
+                if progress != prev_progress:
+                    print(f'Progress: {progress}')
+                    prev_progress = progress
 
     # Report failed AOVs
     if failed_aovs:
@@ -305,20 +396,21 @@ def main(
 
     # Create the frame receipts
     _headline('Creating frame receipts')
-    for frame_index, aov_paths in output_frame_paths.items():
-        # Filter out failed AOVs from receipt
-        successful_aov_paths = {
-            aov_name: aov_path
-            for aov_name, aov_path in aov_paths.items()
-            if aov_name not in failed_aovs
-        }
-        if len(successful_aov_paths) == 0: continue
-        current_receipt_path = _get_frame_path(receipt_path, frame_index)
-        print(f'Creating receipt: {current_receipt_path}')
-        store_json(current_receipt_path, {
-            aov_name: path_str(output_aov_path)
-            for aov_name, output_aov_path in successful_aov_paths.items()
-        })
+    with timing.span('receipts'):
+        for frame_index, aov_paths in output_frame_paths.items():
+            # Filter out failed AOVs from receipt
+            successful_aov_paths = {
+                aov_name: aov_path
+                for aov_name, aov_path in aov_paths.items()
+                if aov_name not in failed_aovs
+            }
+            if len(successful_aov_paths) == 0: continue
+            current_receipt_path = _get_frame_path(receipt_path, frame_index)
+            print(f'Creating receipt: {current_receipt_path}')
+            store_json(current_receipt_path, {
+                aov_name: path_str(output_aov_path)
+                for aov_name, output_aov_path in successful_aov_paths.items()
+            })
 
     # Check that the missing receipts were generated
     for current_receipt_path in missing_receipt_paths:
@@ -368,13 +460,20 @@ def cli():
         for aov_name, aov_path in config['output_paths'].items()
     }
 
-    # Run the main function
-    return main(
-        render_range,
-        receipt_path,
-        input_paths,
-        output_paths,
-        config.get('force_cpu', False)
+    # Run the main function, timing its phases into a report next to the
+    # receipts
+    return timing.run_with_report(
+        'denoise',
+        local_path(receipt_path.parent),
+        first_frame,
+        last_frame,
+        lambda: main(
+            render_range,
+            receipt_path,
+            input_paths,
+            output_paths,
+            config.get('force_cpu', False)
+        )
     )
 
 if __name__ == '__main__':
@@ -1,8 +1,28 @@
+"""Sync a shot's latest beauty, objid and holdout AOVs into the edit folder.
+
+``edit:/manifest.json`` records which shot department, render department and
+version each AOV was last synced from; a source that does not beat it is
+skipped. Frames are synced incrementally: the shot's edit folder holds a
+``sync_manifest.json`` with each frame's source and edit copy stamps (size
+and mtime, plus a content hash when ``TH_EDIT_SYNC_HASH=1``), and only
+frames whose source changed or whose copy is missing or was replaced are
+copied, ``TH_EDIT_SYNC_WORKERS`` (default 8) at a time. Where the edit share
+and the render share are one filesystem, frames are hardlinked instead of
+copied (``TH_EDIT_HARDLINK=0`` to always copy); a linked frame is the
+render's own file, so the edit folder must be treated as read-only. An AOV
+already at the resolved version is still checked, so frames re-rendered into
+that version are picked up.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 from pathlib import Path
+import hashlib
 import logging
-import shutil
 import json
 import sys
+import os
 
 # Add tumblehead python packages path
 tumblehead_packages_path = Path(__file__).parent.parent.parent.parent.parent
@@ -16,6 +36,28 @@ from tumblepipe.util.io import load_json, store_json
 from tumblepipe.pipe.paths import get_render_context
 from tumblepipe.util.uri import Uri
 from tumblepipe.farm.tasks.env import print_env
+from tumblepipe.util import timing, transfer
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+SYNC_MANIFEST_NAME = 'sync_manifest.json'
+SYNC_MANIFEST_VERSION = 1
+
+# Frames copied at once
+WORKERS_ENV = 'TH_EDIT_SYNC_WORKERS'
+DEFAULT_WORKERS = 8
+
+# Set to 1 to also hash source frames (xxhash when installed, else blake2b),
+# so a frame rewritten with the same content, or unchanged in a new version,
+# is not copied again
+HASH_ENV = 'TH_EDIT_SYNC_HASH'
+HASH_CHUNK_SIZE = 1 << 20
+
+# Set to 0 to always copy, even where the edit share can hardlink the frames
+HARDLINK_ENV = 'TH_EDIT_HARDLINK'
 
 def _should_sync_aov(aov_name: str) -> bool:
     """Check if an AOV should be synced to edit"""
@@ -92,25 +134,200 @@ def _compare_with_manifest(
         return False, f'already at version {prev_render_dept}/{prev_version}'
     return True, f'upgrading from {prev_render_dept}/{prev_version} to {curr_render_dept}/{curr_version}'
 
-def _sync_aov_frames(shot_uri, layer_name, aov_name, aov, render_range):
-    """Copy the AOV's frames into the edit folder."""
+def _edit_shot_path(shot_uri):
+    return (
+        api.storage.resolve(Uri.parse_unsafe('edit:/')) /
+        '/'.join(shot_uri.segments[1:])
+    )
+
+# Frame sync
+def _stamp(path: Path) -> Optional[dict]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return dict(size = stat.st_size, mtime_ns = stat.st_mtime_ns)
+
+def _same_stamp(stamp: Optional[dict], recorded: Optional[dict]) -> bool:
+    if stamp is None or recorded is None: return False
+    if stamp['size'] != recorded.get('size'): return False
+    return stamp['mtime_ns'] == recorded.get('mtime_ns')
+
+def _file_hash(path: Path) -> str:
+    if xxhash is not None:
+        hasher, name = xxhash.xxh3_128(), 'xxh3'
+    else:
+        hasher, name = hashlib.blake2b(digest_size = 16), 'blake2b'
+    with path.open('rb') as file:
+        while True:
+            chunk = file.read(HASH_CHUNK_SIZE)
+            if not chunk: break
+            hasher.update(chunk)
+    return f'{name}:{hasher.hexdigest()}'
+
+def _place_frame(
+    input_path: Path,
+    output_path: Path,
+    hardlink: bool,
+    copy_stats: transfer.TransferStats
+    ) -> str:
+    """Link or copy *input_path* to *output_path*; returns which it did.
+
+    Written to a temp name and renamed into place, so an editor never reads
+    a half-written frame.
+    """
+    if hardlink:
+        partial_path = transfer.partial_path(output_path)
+        partial_path.unlink(missing_ok = True)
+        try:
+            os.link(input_path, partial_path)
+            os.replace(partial_path, output_path)
+            return 'linked'
+        except OSError:
+            partial_path.unlink(missing_ok = True)
+    transfer.copy_file(input_path, output_path, stats = copy_stats)
+    return 'copied'
+
+def _sync_frame(
+    input_path: Path,
+    output_path: Path,
+    record: Optional[dict],
+    hash_frames: bool,
+    hardlink: bool,
+    adopt: bool,
+    copy_stats: transfer.TransferStats
+    ) -> tuple[str, int, dict]:
+    """Bring one edit frame up to date with its source.
+
+    Returns what was done (copied, linked or skipped), the frame's size and
+    the frame's new sync manifest record.
+    """
+    source = _stamp(input_path)
+    if source is None:
+        raise FileNotFoundError(f'Source frame not found: {input_path}')
+    target = _stamp(output_path)
+
+    # A frame synced before there were records
+    if (adopt and not record and target is not None and
+        target['size'] == source['size'] and
+        target['mtime_ns'] >= source['mtime_ns']):
+        return 'skipped', source['size'], dict(source = source, target = target)
+
+    record = record or dict()
+    recorded_source = record.get('source') or dict()
+    target_current = _same_stamp(target, record.get('target'))
+    source_current = _same_stamp(source, recorded_source)
+    if (target_current and source_current and
+        (not hash_frames or 'hash' in recorded_source)):
+        return 'skipped', source['size'], record
+
+    # A source rewritten with the same content
+    if hash_frames:
+        source['hash'] = (
+            recorded_source['hash']
+            if source_current and 'hash' in recorded_source else
+            _file_hash(input_path)
+        )
+        if target_current and source['hash'] == recorded_source.get('hash'):
+            return 'skipped', source['size'], dict(source = source, target = target)
+
+    # Already a link to the source
+    if target is not None and os.path.samefile(input_path, output_path):
+        return 'skipped', source['size'], dict(source = source, target = target)
+
+    action = _place_frame(input_path, output_path, hardlink, copy_stats)
+    return action, source['size'], dict(source = source, target = _stamp(output_path))
+
+@dataclass
+class SyncStats:
+    copied_frames: int = 0
+    copied_bytes: int = 0
+    linked_frames: int = 0
+    linked_bytes: int = 0
+    skipped_frames: int = 0
+    skipped_bytes: int = 0
+
+    def add(self, action: str, size: int):
+        setattr(self, f'{action}_frames', getattr(self, f'{action}_frames') + 1)
+        setattr(self, f'{action}_bytes', getattr(self, f'{action}_bytes') + size)
+
+    def merge(self, other: 'SyncStats'):
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def summary(self) -> str:
+        def _gb(size): return f'{size / 1024 ** 3:.2f}GB'
+        return (
+            f'copied {self.copied_frames} frames ({_gb(self.copied_bytes)}), '
+            f'linked {self.linked_frames} ({_gb(self.linked_bytes)}), '
+            f'skipped {self.skipped_frames} ({_gb(self.skipped_bytes)})'
+        )
+
+def _sync_workers() -> int:
+    value = os.environ.get(WORKERS_ENV)
+    if value: return max(1, int(value))
+    return DEFAULT_WORKERS
+
+def _load_sync_manifest(shot_uri) -> dict:
+    sync_manifest = load_json(_edit_shot_path(shot_uri) / SYNC_MANIFEST_NAME)
+    if (not isinstance(sync_manifest, dict) or
+        sync_manifest.get('version') != SYNC_MANIFEST_VERSION):
+        sync_manifest = dict(version = SYNC_MANIFEST_VERSION)
+    sync_manifest.setdefault('aovs', dict())
+    return sync_manifest
+
+def _sync_aov_frames(
+    shot_uri,
+    layer_name,
+    aov_name,
+    aov,
+    render_range,
+    frame_records,
+    executor,
+    copy_stats,
+    adopt = False
+    ) -> SyncStats:
+    """Copy the AOV's changed frames into the edit folder.
+
+    *frame_records* (frame index -> record, from the sync manifest) are
+    updated in place. With *adopt*, a frame without a record whose copy is
+    already there (same size, newer than its source) is taken as synced.
+    """
     # Build output path using URI segments for hierarchy
-    uri_path_segments = shot_uri.segments[1:]
-    uri_name = '_'.join(uri_path_segments)
+    uri_name = '_'.join(shot_uri.segments[1:])
     output_path = (
-        api.storage.resolve(Uri.parse_unsafe('edit:/')) /
-        '/'.join(uri_path_segments) /
+        _edit_shot_path(shot_uri) /
         layer_name /
         aov_name /
         f'{uri_name}.####.exr'
     )
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    hash_frames = os.environ.get(HASH_ENV) == '1'
+    hardlink = os.environ.get(HARDLINK_ENV) != '0'
 
-    # Copy frames
-    for frame_index in render_range:
+    def _sync(frame_index):
         input_frame_path = aov.get_aov_frame_path(str(frame_index).zfill(4))
         output_frame_path = _get_frame_path(output_path, frame_index)
-        shutil.copyfile(input_frame_path, output_frame_path)
+        with timing.span('copy', frame_index):
+            return _sync_frame(
+                input_frame_path,
+                output_frame_path,
+                frame_records.get(str(frame_index)),
+                hash_frames,
+                hardlink,
+                adopt,
+                copy_stats
+            )
+
+    # Sync frames
+    stats = SyncStats()
+    for frame_index, (action, size, record) in zip(
+        render_range,
+        executor.map(_sync, render_range)
+        ):
+        frame_records[str(frame_index)] = record
+        stats.add(action, size)
+    return stats
 
 def main(shot_uri: Uri, purpose: str, render_range: BlockRange):
 
@@ -119,23 +336,25 @@ def main(shot_uri: Uri, purpose: str, render_range: BlockRange):
 
     # Get render context and resolve latest AOVs at runtime
     _headline('Resolving latest AOVs across all departments')
-    render_context = get_render_context(shot_uri, purpose=purpose)
+    with timing.span('resolve'):
+        render_context = get_render_context(shot_uri, purpose=purpose)
 
-    # Get both shot and render department priorities
-    shot_departments = [d.name for d in list_departments('shots')]
-    render_departments = [d.name for d in list_departments('render')]
+        # Get both shot and render department priorities
+        shot_departments = [d.name for d in list_departments('shots')]
+        render_departments = [d.name for d in list_departments('render')]
 
     print(f'Shot department priority (low->high): {shot_departments}')
     print(f'Render department priority (low->high): {render_departments}')
 
     # Resolve using both hierarchies - no minimum filters, always pick the best available
-    latest_aovs = render_context.resolve_latest_aovs(
-        shot_departments,
-        render_departments,
-        min_shot_department=None,
-        min_render_department=None,
-        aov_filter=_should_sync_aov
-    )
+    with timing.span('resolve'):
+        latest_aovs = render_context.resolve_latest_aovs(
+            shot_departments,
+            render_departments,
+            min_shot_department=None,
+            min_render_department=None,
+            aov_filter=_should_sync_aov
+        )
 
     # Debug: Show what was resolved
     if latest_aovs:
@@ -163,48 +382,82 @@ def main(shot_uri: Uri, purpose: str, render_range: BlockRange):
                 print(f'  {layer_name}/{aov_name}: shot_dept={shot_dept}, render_dept={render_dept}, version={version}')
         print()
 
+    # Load the frame records of the previous syncs
+    sync_manifest_path = _edit_shot_path(shot_uri) / SYNC_MANIFEST_NAME
+    sync_manifest = _load_sync_manifest(shot_uri)
+
     # Sync each resolved layer/AOV combination
     synced_count = 0
+    current_count = 0
     skipped_count = 0
+    total_stats = SyncStats()
+    copy_stats = transfer.TransferStats()
 
-    for layer_name, layer_aovs in latest_aovs.items():
-        for aov_name, (render_department_name, aov_version_name, aov, shot_department_name) in layer_aovs.items():
-
-            # Check manifest to see if we should skip
-            prev_data = _manifest_get(manifest_data, shot_key, layer_name, aov_name)
-            if prev_data is not None:
-                should_sync, message = _compare_with_manifest(
-                    prev_data,
-                    (shot_department_name, render_department_name, aov_version_name),
-                    shot_departments,
-                    render_departments
+    with ThreadPoolExecutor(max_workers = _sync_workers()) as executor:
+        for layer_name, layer_aovs in latest_aovs.items():
+            for aov_name, (render_department_name, aov_version_name, aov, shot_department_name) in layer_aovs.items():
+                curr_data = [shot_department_name, render_department_name, aov_version_name]
+
+                # Check manifest to see if we should skip. An AOV already at
+                # this version is still checked frame by frame, for frames
+                # re-rendered into the version since the last sync
+                prev_data = _manifest_get(manifest_data, shot_key, layer_name, aov_name)
+                same_source = prev_data is not None and list(prev_data) == curr_data
+                if prev_data is not None and not same_source:
+                    should_sync, message = _compare_with_manifest(
+                        prev_data,
+                        tuple(curr_data),
+                        shot_departments,
+                        render_departments
+                    )
+                    if not should_sync:
+                        print(f'Skip {layer_name}/{aov_name}: {message}')
+                        skipped_count += 1
+                        continue
+                    print(f'Update {layer_name}/{aov_name}: {message}')
+
+                # Sync this AOV
+                aov_key = f'{layer_name}/{aov_name}'
+                aov_record = sync_manifest['aovs'].setdefault(aov_key, dict())
+                with timing.span('sync'):
+                    stats = _sync_aov_frames(
+                        shot_uri,
+                        layer_name,
+                        aov_name,
+                        aov,
+                        render_range,
+                        aov_record.setdefault('frames', dict()),
+                        executor,
+                        copy_stats,
+                        adopt = same_source
+                    )
+                aov_record['source'] = curr_data
+                store_json(sync_manifest_path, sync_manifest)
+                print(f'Sync {aov_key} from {render_department_name}/{aov_version_name}: {stats.summary()}')
+                total_stats.merge(stats)
+
+                # Update manifest
+                _manifest_set(
+                    manifest_data,
+                    curr_data,
+                    shot_key,
+                    layer_name,
+                    aov_name
                 )
-                if not should_sync:
-                    print(f'Skip {layer_name}/{aov_name}: {message}')
-                    skipped_count += 1
-                    continue
-                print(f'Update {layer_name}/{aov_name}: {message}')
-
-            # Sync this AOV
-            print(f'Sync {layer_name}/{aov_name} from {render_department_name}/{aov_version_name}')
-            _sync_aov_frames(shot_uri, layer_name, aov_name, aov, render_range)
-
-            # Update manifest
-            _manifest_set(
-                manifest_data,
-                [shot_department_name, render_department_name, aov_version_name],
-                shot_key,
-                layer_name,
-                aov_name
-            )
-            synced_count += 1
+                if stats.copied_frames + stats.linked_frames == 0:
+                    current_count += 1
+                else:
+                    synced_count += 1
 
     # Save manifest
     _headline('Updating manifest')
-    store_json(manifest_path, manifest_data)
+    with timing.span('manifest'):
+        store_json(manifest_path, manifest_data)
 
     # Done
-    print(f'Synced {synced_count} AOVs, skipped {skipped_count}')
+    print(f'Synced {synced_count} AOVs, {current_count} up to date, skipped {skipped_count}')
+    print(f'Frames {total_stats.summary()}')
+    print(f'Copied {copy_stats.summary()}')
     return 0
 
 """
@@ -253,8 +506,14 @@ def cli():
     # Get the start and end frames
     render_range = BlockRange(args.start_frame, args.end_frame)
 
-    # Run main
-    return main(entity_uri, purpose, render_range)
+    # Run main, timing its phases into a report in the shot's edit folder
+    return timing.run_with_report(
+        'edit',
+        _edit_shot_path(entity_uri),
+        render_range.first_frame,
+        render_range.last_frame,
+        lambda: main(entity_uri, purpose, render_range)
+    )
 
 if __name__ == '__main__':
     logging.basicConfig(
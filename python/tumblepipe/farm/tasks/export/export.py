@@ -1,4 +1,3 @@
-from tempfile import TemporaryDirectory
 from functools import partial
 from pathlib import Path
 import logging
@@ -11,7 +10,6 @@ if tumblehead_packages_path not in sys.path:
 
 from tumblepipe.api import (
     path_str,
-    local_path,
     to_windows_path,
     api
 )
@@ -20,9 +18,11 @@ from tumblepipe.util.io import (
 )
 from tumblepipe.util.uri import Uri
 from tumblepipe.farm import _common
+from tumblepipe.util import timing
 from tumblepipe.apps.houdini import Hython
 from tumblepipe.farm.jobs.houdini.render import job as render_job
-from tumblepipe.farm.tasks.env import get_hython_env, print_env
+from tumblepipe.farm.tasks.env import get_hython_env, job_data_dir, print_env
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 def _error(msg):
     logging.error(msg)
@@ -56,10 +56,7 @@ def main(config):
     hython = Hython()
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Create output path
         export_path = temp_path / 'export'
@@ -80,13 +77,14 @@ def main(config):
         ))
     
         # Export the USD stage
-        result = hython.run(
-            to_windows_path(SCRIPT_PATH),
-            [
-                path_str(to_windows_path(config_path))
-            ],
-            env = get_hython_env(api)
-        )
+        with timing.span('hython'):
+            result = hython.run(
+                to_windows_path(SCRIPT_PATH),
+                [
+                    path_str(to_windows_path(config_path))
+                ],
+                env = get_hython_env(api)
+            )
 
         # Check if hython process succeeded
         if result != 0:
@@ -99,29 +97,30 @@ def main(config):
         # Submit the render pipe tasks
         tasks = config['tasks'].copy()
         tasks.pop('export')
-        render_job.submit(dict(
-            entity = str(entity_uri),
-            department = department_name,
-            settings = dict(
-                user_name = user_name,
-                purpose = purpose,
-                priority = priority,
-                pool_name = pool_name,
-                variant_name = variant_name,
-                render_department_name = render_department_name,
-                render_settings_path = path_str(render_settings_path),
-                input_path = path_str(relative_stage_path),
-                tile_count = tile_count,
-                first_frame = first_frame,
-                last_frame = last_frame,
-                step_size = step_size,
-                batch_size = batch_size
-            ),
-            tasks = tasks
-        ), {
-            render_settings_path: render_settings_path,
-            export_path: relative_export_path
-        })
+        with timing.span('submit'):
+            render_job.submit(dict(
+                entity = str(entity_uri),
+                department = department_name,
+                settings = dict(
+                    user_name = user_name,
+                    purpose = purpose,
+                    priority = priority,
+                    pool_name = pool_name,
+                    variant_name = variant_name,
+                    render_department_name = render_department_name,
+                    render_settings_path = path_str(render_settings_path),
+                    input_path = path_str(relative_stage_path),
+                    tile_count = tile_count,
+                    first_frame = first_frame,
+                    last_frame = last_frame,
+                    step_size = step_size,
+                    batch_size = batch_size
+                ),
+                tasks = tasks
+            ), {
+                render_settings_path: render_settings_path,
+                export_path: relative_export_path
+            })
 
     # Done
     print('Success')
@@ -247,7 +246,9 @@ def _is_valid_config(config):
     return True
 
 def cli():
-    return _common.run_task_cli(_is_valid_config, main)
+    return _common.run_task_cli(
+        _is_valid_config, main, 'export', job_data_dir()
+    )
 
 if __name__ == '__main__':
     logging.basicConfig(
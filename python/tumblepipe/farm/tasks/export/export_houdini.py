@@ -156,7 +156,9 @@ def main(
 
         # Stitch all chunks (main file + sidecar directories)
         print(f'Stitching {len(chunk_dirs)} chunks into: {output_dir}')
-        stitch_usd_directories(chunk_dirs, output_file_name, output_dir)
+        timings = stitch_usd_directories(chunk_dirs, output_file_name, output_dir)
+        for rel_path, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+            print(f'  {seconds:8.2f}s  {rel_path}')
 
         # Clean up chunks directory
         shutil.rmtree(chunks_dir)
@@ -0,0 +1,26 @@
+"""Worker entry point for farm tasks.
+
+The HPM task manifest runs ``python -m tumblepipe.farm.tasks.launch <module>
+<args>`` rather than the task module itself. Where the jobs root takes no
+hardlinks, a job's ``data/`` dir is submitted empty and only its
+``data_manifest.json`` names the files in the blob store; this copies them
+into place (`tumblepipe.apps.job_data.materialize`) before running the task
+module as ``__main__`` with the remaining arguments.
+"""
+
+import runpy
+import sys
+
+from tumblepipe.apps import job_data
+from tumblepipe.farm.tasks.env import job_data_dir
+
+
+def main():
+    module = sys.argv[1]
+    sys.argv = [module, *sys.argv[2:]]
+    job_data.materialize(job_data_dir())
+    runpy.run_module(module, run_name = '__main__', alter_sys = True)
+
+
+if __name__ == '__main__':
+    main()
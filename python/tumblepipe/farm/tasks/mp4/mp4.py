@@ -1,7 +1,31 @@
-from tempfile import TemporaryDirectory
+"""Encode a frame sequence to mp4 and copy it to the output paths.
+
+Re-rendering a few frames of a shot used to convert every EXR to JPEG and
+re-encode the whole movie. The JPEGs and the encoded movie are now kept in a
+cache dir per input sequence under ``temp:/mp4_cache``, with a
+``manifest.json`` recording
+each source frame's stamp (size and mtime, plus a content hash when
+``TH_MP4_HASH_FRAMES=1``), the JPEG and encode settings, and the stamps of
+the outputs it wrote. A run converts only frames whose stamp changed, encodes
+only when a frame or the settings changed, and copies only to outputs that
+are missing or were replaced since; when nothing changed it does nothing.
+The cache is not kept beside the frames, where a version dir's subdirs are
+read as AOVs. Delete it to force a full rebuild.
+
+A task holds a ``<cache dir>.lock`` file while it uses a cache dir, so two
+tasks on the same sequence take turns rather than write the same JPEGs. A
+lock whose task has exited on this node, or that is older than
+``LOCK_MAX_SECONDS``, is broken. Every run also removes the cache dirs no
+task has used for ``TH_MP4_CACHE_DAYS`` (default 14) days.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
 from pathlib import Path
+import hashlib
 import logging
 import shutil
+import json
 import time
 import sys
 import os
@@ -13,14 +37,39 @@ if tumblehead_packages_path not in sys.path:
 
 from tumblepipe.api import (
     path_str,
-    local_path,
-    api
+    local_path
 )
-from tumblepipe.util.io import load_json
-from tumblepipe.util.uri import Uri
+from tumblepipe.util.io import load_json, store_json
 from tumblepipe.config.timeline import BlockRange, get_fps
 from tumblepipe.apps import exr, mp4
+from tumblepipe.apps.job_data import file_digest
+from tumblepipe.util import timing, transfer
 from tumblepipe.farm.tasks.env import print_env
+from tumblepipe.farm.tasks.scratch import (
+    scratch_dir,
+    shared_temp_root,
+    owner_record,
+    owner_gone
+)
+
+CACHE_DIR_NAME = 'mp4_cache'
+MANIFEST_NAME = 'manifest.json'
+MOVIE_NAME = 'movie.mp4'
+MANIFEST_VERSION = 1
+
+# Set to 1 to also hash source frames, so a frame that was rewritten with
+# the same content (copied back, touched) is not converted again
+HASH_ENV = 'TH_MP4_HASH_FRAMES'
+
+# Cache dirs unused for this many days are removed
+CACHE_DAYS_ENV = 'TH_MP4_CACHE_DAYS'
+DEFAULT_CACHE_DAYS = 14.0
+
+LOCK_SUFFIX = '.lock'
+LOCK_POLL_SECONDS = 2.0
+
+# A lock this old belongs to a task that died on another node
+LOCK_MAX_SECONDS = 6 * 60 * 60
 
 def _error(msg):
     logging.error(msg)
@@ -40,9 +89,126 @@ def _get_frame_path(frame_path, frame_index):
         frame_path.name.replace('*', frame_name)
     )
 
-def _out_of_date(path: Path) -> bool:
-    if not path.exists(): return True
-    return path.stat().st_mtime < time.time()
+# Manifest
+def cache_path(input_path: Path) -> Path:
+    """The cache dir of the frame sequence *input_path*."""
+    digest = hashlib.sha256(path_str(input_path).encode('utf-8')).hexdigest()
+    return shared_temp_root() / CACHE_DIR_NAME / digest[:16]
+
+def _lock_path(cache_dir_path: Path) -> Path:
+    return cache_dir_path.with_name(cache_dir_path.name + LOCK_SUFFIX)
+
+def _lock_stale(lock_path: Path) -> bool:
+    try:
+        age = time.time() - lock_path.stat().st_mtime
+        owner = json.loads(lock_path.read_text())
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        # Being written, unless it has been like this for a while
+        return age > 60.0
+    if age > LOCK_MAX_SECONDS: return True
+    return owner_gone(owner)
+
+def _try_lock(cache_dir_path: Path) -> bool:
+    lock_path = _lock_path(cache_dir_path)
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        if not _lock_stale(lock_path): return False
+        logging.warning(f'Breaking the stale lock {lock_path}')
+        lock_path.unlink(missing_ok = True)
+        return False
+    with os.fdopen(fd, 'w') as lock_file:
+        lock_file.write(json.dumps(owner_record()))
+    return True
+
+@contextmanager
+def cache_lock(cache_dir_path: Path) -> Iterator[None]:
+    """Hold the cache dir of one sequence, waiting for other tasks on it."""
+    cache_dir_path.parent.mkdir(parents = True, exist_ok = True)
+    waiting = False
+    while not _try_lock(cache_dir_path):
+        if not waiting:
+            print(f'Waiting for another task using {cache_dir_path}')
+            waiting = True
+        time.sleep(LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        _lock_path(cache_dir_path).unlink(missing_ok = True)
+
+def _last_used(cache_dir_path: Path) -> Optional[float]:
+    for path in (cache_dir_path / MANIFEST_NAME, cache_dir_path):
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            continue
+    return None
+
+def clean_cache(cache_root: Path) -> list[Path]:
+    """Remove the cache dirs under *cache_root* no task used lately."""
+    if not cache_root.exists(): return []
+    value = os.environ.get(CACHE_DAYS_ENV)
+    max_age = (float(value) if value else DEFAULT_CACHE_DAYS) * 24 * 60 * 60
+    now = time.time()
+    removed = list()
+    for cache_dir_path in cache_root.iterdir():
+        if not cache_dir_path.is_dir(): continue
+        last_used = _last_used(cache_dir_path)
+        if last_used is None or now - last_used <= max_age: continue
+        if not _try_lock(cache_dir_path): continue
+        try:
+            shutil.rmtree(cache_dir_path, ignore_errors = True)
+        finally:
+            _lock_path(cache_dir_path).unlink(missing_ok = True)
+        if cache_dir_path.exists(): continue
+        removed.append(cache_dir_path)
+    if len(removed) != 0:
+        logging.info(f'Removed {len(removed)} unused mp4 cache dir(s) from {cache_root}')
+    return removed
+
+def _stamp(path: Path) -> Optional[dict]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return dict(size = stat.st_size, mtime_ns = stat.st_mtime_ns)
+
+def _same_stamp(stamp: Optional[dict], recorded: Optional[dict]) -> bool:
+    if stamp is None or recorded is None: return False
+    if stamp['size'] != recorded.get('size'): return False
+    return stamp['mtime_ns'] == recorded.get('mtime_ns')
+
+def _load_manifest(cache_path: Path) -> dict:
+    manifest = load_json(cache_path / MANIFEST_NAME)
+    if (not isinstance(manifest, dict) or
+        manifest.get('version') != MANIFEST_VERSION):
+        manifest = dict()
+    return dict(
+        version = MANIFEST_VERSION,
+        input = manifest.get('input'),
+        jpeg = manifest.get('jpeg'),
+        encode = manifest.get('encode'),
+        frames = manifest.get('frames', dict()),
+        movie = manifest.get('movie'),
+        outputs = manifest.get('outputs', dict())
+    )
+
+def _frame_entry(
+    source_path: Path,
+    recorded: Optional[dict],
+    hash_frames: bool
+    ) -> tuple[dict, bool]:
+    """The manifest entry of a source frame, and whether it is unchanged."""
+    stamp = _stamp(source_path)
+    unchanged = _same_stamp(stamp, recorded)
+    if not hash_frames: return (recorded if unchanged else stamp), unchanged
+    if unchanged and 'hash' in recorded: return recorded, True
+    entry = dict(stamp, hash = file_digest(source_path))
+    if unchanged: return entry, True
+    if recorded is None: return entry, False
+    return entry, entry['hash'] == recorded.get('hash')
 
 def main(
     render_range: BlockRange,
@@ -59,57 +225,132 @@ def main(
     # Print environment variables for debugging
     print_env()
 
-    # Find output paths that are not generated
-    missing_output_paths = [
+    # Clear out the caches of old sequences, then wait for this one
+    cache_dir_path = cache_path(input_path)
+    clean_cache(cache_dir_path.parent)
+    with cache_lock(cache_dir_path):
+        return _update(render_range, input_path, output_paths, cache_dir_path)
+
+def _update(
+    render_range: BlockRange,
+    input_path: Path,
+    output_paths: list[Path],
+    cache_dir_path: Path
+    ) -> int:
+
+    # Load what the previous run made, marking the cache as used
+    jpeg_path = cache_dir_path / 'frame.*.jpg'
+    movie_path = cache_dir_path / MOVIE_NAME
+    manifest = _load_manifest(cache_dir_path)
+    try:
+        os.utime(cache_dir_path / MANIFEST_NAME)
+    except OSError:
+        pass
+    jpeg_settings = exr.jpeg_settings()
+    encode_settings = mp4.encode_settings(render_range, get_fps())
+    hash_frames = os.environ.get(HASH_ENV) == '1'
+
+    # Find the frames to convert
+    jpeg_changed = manifest['jpeg'] != jpeg_settings
+    frames = dict()
+    changed_frame_indices = list()
+    for frame_index in render_range:
+        frame_key = str(frame_index)
+        recorded = None if jpeg_changed else manifest['frames'].get(frame_key)
+        entry, unchanged = _frame_entry(
+            local_path(_get_frame_path(input_path, frame_index)),
+            recorded,
+            hash_frames
+        )
+        frames[frame_key] = entry
+        if unchanged and _get_frame_path(jpeg_path, frame_index).exists(): continue
+        changed_frame_indices.append(frame_index)
+
+    # Find the outputs to write
+    encode = (
+        len(changed_frame_indices) != 0 or
+        manifest['encode'] != encode_settings or
+        not _same_stamp(_stamp(movie_path), manifest['movie'])
+    )
+    stale_output_paths = [
         output_path
         for output_path in output_paths
-        if _out_of_date(local_path(output_path))
+        if encode or not _same_stamp(
+            _stamp(local_path(output_path)),
+            manifest['outputs'].get(path_str(output_path))
+        )
     ]
-    if len(missing_output_paths) == 0:
-        print('Output files already exist')
+    if len(stale_output_paths) == 0:
+        if frames != manifest['frames']:
+            store_json(cache_dir_path / MANIFEST_NAME, dict(manifest, frames = frames))
+        print('Output files are up to date')
         return 0
-    
-    # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
-
-        # Convert EXRs to JPGs
-        temp_input_path = temp_path / 'temp.*.jpg'
-        temp_input_path.parent.mkdir(parents=True, exist_ok=True)
-        for frame_index in render_range:
-            input_frame_path = _get_frame_path(input_path, frame_index)
-            temp_frame_path = _get_frame_path(temp_input_path, frame_index)
+    print(
+        f'Converting {len(changed_frame_indices)} of {len(render_range)} frames, '
+        f'{"encoding" if encode else "reusing the encoded movie"}, '
+        f'writing {len(stale_output_paths)} of {len(output_paths)} outputs'
+    )
+
+    # Drop the JPEGs of frames no longer in the range, which the encode
+    # would otherwise pick up
+    cache_dir_path.mkdir(parents=True, exist_ok=True)
+    for frame_path in cache_dir_path.glob('frame.*.jpg'):
+        if str(int(frame_path.name.split('.')[-2])) in frames: continue
+        frame_path.unlink(missing_ok=True)
+
+    # Convert the changed EXRs to JPGs
+    for frame_index in changed_frame_indices:
+        input_frame_path = _get_frame_path(input_path, frame_index)
+        output_frame_path = _get_frame_path(jpeg_path, frame_index)
+        output_frame_path.unlink(missing_ok=True)
+        with timing.span('to_jpeg', frame_index):
             exr.to_jpeg(
                 local_path(input_frame_path),
-                temp_frame_path
+                output_frame_path
             )
-    
-        # Encode to mp4
-        temp_output_path = temp_path / 'temp.mp4'
-        mp4.from_jpg(
-            local_path(temp_input_path),
-            render_range,
-            get_fps(),
-            temp_output_path
-        )
+        if output_frame_path.exists(): continue
+        return _error(f'JPEG not generated: {output_frame_path}')
+
+    # Encode to mp4
+    if encode:
+        with scratch_dir() as temp_path:
+            temp_output_path = temp_path / 'temp.mp4'
+            with timing.span('encode'):
+                mp4.from_jpg(
+                    jpeg_path,
+                    render_range,
+                    get_fps(),
+                    temp_output_path
+                )
 
-        # Check that the temporary output exists
-        if not temp_output_path.exists():
-            return _error(f'Temp output not generated: {temp_output_path}')
-        
-        # Copy to output paths
-        for output_path in missing_output_paths:
-            output_path = local_path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copyfile(temp_output_path, output_path)
-
-    # Check that all the missing outputs exists
-    for output_path in missing_output_paths:
+            # Check that the temporary output exists
+            if not temp_output_path.exists():
+                return _error(f'Temp output not generated: {temp_output_path}')
+            transfer.copy_file(temp_output_path, movie_path)
+
+    # Copy to output paths
+    outputs = dict() if encode else dict(manifest['outputs'])
+    with timing.span('copy'):
+        for output_path in stale_output_paths:
+            transfer.copy_file(movie_path, local_path(output_path))
+            outputs[path_str(output_path)] = _stamp(local_path(output_path))
+
+    # Check that all the stale outputs exists
+    for output_path in stale_output_paths:
         if local_path(output_path).exists(): continue
         return _error(f'Output not generated: {output_path}')
 
+    # Record what was made for the next run
+    store_json(cache_dir_path / MANIFEST_NAME, dict(
+        version = MANIFEST_VERSION,
+        input = path_str(input_path),
+        jpeg = jpeg_settings,
+        encode = encode_settings,
+        frames = frames,
+        movie = _stamp(movie_path),
+        outputs = outputs
+    ))
+
     # Done
     print('Success')
     return 0
@@ -177,11 +418,17 @@ def cli():
     # Get the output paths
     output_paths = list(map(Path, config['output_paths']))
     
-    # Run main
-    return main(
-        render_range,
-        input_path,
-        output_paths
+    # Run main, timing its phases into a report next to the input frames
+    return timing.run_with_report(
+        'mp4',
+        local_path(input_path.parent),
+        first_frame,
+        last_frame,
+        lambda: main(
+            render_range,
+            input_path,
+            output_paths
+        )
     )
 
 if __name__ == '__main__':
@@ -1,4 +1,3 @@
-from tempfile import TemporaryDirectory
 from io import BytesIO, TextIOWrapper
 from dataclasses import dataclass
 # PyOpenColorIO not needed anymore - using iconvert instead
@@ -18,20 +17,20 @@ if tumblehead_packages_path not in sys.path:
 from tumblepipe.api import (
     path_str,
     local_path,
-    to_windows_path,
-    api
+    to_windows_path
 )
-from tumblepipe.util.uri import Uri
 from tumblepipe.apps import mp4, houdini
 from tumblepipe.apps.houdini import IConvert
 from tumblepipe.util.io import load_json
+from tumblepipe.util import timing
 from tumblepipe.config.discord import (
     get_token as get_discord_token,
     get_user_discord_id,
     get_channel_id as get_discord_channel_id
 )
 from tumblepipe.farm.tasks.notify import _spec
-from tumblepipe.farm.tasks.env import ocio_value, print_env
+from tumblepipe.farm.tasks.env import job_data_dir, ocio_value, print_env
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 def _error(msg):
     logging.error(msg)
@@ -105,7 +104,8 @@ def _post(
     try:
 
         # Run the client
-        client.run(token)
+        with timing.span('post'):
+            client.run(token)
 
         # Done
         print('Success')
@@ -230,17 +230,15 @@ def _post_mp4(
         return _error(f'MP4 not found: {path_str(mp4_path)}')
     
     # Fix the size if the mp4 is too large
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Resolve the mp4 size
-        notify_mp4_path, notify_message = _fix_size(
-            temp_path,
-            message,
-            mp4_path
-        )
+        with timing.span('scale'):
+            notify_mp4_path, notify_message = _fix_size(
+                temp_path,
+                message,
+                mp4_path
+            )
 
         # Check that the mp4 is not too large
         notify_mp4_file_size = local_path(notify_mp4_path).stat().st_size
@@ -329,10 +327,7 @@ def _exr_to_jpeg_bytes(path: Path) -> bytes:
     )
     
     # Create temporary JPEG file
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
         temp_jpeg_path = temp_path / 'temp.jpg'
 
         # Convert EXR to JPEG using iconvert (same as exr.to_jpeg)
@@ -362,14 +357,12 @@ def _post_panorama(
     ) -> int:
 
     # Create temporary directory for panorama EXR
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
         panorama_exr_path = temp_path / 'panorama.exr'
 
         # Create panorama EXR using oiiotool
-        result = _create_panorama_exr(image_paths, panorama_exr_path, scale=0.5)
+        with timing.span('panorama'):
+            result = _create_panorama_exr(image_paths, panorama_exr_path, scale=0.5)
         if result != 0:
             return _error(f'Failed to create panorama EXR: {result}')
         
@@ -379,7 +372,8 @@ def _post_panorama(
         
         # Convert panorama EXR to JPEG bytes
         try:
-            panorama_jpeg_bytes = _exr_to_jpeg_bytes(panorama_exr_path)
+            with timing.span('jpeg'):
+                panorama_jpeg_bytes = _exr_to_jpeg_bytes(panorama_exr_path)
         except Exception as e:
             return _error(f'Failed to convert panorama to JPEG: {e}')
 
@@ -588,12 +582,18 @@ def cli():
     message = config['message']
     command = _parse_command(config['command'])
     
-    # Run main
-    return main(
-        user_name,
-        channel_name,
-        message,
-        command
+    # Run main, timing its phases into a report in the job data dir
+    return timing.run_with_report(
+        'notify',
+        job_data_dir(),
+        args.first_frame,
+        args.last_frame,
+        lambda: main(
+            user_name,
+            channel_name,
+            message,
+            command
+        )
     )
 
 if __name__ == '__main__':
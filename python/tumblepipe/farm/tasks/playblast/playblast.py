@@ -1,7 +1,5 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
 import logging
-import shutil
 import json
 import sys
 import os
@@ -19,11 +17,12 @@ from tumblepipe.api import (
 )
 from tumblepipe.util.io import load_json
 from tumblepipe.config.timeline import BlockRange
-from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import Husk
 from tumblepipe.apps import mp4
+from tumblepipe.util import timing, transfer
 from tumblepipe.farm.tasks.env import get_base_env, print_env, job_data_dir
 from tumblepipe.farm.tasks.playblast import _spec
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 # The one GL Hydra delegate husk can actually load headless. HD_HoudiniRenderer
 # (the delegate the interactive flipbook uses) fails with "Unable to load render
@@ -63,10 +62,7 @@ def main(
     husk = Husk()
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Temp paths -- husk substitutes $F4 per frame; mp4.from_jpg globs the
         # stack back out of this directory.
@@ -85,22 +81,23 @@ def main(
         # storage: URIs in the staged USD) to work under husk.
         _headline('Rendering playblast frames (Hydra Storm)')
         width, height = resolution
-        husk.run(
-            to_windows_path(input_path),
-            [
-                '--resolver-context', path_str(to_windows_path(input_path)),
-                '--renderer', STORM_DELEGATE,
-                '--gpu',
-                '--make-output-path',
-                '--no-mplay',
-                '--res', str(width), str(height),
-                '--frame', str(render_range.first_frame),
-                '--frame-count', str(len(render_range)),
-                '--frame-inc', str(render_range.step_size),
-                '--output', path_str(to_windows_path(temp_jpg_path))
-            ],
-            env=env
-        )
+        with timing.span('husk'):
+            husk.run(
+                to_windows_path(input_path),
+                [
+                    '--resolver-context', path_str(to_windows_path(input_path)),
+                    '--renderer', STORM_DELEGATE,
+                    '--gpu',
+                    '--make-output-path',
+                    '--no-mplay',
+                    '--res', str(width), str(height),
+                    '--frame', str(render_range.first_frame),
+                    '--frame-count', str(len(render_range)),
+                    '--frame-inc', str(render_range.step_size),
+                    '--output', path_str(to_windows_path(temp_jpg_path))
+                ],
+                env=env
+            )
 
         # Check that the frames were generated
         rendered = 0
@@ -118,7 +115,8 @@ def main(
 
         # Encode the mp4 (fills any missing frames by repeat, like the local HDA)
         _headline('Encoding mp4')
-        mp4.from_jpg(temp_jpg_path, render_range, fps, temp_mp4_path)
+        with timing.span('encode'):
+            mp4.from_jpg(temp_jpg_path, render_range, fps, temp_mp4_path)
         if not temp_mp4_path.exists():
             return _error(f'Failed to encode mp4: {temp_mp4_path}')
 
@@ -127,8 +125,8 @@ def main(
         for output_path in output_paths:
             output_path = local_path(output_path)
             print(f'Copying file: {output_path}')
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copyfile(temp_mp4_path, output_path)
+            with timing.span('copy'):
+                transfer.copy_file(temp_mp4_path, output_path)
 
         # Verify copies landed
         for output_path in output_paths:
@@ -166,12 +164,19 @@ def _run(config: dict) -> int:
 
     output_paths = [Path(output_path) for output_path in config['output_paths']]
 
-    return main(
-        render_range,
-        config['fps'],
-        tuple(config['res']),
-        input_path,
-        output_paths
+    # Run main, timing its phases into a report in the job data dir
+    return timing.run_with_report(
+        'playblast',
+        job_data_dir(),
+        first_frame,
+        last_frame,
+        lambda: main(
+            render_range,
+            config['fps'],
+            tuple(config['res']),
+            input_path,
+            output_paths
+        )
     )
 
 
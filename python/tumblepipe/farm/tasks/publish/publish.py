@@ -1,4 +1,3 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
 import logging
 import sys
@@ -10,7 +9,6 @@ if tumblehead_packages_path not in sys.path:
 
 from tumblepipe.api import (
     path_str,
-    local_path,
     to_windows_path,
     api
 )
@@ -18,6 +16,7 @@ from tumblepipe.util.io import store_json
 from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import Hython
 from tumblepipe.farm import _common
+from tumblepipe.util import timing
 from tumblepipe.farm.tasks.env import get_hython_env, job_data_dir
 from tumblepipe.farm.tasks.publish import _spec
 from tumblepipe.config.department import is_renderable
@@ -26,6 +25,7 @@ from tumblepipe.pipe.paths import (
     next_export_path
 )
 from tumblepipe.farm.tasks.env import print_env
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 _error = _common.error
 
@@ -100,29 +100,27 @@ def main(config):
     hython = Hython()
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Create a temporary config file
         temp_config_path = temp_path / 'config.json'
         store_json(temp_config_path, config)
     
         # Run script in hython
-        hython_result = hython.run(
-            to_windows_path(SCRIPT_PATH),
-            [
-                path_str(to_windows_path(temp_config_path)),
-            ],
-            env = {
-                **get_hython_env(api),
-                # Forward the job data dir so publish_houdini can resolve the
-                # bundled workfile (it runs in hython with CWD = the hpm
-                # manifest dir, not the data dir).
-                'TH_FARM_DATA': path_str(job_data_dir()),
-            }
-        )
+        with timing.span('hython'):
+            hython_result = hython.run(
+                to_windows_path(SCRIPT_PATH),
+                [
+                    path_str(to_windows_path(temp_config_path)),
+                ],
+                env = {
+                    **get_hython_env(api),
+                    # Forward the job data dir so publish_houdini can resolve
+                    # the bundled workfile (it runs in hython with CWD = the
+                    # hpm manifest dir, not the data dir).
+                    'TH_FARM_DATA': path_str(job_data_dir()),
+                }
+            )
         if hython_result != 0:
             return _error(f'publish_houdini failed with exit code {hython_result}')
 
@@ -138,7 +136,8 @@ def main(config):
     if entity_type == 'asset' and is_renderable('assets', department_name):
         logging.info(f'Renderable asset department published: {department_name}')
         try:
-            _trigger_asset_build(entity_uri, config['settings'], variant_name)
+            with timing.span('asset_build'):
+                _trigger_asset_build(entity_uri, config['settings'], variant_name)
         except Exception as e:
             return _error(f'Publish succeeded but asset build trigger failed: {e}')
 
@@ -147,7 +146,9 @@ def main(config):
     return 0
 
 def cli():
-    return _common.run_task_cli(_spec.is_valid_config, main)
+    return _common.run_task_cli(
+        _spec.is_valid_config, main, 'publish', job_data_dir()
+    )
 
 if __name__ == '__main__':
     _common.configure_logging()
@@ -1,9 +1,12 @@
-from tempfile import TemporaryDirectory
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import threading
 import logging
+import asyncio
 import shutil
 import math
 import json
+import time
 import sys
 import os
 
@@ -23,15 +26,23 @@ from tumblepipe.util.io import (
     store_json
 )
 from tumblepipe.config.timeline import BlockRange
-from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import Husk, ITileStitch
 from tumblepipe.apps import exr
+from tumblepipe.farm import task_stats
+from tumblepipe.util import timing, transfer
 from tumblepipe.farm.tasks.env import get_base_env, ocio_value, print_env, job_data_dir
+from tumblepipe.farm.tasks.scratch import earlier_frame_bytes, scratch_dir
 
 # Required AOVs that must be present - missing these fails the render
 # Other AOVs (utility passes like depth, position) are optional
 REQUIRED_AOVS = {'beauty', 'normal', 'albedo'}
 
+# Frames post-processed (stitch, split, copy) while husk renders the next
+# ones; also bounds how many rendered frames wait in the temp dir
+POST_WORKERS_ENV = 'TH_RENDER_PIPELINE_DEPTH'
+DEFAULT_POST_WORKERS = 2
+POLL_SECONDS = 0.2
+
 
 def _headline(title):
     print(f' {title} '.center(80, '='))
@@ -54,13 +65,122 @@ def _get_frame_path(frame_path, frame_index):
         frame_path.name.replace('*', frame_name)
     )
 
+def _check_aovs(expected_aovs, rendered_aovs, exr_aovs, warned):
+    """Error message if a required AOV is missing from a frame, else None.
+
+    Missing optional AOVs are only warned about, once per task.
+    """
+    missing_aovs = expected_aovs - rendered_aovs
+    if not missing_aovs: return None
+
+    # Check for potential name mismatches (case differences, etc.)
+    exr_aovs_lower = {name.lower(): name for name in exr_aovs}
+    potential_matches = []
+    for missing in missing_aovs:
+        if missing.lower() in exr_aovs_lower:
+            potential_matches.append(f"'{missing}' -> '{exr_aovs_lower[missing.lower()]}'")
+
+    # Separate required vs optional missing AOVs
+    missing_required = {aov for aov in missing_aovs if aov.lower() in REQUIRED_AOVS}
+    missing_optional = missing_aovs - missing_required
+
+    if missing_optional and not warned.is_set():
+        warned.set()
+        print(f'WARNING: Missing optional AOVs in rendered output: {sorted(missing_optional)}')
+        print('  These utility passes were not produced by the renderer')
+
+    if not missing_required: return None
+    print(f'ERROR: Missing required AOVs in rendered output: {sorted(missing_required)}')
+    print(f'  Expected AOVs: {sorted(expected_aovs)}')
+    print(f'  Rendered AOVs: {sorted(rendered_aovs)}')
+    print(f'  EXR AOVs: {sorted(exr_aovs)}')
+    if potential_matches:
+        print(f'  Potential name mismatches: {potential_matches}')
+    return f'Render did not produce required AOVs. Missing: {missing_required}'
+
+def _post_workers() -> int:
+    value = os.environ.get(POST_WORKERS_ENV)
+    if not value: return DEFAULT_POST_WORKERS
+    return max(1, int(value))
+
+class _HuskPasses(threading.Thread):
+    """Runs the husk passes of the task one after the other.
+
+    On its own thread so the frames husk already finished are
+    post-processed while it renders the next ones. Husk drives its own
+    subprocess through asyncio, so the passes get this thread's own loop.
+    """
+
+    def __init__(self, husk, input_path, passes, env):
+        super().__init__(name = 'husk', daemon = True)
+        self.husk = husk
+        self.input_path = input_path
+        self.passes = passes
+        self.env = env
+        self.error = None
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._loop = None
+        self._task = None
+
+    async def _run_pass(self, args):
+        with self._lock:
+            if self._stopped: return
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+        try:
+            await self.husk.run_async(
+                to_windows_path(self.input_path),
+                args,
+                env = self.env
+            )
+        finally:
+            with self._lock:
+                self._loop = None
+                self._task = None
+
+    def run(self):
+        try:
+            for args in self.passes:
+                if self._stopped: break
+                with timing.span('husk'):
+                    asyncio.run(self._run_pass(args))
+        except asyncio.CancelledError:
+            if not self._stopped: self.error = RuntimeError('husk was cancelled')
+        except BaseException as error:
+            self.error = error
+
+    def stop(self):
+        """Kill the running husk and skip the passes after it."""
+        with self._lock:
+            self._stopped = True
+            if self._task is None: return
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+def _is_rendered(
+    frame_indices: list[int],
+    position: int,
+    last_pass_path,
+    husk_passes: _HuskPasses
+    ) -> bool:
+    """True once husk is done with the frame at *position*.
+
+    Husk writes a frame's image when it finishes the frame and renders
+    the frames of a pass in order, so a frame of the last pass is done
+    once the next frame's image of that pass exists, or husk exited.
+    """
+    if not husk_passes.is_alive(): return True
+    if position + 1 == len(frame_indices): return False
+    next_frame_path = last_pass_path(frame_indices[position + 1])
+    return local_path(next_frame_path).exists()
 
 def main(
     tile_count: int,
     render_range: BlockRange,
     input_path: Path,
     receipt_path: Path,
-    output_paths: dict[str, Path]
+    output_paths: dict[str, Path],
+    stats: dict | None = None
     ) -> int:
 
     # Check that OCIO has been set
@@ -86,16 +206,22 @@ def main(
     if len(missing_receipt_paths) == 0:
         print('Output receipts already exist')
         return 0
+    start_time = time.time()
 
     # Get apps ready
-    husk = Husk()
-    itilestitch = ITileStitch()
+    with timing.span('setup'):
+        husk = Husk()
+        itilestitch = ITileStitch()
+
+    # Husk can run ahead of post-processing, so budget for every frame
+    # rendered, its tiles when tiled, and its split AOVs, sized from the
+    # latest earlier version of each AOV
+    frame_bytes = sum(map(earlier_frame_bytes, output_paths.values()))
+    copy_count = 2 if tile_count == 1 else 3
+    required_bytes = len(render_range) * frame_bytes * copy_count
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir(required_bytes) as temp_path:
 
         # Temp paths
         temp_frame_path = temp_path / 'render' / 'render.*.exr'
@@ -105,7 +231,6 @@ def main(
         print_env()
 
         # Render with husk and Karama XPU
-        _headline('Rendering tiles')
         x_tiles = y_tiles = int(math.sqrt(tile_count))
         temp_frame_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -122,71 +247,71 @@ def main(
             '--frame-count', str(len(render_range))
         ]
 
-        # Render tiles
+        # Husk passes: one over all frames, or one per tile
+        output_args = [
+            '--output', path_str(to_windows_path(
+                _fix_frame_pattern(temp_frame_path, '$F4')
+            ))
+        ]
         if tile_count == 1:
-            # Single tile - render directly without tile flags
-            husk.run(
-                to_windows_path(input_path),
-                base_args + [
-                    '--output', path_str(to_windows_path(
-                        _fix_frame_pattern(temp_frame_path, '$F4')
-                    ))
-                ],
-                env=env
-            )
+            passes = [base_args + output_args]
         else:
-            # Multiple tiles - render with tile flags
-            for tile_index in range(tile_count):
-                husk.run(
-                    to_windows_path(input_path),
-                    base_args + [
-                        '--tile-count', str(x_tiles), str(y_tiles),
-                        '--tile-index', str(tile_index),
-                        '--tile-suffix', '.%04d',
-                        '--output', path_str(to_windows_path(
-                            _fix_frame_pattern(temp_frame_path, '$F4')
-                        ))
-                    ],
-                    env=env
-                )
+            passes = [
+                base_args + [
+                    '--tile-count', str(x_tiles), str(y_tiles),
+                    '--tile-index', str(tile_index),
+                    '--tile-suffix', '.%04d'
+                ] + output_args
+                for tile_index in range(tile_count)
+            ]
+
+        def _tile_paths(frame_index):
+            return [
+                temp_frame_path.parent / f'render.{frame_index:04d}.{tile_index:04d}.exr'
+                for tile_index in range(tile_count)
+            ]
+
+        def _last_pass_path(frame_index):
+            if tile_count == 1:
+                return _get_frame_path(temp_frame_path, frame_index)
+            return _tile_paths(frame_index)[-1]
+
+        # Post-process one rendered frame: stitch, split, copy, receipt
+        print(f'Expected AOV names from config: {list(output_paths.keys())}')
+        expected_aovs = set(output_paths.keys())
+        warned = threading.Event()
+        copy_stats = transfer.TransferStats()
 
-            # Stitch the tiles together to create the frames
-            _headline('Stitching tiles')
-            for frame_index in render_range:
-                frame_path = _get_frame_path(temp_frame_path, frame_index)
-                tile_paths = [
-                    temp_frame_path.parent / f'render.{frame_index:04d}.{tile_index:04d}.exr'
-                    for tile_index in range(tile_count)
-                ]
-                print(f'Stitching tiles for frame {frame_index}: {frame_path}')
-                itilestitch.run(
-                    [ path_str(to_windows_path(frame_path)) ] +
-                    [ path_str(to_windows_path(tile_path)) for tile_path in tile_paths ],
-                    env = dict(OCIO=ocio_value())
-                )
+        def _post_process(frame_index):
 
-        # Check that the frames were generated
-        for frame_index in render_range:
+            # Stitch the tiles together to create the frame
             current_frame_path = _get_frame_path(temp_frame_path, frame_index)
-            if local_path(current_frame_path).exists(): continue
-            return _error(f'Frame not generated: {current_frame_path}')
+            tile_paths = _tile_paths(frame_index) if tile_count != 1 else []
+            if tile_count != 1:
+                print(f'Stitching tiles for frame {frame_index}: {current_frame_path}')
+                with timing.span('stitch', frame_index):
+                    asyncio.run(itilestitch.run_async(
+                        [ path_str(to_windows_path(current_frame_path)) ] +
+                        [ path_str(to_windows_path(tile_path)) for tile_path in tile_paths ],
+                        env = dict(OCIO=ocio_value())
+                    ))
 
-        # Split AOVs into separate stacks
-        _headline('Splitting AOVs')
-        print(f'Expected AOV names from config: {list(output_paths.keys())}')
-        framestack_aov_paths = dict()
-        for frame_index in render_range:
+            # Check that the frame was generated
+            if not local_path(current_frame_path).exists():
+                return f'Frame not generated: {current_frame_path}'
 
             # Split the frame
-            current_frame_path = _get_frame_path(temp_frame_path, frame_index)
             print(f'Splitting frame: {current_frame_path}')
-            split_frame_paths = exr.split_subimages(
-                current_frame_path, temp_path
-            )
+            frame_temp_path = temp_path / 'split' / str(frame_index)
+            frame_temp_path.mkdir(parents=True)
+            with timing.span('split', frame_index):
+                split_frame_paths = exr.split_subimages(
+                    current_frame_path, frame_temp_path
+                )
 
             # Check splitter output
             if split_frame_paths is None:
-                return _error(f'Failed to split frame: {current_frame_path}')
+                return f'Failed to split frame: {current_frame_path}'
 
             # Log found AOV names
             print(f'Found AOV names in EXR: {list(split_frame_paths.keys())}')
@@ -200,73 +325,114 @@ def main(
                     temp_aov_path,
                     _get_frame_path(output_aov_path, frame_index)
                 )
-            framestack_aov_paths[frame_index] = aov_paths
 
-        # Validate that all expected AOVs were rendered
-        expected_aovs = set(output_paths.keys())
-        rendered_aovs = set()
-        for aov_paths in framestack_aov_paths.values():
-            rendered_aovs.update(aov_paths.keys())
-        missing_aovs = expected_aovs - rendered_aovs
-
-        if missing_aovs:
-            # Check for potential name mismatches (case differences, etc.)
-            exr_aovs_lower = {name.lower(): name for name in split_frame_paths.keys()}
-            potential_matches = []
-            for missing in missing_aovs:
-                if missing.lower() in exr_aovs_lower:
-                    potential_matches.append(f"'{missing}' -> '{exr_aovs_lower[missing.lower()]}'")
-
-            # Separate required vs optional missing AOVs
-            missing_required = {aov for aov in missing_aovs if aov.lower() in REQUIRED_AOVS}
-            missing_optional = missing_aovs - missing_required
-
-            if missing_optional:
-                print(f'WARNING: Missing optional AOVs in rendered output: {sorted(missing_optional)}')
-                print('  These utility passes were not produced by the renderer')
-
-            if missing_required:
-                print(f'ERROR: Missing required AOVs in rendered output: {sorted(missing_required)}')
-                print(f'  Expected AOVs: {sorted(expected_aovs)}')
-                print(f'  Rendered AOVs: {sorted(rendered_aovs)}')
-                print(f'  EXR AOVs: {sorted(split_frame_paths.keys())}')
-                if potential_matches:
-                    print(f'  Potential name mismatches: {potential_matches}')
-                return _error(f'Render did not produce required AOVs. Missing: {missing_required}')
-
-        # Copy frames to network
-        _headline('Copying files to network')
-        for aov_paths in framestack_aov_paths.values():
-            for temp_aov_path, output_aov_path in aov_paths.values():
-                print(f'Copying file: {output_aov_path}')
-                output_aov_path = local_path(output_aov_path)
-                output_aov_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copyfile(temp_aov_path, output_aov_path)
-
-        # Verify all frames were copied successfully
-        _headline('Verifying copied frames')
-        for frame_index, aov_paths in framestack_aov_paths.items():
-            for aov_name, (_, output_aov_path) in aov_paths.items():
-                output_aov_path = local_path(output_aov_path)
-                if not output_aov_path.exists():
-                    return _error(f'Frame not copied: {output_aov_path}')
-                print(f'Verified: {output_aov_path}')
-
-        # Create the output receipts
-        _headline('Creating output receipts')
-        for frame_index, aov_paths in framestack_aov_paths.items():
-            current_receipt_path = _get_frame_path(receipt_path, frame_index)
-            print(f'Creating receipt: {current_receipt_path}')
-            store_json(local_path(current_receipt_path), {
-                aov_name: path_str(output_aov_path)
-                for aov_name, (_, output_aov_path) in aov_paths.items()
-            })
+            # Validate that all expected AOVs were rendered
+            error = _check_aovs(
+                expected_aovs,
+                set(aov_paths.keys()),
+                set(split_frame_paths.keys()),
+                warned
+            )
+            if error is not None: return error
+
+            # Copy frame to network
+            with timing.span('copy', frame_index):
+                for _, output_aov_path in aov_paths.values():
+                    print(f'Copying file: {output_aov_path}')
+                transfer.copy_files(
+                    [
+                        (temp_aov_path, local_path(output_aov_path))
+                        for temp_aov_path, output_aov_path in aov_paths.values()
+                    ],
+                    stats = copy_stats
+                )
+
+            # Verify the frame was copied successfully
+            with timing.span('verify', frame_index):
+                for aov_name, (_, output_aov_path) in aov_paths.items():
+                    output_aov_path = local_path(output_aov_path)
+                    if not output_aov_path.exists():
+                        return f'Frame not copied: {output_aov_path}'
+                    print(f'Verified: {output_aov_path}')
+
+            # Create the output receipt
+            with timing.span('receipts', frame_index):
+                current_receipt_path = _get_frame_path(receipt_path, frame_index)
+                print(f'Creating receipt: {current_receipt_path}')
+                store_json(local_path(current_receipt_path), {
+                    aov_name: path_str(output_aov_path)
+                    for aov_name, (_, output_aov_path) in aov_paths.items()
+                })
+
+            # Free the frame's temp space for the frames still to come
+            shutil.rmtree(frame_temp_path, ignore_errors = True)
+            for path in [current_frame_path, *tile_paths]:
+                local_path(path).unlink(missing_ok = True)
+            return None
+
+        # Render, post-processing each frame as soon as husk is done with it
+        _headline('Rendering and post-processing frames')
+        frame_indices = list(render_range)
+        workers = _post_workers()
+        husk_passes = _HuskPasses(husk, input_path, passes, env)
+        husk_passes.start()
+        error = None
+        finished = False
+        try:
+            with ThreadPoolExecutor(max_workers = workers) as executor:
+                in_flight = set()
+                position = 0
+                while position < len(frame_indices) and error is None:
+
+                    # Finished post-processing frees a slot; a failure stops the
+                    # frames after it
+                    done = {future for future in in_flight if future.done()}
+                    for future in done:
+                        in_flight.discard(future)
+                        error = error or future.result()
+                    if error is not None: break
+
+                    # Wait for husk, and for a slot in the bounded queue
+                    if (len(in_flight) >= workers or not _is_rendered(
+                        frame_indices, position, _last_pass_path, husk_passes
+                        )):
+                        time.sleep(POLL_SECONDS)
+                        continue
+                    in_flight.add(executor.submit(
+                        _post_process, frame_indices[position]
+                    ))
+                    position += 1
+                for future in in_flight:
+                    error = error or future.result()
+            finished = True
+        finally:
+
+            # A failed task does not wait for husk to render the rest of
+            # the chunk; either way husk is done before its temp dir goes
+            if not finished or error is not None:
+                husk_passes.stop()
+            husk_passes.join()
+        if husk_passes.error is not None:
+            raise husk_passes.error
+        if error is not None:
+            return _error(error)
+        print(f'Copied {copy_stats.summary()}')
 
     # Check if output receipts were generated
     for receipt_path in receipt_paths:
         if local_path(receipt_path).exists(): continue
         return _error(f'Output receipt not found: {receipt_path}')
 
+    # Record the task's runtime for adaptive chunk sizing
+    if stats is not None:
+        task_stats.record_task(
+            stats['entity'],
+            stats['department'],
+            stats['job_type'],
+            len(render_range),
+            time.time() - start_time
+        )
+
     # Done
     print('Success')
     return 0
@@ -352,13 +518,21 @@ def cli():
         for aov_name, aov_path in config['output_paths'].items()
     }
 
-    # Run main
-    return main(
-        tile_count,
-        render_range,
-        input_path,
-        receipt_path,
-        output_paths
+    # Run main, timing its phases into a report next to the receipts
+    return timing.run_with_report(
+        'render',
+        local_path(receipt_path.parent),
+        first_frame,
+        last_frame,
+        lambda: main(
+            tile_count,
+            render_range,
+            input_path,
+            receipt_path,
+            output_paths,
+            config.get('stats')
+        ),
+        tile_count = tile_count
     )
 
 if __name__ == '__main__':
@@ -35,6 +35,11 @@ config = {
     'output_paths': {
         'diffuse': 'path/to/diffuse.####.exr',
         'depth': 'path/to/depth.####.exr'
+    },
+    'stats': {  # optional, see tumblepipe.farm.task_stats
+        'entity': 'entity:/shots/seq010/shot0010',
+        'department': 'lighting',
+        'job_type': 'render'
     }
 }
 """
@@ -101,7 +106,8 @@ def build(config, paths, staging_path):
         tile_count = config['tile_count'],
         receipt_path = config['receipt_path'],
         input_path = config['input_path'],
-        output_paths = config['output_paths']
+        output_paths = config['output_paths'],
+        stats = config.get('stats')
     ))
 
     # Create the task
@@ -125,6 +131,7 @@ def build(config, paths, staging_path):
     task.paths[context_path] = context_path.relative_to(staging_path)
     task.env.update(get_base_env(api))
     task.output_paths.append(to_windows_path(receipt_path))
+    task.stats = config.get('stats')
 
     # Done
     return task
\ No newline at end of file
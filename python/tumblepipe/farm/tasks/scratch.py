@@ -0,0 +1,206 @@
+"""Node-local scratch space for farm task intermediates.
+
+Farm tasks used to open their temporary directory under the ``temp:/``
+storage purpose, which lives on the network share: every tile, stitched
+frame, split AOV and JPEG a task made went over the network and back before
+the final copy to its output. `scratch_dir` opens it on the worker's own
+disk instead — ``TH_FARM_SCRATCH`` if set, else a ``tumblepipe_scratch`` dir
+in the system temp dir — and only falls back to ``temp:/`` when that disk
+has less than ``TH_FARM_SCRATCH_MIN_FREE_GB`` (default 10) free on top of
+what the task asked for, or when ``TH_FARM_SCRATCH=0``.
+
+Tasks that know roughly how much they will write pass it as
+``required_bytes``; `earlier_frame_bytes` sizes a frame of an output from the
+latest earlier version of it.
+
+Each scratch dir has a ``<dir>.owner`` file beside it naming the process
+that made it. A task that crashes, or is killed by Deadline, never gets to
+remove its dir; the next task to open scratch space on the node removes the
+dirs whose owner is gone.
+"""
+
+from contextlib import contextmanager
+from tempfile import TemporaryDirectory
+from typing import Iterator, Optional
+from pathlib import Path
+import tempfile
+import platform
+import logging
+import shutil
+import json
+import time
+import os
+
+from tumblepipe.api import path_str, local_path, api
+from tumblepipe.util.uri import Uri
+
+SCRATCH_ENV = 'TH_FARM_SCRATCH'
+MIN_FREE_ENV = 'TH_FARM_SCRATCH_MIN_FREE_GB'
+DEFAULT_MIN_FREE_GB = 10.0
+
+SCRATCH_DIR_NAME = 'tumblepipe_scratch'
+SCRATCH_PREFIX = 'task_'
+OWNER_SUFFIX = '.owner'
+
+# A dir without an owner file is only stale once it is this old, so a task
+# that just made its dir is never swept before it wrote the file
+ORPHAN_SECONDS = 60 * 60
+
+# Dirs are removed at this age even if their pid is alive again, which is
+# then a reused pid rather than the task
+MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
+def _min_free_bytes() -> int:
+    value = os.environ.get(MIN_FREE_ENV)
+    gigabytes = float(value) if value else DEFAULT_MIN_FREE_GB
+    return int(gigabytes * 1024 ** 3)
+
+def local_scratch_root() -> Optional[Path]:
+    """The node-local scratch root, or None when disabled."""
+    value = os.environ.get(SCRATCH_ENV)
+    if value == '0': return None
+    if value: return Path(value)
+    return Path(tempfile.gettempdir()) / SCRATCH_DIR_NAME
+
+def shared_temp_root() -> Path:
+    return local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
+
+def _is_running(pid: int) -> bool:
+    if pid == os.getpid(): return True
+    if os.name == 'nt':
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle: return False
+        kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def owner_record() -> dict:
+    """What an owner file records of this process."""
+    return dict(
+        host = platform.node(),
+        pid = os.getpid(),
+        started = round(time.time(), 3)
+    )
+
+def owner_gone(owner: dict) -> bool:
+    """True when the process *owner* records has exited on this node.
+
+    An owner on another node cannot be checked, and is taken to be alive.
+    """
+    if owner.get('host') != platform.node(): return False
+    return not _is_running(owner.get('pid', -1))
+
+def _is_stale(dir_path: Path, now: float) -> bool:
+    owner_path = dir_path.with_name(dir_path.name + OWNER_SUFFIX)
+    try:
+        age = now - dir_path.stat().st_mtime
+    except OSError:
+        return False
+    try:
+        owner = json.loads(owner_path.read_text())
+    except FileNotFoundError:
+        return age > ORPHAN_SECONDS
+    except (OSError, ValueError):
+        return False
+    if age > MAX_AGE_SECONDS: return True
+    return owner_gone(owner)
+
+def clean_stale(root_path: Path) -> list[Path]:
+    """Remove the scratch dirs under *root_path* left by dead tasks."""
+    if not root_path.exists(): return []
+    removed = list()
+    now = time.time()
+    for dir_path in root_path.iterdir():
+        if not dir_path.name.startswith(SCRATCH_PREFIX): continue
+        if not dir_path.is_dir(): continue
+        if not _is_stale(dir_path, now): continue
+        shutil.rmtree(dir_path, ignore_errors = True)
+        dir_path.with_name(dir_path.name + OWNER_SUFFIX).unlink(missing_ok = True)
+        if dir_path.exists(): continue
+        removed.append(dir_path)
+    if len(removed) != 0:
+        logging.info(f'Removed {len(removed)} stale scratch dir(s) from {root_path}')
+    return removed
+
+def scratch_root(required_bytes: int = 0) -> Path:
+    """The root to open task temporaries under.
+
+    The node-local root, with the stale dirs of crashed tasks cleared out,
+    when it has *required_bytes* plus the configured minimum free; else the
+    shared ``temp:/`` root.
+    """
+    root_path = local_scratch_root()
+    if root_path is not None:
+        try:
+            root_path.mkdir(parents = True, exist_ok = True)
+            clean_stale(root_path)
+            free_bytes = shutil.disk_usage(root_path).free
+            if free_bytes >= required_bytes + _min_free_bytes():
+                return root_path
+            logging.warning(
+                f'Only {free_bytes / 1024 ** 3:.1f}GB free in {root_path}; '
+                'using the shared temp dir'
+            )
+        except OSError as error:
+            logging.warning(f'Local scratch {root_path} unusable ({error}); using the shared temp dir')
+    root_path = shared_temp_root()
+    root_path.mkdir(parents = True, exist_ok = True)
+    return root_path
+
+def earlier_frame_bytes(frame_path: Path) -> int:
+    """Bytes of the largest frame of *frame_path*'s AOV in the latest
+    earlier version, or 0 when there is none to go by.
+
+    *frame_path* is a ``<version>/<aov>/<name>.*.<ext>`` frame pattern.
+    """
+    aov_path = local_path(frame_path).parent
+    version_path = aov_path.parent
+    if not api.naming.is_valid_version_name(version_path.name): return 0
+    root_path = version_path.parent
+    try:
+        if not root_path.exists(): return 0
+        version_paths = sorted(
+            (
+                path for path in root_path.iterdir()
+                if path.is_dir()
+                and path.name != version_path.name
+                and api.naming.is_valid_version_name(path.name)
+            ),
+            key = lambda path: api.naming.get_version_code(path.name),
+            reverse = True
+        )
+        for path in version_paths:
+            sizes = [
+                file_path.stat().st_size
+                for file_path in (path / aov_path.name).glob(f'*{frame_path.suffix}')
+                if file_path.is_file()
+            ]
+            if len(sizes) != 0: return max(sizes)
+    except OSError as error:
+        logging.warning(f'Could not size earlier versions of {root_path}: {error}')
+    return 0
+
+@contextmanager
+def scratch_dir(required_bytes: int = 0) -> Iterator[Path]:
+    """A temporary directory for a task's intermediates, removed on exit."""
+    root_path = scratch_root(required_bytes)
+    with TemporaryDirectory(
+        prefix = SCRATCH_PREFIX,
+        dir = path_str(root_path)
+        ) as temp_dir:
+        temp_path = Path(temp_dir)
+        owner_path = temp_path.with_name(temp_path.name + OWNER_SUFFIX)
+        owner_path.write_text(json.dumps(owner_record()))
+        try:
+            yield temp_path
+        finally:
+            owner_path.unlink(missing_ok = True)
@@ -1,7 +1,5 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
 import logging
-import shutil
 import sys
 import os
 
@@ -20,7 +18,9 @@ from tumblepipe.util.io import (
 )
 from tumblepipe.config.timeline import BlockRange
 from tumblepipe.apps import exr
+from tumblepipe.util import timing, transfer
 from tumblepipe.farm.tasks.env import print_env
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 
 def _get_ocio_env():
@@ -82,8 +82,7 @@ def _composite_frame(
     print(f'Processing frame {frame_index}')
 
     # Composite layers using oiiotool
-    with TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
         layer_output_paths = []
 
         # Process each render layer
@@ -184,8 +183,7 @@ def _composite_frame(
         if len(layer_output_paths) == 1:
             # Only one layer, copy it directly
             _, layer_path, _ = layer_output_paths[0]
-            output_frame_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copyfile(local_path(layer_path), local_path(output_frame_path))
+            transfer.copy_file(local_path(layer_path), local_path(output_frame_path))
         else:
             # Multiple layers, composite them
             print(f'  Compositing {len(layer_output_paths)} layers')
@@ -262,7 +260,8 @@ def main(
     # Composite frames
     _headline('Compositing frames')
     for frame_index in render_range:
-        result = _composite_frame(frame_index, input_paths, output_path)
+        with timing.span('composite', frame_index):
+            result = _composite_frame(frame_index, input_paths, output_path)
         if result != 0:
             return result
 
@@ -274,13 +273,14 @@ def main(
 
     # Create output receipts
     _headline('Creating output receipts')
-    for frame_index in render_range:
-        current_receipt_path = _get_frame_path(receipt_path, frame_index)
-        current_output_path = _get_frame_path(output_path, frame_index)
-        print(f'Creating receipt: {current_receipt_path}')
-        store_json(local_path(current_receipt_path), dict(
-            slapcomp = path_str(current_output_path)
-        ))
+    with timing.span('receipts'):
+        for frame_index in render_range:
+            current_receipt_path = _get_frame_path(receipt_path, frame_index)
+            current_output_path = _get_frame_path(output_path, frame_index)
+            print(f'Creating receipt: {current_receipt_path}')
+            store_json(local_path(current_receipt_path), dict(
+                slapcomp = path_str(current_output_path)
+            ))
 
     # Done
     print('Success')
@@ -371,12 +371,18 @@ def cli():
     # Get the output path
     output_path = _fix_frame_pattern(Path(config['output_path']), '*')
     
-    # Run main
-    return main(
-        render_range,
-        input_paths,
-        receipt_path,
-        output_path
+    # Run main, timing its phases into a report next to the receipts
+    return timing.run_with_report(
+        'slapcomp',
+        local_path(receipt_path.parent),
+        first_frame,
+        last_frame,
+        lambda: main(
+            render_range,
+            input_paths,
+            receipt_path,
+            output_path
+        )
     )
 
 if __name__ == '__main__':
@@ -1,4 +1,3 @@
-from tempfile import TemporaryDirectory
 from pathlib import Path
 import sys
 
@@ -9,7 +8,6 @@ if tumblepipe_packages_path not in sys.path:
 
 from tumblepipe.api import (
     path_str,
-    local_path,
     to_windows_path,
     api
 )
@@ -17,9 +15,11 @@ from tumblepipe.util.io import store_json
 from tumblepipe.util.uri import Uri
 from tumblepipe.apps.houdini import Hython
 from tumblepipe.farm import _common
+from tumblepipe.util import timing
 from tumblepipe.farm.jobs.houdini.render import job as render_job
-from tumblepipe.farm.tasks.env import get_hython_env, print_env
+from tumblepipe.farm.tasks.env import get_hython_env, job_data_dir, print_env
 from tumblepipe.farm.tasks.stage import _spec
+from tumblepipe.farm.tasks.scratch import scratch_dir
 
 _error = _common.error
 
@@ -48,10 +48,7 @@ def main(config):
     hython = Hython()
 
     # Open a temporary directory
-    root_temp_path = local_path(api.storage.resolve(Uri.parse_unsafe('temp:/')))
-    root_temp_path.mkdir(parents=True, exist_ok=True)
-    with TemporaryDirectory(dir=path_str(root_temp_path)) as temp_dir:
-        temp_path = Path(temp_dir)
+    with scratch_dir() as temp_path:
 
         # Create one output stage per variant. A single stage composing
         # every variant would render the last variant's opinions for all
@@ -87,13 +84,14 @@ def main(config):
         ))
 
         # Export the USD stages
-        result = hython.run(
-            to_windows_path(SCRIPT_PATH),
-            [
-                path_str(to_windows_path(config_path))
-            ],
-            env = get_hython_env(api)
-        )
+        with timing.span('hython'):
+            result = hython.run(
+                to_windows_path(SCRIPT_PATH),
+                [
+                    path_str(to_windows_path(config_path))
+                ],
+                env = get_hython_env(api)
+            )
 
         # Check if hython process succeeded
         if result != 0:
@@ -107,39 +105,42 @@ def main(config):
         # Submit the render pipe tasks with all render layers
         tasks = config['tasks'].copy()
         tasks.pop('stage')
-        render_job.submit(dict(
-            entity = dict(
-                uri = str(entity_uri),
-                department = department_name
-            ),
-            settings = dict(
-                user_name = user_name,
-                purpose = purpose,
-                pool_name = pool_name,
-                variant_names = variant_names,
-                render_department_name = render_department_name,
-                render_settings_path = path_str(render_settings_path),
-                input_paths = {
-                    variant_name: path_str(relative_stage_path)
-                    for variant_name, relative_stage_path in relative_stage_paths.items()
-                },
-                tile_count = tile_count,
-                first_frame = first_frame,
-                last_frame = last_frame,
-                step_size = step_size,
-                batch_size = batch_size
-            ),
-            tasks = tasks
-        ), {
-            render_settings_path: render_settings_path,
-            export_path: relative_export_path
-        })
+        with timing.span('submit'):
+            render_job.submit(dict(
+                entity = dict(
+                    uri = str(entity_uri),
+                    department = department_name
+                ),
+                settings = dict(
+                    user_name = user_name,
+                    purpose = purpose,
+                    pool_name = pool_name,
+                    variant_names = variant_names,
+                    render_department_name = render_department_name,
+                    render_settings_path = path_str(render_settings_path),
+                    input_paths = {
+                        variant_name: path_str(relative_stage_path)
+                        for variant_name, relative_stage_path in relative_stage_paths.items()
+                    },
+                    tile_count = tile_count,
+                    first_frame = first_frame,
+                    last_frame = last_frame,
+                    step_size = step_size,
+                    batch_size = batch_size
+                ),
+                tasks = tasks
+            ), {
+                render_settings_path: render_settings_path,
+                export_path: relative_export_path
+            })
 
     # Done
     return 0
 
 def cli():
-    return _common.run_task_cli(_spec.is_valid_config, main)
+    return _common.run_task_cli(
+        _spec.is_valid_config, main, 'stage', job_data_dir()
+    )
 
 if __name__ == '__main__':
     _common.configure_logging()
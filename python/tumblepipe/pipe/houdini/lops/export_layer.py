@@ -204,18 +204,26 @@ def _check_no_dangling_composition_paths(
     off another workfile's folder via a raw sublayer/reference. Either
     way the dangling check still aborts when the cached file is missing.
 
+    The sidecar layers in the layer's folder (stitched or localized
+    ``.usd`` files) publish with it, so their arcs are checked too, against
+    the same folder; they are analysed together, in parallel.
+
     Fail-open on analysis errors: a problem opening / walking the layer
     only skips the check (preserving the prior behaviour), never blocks a
     legitimate export.
     """
-    from tumblepipe.pipe.usd import (
-        collect_layer_composition_paths,
-        find_dangling_layer_paths,
-        find_escaping_layer_paths,
-    )
+    from tumblepipe.pipe.usd import analyze_layer_paths, list_layer_files
 
+    folder = layer_path.parent
+    layer_paths = [layer_path] + [
+        path for path in list_layer_files(folder)
+        if path != layer_path
+    ]
     try:
-        asset_paths = collect_layer_composition_paths(layer_path)
+        reports = analyze_layer_paths(
+            layer_paths, allowed_roots=allowed_roots,
+            cache_storage_roots=cache_storage_roots, folder=folder,
+        )
     except Exception:
         logger.warning(
             "Dangling-path check skipped; could not analyse %s",
@@ -223,10 +231,19 @@ def _check_no_dangling_composition_paths(
         )
         return
 
-    escaping = find_escaping_layer_paths(
-        asset_paths, layer_path.parent, allowed_roots=allowed_roots,
-        cache_storage_roots=cache_storage_roots,
-    )
+    def _offending(field):
+        # Main layer arcs as-is; a sidecar's arcs name the sidecar
+        paths = []
+        for report in reports:
+            for raw in getattr(report, field):
+                if report.layer_path == layer_path:
+                    paths.append(raw)
+                else:
+                    rel = report.layer_path.relative_to(folder).as_posix()
+                    paths.append(f"{raw} (in {rel})")
+        return paths
+
+    escaping = _offending('escaping')
     if escaping:
         bullets = "\n  - ".join(escaping)
         raise ExportLayerError(
@@ -242,7 +259,7 @@ def _check_no_dangling_composition_paths(
             "reference and are allowed."
         )
 
-    dangling = find_dangling_layer_paths(asset_paths, layer_path.parent)
+    dangling = _offending('dangling')
     if not dangling:
         return
 
@@ -373,69 +390,22 @@ def _localize_external_sidecars(layer_path: Path, skip_roots: list[Path] = ()) -
 
     Fail-open: any analysis/copy error is logged and skipped, leaving the
     layer untouched for the downstream dangling-path guard to catch.
+
+    The work happens at layer level in ``pipe.usd.localize_external_sidecars``
+    (one dependency query, deduped parallel copies, one asset-path rewrite).
     """
     try:
-        from pxr import Sdf, UsdUtils
+        from tumblepipe.pipe.usd import localize_external_sidecars
+        remap = localize_external_sidecars(layer_path, skip_roots=skip_roots)
     except Exception:
-        logger.warning("Sidecar localisation skipped; USD unavailable", exc_info=True)
+        logger.warning("Sidecar localisation skipped", exc_info=True)
         return
 
-    from tumblepipe.pipe.usd import _looks_like_uri
-
-    layer = Sdf.Layer.FindOrOpen(str(layer_path))
-    if layer is None:
-        return
-
-    layer_dir = layer_path.parent
-    try:
-        used_names = {p.name for p in layer_dir.iterdir()}
-    except OSError:
-        used_names = set()
-
-    # Map each raw authored asset path we relocate -> its new sibling name.
-    remap: dict[str, str] = {}
-    stack = list(layer.rootPrims)
-    while stack:
-        prim = stack.pop()
-        for arc_list in (prim.referenceList, prim.payloadList):
-            for item in arc_list.GetAddedOrExplicitItems():
-                raw = str(getattr(item, 'assetPath', '') or '')
-                if not raw or raw in remap or _looks_like_uri(raw):
-                    continue
-                src = Path(raw)
-                abs_src = src if src.is_absolute() else (layer_dir / src)
-                try:
-                    if abs_src.resolve().parent == layer_dir.resolve():
-                        continue  # already a sibling — nothing to do
-                except OSError:
-                    pass
-                if _resolve_under_any(abs_src, skip_roots):
-                    continue  # versioned cache — published by reference
-                if not abs_src.is_file():
-                    continue  # missing — leave for the dangling-path guard
-                dest_name = abs_src.name
-                if dest_name in used_names:
-                    stem, suffix = abs_src.stem, abs_src.suffix
-                    n = 1
-                    while f"{stem}_{n}{suffix}" in used_names:
-                        n += 1
-                    dest_name = f"{stem}_{n}{suffix}"
-                try:
-                    shutil.copy(abs_src, layer_dir / dest_name)
-                except OSError:
-                    logger.warning("Could not localise sidecar %s", abs_src, exc_info=True)
-                    continue
-                used_names.add(dest_name)
-                remap[raw] = dest_name
-        stack.extend(prim.nameChildren.values())
-
     if not remap:
         return
-
-    UsdUtils.ModifyAssetPaths(layer, lambda p: remap.get(p, p))
-    layer.Save()
     logger.info(
-        "Localised %d payload/reference sidecar(s) into %s", len(remap), layer_dir
+        "Localised %d payload/reference sidecar(s) into %s",
+        len(set(remap.values())), layer_path.parent,
     )
 
 
@@ -895,7 +865,9 @@ class ExportLayer(EntityNode):
                 try:
                     report_progress(f"stitching {len(chunk_dirs)} chunks")
                     logger.info(f"Stitching {len(chunk_dirs)} chunks into final USD")
-                    stitch_usd_directories(chunk_dirs, layer_file_name, temp_path)
+                    timings = stitch_usd_directories(chunk_dirs, layer_file_name, temp_path)
+                    for rel_path, seconds in timings.items():
+                        logger.debug(f"Stitched {rel_path} in {seconds:.2f}s")
                     logger.info("Chunk stitching completed successfully")
                 except Exception as e:
                     logger.error(f"USD stitching failed: {e}")
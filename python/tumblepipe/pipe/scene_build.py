@@ -9,21 +9,27 @@ downward (pipe -> config), never the inversion that previously forced these
 imports to be deferred inside config.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+import hashlib
+import json
 
 from tumblepipe.api import api, local_path
 from tumblepipe.util.uri import Uri
-from tumblepipe.util.io import store_text, store_json
+from tumblepipe.util.io import load_json, load_text, store_text, store_json
 from tumblepipe.config.scene import (
     SCENES_URI,
+    Scene,
     get_scene_by_uri,
     get_inherited_scene_ref,
 )
 from tumblepipe.config.timeline import get_frame_range, get_fps
 from tumblepipe.pipe.paths import (
+    get_latest_version_path,
     get_next_version_path,
     get_root_layer_file_name,
-    next_scene_staged_path,
+    get_scene_staged_path,
     get_scene_layer_file_name,
 )
 from tumblepipe.pipe.usd import (
@@ -34,57 +40,115 @@ from tumblepipe.pipe.usd import (
 )
 
 
-def export_scene_version(scene_uri: Uri) -> Path:
-    """
-    Export a new scene layer version.
+@dataclass(frozen=True)
+class _PlannedVersion:
+    """A generated layer version, not yet written.
 
-    Creates versioned .usda at:
-    export:/scenes/{path}/_staged/v####/{scene}_v####.usda
-
-    The file sublayers:
-    1. Direct asset staged files (strongest in USD composition)
-    2. Parent scene layers (for inheritance - weaker)
+    ``version_path`` is the version this export would create; ``latest_path``
+    the layer file of the current latest version (None when there is none),
+    which is what an unchanged export resolves to instead.
+    """
+    version_path: Path
+    output_path: Path
+    usda_content: str
+    context: dict
+    latest_path: Path | None
+
+    def matches_latest(self) -> bool:
+        if self.latest_path is None:
+            return False
+        latest_content = load_text(self.latest_path)
+        if latest_content is None:
+            return False
+        latest_context = load_json(self.latest_path.parent / 'context.json')
+        if latest_context is None:
+            return False
+        return (
+            _version_digest(latest_content, latest_context) ==
+            _version_digest(self.usda_content, self.context)
+        )
+
+
+def _version_digest(usda_content: str, context: dict) -> str:
+    """Hash of a layer version's content, ignoring its version number.
+
+    Covers the context parameters as well as the layer: a scene edit that
+    only changes instance counts leaves the ``.usda`` untouched but must still
+    produce a new version, since the dirty check compares against context.json.
+    """
+    parameters = {key: value for key, value in context.items() if key != 'version'}
+    digest = hashlib.sha256(usda_content.encode('utf-8'))
+    digest.update(json.dumps(parameters, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _write_version(
+    plan_version,
+    skip_unchanged: bool,
+    attempts: int = 8,
+    ) -> tuple[Path, bool]:
+    """Write the version ``plan_version()`` describes.
+
+    The version directory is claimed with an exclusive ``mkdir`` so two
+    exports racing on the same layer never write into one version; the loser
+    re-plans against the new latest. Both files go through the atomic
+    ``store_*`` helpers, context.json last, so a version is never observed
+    half-written.
+
+    Returns ``(layer_path, written)``; with ``skip_unchanged`` an export that
+    matches the current latest version returns that version's layer instead.
+    """
+    for _ in range(attempts):
+        plan = plan_version()
+        if skip_unchanged and plan.matches_latest():
+            return plan.latest_path, False
+        try:
+            plan.version_path.mkdir(parents=True, exist_ok=False)
+        except FileExistsError:
+            continue
+        store_text(plan.output_path, plan.usda_content)
+        store_json(plan.version_path / 'context.json', plan.context)
+        return plan.output_path, True
+    raise RuntimeError(
+        f"Could not claim a new version under {plan.version_path.parent} "
+        f"after {attempts} attempts"
+    )
 
-    Parent scene inheritance allows changes to parent scenes to propagate
-    automatically to child scenes without re-exporting the child.
 
-    Returns:
-        Path to the generated .usda file
+def _parent_scene_sublayer_uris(scene_uri: Uri) -> list[str]:
+    """Parent scene sublayers, nearest first (weaker, inherited).
 
-    Raises:
-        ValueError: If scene not found or asset builds missing
+    Walk up: scenes:/outdoor/forest -> scenes:/outdoor
     """
-    # Get scene
-    scene = get_scene_by_uri(scene_uri)
-    if scene is None:
-        raise ValueError(f"Scene not found: {scene_uri}")
-
-    # Collect sublayer URIs
     layer_uris = []
-
-    # 1. Direct assets FIRST (strongest in USD composition)
-    for entry in scene.assets:
-        asset_uri = Uri.parse_unsafe(entry.asset)
-        staged_uri = generate_staged_sublayer_uri(asset_uri, entry.variant)
-        layer_uris.append(staged_uri)
-
-    # 2. Parent scene sublayers AFTER (weaker, inherited)
-    #    Walk up: scenes:/outdoor/forest -> scenes:/outdoor
     segments = list(scene_uri.segments)
     while len(segments) > 1:
         segments = segments[:-1]
         parent_uri = SCENES_URI
         for seg in segments:
             parent_uri = parent_uri / seg
-        parent_scene_uri = generate_scene_sublayer_uri(parent_uri)
-        layer_uris.append(parent_scene_uri)
+        layer_uris.append(generate_scene_sublayer_uri(parent_uri))
+    return layer_uris
+
+
+def _plan_scene_version(
+    scene: Scene,
+    staged_path: Path,
+    staged_uris: dict[tuple[str, str], str],
+    ) -> _PlannedVersion:
+    # 1. Direct assets FIRST (strongest in USD composition)
+    layer_uris = [staged_uris[(entry.asset, entry.variant)] for entry in scene.assets]
+
+    # 2. Parent scene sublayers AFTER (weaker, inherited)
+    layer_uris.extend(_parent_scene_sublayer_uris(scene.uri))
 
     # Get next version path
-    version_path = next_scene_staged_path(scene_uri)
+    version_path = get_next_version_path(staged_path)
     version_name = version_path.name
+    latest_path = get_latest_version_path(staged_path)
 
     # Generate output path
-    layer_file_name = get_scene_layer_file_name(scene_uri, version_name)
+    layer_file_name = get_scene_layer_file_name(scene.uri, version_name)
     output_path = version_path / layer_file_name
 
     # Generate USDA content (no timing metadata for scenes)
@@ -93,61 +157,82 @@ def export_scene_version(scene_uri: Uri) -> Path:
         output_path=output_path
     )
 
-    # Write files
-    version_path.mkdir(parents=True, exist_ok=True)
-    store_text(output_path, usda_content)
-
-    # Write context.json
-    context_path = version_path / 'context.json'
-    store_json(context_path, {
-        'uri': str(scene_uri),
-        'version': version_name,
-        'parameters': {
-            'assets': [
-                {'asset': entry.asset, 'instances': entry.instances, 'variant': entry.variant}
-                for entry in scene.assets
-            ]
-        }
-    })
+    return _PlannedVersion(
+        version_path=version_path,
+        output_path=output_path,
+        usda_content=usda_content,
+        context={
+            'uri': str(scene.uri),
+            'version': version_name,
+            'parameters': {
+                'assets': [
+                    {'asset': entry.asset, 'instances': entry.instances, 'variant': entry.variant}
+                    for entry in scene.assets
+                ]
+            }
+        },
+        latest_path=(
+            None if latest_path is None else
+            latest_path / get_scene_layer_file_name(scene.uri, latest_path.name)
+        ),
+    )
 
-    return output_path
 
+def _staged_sublayer_uris(scenes: list[Scene]) -> dict[tuple[str, str], str]:
+    """Staged sublayer URIs for the union of assets across *scenes*."""
+    staged_uris = {}
+    for scene in scenes:
+        for entry in scene.assets:
+            key = (entry.asset, entry.variant)
+            if key in staged_uris:
+                continue
+            asset_uri = Uri.parse_unsafe(entry.asset)
+            staged_uris[key] = generate_staged_sublayer_uri(asset_uri, entry.variant)
+    return staged_uris
 
-def generate_root_version(shot_uri: Uri) -> Path:
+
+def export_scene_version(scene_uri: Uri) -> Path:
     """
-    Generate a new root department version for a shot.
+    Export a new scene layer version.
 
-    This creates a versioned .usda file at:
-    export:/shots/{seq}/{shot}/root/v####/{shot}_root_v####.usda
+    Creates versioned .usda at:
+    export:/scenes/{path}/_staged/v####/{scene}_v####.usda
 
     The file sublayers:
-    1. Scene .usda (if scene assigned) - contains asset sublayers
-    2. Root defaults template - camera, render settings, render vars
-
-    Shots without a scene assigned will only have the root defaults template.
+    1. Direct asset staged files (strongest in USD composition)
+    2. Parent scene layers (for inheritance - weaker)
 
-    Args:
-        shot_uri: The shot entity URI (e.g., entity:/shots/010/010)
+    Parent scene inheritance allows changes to parent scenes to propagate
+    automatically to child scenes without re-exporting the child.
 
     Returns:
-        Path to the generated USD file
+        Path to the generated .usda file
 
     Raises:
-        ValueError: If frame range not set
+        ValueError: If scene not found or asset builds missing
     """
-    # Get scene reference (may be None if no scene assigned)
-    scene_ref, _ = get_inherited_scene_ref(shot_uri)
+    # Get scene
+    scene = get_scene_by_uri(scene_uri)
+    if scene is None:
+        raise ValueError(f"Scene not found: {scene_uri}")
 
-    # Get frame range
-    frame_range = get_frame_range(shot_uri)
-    if frame_range is None:
-        raise ValueError(f"No frame range defined for {shot_uri}")
+    staged_path = get_scene_staged_path(scene_uri)
+    staged_uris = _staged_sublayer_uris([scene])
+    output_path, _ = _write_version(
+        lambda: _plan_scene_version(scene, staged_path, staged_uris),
+        skip_unchanged=False,
+    )
+    return output_path
 
-    # Get fps (default to 24 if not set)
-    fps = get_fps(shot_uri)
-    if fps is None:
-        fps = 24
 
+def _plan_root_version(
+    shot_uri: Uri,
+    scene_ref: Uri | None,
+    frame_range,
+    fps: int,
+    root_defaults_path: Path | None,
+    export_path: Path,
+    ) -> _PlannedVersion:
     # Collect sublayer references
     layer_refs = []
 
@@ -157,18 +242,13 @@ def generate_root_version(shot_uri: Uri) -> Path:
         layer_refs.append(scene_uri)
 
     # Root defaults template (weakest - provides camera, render settings, render vars)
-    # Note: This is the only exception - config templates use filesystem paths
-    # since they are static and don't need dynamic version resolution
-    root_defaults_uri = Uri.parse_unsafe('config:/usd/root_default_prims.usda')
-    root_defaults_path = local_path(api.storage.resolve(root_defaults_uri))
-    if root_defaults_path.exists():
+    if root_defaults_path is not None:
         layer_refs.append(root_defaults_path)
 
     # Get next version path for root (shot-level, not variant-specific)
-    export_uri = Uri.parse_unsafe('export:/') / shot_uri.segments / '_root'
-    export_path = local_path(api.storage.resolve(export_uri))
     version_path = get_next_version_path(export_path)
     version_name = version_path.name
+    latest_path = get_latest_version_path(export_path)
 
     # Generate output path (no variant in filename for shot-level root)
     layer_file_name = get_root_layer_file_name(shot_uri, version_name)
@@ -186,19 +266,188 @@ def generate_root_version(shot_uri: Uri) -> Path:
         end_frame=full_range.last_frame
     )
 
-    # Write files
-    version_path.mkdir(parents=True, exist_ok=True)
-    store_text(output_path, usda_content)
-
-    # Write context.json
-    context_path = version_path / 'context.json'
-    store_json(context_path, {
-        'uri': str(shot_uri),
-        'department': 'root',
-        'version': version_name,
-        'parameters': {
-            'scene': str(scene_ref) if scene_ref else None
-        }
-    })
+    return _PlannedVersion(
+        version_path=version_path,
+        output_path=output_path,
+        usda_content=usda_content,
+        context={
+            'uri': str(shot_uri),
+            'department': 'root',
+            'version': version_name,
+            'parameters': {
+                'scene': str(scene_ref) if scene_ref else None
+            }
+        },
+        latest_path=(
+            None if latest_path is None else
+            latest_path / get_root_layer_file_name(shot_uri, latest_path.name)
+        ),
+    )
+
+
+def _root_defaults_path() -> Path | None:
+    # Note: This is the only exception - config templates use filesystem paths
+    # since they are static and don't need dynamic version resolution
+    root_defaults_uri = Uri.parse_unsafe('config:/usd/root_default_prims.usda')
+    root_defaults_path = local_path(api.storage.resolve(root_defaults_uri))
+    if not root_defaults_path.exists():
+        return None
+    return root_defaults_path
+
+
+def _root_version_planner(shot_uri: Uri, root_defaults_path: Path | None):
+    """Resolve a shot's root inputs; returns a planner for ``_write_version``.
+
+    All config and storage lookups happen here, up front, so the planner
+    itself only touches the shot's export directory.
+
+    Raises:
+        ValueError: If frame range not set
+    """
+    # Get scene reference (may be None if no scene assigned)
+    scene_ref, _ = get_inherited_scene_ref(shot_uri)
+
+    # Get frame range
+    frame_range = get_frame_range(shot_uri)
+    if frame_range is None:
+        raise ValueError(f"No frame range defined for {shot_uri}")
+
+    # Get fps (default to 24 if not set)
+    fps = get_fps(shot_uri)
+    if fps is None:
+        fps = 24
+
+    export_uri = Uri.parse_unsafe('export:/') / shot_uri.segments / '_root'
+    export_path = local_path(api.storage.resolve(export_uri))
+    return lambda: _plan_root_version(
+        shot_uri, scene_ref, frame_range, fps, root_defaults_path, export_path,
+    )
+
+
+def generate_root_version(shot_uri: Uri) -> Path:
+    """
+    Generate a new root department version for a shot.
+
+    This creates a versioned .usda file at:
+    export:/shots/{seq}/{shot}/root/v####/{shot}_root_v####.usda
+
+    The file sublayers:
+    1. Scene .usda (if scene assigned) - contains asset sublayers
+    2. Root defaults template - camera, render settings, render vars
 
+    Shots without a scene assigned will only have the root defaults template.
+
+    Args:
+        shot_uri: The shot entity URI (e.g., entity:/shots/010/010)
+
+    Returns:
+        Path to the generated USD file
+
+    Raises:
+        ValueError: If frame range not set
+    """
+    planner = _root_version_planner(shot_uri, _root_defaults_path())
+    output_path, _ = _write_version(planner, skip_unchanged=False)
     return output_path
+
+
+@dataclass
+class BulkExportResult:
+    """Outcome of a bulk export, per input URI.
+
+    ``written`` holds the new layer versions, ``unchanged`` the current latest
+    layer of every input whose generated content matched it (nothing written),
+    and ``failed`` the error each remaining input raised.
+    """
+    written: dict[Uri, Path] = field(default_factory=dict)
+    unchanged: dict[Uri, Path] = field(default_factory=dict)
+    failed: dict[Uri, Exception] = field(default_factory=dict)
+
+
+def _write_versions(
+    planners: dict,
+    result: BulkExportResult,
+    skip_unchanged: bool,
+    max_workers: int,
+    ) -> BulkExportResult:
+    if len(planners) == 0:
+        return result
+    workers = max(1, min(max_workers, len(planners)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            uri: executor.submit(_write_version, planner, skip_unchanged)
+            for uri, planner in planners.items()
+        }
+    for uri, future in futures.items():
+        try:
+            layer_path, written = future.result()
+        except Exception as error:
+            result.failed[uri] = error
+            continue
+        if written:
+            result.written[uri] = layer_path
+        else:
+            result.unchanged[uri] = layer_path
+    return result
+
+
+def export_scene_versions(
+    scene_uris: list[Uri],
+    skip_unchanged: bool = True,
+    max_workers: int = 8,
+    ) -> BulkExportResult:
+    """Bulk :func:`export_scene_version` for many scenes.
+
+    Scenes are looked up and the staged sublayer URIs for the union of their
+    assets resolved once, up front; generating, comparing and writing each
+    scene's version then runs on a thread pool, since that part is only
+    export-directory I/O. With ``skip_unchanged`` a scene whose generated
+    layer and context match its current latest version is not re-versioned.
+
+    A failing scene is recorded in the result and does not stop the others.
+    """
+    result = BulkExportResult()
+    scenes = {}
+    for scene_uri in dict.fromkeys(scene_uris):
+        try:
+            scene = get_scene_by_uri(scene_uri)
+            if scene is None:
+                raise ValueError(f"Scene not found: {scene_uri}")
+            scenes[scene_uri] = (scene, get_scene_staged_path(scene_uri))
+        except Exception as error:
+            result.failed[scene_uri] = error
+    staged_uris = _staged_sublayer_uris([scene for scene, _ in scenes.values()])
+    planners = {
+        scene_uri: (
+            lambda scene=scene, staged_path=staged_path:
+            _plan_scene_version(scene, staged_path, staged_uris)
+        )
+        for scene_uri, (scene, staged_path) in scenes.items()
+    }
+    return _write_versions(planners, result, skip_unchanged, max_workers)
+
+
+def generate_root_versions(
+    shot_uris: list[Uri],
+    skip_unchanged: bool = True,
+    max_workers: int = 8,
+    ) -> BulkExportResult:
+    """Bulk :func:`generate_root_version` for many shots.
+
+    The root defaults template is resolved once for all shots, and each
+    shot's scene reference, frame range and fps up front; generation and
+    writing then run on a thread pool. With ``skip_unchanged`` a shot whose
+    generated root matches its current latest root version is not
+    re-versioned.
+
+    A failing shot is recorded in the result and does not stop the others.
+    """
+    result = BulkExportResult()
+    root_defaults_path = _root_defaults_path()
+    planners = {}
+    for shot_uri in dict.fromkeys(shot_uris):
+        try:
+            planners[shot_uri] = _root_version_planner(shot_uri, root_defaults_path)
+        except Exception as error:
+            result.failed[shot_uri] = error
+    return _write_versions(planners, result, skip_unchanged, max_workers)
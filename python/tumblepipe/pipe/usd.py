@@ -869,8 +869,46 @@ def _resolver_locates(asset_path: str) -> bool:
         return False
 
 
+class _ResolutionMemo:
+    """Filesystem and Ar lookups shared by the layers of one analysis.
+
+    Sibling layers of an export point at the same payloads, caches and
+    ``$HFS`` search paths over and over; each distinct path is stat'ed,
+    ``resolve()``-d and offered to Ar once per analysis instead of once
+    per arc. Plain dict reads/writes, so it is safe to share across the
+    threads of :func:`analyze_layer_paths` (a race only repeats a lookup).
+    """
+
+    def __init__(self):
+        self._exists: dict[Path, bool] = {}
+        self._resolved: dict[Path, Path | None] = {}
+        self._locates: dict[str, bool] = {}
+
+    def exists(self, path: Path) -> bool:
+        cached = self._exists.get(path)
+        if cached is None:
+            cached = self._exists[path] = path.exists()
+        return cached
+
+    def resolve(self, path: Path) -> Path | None:
+        if path in self._resolved:
+            return self._resolved[path]
+        try:
+            resolved = path.resolve()
+        except OSError:
+            resolved = None
+        self._resolved[path] = resolved
+        return resolved
+
+    def resolver_locates(self, asset_path: str) -> bool:
+        cached = self._locates.get(asset_path)
+        if cached is None:
+            cached = self._locates[asset_path] = _resolver_locates(asset_path)
+        return cached
+
+
 def find_dangling_layer_paths(
-    asset_paths, layer_dir: Union[Path, str, None] = None,
+    asset_paths, layer_dir: Union[Path, str, None] = None, memo=None,
 ) -> list:
     """Return composition asset paths that won't resolve at load time.
 
@@ -890,8 +928,12 @@ def find_dangling_layer_paths(
       ``$HFS``) before being flagged; ``./``/``../``-anchored paths are
       not, since USD anchors those to the layer itself.
 
+    ``memo`` shares lookups across calls (see :func:`analyze_layer_paths`).
+
     Returns the offending raw path strings, in input order, de-duped.
     """
+    if memo is None:
+        memo = _ResolutionMemo()
     dangling = []
     seen = set()
     for raw in asset_paths:
@@ -902,11 +944,11 @@ def find_dangling_layer_paths(
             continue
         path = Path(p)
         if path.is_absolute():
-            exists = path.exists()
+            exists = memo.exists(path)
         elif layer_dir is not None:
-            exists = (Path(layer_dir) / path).exists()
+            exists = memo.exists(Path(layer_dir) / path)
             if not exists and not p.startswith(('./', '../')):
-                exists = _resolver_locates(p)
+                exists = memo.resolver_locates(p)
         else:
             continue
         if not exists:
@@ -941,7 +983,7 @@ def _is_workfile_cache(resolved: Path, storage_roots) -> bool:
 
 def find_escaping_layer_paths(
     asset_paths, layer_dir: Union[Path, str], allowed_roots=(),
-    cache_storage_roots=(),
+    cache_storage_roots=(), memo=None, folder: Union[Path, str, None] = None,
 ) -> list:
     """Return filesystem composition paths that resolve outside ``layer_dir``.
 
@@ -963,11 +1005,18 @@ def find_escaping_layer_paths(
       ``project:``/``proxy:`` storage roots), i.e. a versioned cache next
       to some workfile, which publishes by reference. Relative arcs are
       never exempt; they re-anchor when the layer folder moves.
-    - Relative paths are flagged when they climb out of ``layer_dir``.
+    - Relative paths are flagged when they climb out of ``folder`` — the
+      folder the layer is published in, which defaults to ``layer_dir``
+      and is an ancestor of it for a sidecar layer in a subdirectory.
+
+    ``memo`` shares lookups across calls (see :func:`analyze_layer_paths`).
 
     Returns the offending raw path strings, in input order, de-duped.
     """
+    if memo is None:
+        memo = _ResolutionMemo()
     layer_root = Path(layer_dir).resolve()
+    folder_root = layer_root if folder is None else Path(folder).resolve()
     roots = []
     for root in allowed_roots:
         try:
@@ -990,19 +1039,16 @@ def find_escaping_layer_paths(
             continue
         path = Path(p)
         if path.is_absolute():
-            try:
-                resolved = path.resolve()
-            except OSError:
-                resolved = None
+            resolved = memo.resolve(path)
             escapes = resolved is None or (
                 not any(resolved.is_relative_to(root) for root in roots)
                 and not _is_workfile_cache(resolved, storage_roots)
             )
         else:
-            try:
-                escapes = not (layer_root / path).resolve().is_relative_to(layer_root)
-            except OSError:
+            resolved = memo.resolve(layer_root / path)
+            if resolved is None:
                 continue
+            escapes = not resolved.is_relative_to(folder_root)
         if escapes:
             seen.add(p)
             escaping.append(p)
@@ -1035,6 +1081,316 @@ def collect_layer_composition_paths(layer_path: Union[Path, str]) -> list:
     return paths
 
 
+@dataclass(frozen=True)
+class LayerPathReport:
+    """Escaping and dangling composition paths of one layer file.
+
+    The outcome of :func:`find_escaping_layer_paths` and
+    :func:`find_dangling_layer_paths` over the layer's own arcs, anchored
+    at its directory.
+    """
+    layer_path: Path
+    escaping: tuple[str, ...]
+    dangling: tuple[str, ...]
+
+
+LAYER_SUFFIXES = ('.usd', '.usda', '.usdc')
+
+
+def list_layer_files(folder: Union[Path, str]) -> list:
+    """Every USD layer file below ``folder``, sorted.
+
+    The sidecar layers an export writes next to its main layer travel
+    with it into the version folder, so they are validated with it.
+    """
+    return sorted(
+        path for path in Path(folder).rglob('*')
+        if path.suffix.lower() in LAYER_SUFFIXES and path.is_file()
+    )
+
+
+# Per-layer (composition paths, escaping paths) behind analyze_layer_paths,
+# oldest first; bounded so a long session of exports can't grow it without
+# limit.
+_LAYER_ARC_CACHE: dict[tuple, tuple[tuple[str, ...], tuple[str, ...]]] = {}
+_LAYER_ARC_CACHE_MAX = 1024
+
+
+def _layer_arc_cache_key(layer_path: Path, roots: tuple) -> tuple | None:
+    """Cache key for one layer's arcs, or None if it can't be stamped.
+
+    The file stamp catches a rewritten layer; the resolver generation
+    catches a refresh/latest-mode flip; the roots are part of the
+    escaping question being asked.
+    """
+    from tumblepipe.resolver import resolver_generation
+    try:
+        stat = layer_path.stat()
+    except OSError:
+        return None
+    return (
+        path_str(layer_path.resolve()),
+        stat.st_mtime_ns,
+        stat.st_size,
+        resolver_generation(),
+        roots,
+    )
+
+
+def analyze_layer_paths(
+    layer_paths, allowed_roots=(), cache_storage_roots=(), max_workers: int = 8,
+    folder: Union[Path, str, None] = None,
+) -> list:
+    """Escaping/dangling analysis for many layers, cached and in parallel.
+
+    Runs :func:`collect_layer_composition_paths` and the two ``find_*``
+    checks for every layer in ``layer_paths``, each anchored at its own
+    directory, and returns one :class:`LayerPathReport` per layer in input
+    order. With ``folder`` (the export folder all the layers publish in,
+    e.g. a main layer and its :func:`list_layer_files` sidecars) relative
+    arcs only escape when they leave that folder. Validation re-runs on
+    every export attempt, so:
+
+    - a layer's arcs and its escaping verdict are cached per layer file +
+      stamp + resolver generation + roots, so an unchanged layer is never
+      reopened or re-walked. The dangling check is not cached — it is
+      about the *targets*, which can vanish without the layer changing —
+      but it only costs one memoized stat per distinct path;
+    - all layers of one call share a :class:`_ResolutionMemo`, so a path
+      many layers arc to is stat'ed / resolved / offered to Ar once;
+    - the uncached layers are opened and walked on a thread pool.
+
+    Requires USD. Raises whatever opening/walking a layer raises — callers
+    that must fail open wrap the call.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    roots = (
+        tuple(path_str(root) for root in allowed_roots),
+        tuple(path_str(root) for root in cache_storage_roots),
+        None if folder is None else path_str(Path(folder).resolve()),
+    )
+    layer_paths = [Path(layer_path) for layer_path in layer_paths]
+    keys = [_layer_arc_cache_key(layer_path, roots) for layer_path in layer_paths]
+    memo = _ResolutionMemo()
+
+    def _collect(layer_path: Path) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        asset_paths = tuple(collect_layer_composition_paths(layer_path))
+        escaping = tuple(find_escaping_layer_paths(
+            asset_paths, layer_path.parent, allowed_roots=allowed_roots,
+            cache_storage_roots=cache_storage_roots, memo=memo, folder=folder,
+        ))
+        return asset_paths, escaping
+
+    arcs = [
+        _LAYER_ARC_CACHE.get(key) if key is not None else None
+        for key in keys
+    ]
+    missing = [index for index, entry in enumerate(arcs) if entry is None]
+    if len(missing) == 1:
+        arcs[missing[0]] = _collect(layer_paths[missing[0]])
+    elif missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for index, entry in zip(missing, pool.map(
+                _collect, [layer_paths[index] for index in missing]
+            )):
+                arcs[index] = entry
+
+    for index in missing:
+        if keys[index] is None:
+            continue
+        _LAYER_ARC_CACHE[keys[index]] = arcs[index]
+        while len(_LAYER_ARC_CACHE) > _LAYER_ARC_CACHE_MAX:
+            del _LAYER_ARC_CACHE[next(iter(_LAYER_ARC_CACHE))]
+
+    return [
+        LayerPathReport(
+            layer_path = layer_path,
+            escaping = escaping,
+            dangling = tuple(find_dangling_layer_paths(
+                asset_paths, layer_path.parent, memo=memo,
+            )),
+        )
+        for layer_path, (asset_paths, escaping) in zip(layer_paths, arcs)
+    ]
+
+
+def _same_file_stamp(src: Path, dest: Path) -> bool:
+    """True if ``dest`` already holds ``src``'s bytes.
+
+    Same size and same ``st_mtime_ns`` count as the same file; a share that
+    keeps coarser mtimes than ``copy2`` wrote falls back to comparing the
+    bytes, so a same-size rewrite within the same second is never missed.
+    """
+    try:
+        src_stat = src.stat()
+        dest_stat = dest.stat()
+    except OSError:
+        return False
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    # Not filecmp.cmp: its cache keys on float mtimes, the very thing in doubt
+    try:
+        with open(src, "rb") as src_file, open(dest, "rb") as dest_file:
+            while True:
+                src_chunk = src_file.read(1 << 20)
+                if src_chunk != dest_file.read(1 << 20):
+                    return False
+                if not src_chunk:
+                    return True
+    except OSError:
+        return False
+
+
+def _copy_if_changed(src: Path, dest: Path) -> bool:
+    """Copy ``src`` to ``dest`` unless it is already there; True if copied.
+
+    ``copy2`` keeps the source mtime, which is what lets a later run
+    recognise the copy by stamp instead of re-transferring it.
+    """
+    import shutil
+    if _same_file_stamp(src, dest):
+        return False
+    shutil.copy2(src, dest)
+    return True
+
+
+def localize_external_sidecars(
+    layer_path: Union[Path, str], skip_roots=(), max_workers: int = 8,
+) -> dict:
+    """Copy the external files ``layer_path``'s arcs point at beside it.
+
+    Layer-level core of ``export_layer._localize_external_sidecars``; needs
+    USD but not Houdini, so it runs against plain ``.usda`` fixtures.
+
+    The reference/payload targets come from one C++ call
+    (``Sdf.Layer.GetCompositionAssetDependencies``) made while the layer's
+    sublayers are set aside — an escaping sublayer is the escaping-path
+    guard's business, not a sidecar, but a reference to the same file still
+    is one — instead of a Python walk over every prim spec. Arcs that
+    resolve to the same file — the same payload authored absolute on one
+    prim and relative on another — share one copy. Copies run on a thread
+    pool and skip a destination that already holds the same bytes, and
+    every arc is rewritten in a single ``UsdUtils.ModifyAssetPaths`` pass.
+
+    Skipped, leaving the arc as authored: URI arcs, files already beside
+    the layer, files under ``skip_roots`` (versioned caches that publish by
+    reference) and missing files (left for the dangling-path guard). A
+    sidecar whose name is taken by a different file gets a ``_<n>``
+    suffix.
+
+    Returns the ``{authored path: sibling name}`` remap that was applied.
+    """
+    from pxr import Sdf
+
+    layer_path = Path(layer_path)
+    layer = Sdf.Layer.FindOrOpen(str(layer_path))
+    if layer is None:
+        return {}
+
+    layer_dir = layer_path.parent
+
+    # Set the sublayers aside, so only reference and payload arcs are
+    # collected and rewritten; they go back before the layer is saved
+    sublayers = list(layer.subLayerPaths)
+    offsets = list(layer.subLayerOffsets)
+    del layer.subLayerPaths[:]
+    try:
+        remap = _localize_arcs(layer, layer_dir, skip_roots, max_workers)
+    finally:
+        layer.subLayerPaths[:] = sublayers
+        for index, offset in enumerate(offsets):
+            layer.subLayerOffsets[index] = offset
+    if remap:
+        layer.Save()
+    return remap
+
+
+def _localize_arcs(layer, layer_dir: Path, skip_roots, max_workers: int) -> dict:
+    """Copy and rewrite the arcs of ``layer``; the core of ``localize_external_sidecars``."""
+    from concurrent.futures import ThreadPoolExecutor
+    from pxr import UsdUtils
+
+    try:
+        layer_root = layer_dir.resolve()
+    except OSError:
+        layer_root = layer_dir
+    skip = []
+    for root in skip_roots:
+        try:
+            skip.append(Path(root).resolve())
+        except OSError:
+            continue
+    try:
+        used_names = {p.name for p in layer_dir.iterdir()}
+    except OSError:
+        used_names = set()
+
+    candidates = sorted(
+        raw for raw in map(str, layer.GetCompositionAssetDependencies())
+        if raw and not _looks_like_uri(raw)
+    )
+
+    # Resolve every candidate once; identical targets share one copy.
+    dest_by_source: dict[Path, str] = {}
+    remap: dict[str, str] = {}
+    for raw in candidates:
+        src = Path(raw)
+        abs_src = src if src.is_absolute() else (layer_dir / src)
+        try:
+            resolved = abs_src.resolve()
+        except OSError:
+            continue
+        if resolved.parent == layer_root:
+            continue  # already a sibling — nothing to do
+        if any(resolved.is_relative_to(root) for root in skip):
+            continue  # versioned cache — published by reference
+        if resolved not in dest_by_source:
+            if not resolved.is_file():
+                continue  # missing — leave for the dangling-path guard
+            dest_name = resolved.name
+            if (
+                dest_name in used_names
+                and not _same_file_stamp(resolved, layer_dir / dest_name)
+            ):
+                stem, suffix = resolved.stem, resolved.suffix
+                n = 1
+                while f"{stem}_{n}{suffix}" in used_names:
+                    n += 1
+                dest_name = f"{stem}_{n}{suffix}"
+            used_names.add(dest_name)
+            dest_by_source[resolved] = dest_name
+        remap[raw] = dest_by_source[resolved]
+
+    if not remap:
+        return {}
+
+    # Copy in parallel; an arc whose copy failed keeps its authored path.
+    failed = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_copy_if_changed, src, layer_dir / dest_name): src
+            for src, dest_name in dest_by_source.items()
+        }
+        for future, src in futures.items():
+            try:
+                future.result()
+            except OSError:
+                logging.warning("Could not localise sidecar %s", src, exc_info=True)
+                failed.add(dest_by_source[src])
+    remap = {
+        raw: dest_name for raw, dest_name in remap.items()
+        if dest_name not in failed
+    }
+    if not remap:
+        return {}
+
+    UsdUtils.ModifyAssetPaths(layer, lambda p: remap.get(p, p))
+    return remap
+
+
 def generate_entity_sublayer_uri(
     entity_uri: Uri,
     variant_name: str,
@@ -10,6 +10,8 @@ module provides the small surface the rest of the pipeline uses:
   to newly published versions by re-resolving loaded entity:// layers
   and reloading the stale ones (see refresh_context's docstring for why
   Ar's own RefreshContext machinery cannot do this)
+- resolver_generation(): a counter that changes whenever resolution
+  results may have (refresh or latest-mode flip), for memoizing resolves
 - a helper that locates the compiled plugin's resources dir for a given
   Houdini major, used when building PXR_PLUGINPATH_NAME for farm tasks
   and other out-of-process launches
@@ -25,6 +27,21 @@ from pathlib import Path
 LATEST_MODE_ENV_VAR = "TH_RESOLVER_LATEST_MODE"
 
 
+_generation = 0
+
+
+def resolver_generation() -> tuple[int, bool]:
+    """Key under which memoized resolution results stay valid.
+
+    Bumped by every refresh that actually runs; paired with the latest
+    mode, which the Rust core reads per resolve. Anything caching what a
+    path resolved to (e.g. ``pipe.usd.analyze_layer_paths``) keys on this
+    so a publish picked up by ``refresh_context`` or a mode flip is never
+    answered from a stale memo.
+    """
+    return _generation, get_latest_mode()
+
+
 def set_latest_mode(enabled: bool) -> None:
     """Toggle "latest" cascade semantics for entity:// resolution."""
     os.environ[LATEST_MODE_ENV_VAR] = "1" if enabled else "0"
@@ -99,6 +116,9 @@ def _reload_stale_entity_layers() -> None:
     import os
     from pxr import Ar, Sdf
 
+    global _generation
+    _generation += 1
+
     def _norm(p: str) -> str:
         return os.path.normcase(os.path.normpath(p))
 
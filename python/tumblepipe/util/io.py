@@ -9,9 +9,8 @@ def load_text(path: Path) -> Optional[str]:
         return file.read()
 
 def store_text(path: Path, data: str):
-    path.parent.mkdir(parents = True, exist_ok = True)
-    with path.open('w') as file:
-        file.write(data)
+    """Write *data* to *path* atomically, like :func:`store_json`."""
+    _store_atomic(path, lambda file: file.write(data))
 
 def load_json(path: Path) -> Optional[dict]:
     if not path.exists(): return None
@@ -28,20 +27,26 @@ def store_json(path: Path, data: dict):
     fully written or untouched — a crash or force-kill mid-write
     cannot leave a truncated file.
     """
+    _store_atomic(path, lambda file: json.dump(data, file, indent = 4))
+
+def _store_atomic(path: Path, write):
+    # mkstemp creates the file 0600; give it the mode a plain open() would
+    # under the usual umask so shared project files stay readable by others.
     import os
     import tempfile
     path.parent.mkdir(parents = True, exist_ok = True)
     fd, tmp = tempfile.mkstemp(
-        suffix = '.json',
+        suffix = path.suffix,
         dir = str(path.parent),
     )
     try:
         with os.fdopen(fd, 'w') as file:
-            json.dump(data, file, indent = 4)
+            write(file)
+        os.chmod(tmp, 0o644)
         os.replace(tmp, str(path))
     except BaseException:
         try:
             os.unlink(tmp)
         except OSError:
             pass
-        raise
\ No newline at end of file
+        raise
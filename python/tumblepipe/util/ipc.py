@@ -16,7 +16,7 @@ class Server:
         self._process = None
     
     async def _on_message(self, reader, writer):
-        message = await reader.read(1024**3)
+        message = await reader.read()
         response = await self._handler(message.decode())
         writer.write(response.encode())
         await writer.drain()
@@ -56,9 +56,12 @@ class Client:
         self._writer = None
     
     async def send(self, message):
+        # One message per connection: the end of the stream ends the message,
+        # so one larger than a single socket read arrives whole
         self._writer.write(message.encode())
         await self._writer.drain()
+        self._writer.write_eof()
     
     async def receive(self):
-        message = await self._reader.read(1024**3)
+        message = await self._reader.read()
         return message.decode()
\ No newline at end of file
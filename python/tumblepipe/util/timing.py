@@ -0,0 +1,328 @@
+"""Per-phase timing for farm tasks.
+
+Farm tasks wrap their work in nested `span` blocks ("husk", "stitch",
+"copy", ...) inside a `timing_report`, which writes one small JSON report
+per task next to the task's receipts, named
+``_timing.<task>.<first>-<last>.json``. Spans are aggregated by their
+nesting path (``render/stitch``): call count, total, min and max seconds,
+and — for spans given a ``frame`` — the seconds per frame. Spans of one path
+may overlap when worker threads open them at once, so the total can exceed
+the task's run time; the wall-clock seconds and the self seconds (those not
+covered by nested spans) merge the overlapping intervals instead, and so
+always fit within it. ``scripts/summarize_task_timings.py`` reads the
+reports of a job and names the phase that dominates it.
+
+Like `tumblepipe.util.progress`, code that runs with no report installed
+pays next to nothing, so library code can open spans unconditionally.
+"""
+
+from contextlib import contextmanager
+from typing import Callable, Optional
+from pathlib import Path
+import threading
+import platform
+import logging
+import json
+import time
+
+REPORT_PREFIX = '_timing'
+
+class TimingReport:
+    """Aggregated spans of one task run.
+
+    Spans nest per thread: a span opened inside another one of the same
+    thread is recorded under its path.
+    """
+
+    def __init__(self, task: str, **meta):
+        self.task = task
+        self.meta = meta
+        self.status = None
+        self.path = None
+        self._started = time.time()
+        self._start = time.perf_counter()
+        self._seconds = None
+        self._spans = dict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list[str]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = list()
+        return stack
+
+    @contextmanager
+    def span(self, name: str, frame: Optional[int] = None):
+        stack = self._stack()
+        path = '/'.join([*stack, name])
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self._add(path, start - self._start, end - self._start, frame)
+
+    def _add(self, path: str, start: float, end: float, frame: Optional[int]):
+        seconds = end - start
+        with self._lock:
+            entry = self._spans.get(path)
+            if entry is None:
+                entry = self._spans[path] = dict(
+                    count = 0,
+                    seconds = 0.0,
+                    min = seconds,
+                    max = seconds,
+                    frames = dict(),
+                    intervals = list()
+                )
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['min'] = min(entry['min'], seconds)
+            entry['max'] = max(entry['max'], seconds)
+            entry['intervals'].append((start, end))
+            if frame is not None:
+                key = str(frame)
+                entry['frames'][key] = entry['frames'].get(key, 0.0) + seconds
+
+    def is_empty(self) -> bool:
+        return len(self._spans) == 0
+
+    def finish(self, status: str = 'ok'):
+        if self._seconds is not None: return
+        self._seconds = time.perf_counter() - self._start
+        if self.status is None: self.status = status
+
+    def to_dict(self) -> dict:
+        seconds = (
+            self._seconds if self._seconds is not None else
+            time.perf_counter() - self._start
+        )
+        with self._lock:
+            spans = {
+                path: dict(entry, intervals = list(entry['intervals']))
+                for path, entry in self._spans.items()
+            }
+
+        # Wall-clock time of each path and of the spans nested in it
+        covered = {
+            path: _merge(entry['intervals'])
+            for path, entry in spans.items()
+        }
+        child_intervals = dict()
+        for path, entry in spans.items():
+            parent = path.rpartition('/')[0]
+            child_intervals.setdefault(parent, list()).extend(entry['intervals'])
+        child_covered = {
+            path: _merge(intervals)
+            for path, intervals in child_intervals.items()
+        }
+        def _self_seconds(path):
+            return _length(covered[path]) - _overlap(
+                covered[path], child_covered.get(path, [])
+            )
+        return dict(
+            task = self.task,
+            meta = self.meta,
+            host = platform.node(),
+            status = self.status,
+            started = round(self._started, 3),
+            seconds = round(seconds, 3),
+            unaccounted_seconds = round(
+                max(0.0, seconds - _length(child_covered.get('', []))), 3
+            ),
+            spans = [
+                dict(
+                    path = path,
+                    count = entry['count'],
+                    seconds = round(entry['seconds'], 3),
+                    wall_seconds = round(_length(covered[path]), 3),
+                    self_seconds = round(max(0.0, _self_seconds(path)), 3),
+                    min = round(entry['min'], 3),
+                    max = round(entry['max'], 3)
+                ) | (
+                    dict(frames = {
+                        frame: round(frame_seconds, 3)
+                        for frame, frame_seconds in entry['frames'].items()
+                    })
+                    if len(entry['frames']) != 0 else dict()
+                )
+                for path, entry in spans.items()
+            ]
+        )
+
+    def write(self, path: Path):
+        path.parent.mkdir(parents = True, exist_ok = True)
+        path.write_text(json.dumps(self.to_dict(), indent = 4))
+
+def _merge(intervals: list[tuple[float, float]]) -> list[tuple[float, float]]:
+    """The union of *intervals*, as sorted disjoint intervals."""
+    merged = list()
+    for start, end in sorted(intervals):
+        if len(merged) != 0 and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            continue
+        merged.append((start, end))
+    return merged
+
+def _length(merged: list[tuple[float, float]]) -> float:
+    return sum(end - start for start, end in merged)
+
+def _overlap(
+    merged_a: list[tuple[float, float]],
+    merged_b: list[tuple[float, float]]
+    ) -> float:
+    """Seconds covered by both of two merged interval lists."""
+    seconds = 0.0
+    index_a = index_b = 0
+    while index_a < len(merged_a) and index_b < len(merged_b):
+        start_a, end_a = merged_a[index_a]
+        start_b, end_b = merged_b[index_b]
+        seconds += max(0.0, min(end_a, end_b) - max(start_a, start_b))
+        if end_a < end_b: index_a += 1
+        else: index_b += 1
+    return seconds
+
+def report_path(
+    directory: Path,
+    task: str,
+    first_frame: int,
+    last_frame: int
+    ) -> Path:
+    return directory / (
+        f'{REPORT_PREFIX}.{task}.'
+        f'{str(first_frame).zfill(4)}-{str(last_frame).zfill(4)}.json'
+    )
+
+_report: Optional[TimingReport] = None
+
+@contextmanager
+def timing_report(task: str, **meta):
+    """Install a `TimingReport` for the block and write it on the way out.
+
+    The report is written to ``report.path`` (set it once the output
+    location is known), and only when a span was recorded — a task that
+    found its outputs already there does not overwrite the report of the
+    run that made them. A failure to write is logged, never raised.
+    """
+    global _report
+    previous = _report
+    report = TimingReport(task, **meta)
+    _report = report
+    try:
+        yield report
+    except BaseException:
+        report.finish('failed')
+        raise
+    finally:
+        _report = previous
+        report.finish()
+        if report.path is not None and not report.is_empty():
+            try:
+                report.write(report.path)
+            except Exception as error:
+                logging.warning(f'Could not write timing report: {error}')
+
+def run_with_report(
+    task: str,
+    report_dir: Path,
+    first_frame: int,
+    last_frame: int,
+    fn: Callable[[], int],
+    **meta
+    ) -> int:
+    """Run a task's *fn* inside a `timing_report` for its frame range.
+
+    The report goes to `report_path` in *report_dir*; *fn* returns the
+    task's exit code, and a non-zero one marks the report failed.
+    """
+    with timing_report(
+        task,
+        first_frame = first_frame,
+        last_frame = last_frame,
+        **meta
+        ) as report:
+        report.path = report_path(report_dir, task, first_frame, last_frame)
+        result = fn()
+        report.status = 'ok' if result == 0 else 'failed'
+    return result
+
+@contextmanager
+def span(name: str, frame: Optional[int] = None):
+    """Time the block as phase *name* of the installed report, if any."""
+    if _report is None:
+        yield
+        return
+    with _report.span(name, frame):
+        yield
+
+def find_reports(paths: list[Path]) -> list[Path]:
+    """Report files among *paths*, searching directories recursively."""
+    result = list()
+    for path in paths:
+        if path.is_dir():
+            result.extend(sorted(path.rglob(f'{REPORT_PREFIX}.*.json')))
+        elif path.is_file():
+            result.append(path)
+    return result
+
+def load_report(path: Path) -> Optional[dict]:
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        logging.warning(f'Unreadable timing report: {path}')
+        return None
+    if not isinstance(data, dict) or 'spans' not in data: return None
+    return data
+
+def summarize(reports: list[dict]) -> dict[str, dict]:
+    """Aggregate reports per task type.
+
+    Returns ``{task: {'runs', 'seconds', 'phases': {path: {...}},
+    'dominant'}}``; phases carry summed ``seconds``/``wall_seconds``/
+    ``self_seconds``, ``count`` and ``share`` (self seconds over task seconds), and the
+    dominant phase is the one with the most self time — where the task's
+    time actually went, not the span that merely encloses it.
+    """
+    result = dict()
+    for report in reports:
+        task = result.setdefault(report.get('task', '?'), dict(
+            runs = 0,
+            failed = 0,
+            seconds = 0.0,
+            phases = dict()
+        ))
+        task['runs'] += 1
+        task['failed'] += int(report.get('status') == 'failed')
+        task['seconds'] += report.get('seconds', 0.0)
+        phases = task['phases']
+        unaccounted = phases.setdefault('(unaccounted)', dict(
+            count = 0, seconds = 0.0, wall_seconds = 0.0, self_seconds = 0.0
+        ))
+        unaccounted['count'] += 1
+        unaccounted['seconds'] += report.get('unaccounted_seconds', 0.0)
+        unaccounted['wall_seconds'] += report.get('unaccounted_seconds', 0.0)
+        unaccounted['self_seconds'] += report.get('unaccounted_seconds', 0.0)
+        for entry in report['spans']:
+            phase = phases.setdefault(entry['path'], dict(
+                count = 0, seconds = 0.0, wall_seconds = 0.0, self_seconds = 0.0
+            ))
+            phase['count'] += entry['count']
+            phase['seconds'] += entry['seconds']
+            # Reports from before wall-clock times only have the sum
+            phase['wall_seconds'] += entry.get('wall_seconds', entry['seconds'])
+            phase['self_seconds'] += entry['self_seconds']
+    for task in result.values():
+        for phase in task['phases'].values():
+            phase['share'] = (
+                phase['self_seconds'] / task['seconds']
+                if task['seconds'] > 0 else 0.0
+            )
+        task['dominant'] = max(
+            task['phases'].keys(),
+            key = lambda path: task['phases'][path]['self_seconds'],
+            default = None
+        )
+    return result
@@ -0,0 +1,204 @@
+"""Copying farm task outputs to and from the shares.
+
+Farm tasks used to move their frames with ``shutil.copyfile`` loops: one
+file at a time, a failed task on any transient SMB error, and a reader of
+the share could see a half-written frame. `copy_file` and `copy_files`
+replace those loops:
+
+- the copy goes to a ``.<name>.partial`` file beside the target and is
+  renamed into place, so a target is either the old file or the whole new one;
+- it uses ``os.copy_file_range`` (which lets an NFS or SMB server copy
+  server-side) or ``os.sendfile`` where the platform has them, else reads
+  and writes in ``BUFFER_SIZE`` blocks;
+- a failed attempt is retried ``TH_TRANSFER_RETRIES`` times (default 3),
+  backing off from ``BACKOFF_SECONDS``;
+- with ``verify`` (or ``TH_TRANSFER_VERIFY=1``) the written file is read
+  back and its checksum compared with the source's;
+- `copy_files` runs ``TH_TRANSFER_WORKERS`` (default 4) copies at a time.
+
+Every copy can add itself to a `TransferStats`, for the files, bytes,
+retries and throughput a task reports.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from pathlib import Path
+import threading
+import platform
+import hashlib
+import logging
+import shutil
+import time
+import os
+
+WORKERS_ENV = 'TH_TRANSFER_WORKERS'
+DEFAULT_WORKERS = 4
+
+RETRIES_ENV = 'TH_TRANSFER_RETRIES'
+DEFAULT_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+VERIFY_ENV = 'TH_TRANSFER_VERIFY'
+
+BUFFER_SIZE = 8 * 1024 * 1024
+
+PARTIAL_SUFFIX = '.partial'
+
+class TransferError(OSError):
+    """A copy that completed but does not match its source."""
+
+@dataclass
+class TransferStats:
+    files: int = 0
+    bytes: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    started: float = field(default_factory = time.time)
+    _lock: threading.Lock = field(default_factory = threading.Lock, repr = False)
+
+    def add(self, size: int, seconds: float, retries: int = 0):
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.retries += retries
+            self.seconds += seconds
+
+    def rate(self) -> float:
+        """Bytes per second of wall time since the stats were made."""
+        elapsed = time.time() - self.started
+        if elapsed <= 0: return 0.0
+        return self.bytes / elapsed
+
+    def summary(self) -> str:
+        return (
+            f'{self.files} files, {self.bytes / 1024 ** 2:.1f}MB '
+            f'at {self.rate() / 1024 ** 2:.1f}MB/s'
+            + (f', {self.retries} retries' if self.retries else '')
+        )
+
+def _workers() -> int:
+    value = os.environ.get(WORKERS_ENV)
+    if value: return max(1, int(value))
+    return DEFAULT_WORKERS
+
+def _retries() -> int:
+    value = os.environ.get(RETRIES_ENV)
+    if value: return max(0, int(value))
+    return DEFAULT_RETRIES
+
+def _verify() -> bool:
+    return os.environ.get(VERIFY_ENV) == '1'
+
+def partial_path(target_path: Path) -> Path:
+    """The temp name *target_path* is written to before the rename."""
+    return target_path.with_name(f'.{target_path.name}{PARTIAL_SUFFIX}')
+
+def file_checksum(path: Path) -> str:
+    hasher = hashlib.blake2b(digest_size = 16)
+    with path.open('rb') as file:
+        while True:
+            chunk = file.read(BUFFER_SIZE)
+            if not chunk: break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _copy_range(source_file, target_file, size: int) -> bool:
+    """Copy with a kernel call; False when none applies to these files."""
+    source_fd, target_fd = source_file.fileno(), target_file.fileno()
+    copy_call = None
+    if hasattr(os, 'copy_file_range'):
+        copy_call = lambda offset: os.copy_file_range(
+            source_fd, target_fd, min(BUFFER_SIZE, size - offset)
+        )
+    elif hasattr(os, 'sendfile') and platform.system() == 'Linux':
+        copy_call = lambda offset: os.sendfile(
+            target_fd, source_fd, offset, min(BUFFER_SIZE, size - offset)
+        )
+    if copy_call is None: return False
+    offset = 0
+    try:
+        while offset < size:
+            sent = copy_call(offset)
+            if sent == 0:
+                # Some file systems copy nothing instead of refusing
+                if offset == 0: return False
+                raise TransferError(f'Copy stopped at {offset} of {size} bytes')
+            offset += sent
+    except OSError:
+        # Not supported between these file systems; start over in user space
+        if offset != 0: raise
+        return False
+    return True
+
+def _copy_once(source_path: Path, target_path: Path):
+    size = source_path.stat().st_size
+    with source_path.open('rb') as source_file, target_path.open('wb') as target_file:
+        if _copy_range(source_file, target_file, size): return
+        shutil.copyfileobj(source_file, target_file, BUFFER_SIZE)
+
+def copy_file(
+    source_path: Path,
+    target_path: Path,
+    verify: Optional[bool] = None,
+    retries: Optional[int] = None,
+    stats: Optional[TransferStats] = None
+    ) -> int:
+    """Copy *source_path* to *target_path* atomically; returns the bytes copied.
+
+    *verify* and *retries* default to ``TH_TRANSFER_VERIFY`` and
+    ``TH_TRANSFER_RETRIES``. A missing source is raised at once; other errors
+    are retried, and raised when the retries are used up.
+    """
+    verify = _verify() if verify is None else verify
+    retries = _retries() if retries is None else retries
+    target_path.parent.mkdir(parents = True, exist_ok = True)
+    temp_path = partial_path(target_path)
+    start = time.time()
+    attempt = 0
+    while True:
+        try:
+            _copy_once(source_path, temp_path)
+            size = temp_path.stat().st_size
+            if size != source_path.stat().st_size:
+                raise TransferError(f'Copied {size} bytes of {source_path}')
+            if verify and file_checksum(temp_path) != file_checksum(source_path):
+                raise TransferError(f'Checksum mismatch copying {source_path}')
+            os.replace(temp_path, target_path)
+            break
+        except OSError as error:
+            temp_path.unlink(missing_ok = True)
+            if isinstance(error, FileNotFoundError) and not source_path.exists(): raise
+            if attempt >= retries: raise
+            logging.warning(f'Copy to {target_path} failed ({error}); retrying')
+        time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+        attempt += 1
+    if stats is not None:
+        stats.add(size, time.time() - start, attempt)
+    return size
+
+def copy_files(
+    pairs: Iterable[tuple[Path, Path]],
+    workers: Optional[int] = None,
+    verify: Optional[bool] = None,
+    retries: Optional[int] = None,
+    stats: Optional[TransferStats] = None
+    ) -> TransferStats:
+    """Copy each (source, target) pair with `copy_file`, several at a time.
+
+    Every copy is attempted; the first error is raised once they are done.
+    Returns *stats*, or new stats for these copies.
+    """
+    stats = TransferStats() if stats is None else stats
+    pairs = list(pairs)
+    if len(pairs) == 0: return stats
+    workers = min(_workers() if workers is None else workers, len(pairs))
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        futures = [
+            executor.submit(copy_file, source_path, target_path, verify, retries, stats)
+            for source_path, target_path in pairs
+        ]
+    for future in futures:
+        error = future.exception()
+        if error is not None: raise error
+    return stats
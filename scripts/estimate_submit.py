@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Estimate a Submit Jobs batch without submitting it.
+
+Takes the entity configurations the Submit Jobs dialog hands to
+``batch_submit.submit_all`` (a JSON list, one entry per entity), builds every
+batch as a real submit would, and prints what it would cost: tasks, frames,
+farm hours from task history, job data and output bytes (see
+``tumblepipe.farm.estimate``). Nothing is submitted and Deadline is never
+contacted; it needs the usual ``TH_*`` project environment:
+
+    python scripts/estimate_submit.py <configs.json> [--json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from tumblepipe.farm.jobs.houdini.batch_submit import submit_entities  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('configs', type=Path)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    configs = json.loads(args.configs.read_text())
+    results = submit_entities(configs, dry_run=True)
+
+    failed = [result for result in results if result.error is not None]
+    if args.json:
+        print(json.dumps([
+            dict(
+                entity=result.entity_uri,
+                error=result.error,
+                estimate=(
+                    result.estimate.to_dict()
+                    if result.estimate is not None else None
+                ),
+            )
+            for result in results
+        ], indent=4))
+    else:
+        for result in results:
+            if result.error is not None:
+                print(f'{result.entity_uri}: failed: {result.error}')
+            elif result.estimate is not None:
+                print(result.estimate.format())
+            else:
+                print(f'{result.entity_uri}: nothing to submit')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""A stand-in ``deadlinecommand`` for exercising ``tumblepipe.apps.deadline``
+without a Deadline repository.
+
+Point the wrapper at it through ``TH_DEADLINE_COMMAND`` and give it a state
+directory through ``TH_FAKE_DEADLINE_ROOT`` (defaults to a folder in the
+system tempdir):
+
+    export TH_DEADLINE_COMMAND=$PWD/scripts/fake_deadlinecommand.py
+    export TH_FAKE_DEADLINE_ROOT=/tmp/th_fake_deadline
+
+Submitted jobs are kept in ``jobs.json`` under the state directory, one task
+per frame chunk, and every invocation is appended to ``calls.log`` so a
+harness can count how many ``deadlinecommand`` processes a code path starts.
+Set ``TH_FAKE_DEADLINE_NO_MULTI=1`` to emulate a Deadline without
+``-SubmitMultipleJobs`` (the call prints an error and submits nothing), and
+``TH_FAKE_DEADLINE_NO_FILTER=1`` for one without the ``*Filter`` queries.
+
+Supported commands: ``GetRepositoryPath``, ``Pools``, ``Groups``,
+``GetJobs``, ``GetJobsFilter <key=value...>``, ``GetJobIds``,
+``GetJobIdsFilter <key=value...>``, ``GetJob <ids>``, ``GetJobTasks <id>``,
+``SuspendJob``/``ResumeJob``/``CompleteJob <ids>``, ``DeleteJob <id>``, ``SuspendJobTasks``/``ResumeJobTasks <id> <task ids>``,
+``<job info> <plugin info>`` and
+``-SubmitMultipleJobs [-dependent] -job <job info> <plugin info> ...``.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+POOLS = ['none', 'general', 'render']
+GROUPS = ['none', 'houdini', 'karma', 'ffmpeg']
+
+
+def state_root() -> Path:
+    root = os.environ.get('TH_FAKE_DEADLINE_ROOT')
+    path = (
+        Path(root) if root else
+        Path(tempfile.gettempdir()) / 'th_fake_deadline'
+    )
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def load_jobs(root: Path) -> list[dict]:
+    path = root / 'jobs.json'
+    if not path.exists():
+        return []
+    return json.loads(path.read_text())
+
+
+def store_jobs(root: Path, jobs: list[dict]) -> None:
+    path = root / 'jobs.json'
+    temp_path = path.with_suffix('.tmp')
+    temp_path.write_text(json.dumps(jobs, indent=2))
+    temp_path.replace(path)
+
+
+def read_key_value(path: str) -> dict:
+    result = {}
+    for line in Path(path).read_text().splitlines():
+        if '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        result[key] = value
+    return result
+
+
+def parse_frames(frames: str) -> list[int]:
+    result = []
+    for part in frames.split(','):
+        part = part.strip()
+        if len(part) == 0:
+            continue
+        step = 1
+        if 'x' in part:
+            part, raw_step = part.split('x', 1)
+            step = int(raw_step)
+        if '-' in part:
+            first, last = part.split('-', 1)
+            result.extend(range(int(first), int(last) + 1, step))
+        else:
+            result.append(int(part))
+    return result
+
+
+def create_job(jobs: list[dict], job_info_path: str, plugin_info_path: str) -> dict:
+    job_info = read_key_value(job_info_path)
+    read_key_value(plugin_info_path)
+    frames = parse_frames(job_info.get('Frames', '1'))
+    chunk_size = max(1, int(job_info.get('ChunkSize', '1')))
+    known_ids = {job['JobID'] for job in jobs}
+    dependencies = [
+        dep for dep in job_info.get('JobDependencies', '').split(',')
+        if len(dep) != 0
+    ]
+    for dep in dependencies:
+        if dep not in known_ids:
+            raise ValueError(f'Unknown dependency job id: {dep}')
+    status = 'Pending' if dependencies else job_info.get('InitialStatus', 'Active')
+    job = {
+        'JobID': uuid.uuid4().hex[:24],
+        'Name': job_info.get('Name', ''),
+        'BatchName': job_info.get('BatchName', ''),
+        'UserName': job_info.get('UserName', ''),
+        'Pool': job_info.get('Pool', ''),
+        'Group': job_info.get('Group', ''),
+        'Status': status,
+        'JobDependencies': ','.join(dependencies),
+        'Frames': job_info.get('Frames', '1'),
+        'Tasks': [
+            {
+                'TaskID': str(index),
+                'Frames': ','.join(map(str, frames[start:start + chunk_size])),
+                'Status': 'Queued' if status == 'Active' else status,
+            }
+            for index, start in enumerate(range(0, len(frames), chunk_size))
+        ],
+    }
+    jobs.append(job)
+    return job
+
+
+def print_blocks(items: list[dict]) -> None:
+    for item in items:
+        for key, value in item.items():
+            if isinstance(value, list):
+                continue
+            print(f'{key}={value}')
+        print()
+
+
+def print_submission(job: dict) -> None:
+    print('Result=Success')
+    print(f'JobID={job["JobID"]}')
+    print('The job was submitted successfully.')
+    print()
+
+
+def submit_multiple(root: Path, args: list[str]) -> int:
+    if os.environ.get('TH_FAKE_DEADLINE_NO_MULTI') == '1':
+        print('Error: Unrecognized command line argument: -SubmitMultipleJobs')
+        return 1
+    dependent = '-dependent' in args
+    pairs = []
+    index = 0
+    while index < len(args):
+        if args[index] == '-job':
+            pairs.append((args[index + 1], args[index + 2]))
+            index += 3
+            continue
+        index += 1
+    jobs = load_jobs(root)
+    previous = None
+    for job_info_path, plugin_info_path in pairs:
+        job = create_job(jobs, job_info_path, plugin_info_path)
+        if dependent and previous is not None:
+            job['JobDependencies'] = ','.join(filter(None, [
+                job['JobDependencies'], previous['JobID']
+            ]))
+            job['Status'] = 'Pending'
+        print_submission(job)
+        previous = job
+    store_jobs(root, jobs)
+    return 0
+
+
+def set_status(root: Path, job_ids: list[str], status: str) -> int:
+    task_status = {'Active': 'Queued'}.get(status, status)
+    jobs = load_jobs(root)
+    for job in jobs:
+        if job['JobID'] not in job_ids:
+            continue
+        job['Status'] = status
+        for task in job['Tasks']:
+            task['Status'] = task_status
+    store_jobs(root, jobs)
+    return 0
+
+
+def set_task_status(root: Path, job_id: str, task_ids: list[str], status: str) -> int:
+    jobs = load_jobs(root)
+    for job in jobs:
+        if job['JobID'] != job_id:
+            continue
+        for task in job['Tasks']:
+            if task['TaskID'] in task_ids:
+                task['Status'] = status
+    store_jobs(root, jobs)
+    return 0
+
+
+def filter_jobs(jobs: list[dict], args: list[str]) -> list[dict]:
+    filters = dict(arg.split('=', 1) for arg in args if '=' in arg)
+    return [
+        job for job in jobs
+        if all(job.get(key) == value for key, value in filters.items())
+    ]
+
+
+def main(args: list[str]) -> int:
+    root = state_root()
+    with (root / 'calls.log').open('a') as log_file:
+        log_file.write(json.dumps(args) + '\n')
+
+    if len(args) == 0:
+        print('Usage: deadlinecommand <command> [args]')
+        return 1
+    command, rest = args[0], args[1:]
+    if command == 'GetRepositoryPath':
+        print(root / 'repository')
+        return 0
+    if command == 'Pools':
+        print('\n'.join(POOLS))
+        return 0
+    if command == 'Groups':
+        print('\n'.join(GROUPS))
+        return 0
+    if command == 'GetJobs':
+        print_blocks(load_jobs(root))
+        return 0
+    if command in ('GetJobsFilter', 'GetJobIdsFilter'):
+        if os.environ.get('TH_FAKE_DEADLINE_NO_FILTER') == '1':
+            print(f'Error: Unrecognized command: {command}')
+            return 1
+        jobs = filter_jobs(load_jobs(root), rest)
+        if command == 'GetJobsFilter':
+            print_blocks(jobs)
+        else:
+            print('\n'.join(job['JobID'] for job in jobs))
+        return 0
+    if command == 'GetJobIds':
+        print('\n'.join(job['JobID'] for job in load_jobs(root)))
+        return 0
+    if command == 'GetJob':
+        job_ids = rest[0].split(',')
+        print_blocks([job for job in load_jobs(root) if job['JobID'] in job_ids])
+        return 0
+    if command == 'GetJobTasks':
+        for job in load_jobs(root):
+            if job['JobID'] == rest[0]:
+                print_blocks(job['Tasks'])
+                return 0
+        print(f'Error: job {rest[0]} not found')
+        return 1
+    if command in ('SuspendJob', 'ResumeJob', 'CompleteJob'):
+        status = {
+            'SuspendJob': 'Suspended',
+            'ResumeJob': 'Active',
+            'CompleteJob': 'Completed',
+        }[command]
+        return set_status(root, rest[0].split(','), status)
+    if command == 'DeleteJob':
+        store_jobs(root, [
+            job for job in load_jobs(root)
+            if job['JobID'] != rest[0]
+        ])
+        return 0
+    if command in ('SuspendJobTasks', 'ResumeJobTasks'):
+        status = 'Suspended' if command == 'SuspendJobTasks' else 'Queued'
+        return set_task_status(root, rest[0], rest[1].split(','), status)
+    if command == '-SubmitMultipleJobs':
+        return submit_multiple(root, rest)
+    if len(args) >= 2 and Path(args[0]).is_file():
+        jobs = load_jobs(root)
+        job = create_job(jobs, args[0], args[1])
+        store_jobs(root, jobs)
+        print_submission(job)
+        return 0
+    print(f'Error: Unrecognized command: {command}')
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Delete job data blobs that no Deadline job refers to any more.
+
+``Deadline.submit`` stores job data content-addressed under
+``<jobs root>/_blobs`` (see ``tumblepipe.apps.job_data``). Blobs outlive
+the job dirs linking to them; once old job dirs have been cleaned up, this
+removes the blobs no remaining job manifest or hardlink references.
+
+Dry-run by default:
+
+    python scripts/gc_job_blobs.py <jobs_root>
+    python scripts/gc_job_blobs.py <jobs_root> --delete [--grace-hours 24]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from tumblepipe.apps.job_data import collect_unreferenced_blobs  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('jobs_root', type=Path)
+    parser.add_argument('--delete', action='store_true')
+    parser.add_argument('--grace-hours', type=float, default=24.0)
+    args = parser.parse_args()
+
+    if not args.jobs_root.is_dir():
+        print(f'Jobs root not found: {args.jobs_root}')
+        return 1
+
+    count, size = collect_unreferenced_blobs(
+        args.jobs_root,
+        grace_seconds=args.grace_hours * 60 * 60,
+        dry_run=not args.delete,
+    )
+    verb = 'Deleted' if args.delete else 'Would delete'
+    print(f'{verb} {count} unreferenced blob(s), {size / (1 << 20):.1f} MiB')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
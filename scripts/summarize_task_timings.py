@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Summarize farm task timing reports and name the dominant phase.
+
+Farm tasks write a ``_timing.<task>.<first>-<last>.json`` report next to
+their receipts (see ``tumblepipe.util.timing``). Point this at report files
+or at directories holding them (searched recursively) — e.g. a render
+version dir — to see, per task type, where the time went:
+
+    python scripts/summarize_task_timings.py <path> [<path> ...] [--json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from tumblepipe.util.timing import find_reports, load_report, summarize  # noqa: E402
+
+
+def _print_summary(summary):
+    for task_name, task in sorted(summary.items()):
+        print(
+            f'{task_name}: {task["runs"]} run(s), {task["failed"]} failed, '
+            f'{task["seconds"]:.1f}s total, dominant phase: {task["dominant"]}'
+        )
+        phases = sorted(
+            task['phases'].items(),
+            key=lambda item: item[1]['self_seconds'],
+            reverse=True,
+        )
+        for path, phase in phases:
+            print(
+                f'  {path:<40} {phase["self_seconds"]:>10.1f}s self '
+                f'{phase["wall_seconds"]:>10.1f}s wall '
+                f'{phase["seconds"]:>10.1f}s total '
+                f'{phase["share"] * 100:>5.1f}%  x{phase["count"]}'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('paths', type=Path, nargs='+')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    reports = list(filter(None, map(load_report, find_reports(args.paths))))
+    if len(reports) == 0:
+        print('No timing reports found')
+        return 1
+
+    summary = summarize(reports)
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        _print_summary(summary)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Verify task cost estimates and adaptive chunk sizes against throwaway history.
+
+Pins the contract of ``tumblepipe.farm.task_stats``: ``estimate_cost`` fits
+a per-task overhead and a per-frame cost to the task history when it holds
+tasks of different lengths and falls back to the median seconds per frame
+otherwise; ``adaptive_batch_size`` keeps the static size without history
+and otherwise sizes chunks for the target duration, within the project's
+batch size range; and the render job builder only sizes adaptively when
+the batch size is the project default or the setting asks for it.
+
+Needs neither Deadline, Houdini nor project data — it runs against a copy
+of the project template:
+
+    python scripts/verify_adaptive_batch_size.py
+
+Checks:
+  1. No history: no estimate, and the static size is kept.
+  2. One task length: the median seconds per frame, with no overhead.
+  3. Tasks of different lengths: the least-squares overhead and per-frame cost.
+  4. A fit with negative overhead falls back to the median.
+  5. Only the latest samples are fitted.
+  6. The adaptive size fills the target duration, clamped to [1, max].
+  7. The render builder sizes adaptively only for the default or when asked.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+ENTITY = "entity:/shots/seq010/shot010"
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def close(a, b):
+    return abs(a - b) < 1e-6
+
+
+def samples(task_stats, *pairs):
+    return [
+        task_stats.TaskSample(frames=frames, seconds=seconds, time=0.0)
+        for frames, seconds in pairs
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_adaptive_batch_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ["TH_TASK_STATS_PATH"] = str(temp / "task_stats")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        os.environ.pop("TH_CHUNK_TARGET_SECONDS", None)
+
+        from tumblepipe.config import get_batch_size_range
+        from tumblepipe.farm import task_stats
+        from tumblepipe.farm.jobs.houdini import _render_build
+
+        min_size, max_size, default_size = get_batch_size_range()
+
+        # 1. No history
+        check(
+            "no history keeps the static size",
+            task_stats.estimate_cost([]) is None
+            and task_stats.adaptive_batch_size(ENTITY, "lighting", "render", 7) == 7,
+        )
+
+        # 2. One task length
+        model = task_stats.estimate_cost(samples(task_stats, (5, 50), (5, 60), (5, 100)))
+        check(
+            "one task length uses the median",
+            model is not None and model.overhead_seconds == 0.0
+            and close(model.seconds_per_frame, 12.0) and model.samples == 3,
+            str(model),
+        )
+
+        # 3. Least squares: 30s overhead + 6s per frame
+        model = task_stats.estimate_cost(
+            samples(task_stats, *[(frames, 30 + 6 * frames) for frames in (2, 4, 8, 10)])
+        )
+        check(
+            "different lengths fit overhead and per-frame cost",
+            model is not None and close(model.overhead_seconds, 30.0)
+            and close(model.seconds_per_frame, 6.0),
+            str(model),
+        )
+
+        # 4. Degenerate fit: longer tasks cost more per frame than the line
+        # through them allows (negative overhead)
+        model = task_stats.estimate_cost(samples(task_stats, (2, 2), (10, 100)))
+        check(
+            "negative overhead falls back to the median",
+            model is not None and model.overhead_seconds == 0.0
+            and close(model.seconds_per_frame, (1.0 + 10.0) / 2),
+            str(model),
+        )
+
+        # 5. History window: old light tasks, then HISTORY_SIZE heavy ones
+        for _ in range(5):
+            task_stats.record_task(ENTITY, "lighting", "window", 10, 10)
+        for frames in (2, 4, 8, 10) * (task_stats.HISTORY_SIZE // 4):
+            task_stats.record_task(ENTITY, "lighting", "window", frames, 60 + 12 * frames)
+        window = task_stats.load_samples(ENTITY, "lighting", "window")
+        model = task_stats.estimate_cost(window)
+        check(
+            "only the latest samples are fitted",
+            len(window) == task_stats.HISTORY_SIZE
+            and model is not None and close(model.overhead_seconds, 60.0)
+            and close(model.seconds_per_frame, 12.0),
+            str(model),
+        )
+
+        # 6. Target duration: (1200 - 60) / 12 = 95 frames
+        sized = task_stats.adaptive_batch_size(
+            ENTITY, "lighting", "window", 10, target_seconds=1200
+        )
+        clamped = task_stats.adaptive_batch_size(
+            ENTITY, "lighting", "window", 10, target_seconds=1200, max_size=50
+        )
+        tiny = task_stats.adaptive_batch_size(
+            ENTITY, "lighting", "window", 10, target_seconds=30
+        )
+        os.environ["TH_CHUNK_TARGET_SECONDS"] = "300"
+        from_env = task_stats.adaptive_batch_size(ENTITY, "lighting", "window", 10)
+        os.environ.pop("TH_CHUNK_TARGET_SECONDS")
+        check(
+            "adaptive size fills the target, clamped",
+            sized == 95 and clamped == 50 and tiny == 1
+            and from_env == 20
+            and task_stats.adaptive_batch_size(ENTITY, "lighting", "window", 0) == 0,
+            f"{sized}, {clamped}, {tiny}, {from_env}",
+        )
+
+        # 7. Render builder. 30s overhead + 6s per frame for the render key,
+        # so a 20 minute task is 195 frames, clamped to the range's max.
+        for frames in (2, 4, 8, 10):
+            task_stats.record_task(ENTITY, "lighting", "render", frames, 30 + 6 * frames)
+        adaptive_size = min(195, max_size)
+        render_settings_path = temp / "render_settings.json"
+        render_settings_path.write_text('{"aov_names": ["beauty"]}')
+        built = []
+        render_task = types.ModuleType("tumblepipe.farm.tasks.render.task")
+        render_task.build = lambda config, paths, staging_path: built.append(config) or "task"
+
+        def build(batch_size, adaptive=None):
+            settings = dict(
+                purpose="render",
+                pool_name="none",
+                variant_name="default",
+                render_department_name="render",
+                render_settings_path=str(render_settings_path),
+                input_path=str(temp / "stage.usda"),
+                first_frame=1,
+                last_frame=100,
+                step_size=1,
+                batch_size=batch_size,
+            )
+            if adaptive is not None:
+                settings["adaptive_batch_size"] = adaptive
+            config = dict(entity=dict(uri=ENTITY, department="lighting"), settings=settings)
+            _render_build.build_full_render_job(
+                config, dict(), temp / "staging", None,
+                render_task=render_task, priority=50, render_task_extra=dict(),
+            )
+            return built[-1]["batch_size"]
+
+        custom_size = default_size + 1 if default_size + 1 <= max_size else default_size - 1
+        sizes = dict(
+            default=build(default_size),
+            custom=build(custom_size),
+            custom_adaptive=build(custom_size, adaptive=True),
+            default_static=build(default_size, adaptive=False),
+        )
+        check(
+            "render builder sizes adaptively only for the default or when asked",
+            sizes == dict(
+                default=adaptive_size,
+                custom=custom_size,
+                custom_adaptive=adaptive_size,
+                default_static=default_size,
+            )
+            and built[-1]["stats"] == dict(
+                entity=ENTITY, department="lighting", job_type="render"
+            ),
+            f"{sizes} (range {min_size}-{max_size}, default {default_size})",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Verify config snapshots against a throwaway copy of the project template.
+
+Pins the contract of ``tumblepipe.config.snapshot``: a snapshot freezes the
+purpose trees, the resolved properties of the given entities and the
+convention sources; a client built from it with ``TH_CONFIG_SNAPSHOT`` reads
+the same config without touching ``_config/``, and refuses to write.
+
+Needs neither Houdini nor project data:
+
+    python scripts/verify_config_snapshot.py
+
+Checks:
+  1. The snapshot holds every db purpose and the entity's ancestors.
+  2. A snapshot client resolves the same properties as the live one.
+  3. With ``_config`` removed, the snapshot client still builds and reads.
+  4. A relative TH_CONFIG_SNAPSHOT resolves against TH_FARM_DATA.
+  5. Writes raise ReadOnlyConfigError.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_config_snapshot_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        config_path = project_path / "_config"
+        pipeline_path = temp / "pipeline"
+        shutil.copytree(
+            TEMPLATE_CONFIG, config_path,
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        pipeline_path.mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(pipeline_path)
+        os.environ["TH_CONFIG_PATH"] = str(config_path)
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+
+        from tumblepipe import api as api_module
+        from tumblepipe.util.uri import Uri
+        from tumblepipe.config.snapshot import (
+            SNAPSHOT_NAME,
+            ReadOnlyConfigError,
+            create_snapshot,
+            write_snapshot,
+        )
+
+        live = api_module.default_client()
+        entity_uri = Uri.parse_unsafe("entity:/shots")
+        shot_uri = entity_uri / "seq010"
+        live.config.add_entity(shot_uri, dict())
+        data_path = temp / "data"
+        snapshot = create_snapshot([shot_uri], live)
+        write_snapshot(data_path / SNAPSHOT_NAME, snapshot)
+
+        # 1. Contents
+        check(
+            "every purpose frozen",
+            sorted(snapshot["purposes"]) == live.config.purposes(),
+            str(sorted(snapshot["purposes"])),
+        )
+        check(
+            "entity and ancestors resolved",
+            {"entity:/", str(entity_uri), str(shot_uri)} <= set(snapshot["properties"]),
+            str(sorted(snapshot["properties"])),
+        )
+        live_properties = live.config.get_properties(shot_uri)
+        live_departments = live.config.list_entity_uris(
+            Uri.parse_unsafe("departments:/"), closure=True
+        )
+
+        # 2-4. Snapshot client, with the live config gone
+        shutil.rmtree(config_path / "db")
+        for name in ("naming_convention.py", "storage_convention.py"):
+            (config_path / name).unlink()
+        os.environ["TH_CONFIG_SNAPSHOT"] = SNAPSHOT_NAME
+        os.environ["TH_FARM_DATA"] = str(data_path)
+        api_module.reset_default_client()
+        try:
+            frozen = api_module.default_client()
+        except Exception as error:
+            check("snapshot client builds without _config", False, repr(error))
+            return 1
+        check("snapshot client builds without _config", True)
+        check(
+            "same resolved properties",
+            frozen.config.get_properties(shot_uri) == live_properties,
+        )
+        check(
+            "same entity listing",
+            frozen.config.list_entity_uris(
+                Uri.parse_unsafe("departments:/"), closure=True
+            ) == live_departments,
+        )
+        check(
+            "storage convention loaded from the snapshot",
+            frozen.storage.resolve(Uri.parse_unsafe("project:/x"))
+            == project_path / "x",
+        )
+
+        # 5. Read-only
+        try:
+            frozen.config.add_entity(Uri.parse_unsafe("entity:/shots/seq020"), dict())
+            check("writes refused", False, "add_entity succeeded")
+        except ReadOnlyConfigError:
+            check("writes refused", True)
+
+        api_module.reset_default_client()
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Verify multi-job Deadline submission against the fake deadlinecommand.
+
+Pins the contract of ``tumblepipe.apps.deadline.Deadline.submit``: a batch is
+submitted one dependency level per ``-SubmitMultipleJobs`` call, in-batch
+dependencies reach Deadline as real job ids, and a Deadline without multi-job
+support falls back to one call per job with the same result.
+
+Needs neither Deadline nor project data — it drives
+``scripts/fake_deadlinecommand.py`` in a throwaway tempdir:
+
+    python scripts/verify_deadline_multi_submit.py
+
+Checks:
+  1. Multi-job mode starts one submit process per dependency level.
+  2. Per-job mode (``multiple_jobs=False``) starts one per job.
+  3. A Deadline rejecting ``-SubmitMultipleJobs`` falls back to per-job.
+  4. In every mode each job depends on exactly the ids of its batch deps.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def make_batch(deadline, script_path, entities):
+    """Shot-submit shaped batch: a chain per entity plus one notify job."""
+    batch = deadline.Batch("verify multi submit")
+    stages = ["export", "stage", "render", "denoise", "mp4"]
+    expected = {}
+    last_jobs = []
+    for entity in range(entities):
+        previous = None
+        for stage in stages:
+            job = deadline.Job(script_path, None, stage)
+            job.name = f"{entity:03d} {stage}"
+            job.pool = "general"
+            job.group = "houdini"
+            index = batch.add_job(job)
+            expected[job.name] = set() if previous is None else {previous}
+            if previous is not None:
+                batch.add_dep(index, previous[0])
+            previous = (index, job.name)
+        last_jobs.append(previous)
+    notify = deadline.Job(script_path, None, "notify")
+    notify.name = "notify"
+    notify.pool = "general"
+    notify.group = "houdini"
+    index = batch.add_job(notify)
+    for last in last_jobs:
+        batch.add_dep(index, last[0])
+    expected["notify"] = set(last_jobs)
+    return batch, {
+        name: {dep_name for _, dep_name in deps}
+        for name, deps in expected.items()
+    }
+
+
+def submit(deadline, state_root, jobs_root, script_path, entities, **kwargs):
+    os.environ["TH_FAKE_DEADLINE_ROOT"] = str(state_root)
+    batch, expected = make_batch(deadline, script_path, entities)
+    job_ids = deadline.Deadline().submit(batch, jobs_root, **kwargs)
+    calls = [
+        json.loads(line)
+        for line in (state_root / "calls.log").read_text().splitlines()
+    ]
+    submit_calls = [
+        call for call in calls
+        if call[0] == "-SubmitMultipleJobs" or call[0].endswith(".job")
+    ]
+    jobs = json.loads((state_root / "jobs.json").read_text())
+    return job_ids, submit_calls, jobs, expected
+
+
+def dependencies_match(jobs, expected):
+    names = {job["JobID"]: job["Name"] for job in jobs}
+    actual = {
+        job["Name"]: {
+            names[dep] for dep in job["JobDependencies"].split(",") if dep
+        }
+        for job in jobs
+    }
+    return actual == expected
+
+
+def main():
+    entities = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    with tempfile.TemporaryDirectory(prefix="th_deadline_verify_") as temp_dir:
+        temp = Path(temp_dir)
+        script_path = temp / ".hpm/packages/tumblepipe@0.0.0/task.py"
+        script_path.parent.mkdir(parents=True)
+        script_path.write_text("")
+        os.environ["TH_DEADLINE_COMMAND"] = str(ROOT / "fake_deadlinecommand.py")
+        os.environ.pop("TH_FAKE_DEADLINE_NO_MULTI", None)
+
+        from tumblepipe.apps import deadline
+
+        job_count = entities * 5 + 1
+        cases = [
+            ("multi", {}, 6),
+            ("per-job", {"multiple_jobs": False}, job_count),
+            ("fallback", {}, 1 + job_count),
+        ]
+        for label, kwargs, expected_calls in cases:
+            if label == "fallback":
+                os.environ["TH_FAKE_DEADLINE_NO_MULTI"] = "1"
+            state_root = temp / label
+            jobs_root = temp / f"{label}_jobs"
+            job_ids, calls, jobs, expected = submit(
+                deadline, state_root, jobs_root, script_path, entities, **kwargs
+            )
+            check(
+                f"{label}: {job_count} jobs submitted",
+                len(job_ids) == job_count and len(jobs) == job_count,
+                f"{len(job_ids)} ids, {len(jobs)} jobs",
+            )
+            check(
+                f"{label}: {expected_calls} submit calls",
+                len(calls) == expected_calls,
+                f"{len(calls)} calls",
+            )
+            check(f"{label}: dependencies resolved", dependencies_match(jobs, expected))
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Verify the cached, server-filtered Deadline job and task queries.
+
+Pins the contract of ``Deadline.find_jobs`` / ``find_tasks`` /
+``JobPoller`` in ``tumblepipe.apps.deadline``: filters are pushed down to
+``deadlinecommand`` (with an exact client-side fallback), results are
+reused for the cache TTL and dropped when farm state changes, and the
+poller only re-fetches jobs that can still change.
+
+Needs neither Deadline nor project data — it drives
+``scripts/fake_deadlinecommand.py`` in a throwaway tempdir:
+
+    python scripts/verify_deadline_queries.py
+
+Checks:
+  1. find_jobs(BatchName=...) asks GetJobsFilter and returns exactly that batch.
+  2. A repeat query inside the TTL starts no process; max_age=0 does.
+  3. Suspending a job drops the cache.
+  4. A Deadline without GetJobsFilter gives the same result via GetJobs.
+  5. find_tasks filters tasks while parsing.
+  6. JobPoller reports only changed jobs and skips settled ones, until
+     they are due a slower refresh that picks up a resumed job.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+FAKE = ROOT / "fake_deadlinecommand.py"
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def calls(state_root):
+    return [
+        json.loads(line)
+        for line in (state_root / "calls.log").read_text().splitlines()
+    ]
+
+
+def submit_batch(deadline, farm, jobs_root, script_path, name, count):
+    batch = deadline.Batch(name)
+    for index in range(count):
+        job = deadline.Job(script_path, None, "task")
+        job.name = f"{name} {index}"
+        job.pool = "general"
+        job.group = "houdini"
+        job.start_frame = 1
+        job.end_frame = 10
+        job.chunk_size = 5
+        batch.add_job(job)
+    return farm.submit(batch, jobs_root)
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_deadline_queries_") as temp_dir:
+        temp = Path(temp_dir)
+        state_root = temp / "state"
+        script_path = temp / ".hpm/packages/tumblepipe@0.0.0/task.py"
+        script_path.parent.mkdir(parents=True)
+        script_path.write_text("")
+        os.environ["TH_DEADLINE_COMMAND"] = str(FAKE)
+        os.environ["TH_FAKE_DEADLINE_ROOT"] = str(state_root)
+
+        from tumblepipe.apps import deadline
+
+        farm = deadline.Deadline()
+        first_ids = submit_batch(deadline, farm, temp / "jobs", script_path, "alpha", 3)
+        submit_batch(deadline, farm, temp / "jobs", script_path, "beta", 4)
+
+        # 1. Server-side filter
+        before = len(calls(state_root))
+        jobs = farm.find_jobs(BatchName="alpha")
+        new_calls = calls(state_root)[before:]
+        check(
+            "filtered query returns the batch",
+            sorted(job["JobID"] for job in jobs) == sorted(first_ids),
+        )
+        check(
+            "filter pushed to deadlinecommand",
+            [call[0] for call in new_calls] == ["GetJobsFilter"],
+            str(new_calls),
+        )
+
+        # 2. TTL cache
+        before = len(calls(state_root))
+        farm.find_jobs(BatchName="alpha")
+        check("cached repeat starts no process", len(calls(state_root)) == before)
+        farm.find_jobs(max_age=0, BatchName="alpha")
+        check("max_age=0 re-queries", len(calls(state_root)) == before + 1)
+
+        # 3. Invalidation
+        farm.suspend_jobs(first_ids[0])
+        suspended = farm.find_jobs(BatchName="alpha", Status="Suspended")
+        check(
+            "state change drops the cache",
+            [job["JobID"] for job in suspended] == [first_ids[0]],
+        )
+
+        # 4. Fallback without GetJobsFilter
+        os.environ["TH_FAKE_DEADLINE_NO_FILTER"] = "1"
+        deadline._SERVER_FILTERS = None
+        fallback = farm.find_jobs(max_age=0, BatchName="beta")
+        check(
+            "fallback filters the full listing",
+            len(fallback) == 4 and calls(state_root)[-1] == ["GetJobs"],
+        )
+        del os.environ["TH_FAKE_DEADLINE_NO_FILTER"]
+        deadline._SERVER_FILTERS = None
+
+        # 5. Task filters
+        tasks = farm.find_tasks(first_ids[0], Status="Suspended")
+        check("task filter", len(tasks) == 2, f"{len(tasks)} tasks")
+
+        # 6. Poller
+        poller = farm.poller(BatchName="alpha")
+        changed = poller.poll()
+        check("first poll lists every job", changed == set(first_ids))
+        check("quiet poll reports nothing", poller.poll() == set())
+        subprocess.run(
+            [sys.executable, str(FAKE), "CompleteJob", first_ids[1]],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        check("completed job reported", poller.poll() == {first_ids[1]})
+        poller.poll()
+        fetched = calls(state_root)[-1]
+        check(
+            "settled jobs are not re-fetched",
+            fetched[0] == "GetJob" and fetched[1] == first_ids[2],
+            str(fetched),
+        )
+        subprocess.run(
+            [sys.executable, str(FAKE), "ResumeJob", first_ids[1]],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        quiet = poller.poll()
+        poller.settled_seconds = 0
+        resumed = poller.poll()
+        check(
+            "resumed settled job picked up on refresh",
+            quiet == set() and resumed == {first_ids[1]}
+            and poller.jobs()[first_ids[1]].get("Status") == "Active",
+            f"{quiet} {resumed}",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
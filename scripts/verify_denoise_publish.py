@@ -0,0 +1,397 @@
+"""Verify the denoise task's publish step and frame workers with stub tools.
+
+Pins the contract of ``tumblepipe.apps.exr.publish_aovs`` and its use in the
+denoise task: one oiiotool call extracts, stamps and DWAB-compresses every
+AOV of a frame, reading each idenoise result once, and writes the same files
+``extract_aov`` + ``dwab_encode`` write one AOV at a time. Frames are
+denoised several at a time (``TH_DENOISE_WORKERS``, else sized from the
+node's cores and memory) with the same receipts as one at a time.
+
+Needs neither Houdini nor real images. hoiiotool is replaced by a stub that
+runs the oiiotool commands used here over JSON "images", and idenoise by one
+that scales the merged planes:
+
+    python scripts/verify_denoise_publish.py
+
+Checks:
+  1. publish_aovs writes the same bytes as extract_aov + dwab_encode.
+  2. It is one oiiotool call that reads each source file once.
+  3. A frame is denoised with two oiiotool calls: combine and publish.
+  4. The published beauty is the denoised plane, renamed and compressed.
+  5. A plane missing from the idenoise result fails only that AOV.
+  6. The worker count follows cores, memory per frame, GPU and the env.
+  7. Frames run concurrently and write the receipts a serial run writes.
+  8. A critical AOV failing in one frame still fails the task.
+"""
+
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+FAILURES = []
+
+AOV_NAMES = ("beauty", "normal", "albedo", "diffuse")
+
+STUB_HEADER = """#!PYTHON
+import json, os, sys
+args = sys.argv[1:]
+def load(path):
+    with open(path) as image_file:
+        return json.load(image_file)
+def save(path, image):
+    with open(path, 'w') as image_file:
+        image_file.write(json.dumps(image, sort_keys=True))
+def fail(message):
+    print(message)
+    sys.exit(1)
+"""
+
+# Images are never changed in place: every step pushes a new one, as
+# oiiotool does, so a labelled input stays as it was read
+OIIOTOOL_STUB = STUB_HEADER + """
+if args[0].startswith('--info'):
+    for sub in load(args[-1])['subimages']:
+        print('<ImageSpec version="30">')
+        print(f'<width>{len(sub["channels"][0][1])}</width>')
+        print('<height>1</height>')
+        print('<channelnames>')
+        for name, _ in sub['channels']:
+            print(f'<channelname>{name}</channelname>')
+        print('</channelnames>')
+        print(f'<attrib name="oiio:subimagename" type="string">{sub["name"]}</attrib>')
+        print('</ImageSpec>')
+    sys.exit(0)
+reads = []
+stack = []
+labels = {}
+compression = None
+index = 0
+def take():
+    global index
+    index += 1
+    return args[index - 1]
+def top_subimage():
+    return stack.pop()['subimages'][0]
+while index < len(args):
+    arg = take()
+    if arg == '--label':
+        labels[take()] = stack[-1]
+    elif arg == '--subimage':
+        name = take()
+        found = [sub for sub in stack.pop()['subimages'] if sub['name'] == name]
+        if not found: fail(f'no subimage {name}')
+        stack.append(dict(subimages=[found[0]]))
+    elif arg == '--ch':
+        selection = [int(part) for part in take().split(',')]
+        sub = top_subimage()
+        stack.append(dict(subimages=[dict(sub, channels=[sub['channels'][k] for k in selection])]))
+    elif arg == '--chnames':
+        names = take().split(',')
+        sub = top_subimage()
+        channels = [[name, channel[1]] for name, channel in zip(names, sub['channels'])]
+        stack.append(dict(subimages=[dict(sub, channels=channels)]))
+    elif arg == '--chappend':
+        second = top_subimage()
+        first = top_subimage()
+        stack.append(dict(subimages=[dict(first, channels=first['channels'] + second['channels'])]))
+    elif arg.startswith('--attrib'):
+        name, value = take(), take()
+        image = stack.pop()
+        stack.append(dict(subimages=[
+            dict(sub, attribs=dict(sub.get('attribs', {}), **{name: value}))
+            for sub in image['subimages']
+        ]))
+    elif arg == '--compression':
+        compression = take()
+    elif arg == '-o':
+        save(take(), dict(stack[-1], compression=compression))
+    elif arg == '--pop':
+        stack.pop()
+    elif arg.startswith('-'):
+        fail(f'unsupported {arg}')
+    elif arg in labels:
+        stack.append(labels[arg])
+    else:
+        reads.append(arg)
+        stack.append(load(arg))
+with open(os.environ['TH_STUB_LOG'], 'a') as log_file:
+    log_file.write(json.dumps(dict(app='oiiotool', args=args, reads=reads)) + '\\n')
+"""
+
+# idenoise: one subimage per denoised AOV, its planes scaled by a half
+IDENOISE_STUB = STUB_HEADER + """
+import time
+input_path, output_path = args[0], args[1]
+frame = os.path.basename(os.path.dirname(input_path))
+def log(event):
+    with open(os.environ['TH_STUB_LOG'], 'a') as log_file:
+        log_file.write(json.dumps(dict(app='idenoise', event=event, frame=frame, time=time.time())) + '\\n')
+log('start')
+time.sleep(float(os.environ.get('TH_STUB_DENOISE_SECONDS', '0')))
+aovs = []
+for arg in args[args.index('--aovs') + 1:]:
+    if arg.startswith('--'): break
+    aovs.append(arg)
+drop = os.environ.get('TH_STUB_DROP_AOV')
+channels = load(input_path)['subimages'][0]['channels']
+save(output_path, dict(subimages=[
+    dict(name=aov, channels=[
+        [name, [value * 0.5 for value in values]]
+        for name, values in channels
+        if name.startswith(aov + '.')
+    ])
+    for aov in aovs
+    if aov != drop or frame not in os.environ.get('TH_STUB_DROP_FRAMES', frame)
+]))
+log('end')
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def read_log(log_path):
+    if not log_path.exists():
+        return []
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    log_path.unlink()
+    return entries
+
+
+def write_exr_header(path, width, height, channels):
+    """A single part EXR header, all the memory sizing reads."""
+    def attribute(name, type_name, value):
+        return name.encode() + b"\0" + type_name.encode() + b"\0" + struct.pack("<i", len(value)) + value
+    chlist = b"".join(
+        name.encode() + b"\0" + struct.pack("<iB3xii", 2, 0, 1, 1)
+        for name in sorted(channels)
+    ) + b"\0"
+    path.write_bytes(
+        struct.pack("<ii", 20000630, 2)
+        + attribute("channels", "chlist", chlist)
+        + attribute("dataWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1))
+        + b"\0"
+    )
+
+
+def receipts(path):
+    return {
+        receipt.name: json.loads(receipt.read_text())
+        for receipt in sorted(path.glob("denoise.*.json"))
+    }
+
+
+def write_image(path, subimages):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dict(subimages=subimages), sort_keys=True))
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_denoise_publish_") as temp_dir:
+        temp = Path(temp_dir)
+        log_path = temp / "stub.log"
+        os.environ["TH_STUB_LOG"] = str(log_path)
+        os.environ["OCIO"] = str(temp / "config.ocio")
+
+        from tumblepipe.apps.houdini import HOUDINI_ROOT_ENV, IDenoise
+        from tumblepipe.apps.local_farm import install_stub_houdini
+
+        bin_path = install_stub_houdini(temp / "houdini")
+        for name, stub in (("hoiiotool.exe", OIIOTOOL_STUB), ("idenoise.exe", IDENOISE_STUB)):
+            (bin_path / name).write_text(stub.replace("PYTHON", sys.executable, 1))
+        os.environ[HOUDINI_ROOT_ENV] = str(temp / "houdini")
+
+        from tumblepipe.apps import exr
+        from tumblepipe.farm.tasks.denoise import denoise
+
+        # A denoised frame, plus a retried AOV in a file of its own
+        denoised_path = temp / "denoised.exr"
+        write_image(denoised_path, [
+            dict(name=aov, channels=[[f"{aov}.{c}", [index, 0.25]] for c in "RGB"])
+            for index, aov in enumerate(AOV_NAMES[:3])
+        ])
+        retried_path = temp / "diffuse_denoised.exr"
+        write_image(retried_path, [
+            dict(name="diffuse", channels=[[f"diffuse.{c}", [7, 8]] for c in "RGB"])
+        ])
+        source_paths = {aov: denoised_path for aov in AOV_NAMES[:3]}
+        source_paths["diffuse"] = retried_path
+
+        # 1. Same bytes as the per-AOV calls
+        step_paths = {aov: temp / "steps" / f"{aov}.exr" for aov in AOV_NAMES}
+        for aov, source_path in source_paths.items():
+            step_paths[aov].parent.mkdir(parents=True, exist_ok=True)
+            extracted_path = temp / "steps" / f"{aov}_extracted.exr"
+            exr.extract_aov(source_path, aov, extracted_path)
+            exr.dwab_encode(extracted_path, step_paths[aov])
+        read_log(log_path)
+        chain_paths = {aov: temp / "chain" / f"{aov}.exr" for aov in AOV_NAMES}
+        (temp / "chain").mkdir()
+        exit_code = exr.publish_aovs(source_paths, chain_paths)
+        calls = read_log(log_path)
+        same = all(
+            chain_paths[aov].exists()
+            and chain_paths[aov].read_bytes() == step_paths[aov].read_bytes()
+            for aov in AOV_NAMES
+        )
+        check("same bytes as extract + encode", exit_code == 0 and same)
+
+        # 2. One call, one read per source
+        check(
+            "one call reading each source once",
+            len(calls) == 1 and sorted(calls[0]["reads"]) == sorted(
+                [str(denoised_path), str(retried_path)]
+            ),
+            str([call["reads"] for call in calls]),
+        )
+
+        # 3-5. A frame through the denoise task
+        input_paths = {aov: temp / "render" / aov / f"{aov}.*.exr" for aov in AOV_NAMES}
+        output_paths = {aov: temp / "denoise" / aov / f"{aov}.*.exr" for aov in AOV_NAMES}
+        for index, aov in enumerate(AOV_NAMES):
+            write_image(
+                temp / "render" / aov / f"{aov}.0001.exr",
+                [dict(name=aov, channels=[[c, [index, 1]] for c in "RGB"])],
+            )
+        channel_counts = {aov: 3 for aov in AOV_NAMES}
+        idenoise = IDenoise()
+        written, failed = denoise._denoise_frame(
+            idenoise, temp / "work", 1, input_paths, output_paths, channel_counts, False
+        )
+        calls = [call for call in read_log(log_path) if call["app"] == "oiiotool"]
+        check(
+            "frame denoised with two oiiotool calls",
+            sorted(written) == sorted(AOV_NAMES) and failed == set() and len(calls) == 2,
+            f"{len(calls)} calls, failed {sorted(failed)}",
+        )
+        beauty = json.loads((temp / "denoise" / "beauty" / "beauty.0001.exr").read_text())
+        check(
+            "published beauty is the denoised plane",
+            beauty["compression"] == "dwab:45"
+            and [channel for channel, _ in beauty["subimages"][0]["channels"]] == ["R", "G", "B"]
+            and beauty["subimages"][0]["channels"][0][1] == [0.0, 0.5],
+        )
+
+        os.environ["TH_STUB_DROP_AOV"] = "diffuse"
+        try:
+            written, failed = denoise._denoise_frame(
+                idenoise, temp / "work_drop", 1, input_paths,
+                {aov: temp / "drop" / aov / f"{aov}.*.exr" for aov in AOV_NAMES},
+                channel_counts, False,
+            )
+        finally:
+            os.environ.pop("TH_STUB_DROP_AOV")
+        read_log(log_path)
+        check(
+            "missing plane fails only its AOV",
+            failed == {"diffuse"}
+            and sorted(written) == ["albedo", "beauty", "normal"]
+            and not (temp / "drop" / "diffuse" / "diffuse.0001.exr").exists(),
+            f"written {sorted(written)}, failed {sorted(failed)}",
+        )
+
+        # 6. Worker count
+        from tumblepipe.util import system
+
+        probe_path = temp / "probe.exr"
+        write_exr_header(probe_path, 1920, 1080, ["R", "G", "B"])
+        frame_bytes = denoise._frame_memory_bytes({"beauty": probe_path, "normal": probe_path})
+        expected_bytes = denoise.FRAME_COPIES * 2 * 1920 * 1080 * 12 + denoise.FRAME_OVERHEAD_BYTES
+        usable_cpu_count, available_memory = system.usable_cpu_count, system.available_memory
+        system.usable_cpu_count = lambda: 32
+        system.available_memory = lambda: int(3.5 * frame_bytes)
+        try:
+            probes = {"beauty": probe_path, "normal": probe_path}
+            counts = (
+                denoise._frame_workers(20, probes, True),
+                denoise._frame_workers(20, probes, False),
+                denoise._frame_workers(2, probes, True),
+            )
+            system.available_memory = lambda: None
+            counts += (denoise._frame_workers(20, probes, True),)
+            os.environ[denoise.WORKERS_ENV] = "5"
+            counts += (denoise._frame_workers(20, probes, True),)
+        finally:
+            os.environ.pop(denoise.WORKERS_ENV, None)
+            system.usable_cpu_count, system.available_memory = usable_cpu_count, available_memory
+        check(
+            "worker count from cores, memory, GPU and env",
+            frame_bytes == expected_bytes and counts == (3, 2, 2, 8, 5),
+            f"{frame_bytes} bytes per frame, counts {counts}",
+        )
+
+        # 7-8. Whole task, serial and in parallel
+        from tumblepipe.config.timeline import BlockRange
+
+        for frame in range(2, 7):
+            for aov in AOV_NAMES:
+                shutil.copyfile(
+                    temp / "render" / aov / f"{aov}.0001.exr",
+                    temp / "render" / aov / f"{aov}.{frame:04d}.exr",
+                )
+        os.environ["TH_FARM_SCRATCH"] = str(temp / "scratch")
+        os.environ["TH_FARM_SCRATCH_MIN_FREE_GB"] = "0"
+        os.environ["TH_STUB_DENOISE_SECONDS"] = "0.2"
+
+        def run_task(name, workers, **env):
+            os.environ[denoise.WORKERS_ENV] = str(workers)
+            os.environ.update(env)
+            try:
+                result = denoise.main(
+                    BlockRange(1, 6),
+                    temp / name / "denoise.*.json",
+                    input_paths,
+                    {aov: temp / name / aov / f"{aov}.*.exr" for aov in AOV_NAMES},
+                    True,
+                )
+            finally:
+                for key in (denoise.WORKERS_ENV, *env):
+                    os.environ.pop(key, None)
+            return result, read_log(log_path)
+
+        serial_result, _ = run_task("serial", 1)
+        parallel_result, entries = run_task("parallel", 3)
+        running = peak = 0
+        for entry in sorted(
+            (entry for entry in entries if entry["app"] == "idenoise"),
+            key=lambda entry: (entry["time"], entry["event"] == "start"),
+        ):
+            running += 1 if entry["event"] == "start" else -1
+            peak = max(peak, running)
+        serial_receipts = {
+            name: {aov: path.replace("serial", "parallel") for aov, path in receipt.items()}
+            for name, receipt in receipts(temp / "serial").items()
+        }
+        check(
+            "frames in parallel, same receipts",
+            serial_result == 0 and parallel_result == 0 and peak == 3
+            and len(serial_receipts) == 6
+            and receipts(temp / "parallel") == serial_receipts,
+            f"peak {peak} concurrent, results {serial_result}/{parallel_result}",
+        )
+
+        critical_result, _ = run_task(
+            "critical", 3, TH_STUB_DROP_AOV="beauty", TH_STUB_DROP_FRAMES="0004"
+        )
+        check("critical AOV failure fails the task", critical_result == 1)
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Verify the edit task's incremental frame sync against a throwaway project.
+
+Pins the contract of ``tumblepipe.farm.tasks.edit.edit``: frames are
+compared with the shot's ``sync_manifest.json`` and only changed or missing
+frames are copied (or hardlinked where the shares allow), an AOV already at
+the resolved version is still checked for re-rendered frames, and an older
+or lower-priority source is still skipped.
+
+Needs neither Houdini nor a render: AOV resolution is replaced by a fixed
+mapping over synthetic frame dirs:
+
+    python scripts/verify_edit_sync.py
+
+Checks:
+  1. A first sync copies every frame and writes both manifests.
+  2. A rerun with nothing changed copies nothing.
+  3. A frame re-rendered into the same version is copied alone.
+  4. A missing or replaced edit frame is copied again.
+  5. With hashing, a new version copies only the frames that differ.
+  6. Frames are hardlinked where the shares are one filesystem.
+  7. Copies made before the sync manifest existed are adopted.
+  8. A lower-priority source is still skipped.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+FRAMES = range(1001, 1006)
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_edit_sync_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        os.environ["TH_EDIT_HARDLINK"] = "0"
+
+        from tumblepipe.config.timeline import BlockRange
+        from tumblepipe.farm.tasks.edit import edit
+        from tumblepipe.pipe.paths.render import AOV
+        from tumblepipe.util.uri import Uri
+
+        shot_uri = Uri.parse_unsafe("entity:/shots/seq010/sh010")
+        render_range = BlockRange(FRAMES[0], FRAMES[-1])
+        render_root = temp / "render"
+
+        def write_aov(department, version, texts):
+            aov_path = render_root / department / version / "beauty"
+            aov_path.mkdir(parents=True, exist_ok=True)
+            for frame_index, text in texts.items():
+                (aov_path / f"seq010_sh010_beauty.{frame_index:04d}.exr").write_text(text)
+            return AOV(path=aov_path, label="beauty", name="seq010_sh010_beauty", suffix="exr")
+
+        resolved = {}
+
+        class RenderContext:
+            def resolve_latest_aovs(self, *args, **kwargs):
+                return {"main": {"beauty": resolved["beauty"]}}
+
+        edit.get_render_context = lambda *args, **kwargs: RenderContext()
+        edit.list_departments = lambda context: [
+            SimpleNamespace(name=name)
+            for name in (["layout", "lighting"] if context == "shots" else ["light", "comp"])
+        ]
+
+        placed = []
+        place_frame = edit._place_frame
+
+        def counting_place(input_path, output_path, *args):
+            placed.append(output_path.name)
+            return place_frame(input_path, output_path, *args)
+
+        edit._place_frame = counting_place
+
+        def sync(aov, shot_department="lighting", render_department="light", version="v0001"):
+            resolved["beauty"] = (render_department, version, aov, shot_department)
+            placed.clear()
+            code = edit.main(shot_uri, "render", render_range)
+            return code, sorted(int(name.split(".")[-2]) for name in placed)
+
+        edit_path = project_path / "edit" / "seq010" / "sh010" / "main" / "beauty"
+
+        def edit_frame(frame_index):
+            return edit_path / f"seq010_sh010.{frame_index:04d}.exr"
+
+        # 1. First sync
+        v1 = write_aov("light", "v0001", {index: f"v1 {index}" for index in FRAMES})
+        code, copied = sync(v1)
+        manifest = json.loads((project_path / "edit" / "manifest.json").read_text())
+        sync_manifest_path = project_path / "edit" / "seq010" / "sh010" / edit.SYNC_MANIFEST_NAME
+        sync_manifest = json.loads(sync_manifest_path.read_text())
+        check(
+            "first sync copies every frame",
+            code == 0 and copied == list(FRAMES)
+            and edit_frame(1003).read_text() == "v1 1003"
+            and manifest[str(shot_uri)]["main"]["beauty"] == ["lighting", "light", "v0001"]
+            and sorted(sync_manifest["aovs"]["main/beauty"]["frames"]) == [str(index) for index in FRAMES],
+            str(copied),
+        )
+
+        # 2. Nothing changed
+        code, copied = sync(v1)
+        check("unchanged rerun copies nothing", code == 0 and copied == [], str(copied))
+
+        # 3. Re-rendered in place
+        write_aov("light", "v0001", {1004: "v1 1004 re-rendered"})
+        code, copied = sync(v1)
+        check(
+            "re-rendered frame copied alone",
+            code == 0 and copied == [1004] and edit_frame(1004).read_text() == "v1 1004 re-rendered",
+            str(copied),
+        )
+
+        # 4. Missing and replaced edit frames
+        edit_frame(1001).unlink()
+        edit_frame(1002).write_text("edited by hand")
+        code, copied = sync(v1)
+        check(
+            "missing and replaced frames restored",
+            code == 0 and copied == [1001, 1002] and edit_frame(1002).read_text() == "v1 1002",
+            str(copied),
+        )
+
+        # 5. New version, hashed
+        os.environ[edit.HASH_ENV] = "1"
+        sync(v1)
+        v2_texts = {index: edit_frame(index).read_text() for index in FRAMES}
+        v2_texts[1005] = "v2 1005"
+        v2 = write_aov("light", "v0002", v2_texts)
+        code, copied = sync(v2, version="v0002")
+        os.environ.pop(edit.HASH_ENV)
+        check(
+            "new version copies only differing frames",
+            code == 0 and copied == [1005] and edit_frame(1005).read_text() == "v2 1005",
+            str(copied),
+        )
+
+        # 6. Hardlinks
+        os.environ["TH_EDIT_HARDLINK"] = "1"
+        v3 = write_aov("light", "v0003", {index: f"v3 {index}" for index in FRAMES})
+        code, copied = sync(v3, version="v0003")
+        source_frame = v3.get_aov_frame_path("1002")
+        check(
+            "frames hardlinked on one filesystem",
+            code == 0 and copied == list(FRAMES)
+            and os.path.samefile(source_frame, edit_frame(1002))
+            and not list(edit_path.glob(".*.partial")),
+            str(copied),
+        )
+        os.environ["TH_EDIT_HARDLINK"] = "0"
+
+        # 7. Adopted copies
+        v4 = write_aov("light", "v0004", {index: f"v4 {index}" for index in FRAMES})
+        sync(v4, version="v0004")
+        sync_manifest_path.unlink()
+        code, copied = sync(v4, version="v0004")
+        check("copies without records adopted", code == 0 and copied == [], str(copied))
+
+        # 8. Lower priority
+        layout = write_aov("layout_light", "v0009", {index: f"layout {index}" for index in FRAMES})
+        code, copied = sync(layout, shot_department="layout", version="v0009")
+        check(
+            "lower-priority source skipped",
+            code == 0 and copied == [] and edit_frame(1001).read_text() == "v4 1001",
+            str(copied),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""Verify the native EXR header reader against generated EXR fixtures.
+
+Pins the contract of ``tumblepipe.apps.exr.get_image_info`` when it reads
+headers itself: single part and multipart, scanline and tiled files give the
+subimage names, sizes, channels (in OIIO's order), date, aspect ratio and
+compression oiiotool reports; results are cached per path until the file
+changes; and files the reader does not accept go to oiiotool.
+
+The fixtures are small uncompressed EXRs written by hand, so this needs
+neither Houdini nor an OpenEXR library:
+
+    python scripts/verify_exr_headers.py
+
+Checks:
+  1. A single part scanline file.
+  2. Channels are ordered per layer R, G, B, A, then file order.
+  3. A multipart file gives one ImageInfo per part, named by part.
+  4. A tiled file.
+  5. A header larger than the first read.
+  6. A second call is served from the cache until the file changes.
+  7. A non-EXR or truncated file falls back to oiiotool.
+"""
+
+import datetime as dt
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+FAILURES = []
+
+MAGIC = 20000630
+TILED_FLAG = 0x200
+MULTIPART_FLAG = 0x1000
+HALF = 1
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def attribute(name, type_name, value):
+    return name.encode() + b"\0" + type_name.encode() + b"\0" + struct.pack("<i", len(value)) + value
+
+
+def chlist(names):
+    # Channels are stored sorted by name, as OpenEXR writes them
+    return b"".join(
+        name.encode() + b"\0" + struct.pack("<iB3xii", HALF, 0, 1, 1)
+        for name in sorted(names)
+    ) + b"\0"
+
+
+def header(channels, width, height, compression=0, name=None, tiled=False, extra=()):
+    attributes = [
+        attribute("channels", "chlist", chlist(channels)),
+        attribute("compression", "compression", bytes([compression])),
+        attribute("dataWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1)),
+        attribute("displayWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1)),
+        attribute("lineOrder", "lineOrder", bytes([0])),
+        attribute("pixelAspectRatio", "float", struct.pack("<f", 1.0)),
+        attribute("screenWindowCenter", "v2f", struct.pack("<2f", 0, 0)),
+        attribute("screenWindowWidth", "float", struct.pack("<f", 1.0)),
+    ]
+    if tiled:
+        attributes.append(attribute("tiles", "tiledesc", struct.pack("<IIB", width, height, 0)))
+    if name is not None:
+        chunks = 1 if tiled else height
+        attributes += [
+            attribute("name", "string", name.encode()),
+            attribute("type", "string", b"tiledimage" if tiled else b"scanlineimage"),
+            attribute("chunkCount", "int", struct.pack("<i", chunks)),
+        ]
+    attributes += list(extra)
+    return b"".join(attributes) + b"\0"
+
+
+def pixels(channels, width, lines):
+    return b"".join(
+        struct.pack("<e", 0.5) * width
+        for _ in range(lines)
+        for _ in channels
+    )
+
+
+def write_exr(path, parts, tiled=False):
+    """Write *parts* — (channels, width, height, name, extra) — uncompressed."""
+    multipart = len(parts) > 1
+    flags = (MULTIPART_FLAG if multipart else 0) | (TILED_FLAG if tiled and not multipart else 0)
+    data = struct.pack("<ii", MAGIC, 2 | flags)
+    data += b"".join(
+        header(channels, width, height, name=name if multipart else None, tiled=tiled, extra=extra)
+        for channels, width, height, name, extra in parts
+    )
+    if multipart:
+        data += b"\0"
+
+    # Chunks: one per scanline, or one tile per part
+    chunks = []
+    for part_index, (channels, width, height, _, _) in enumerate(parts):
+        prefix = struct.pack("<i", part_index) if multipart else b""
+        if tiled:
+            body = pixels(channels, width, height)
+            chunks.append((part_index, prefix + struct.pack("<4ii", 0, 0, 0, 0, len(body)) + body))
+        else:
+            for y in range(height):
+                body = pixels(channels, width, 1)
+                chunks.append((part_index, prefix + struct.pack("<ii", y, len(body)) + body))
+
+    offset = len(data) + 8 * len(chunks)
+    table = b""
+    for _, chunk in chunks:
+        table += struct.pack("<Q", offset)
+        offset += len(chunk)
+    path.write_bytes(data + table + b"".join(chunk for _, chunk in chunks))
+
+
+def main():
+    from tumblepipe.apps import exr
+
+    with tempfile.TemporaryDirectory(prefix="th_exr_headers_") as temp_dir:
+        temp = Path(temp_dir)
+
+        # 1-2. Single part scanline
+        single_path = temp / "single.exr"
+        write_exr(single_path, [(
+            ["R", "G", "B", "A", "diffuse.R", "diffuse.G", "diffuse.B", "depth.Z", "N.x", "N.y", "N.z"],
+            64, 32, None,
+            [
+                attribute("capDate", "string", b"2026:03:14 15:09:26"),
+                attribute("dwaCompressionLevel", "float", struct.pack("<f", 45.0)),
+            ],
+        )])
+        infos = exr.get_image_info(single_path)
+        info = infos[0] if infos else None
+        check(
+            "single part scanline",
+            info is not None and len(infos) == 1
+            and (info.name, info.width, info.height) == (None, 64, 32)
+            and info.date == dt.datetime(2026, 3, 14, 15, 9, 26)
+            and info.aspect_ratio == 1.0
+            and (info.compression, info.compression_level) == ("none", 45),
+            repr(info),
+        )
+        check(
+            "channels in OIIO order",
+            # Suffixes match case-insensitively, so y (as Y) and z (as Z)
+            # come before x, as oiiotool lists them
+            info is not None and info.channels == [
+                "R", "G", "B", "A", "N.y", "N.z", "N.x", "depth.Z",
+                "diffuse.R", "diffuse.G", "diffuse.B",
+            ],
+            repr(info.channels if info else None),
+        )
+
+        # 3. Multipart
+        multi_path = temp / "render.0001.exr"
+        write_exr(multi_path, [
+            (["R", "G", "B", "A"], 8, 4, "Beauty", []),
+            (["normal.x", "normal.y", "normal.z"], 8, 4, "normal", []),
+            (["albedo.B", "albedo.G", "albedo.R"], 8, 4, "albedo", []),
+        ])
+        infos = exr.get_image_info(multi_path) or []
+        check(
+            "multipart",
+            [(info.name, info.width, info.height, info.channels) for info in infos] == [
+                ("beauty", 8, 4, ["R", "G", "B", "A"]),
+                ("normal", 8, 4, ["normal.y", "normal.z", "normal.x"]),
+                ("albedo", 8, 4, ["albedo.R", "albedo.G", "albedo.B"]),
+            ],
+            repr(infos),
+        )
+
+        # 4. Tiled
+        tiled_path = temp / "tiled.exr"
+        write_exr(tiled_path, [(["Y"], 16, 16, None, [])], tiled=True)
+        infos = exr.get_image_info(tiled_path) or []
+        check(
+            "tiled",
+            [(info.width, info.height, info.channels) for info in infos] == [(16, 16, ["Y"])],
+            repr(infos),
+        )
+
+        # 5. Large header
+        large_path = temp / "large.exr"
+        write_exr(large_path, [(
+            ["R", "G", "B"], 4, 4, None,
+            [
+                attribute(f"comment{index:03d}", "string", b"x" * 200)
+                for index in range(200)
+            ],
+        )])
+        infos = exr.get_image_info(large_path) or []
+        check(
+            "header larger than the first read",
+            os.path.getsize(large_path) > 16 * 1024
+            and [info.channels for info in infos] == [["R", "G", "B"]],
+        )
+
+        # 6. Cache
+        calls = []
+        read_exr_headers = exr.read_exr_headers
+
+        def counting_read(path):
+            calls.append(path)
+            return read_exr_headers(path)
+
+        exr.read_exr_headers = counting_read
+        try:
+            exr.get_image_info(multi_path)
+            cached = len(calls) == 0
+            write_exr(multi_path, [(["R", "G", "B"], 2, 2, "beauty", []), (["Z"], 2, 2, "depth", [])])
+            stamp = multi_path.stat().st_mtime_ns + 1_000_000_000
+            os.utime(multi_path, ns=(stamp, stamp))
+            infos = exr.get_image_info(multi_path) or []
+        finally:
+            exr.read_exr_headers = read_exr_headers
+        check(
+            "cached until the file changes",
+            cached and len(calls) == 1 and [info.name for info in infos] == ["beauty", "depth"],
+            f"{len(calls)} reads",
+        )
+
+        # 7. Fallback
+        fallbacks = []
+        oiiotool_image_info = exr._oiiotool_image_info
+        exr._oiiotool_image_info = lambda path: fallbacks.append(path.name) or []
+        try:
+            text_path = temp / "text.exr"
+            text_path.write_text("not an exr")
+            truncated_path = temp / "truncated.exr"
+            truncated_path.write_bytes(single_path.read_bytes()[:100])
+            exr.get_image_info(text_path)
+            exr.get_image_info(truncated_path)
+            os.environ[exr.NATIVE_HEADERS_ENV] = "0"
+            exr.get_image_info(single_path)
+            os.environ.pop(exr.NATIVE_HEADERS_ENV)
+        finally:
+            exr._oiiotool_image_info = oiiotool_image_info
+        check(
+            "falls back to oiiotool",
+            fallbacks == ["text.exr", "truncated.exr", "single.exr"],
+            str(fallbacks),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Verify farm task scratch space against a throwaway project template.
+
+Pins the contract of ``tumblepipe.farm.tasks.scratch``: task temporaries go
+to the node-local scratch root, which falls back to the shared ``temp:/``
+root when it is disabled or short of space, and dirs left by dead tasks are
+removed while the dirs of running tasks are kept.
+
+Needs neither Houdini nor project data:
+
+    python scripts/verify_farm_scratch.py
+
+Checks:
+  1. scratch_dir opens under TH_FARM_SCRATCH and is removed on exit.
+  2. TH_FARM_SCRATCH=0 falls back to temp:/.
+  3. Too little free space falls back to temp:/.
+  4. A dir whose owner is gone is removed; a live one is kept.
+  5. An old dir without an owner file is removed; a new one is kept.
+  6. A frame is sized from the latest earlier version of its AOV.
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def make_dir(root, name, pid=None, age=0):
+    dir_path = root / name
+    dir_path.mkdir(parents=True)
+    (dir_path / "frame.exr").write_text("x")
+    if pid is not None:
+        (root / f"{name}.owner").write_text(json.dumps(
+            {"host": platform.node(), "pid": pid, "started": time.time() - age}
+        ))
+    stamp = time.time() - age
+    os.utime(dir_path, (stamp, stamp))
+    return dir_path
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_farm_scratch_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        local_root = temp / "local"
+        os.environ["TH_FARM_SCRATCH"] = str(local_root)
+        os.environ["TH_FARM_SCRATCH_MIN_FREE_GB"] = "0"
+
+        from tumblepipe.farm.tasks import scratch
+
+        shared_root = scratch.shared_temp_root()
+
+        # 1. Local
+        with scratch.scratch_dir() as temp_path:
+            opened = temp_path
+            owner_written = temp_path.with_name(temp_path.name + scratch.OWNER_SUFFIX).exists()
+        check(
+            "opens under the local root",
+            opened.parent == local_root and owner_written,
+            str(opened),
+        )
+        check("removed on exit", list(local_root.iterdir()) == [])
+
+        # 2. Disabled
+        os.environ["TH_FARM_SCRATCH"] = "0"
+        check("disabled falls back to temp:/", scratch.scratch_root() == shared_root)
+        os.environ["TH_FARM_SCRATCH"] = str(local_root)
+
+        # 3. Free space
+        free = shutil.disk_usage(local_root).free
+        check(
+            "short of space falls back to temp:/",
+            scratch.scratch_root(required_bytes=free * 2) == shared_root,
+        )
+
+        # 4-5. Stale dirs
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        dead_dir = make_dir(local_root, "task_dead", pid=dead.pid)
+        live_dir = make_dir(local_root, "task_live", pid=os.getpid())
+        orphan_dir = make_dir(local_root, "task_orphan", age=2 * scratch.ORPHAN_SECONDS)
+        fresh_dir = make_dir(local_root, "task_fresh")
+        other_dir = make_dir(local_root, "other", age=2 * scratch.ORPHAN_SECONDS)
+        scratch.scratch_root()
+        check(
+            "dead owner removed, live kept",
+            not dead_dir.exists()
+            and not (local_root / "task_dead.owner").exists()
+            and live_dir.exists(),
+        )
+        check(
+            "old orphan removed, fresh kept",
+            not orphan_dir.exists() and fresh_dir.exists() and other_dir.exists(),
+        )
+
+        # 6. Earlier frame bytes
+        layer_root = temp / "render" / "main"
+        for version_name, size in (("v0001", 300), ("v0002", 200)):
+            aov_path = layer_root / version_name / "beauty"
+            aov_path.mkdir(parents=True)
+            for frame, extra in ((1001, 0), (1002, 50)):
+                (aov_path / f"main.{frame}.exr").write_bytes(b"x" * (size + extra))
+        (layer_root / "v0003").mkdir()
+        frame_bytes = scratch.earlier_frame_bytes(
+            layer_root / "v0003" / "beauty" / "main.*.exr"
+        )
+        check(
+            "frame sized from the latest earlier version",
+            frame_bytes == 250
+            and scratch.earlier_frame_bytes(
+                layer_root / "v0003" / "depth" / "main.*.exr"
+            ) == 0
+            and scratch.earlier_frame_bytes(temp / "loose" / "main.*.exr") == 0,
+            str(frame_bytes),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
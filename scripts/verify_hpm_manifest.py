@@ -0,0 +1,181 @@
+"""Verify the cached HPM task manifests against a throwaway package store.
+
+Pins the contract of ``tumblepipe.farm.deadline.hpm_task_manifest``: the
+manifest rendered from the cached package base plus the task's own
+``[scripts]`` table is byte for byte what rendering the whole document with
+``tomli_w`` gives; a changed ``requirements.txt``, package ``hpm.toml`` or
+submitter ``~/.hpm/config.toml`` is picked up on the next call; and
+``Deadline.submit`` writes each distinct manifest once per job dir.
+
+Needs neither Deadline, HPM nor project data — it fakes an HPM package
+store and drives ``scripts/fake_deadlinecommand.py`` in a throwaway tempdir:
+
+    python scripts/verify_hpm_manifest.py
+
+Checks:
+  1. The cached rendering matches rendering the whole document.
+  2. Unchanged inputs return the cached manifest.
+  3. A changed requirements.txt is picked up.
+  4. A changed package hpm.toml or registry config is picked up.
+  5. Identical manifests share one file per job dir.
+"""
+
+import os
+import sys
+import tempfile
+import tomllib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+import tomli_w  # noqa: E402
+
+FAILURES = []
+
+REGISTRY = {"name": "studio", "url": "https://registry.example/v1", "type": "api"}
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def write_stamped(path: Path, text: str):
+    """Write *text* with a stamp that differs from the file's last one."""
+    previous = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    os.utime(path, ns=(previous + 10**9, previous + 10**9))
+
+
+def expected_manifest(full_name, version, registries, module, requirements):
+    task_script = {
+        "cmd": f"python -m tumblepipe.farm.tasks.launch {module}",
+        "package-env": True,
+    }
+    if requirements:
+        task_script["requirements"] = list(requirements)
+    return tomli_w.dumps({
+        "package": {
+            "path": "local/deadline-hpm-job",
+            "name": "deadline-hpm-job",
+            "version": "0.0.0",
+        },
+        "compat": {"houdini": ">=21, <99"},
+        "registries": registries,
+        "dependencies": {full_name: version},
+        "scripts": {"task": task_script},
+    })
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_hpm_manifest_") as temp_dir:
+        temp = Path(temp_dir)
+        home = temp / "home"
+        package = home / ".hpm" / "packages" / "tumblepipe@1.2.3"
+        tasks = package / "python" / "tumblepipe" / "farm" / "tasks"
+        render_script = tasks / "render" / "render.py"
+        notify_script = tasks / "notify" / "notify.py"
+        for script in (render_script, notify_script):
+            script.parent.mkdir(parents=True)
+            script.write_text("")
+        requirements = notify_script.parent / "requirements.txt"
+        write_stamped(requirements, "# chat client\ndiscord.py>=2.0  # bot\n")
+        write_stamped(package / "hpm.toml", '[package]\npath = "tumblehead/tumblepipe"\n')
+        config = home / ".hpm" / "config.toml"
+        write_stamped(config, tomli_w.dumps({"registries": [REGISTRY]}))
+
+        os.environ["HOME"] = str(home)
+        os.environ["TH_DEADLINE_COMMAND"] = str(ROOT / "fake_deadlinecommand.py")
+        os.environ["TH_FAKE_DEADLINE_ROOT"] = str(temp / "deadline")
+
+        from tumblepipe.apps import deadline as deadline_app
+        from tumblepipe.farm import deadline
+
+        # 1. Byte-identical rendering
+        render_manifest = deadline.hpm_task_manifest(render_script)
+        notify_manifest = deadline.hpm_task_manifest(notify_script, requirements)
+        check(
+            "cached rendering matches the whole document",
+            render_manifest == expected_manifest(
+                "tumblehead/tumblepipe", "1.2.3", [REGISTRY],
+                "tumblepipe.farm.tasks.render.render", [],
+            )
+            and notify_manifest == expected_manifest(
+                "tumblehead/tumblepipe", "1.2.3", [REGISTRY],
+                "tumblepipe.farm.tasks.notify.notify", ["discord.py>=2.0"],
+            ),
+        )
+
+        # 2. Cache hit
+        check(
+            "unchanged inputs return the cached manifest",
+            deadline.hpm_task_manifest(notify_script, requirements) is notify_manifest
+            and deadline.hpm_task_manifest(render_script) is render_manifest,
+        )
+
+        # 3. Requirements
+        write_stamped(requirements, "discord.py>=2.3\naiohttp\n")
+        updated = tomllib.loads(deadline.hpm_task_manifest(notify_script, requirements))
+        check(
+            "changed requirements.txt is picked up",
+            updated["scripts"]["task"]["requirements"] == ["discord.py>=2.3", "aiohttp"],
+            str(updated["scripts"]["task"].get("requirements")),
+        )
+
+        # 4. Package name and registries
+        write_stamped(package / "hpm.toml", '[package]\npath = "studio/tumblepipe"\n')
+        other_registry = dict(REGISTRY, name="mirror")
+        write_stamped(config, tomli_w.dumps({"registries": [other_registry]}))
+        updated = tomllib.loads(deadline.hpm_task_manifest(render_script))
+        check(
+            "changed hpm.toml and registry config are picked up",
+            updated["dependencies"] == {"studio/tumblepipe": "1.2.3"}
+            and updated["registries"] == [other_registry],
+            f"{updated['dependencies']}, {updated['registries']}",
+        )
+
+        # 5. One file per distinct manifest. Render chunks share a manifest,
+        # the notify job has its own.
+        batch = deadline_app.Batch("verify hpm manifest")
+        for index in range(4):
+            job = deadline.Task(render_script, None, "context.json")
+            job.name = f"render {index}"
+            job.pool = "general"
+            job.group = "houdini"
+            batch.add_job(job)
+        notify = deadline.Task(notify_script, requirements, "context.json")
+        notify.name = "notify"
+        notify.pool = "general"
+        notify.group = "houdini"
+        batch.add_job(notify)
+        jobs_root = temp / "jobs"
+        jobs_root.mkdir()
+        deadline_app.Deadline().submit(batch, jobs_root)
+        [job_dir] = [path for path in jobs_root.iterdir() if not path.name.startswith("_")]
+        written = sorted(job_dir.glob("*_hpm.toml"))
+        referenced = set()
+        for plugin_info in job_dir.glob("*_plugin_info.job"):
+            for line in plugin_info.read_text().splitlines():
+                if line.startswith("Manifest="):
+                    referenced.add(Path(line.split("=", 1)[1]).name)
+        check(
+            "identical manifests share one file",
+            len(written) == 2
+            and referenced == {path.name for path in written}
+            and {path.read_text() for path in written}
+            == {batch.get_job(0).manifest, notify.manifest},
+            str([path.name for path in written]),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,459 @@
+"""Verify the warm hython pool with plain Python standing in for hython.
+
+Pins the contract of ``tumblepipe.apps.hython_pool``: with ``TH_HYTHON_POOL``
+set, ``Hython.run`` runs its scripts in warm workers of a background pool
+that later callers on the machine share, each job isolated from the ones
+before it, with the output and exit code a one-shot hython would give.
+Workers are replaced after enough jobs, on memory growth and when they die,
+and a script runs one-shot whenever no pool can take it.
+
+Needs no Houdini. The stub install's hython execs this Python, so the pool
+runs the real ``hython_worker.py`` and the one-shot path the real runner:
+
+    python scripts/verify_hython_pool.py
+
+Checks:
+  1. Without a pool, every run starts a new process.
+  2. Runs in a pool reuse one warm worker and relay its output.
+  3. Exit codes and exceptions are reported; the worker survives them.
+  4. A job does not see the environment, cwd or modules of the one before.
+  5. Another process on the machine uses the same pool.
+  6. A worker is replaced after its job limit.
+  7. A worker is replaced when its memory grows too much.
+  8. A job whose worker dies fails with its exit code; the next runs.
+  9. A pool runs jobs in several workers at once.
+ 10. A pool whose workers cannot start hands its jobs back.
+ 11. A script runs one-shot when no pool starts.
+ 12. A job whose caller stops waiting is cancelled and its worker killed.
+ 13. A job its caller cancels is dropped and its worker killed.
+ 14. Of two pools starting at once, one claims the state file; a dead
+     pool's state file is taken over.
+ 15. A request without the pool's token is refused, and jobs do not see it.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+HYTHON_STUB = """#!PYTHON
+import os, sys
+os.execv(sys.executable, [sys.executable] + sys.argv[1:])
+"""
+
+JOB_SCRIPT = """
+import json, os, sys, time
+record_path, action = sys.argv[-2], sys.argv[-1]
+print(f'job {action} says hello')
+from tumblepipe.util import cache
+record = dict(
+    pid=os.getpid(),
+    cwd=os.getcwd(),
+    job=os.environ.get('TH_VERIFY_JOB'),
+    caller=os.environ.get('TH_VERIFY_CALLER'),
+    leaked_env='TH_VERIFY_LEAK' in os.environ,
+    leaked_module=hasattr(cache, '_verify_leak'),
+    leaked_path='/verify/leak' in sys.path,
+    token='TH_HYTHON_POOL_TOKEN' in os.environ,
+)
+with open(record_path, 'w') as record_file:
+    json.dump(record, record_file)
+if action == 'leak':
+    os.environ['TH_VERIFY_LEAK'] = '1'
+    cache._verify_leak = True
+    sys.path.append('/verify/leak')
+    os.chdir('/')
+elif action == 'exit':
+    sys.exit(3)
+elif action == 'raise':
+    raise RuntimeError('job failed on purpose')
+elif action == 'crash':
+    os._exit(7)
+elif action == 'hog':
+    sys._verify_hog = b'x' * (200 * 1024 * 1024)
+elif action == 'sleep':
+    time.sleep(1.0)
+elif action == 'long':
+    time.sleep(60.0)
+"""
+
+CLIENT_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from pathlib import Path
+from tumblepipe.apps.houdini import Hython
+sys.exit(Hython().run(Path(sys.argv[2]), sys.argv[3:]))
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_hython_pool_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        os.environ.pop("TH_HYTHON_POOL", None)
+        os.environ["TH_HYTHON_POOL_PRELOAD"] = ""
+        os.environ["TH_HYTHON_POOL_IDLE"] = "60"
+        os.environ["TMPDIR"] = str(temp)
+        tempfile.tempdir = str(temp)
+
+        from tumblepipe.apps.houdini import HOUDINI_ROOT_ENV, Hython
+        from tumblepipe.apps.local_farm import install_stub_houdini
+        from tumblepipe.apps import hython_pool
+
+        bin_path = install_stub_houdini(temp / "houdini")
+        hython_path = bin_path / "hython.exe"
+        hython_path.write_text(HYTHON_STUB.replace("PYTHON", sys.executable, 1))
+        os.environ[HOUDINI_ROOT_ENV] = str(temp / "houdini")
+
+        script_path = temp / "job.py"
+        script_path.write_text(JOB_SCRIPT)
+        records_path = temp / "records"
+        records_path.mkdir()
+        work_path = temp / "work"
+        work_path.mkdir()
+
+        def run(action, env=None, cwd=None):
+            record_path = records_path / f"{time.time_ns()}.json"
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                code = Hython().run(script_path, [str(record_path), action], cwd, env)
+            record = json.loads(record_path.read_text()) if record_path.exists() else {}
+            return code, record, output.getvalue()
+
+        # 1. One-shot
+        first = run("record")
+        second = run("record")
+        check(
+            "without a pool, a process per run",
+            first[0] == 0 and second[0] == 0
+            and first[1]["pid"] != second[1]["pid"]
+            and "job record says hello" in first[2],
+        )
+
+        # 2. Warm worker
+        os.environ["TH_HYTHON_POOL"] = "1"
+        first = run("record")
+        second = run("record")
+        pool_states = list(temp.glob("th_hython_pool_*.json"))
+        check(
+            "pool reuses a warm worker and relays output",
+            first[0] == 0 and second[0] == 0
+            and first[1]["pid"] == second[1]["pid"]
+            and "job record says hello" in second[2]
+            and "Hython Worker: Done" in second[2]
+            and len(pool_states) == 1,
+            f"{first[1].get('pid')} {second[1].get('pid')} {pool_states}",
+        )
+        warm_pid = second[1]["pid"]
+
+        # 3. Exit codes
+        exited = run("exit")
+        raised = run("raise")
+        after = run("record")
+        check(
+            "exit codes reported, worker survives",
+            exited[0] == 3 and raised[0] == 1
+            and "RuntimeError: job failed on purpose" in raised[2]
+            and after[0] == 0 and after[1]["pid"] == warm_pid,
+            f"{exited[0]} {raised[0]}",
+        )
+
+        # 4. Isolation
+        os.environ["TH_VERIFY_CALLER"] = "caller"
+        run("leak", env={"TH_VERIFY_JOB": "first"})
+        code, record, _ = run("record", env={"TH_VERIFY_JOB": "second"}, cwd=work_path)
+        os.environ.pop("TH_VERIFY_CALLER")
+        check(
+            "jobs isolated from each other",
+            code == 0 and record["pid"] == warm_pid
+            and record["job"] == "second" and record["caller"] == "caller"
+            and not record["leaked_env"] and not record["leaked_module"]
+            and not record["leaked_path"]
+            and Path(record["cwd"]).resolve() == work_path.resolve(),
+            str(record),
+        )
+
+        # 5. Another process
+        client_path = temp / "client.py"
+        client_path.write_text(CLIENT_SCRIPT)
+        record_path = records_path / "other.json"
+        result = subprocess.run(
+            [sys.executable, str(client_path), str(ROOT.parent / "python"),
+             str(script_path), str(record_path), "record"],
+            capture_output=True, text=True,
+        )
+        other = json.loads(record_path.read_text()) if record_path.exists() else {}
+        check(
+            "another process shares the pool",
+            result.returncode == 0 and other.get("pid") == warm_pid
+            and "job record says hello" in result.stdout,
+            f"{result.returncode} {other.get('pid')} {warm_pid}",
+        )
+
+        # In-process pools for the worker lifecycle
+        os.environ.pop("TH_HYTHON_POOL")
+
+        async def pool_run(pool, action):
+            record_path = records_path / f"{time.time_ns()}.json"
+            log_path = temp / f"{record_path.stem}.log"
+            code = await pool.run(
+                script_path, [str(record_path), action], temp, dict(os.environ), log_path
+            )
+            record = json.loads(record_path.read_text()) if record_path.exists() else {}
+            return code, record.get("pid")
+
+        async def lifecycle():
+            results = {}
+            async with hython_pool.HythonPool(hython_path, 1, max_jobs=2) as pool:
+                results["limit"] = [await pool_run(pool, "record") for _ in range(3)]
+            async with hython_pool.HythonPool(hython_path, 1, max_growth_mb=50) as pool:
+                results["growth"] = [
+                    await pool_run(pool, action) for action in ("record", "hog", "record")
+                ]
+            async with hython_pool.HythonPool(hython_path, 1) as pool:
+                results["crash"] = [
+                    await pool_run(pool, action) for action in ("record", "crash", "record")
+                ]
+            async with hython_pool.HythonPool(hython_path, 2) as pool:
+                start = time.time()
+                results["parallel"] = await asyncio.gather(
+                    pool_run(pool, "sleep"), pool_run(pool, "sleep")
+                )
+                results["parallel_seconds"] = time.time() - start
+            broken_path = bin_path / "broken.exe"
+            broken_path.write_text(f"#!{sys.executable}\nimport sys\nsys.exit(1)\n")
+            broken_path.chmod(0o755)
+            async with hython_pool.HythonPool(broken_path, 1) as pool:
+                results["broken"] = await asyncio.wait_for(pool_run(pool, "record"), 20)
+            return results
+
+        results = asyncio.run(lifecycle())
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+        # 6. Job limit
+        pids = [pid for _, pid in results["limit"]]
+        check(
+            "worker replaced after its job limit",
+            pids[0] == pids[1] and pids[2] not in (None, pids[0]),
+            str(pids),
+        )
+
+        # 7. Memory growth
+        pids = [pid for _, pid in results["growth"]]
+        check(
+            "worker replaced on memory growth",
+            pids[0] == pids[1] and pids[2] not in (None, pids[0]),
+            str(pids),
+        )
+
+        # 8. Worker death
+        (_, first_pid), (crash_code, _), (code, pid) = results["crash"]
+        check(
+            "dead worker fails its job only",
+            crash_code == 7 and code == 0 and pid not in (None, first_pid),
+            f"{crash_code} {first_pid} {pid}",
+        )
+
+        # 9. Parallel
+        (code_a, pid_a), (code_b, pid_b) = results["parallel"]
+        check(
+            "jobs run in several workers at once",
+            code_a == 0 and code_b == 0 and pid_a != pid_b,
+            f"{pid_a} {pid_b} in {results['parallel_seconds']:.1f}s",
+        )
+
+        # 10. Workers that cannot start
+        check(
+            "broken pool hands its jobs back",
+            results["broken"] == (None, None),
+            str(results["broken"]),
+        )
+
+        # 11. One-shot fallback
+        os.environ["TH_HYTHON_POOL"] = "1"
+        os.environ["PXR_VERIFY_FALLBACK"] = "1"
+        pool_command = hython_pool._pool_command
+        start_timeout = hython_pool.START_TIMEOUT
+        hython_pool._pool_command = lambda *args: [sys.executable, "-c", "pass"]
+        hython_pool.START_TIMEOUT = 1.0
+        try:
+            code, record, output = run("record")
+        finally:
+            hython_pool._pool_command = pool_command
+            hython_pool.START_TIMEOUT = start_timeout
+            os.environ.pop("PXR_VERIFY_FALLBACK")
+            os.environ.pop("TH_HYTHON_POOL")
+        check(
+            "one-shot when no pool starts",
+            code == 0 and record.get("pid") not in (None, warm_pid)
+            and "Houdini Runner: Done" in output,
+        )
+
+        # Callers that go away
+        async def abandon(pool, cancel):
+            record_path = records_path / f"{time.time_ns()}.json"
+            reply = await hython_pool._request(pool.port, dict(kind="submit", token=pool.token, task=dict(
+                cwd=str(temp), env=dict(os.environ), path=str(script_path),
+                args=[str(record_path), "long"], log=str(temp / "abandoned.log"),
+            )))
+            job_id = reply["job"]
+            waited = await hython_pool._request(
+                pool.port, dict(kind="wait", token=pool.token, job=job_id)
+            )
+            if cancel:
+                await hython_pool._request(
+                    pool.port, dict(kind="cancel", token=pool.token, job=job_id)
+                )
+            start = time.time()
+            while pool.stats()["busy"] > 0 and time.time() - start < 10:
+                await asyncio.sleep(0.1)
+            seconds = time.time() - start
+            pid = json.loads(record_path.read_text())["pid"] if record_path.exists() else None
+            try:
+                os.kill(pid, 0)
+                killed = False
+            except (ProcessLookupError, TypeError):
+                killed = pid is not None
+            _, next_pid = await pool_run(pool, "record")
+            return waited.get("kind"), killed, seconds, pid, next_pid
+
+        async def abandoned():
+            results = {}
+            async with hython_pool.HythonPool(hython_path, 1, lease_seconds=1.0) as pool:
+                results["lease"] = await abandon(pool, False)
+                results["cancel"] = await abandon(pool, True)
+            return results
+
+        wait_seconds = hython_pool.WAIT_SECONDS
+        hython_pool.WAIT_SECONDS = 1.0
+        try:
+            results = asyncio.run(abandoned())
+        finally:
+            hython_pool.WAIT_SECONDS = wait_seconds
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+        # 12. Lease
+        waited, killed, seconds, pid, next_pid = results["lease"]
+        check(
+            "abandoned job cancelled, worker killed",
+            waited == "waiting" and killed and seconds < 5
+            and next_pid not in (None, pid),
+            f"{waited} {killed} {seconds:.1f}s {pid} {next_pid}",
+        )
+
+        # 13. Cancel
+        waited, killed, seconds, pid, next_pid = results["cancel"]
+        check(
+            "cancelled job dropped, worker killed",
+            waited == "waiting" and killed and seconds < 1
+            and next_pid not in (None, pid),
+            f"{waited} {killed} {seconds:.1f}s {pid} {next_pid}",
+        )
+
+        # 14. Claims
+        async def claims():
+            claim_path = temp / "claim.json"
+            claim_path.write_text(json.dumps(dict(port=1, pid=1)))
+            async with hython_pool.HythonPool(hython_path, 1) as first, \
+                    hython_pool.HythonPool(hython_path, 1) as second:
+                claimed = await asyncio.gather(
+                    hython_pool._claim(claim_path, first),
+                    hython_pool._claim(claim_path, second),
+                )
+                owner = json.loads(claim_path.read_text())["port"]
+                winner = first.port if claimed[0] else second.port
+            return claimed, owner == winner, claim_path.with_suffix(".lock").exists()
+
+        claimed, owned, locked = asyncio.run(claims())
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        check(
+            "one of two starting pools claims the state",
+            sorted(claimed) == [False, True] and owned and not locked,
+            f"{claimed} {owned} {locked}",
+        )
+
+        # 15. Token
+        async def intrude(state_path):
+            state = await hython_pool._live_pool(state_path)
+            task = dict(
+                cwd=str(temp), env=dict(os.environ), path=str(script_path),
+                args=[str(records_path / "intruder.json"), "record"],
+                log=str(temp / "intruder.log"),
+            )
+            replies = [
+                await hython_pool._request(state["port"], dict(kind="submit", task=task)),
+                await hython_pool._request(
+                    state["port"], dict(kind="submit", token="0" * 32, task=task)
+                ),
+                await hython_pool._request(state["port"], dict(kind="stop")),
+            ]
+            return [reply.get("kind") for reply in replies]
+
+        kinds = asyncio.run(intrude(pool_states[0]))
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        mode = pool_states[0].stat().st_mode & 0o777
+        os.environ["TH_HYTHON_POOL"] = "1"
+        code, record, _ = run("record")
+        os.environ.pop("TH_HYTHON_POOL")
+        check(
+            "requests without the token refused",
+            kinds == ["error"] * 3 and mode == 0o600
+            and not (records_path / "intruder.json").exists()
+            and code == 0 and record.get("pid") == warm_pid
+            and record.get("token") is False,
+            f"{kinds} {oct(mode)} {record.get('token')}",
+        )
+
+        # Stop the background pool
+        async def stop(state_path):
+            state = await hython_pool._live_pool(state_path)
+            if state is not None:
+                await hython_pool._request(
+                    state["port"], dict(kind="stop", token=state["token"])
+                )
+
+        for state_path in pool_states:
+            asyncio.run(stop(state_path))
+            deadline = time.time() + 20
+            while state_path.exists() and time.time() < deadline:
+                time.sleep(0.2)
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
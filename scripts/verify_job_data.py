@@ -0,0 +1,247 @@
+"""Verify the content-addressed job data store against a throwaway jobs root.
+
+Pins the contract of ``tumblepipe.apps.job_data``: submitted job data is
+stored once per content under ``<jobs root>/_blobs``, read-only, and linked
+into each job's ``data/`` dir; a resubmit transfers nothing new; where the
+jobs root takes no hardlinks the job resolves its data from its manifest;
+and blob GC only removes what no job can still need.
+
+Needs neither Deadline nor project data:
+
+    python scripts/verify_job_data.py
+
+Checks:
+  1. A first submit stores every file and links it into data/.
+  2. The manifest lists every file with its digest.
+  3. Stored blobs are read-only.
+  4. A second submit reuses every blob and stores no new bytes.
+  5. Without hardlinks, blobs and manifest are stored and materialize fills data/.
+  6. GC keeps linked and recent blobs.
+  7. GC removes unreferenced blobs and stale temp files.
+  8. GC keeps blobs only a manifest lists.
+  9. scripts/gc_job_blobs.py reports in dry-run and deletes with --delete.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+from tumblepipe.apps import job_data  # noqa: E402
+
+DAY = 24 * 60 * 60
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def write_sources(root: Path) -> dict:
+    """A ``job.paths``-shaped mapping: a workfile and a dir of configs."""
+    workfile = root / "shot_010.hip"
+    workfile.parent.mkdir(parents=True)
+    workfile.write_bytes(b"hip" * 4096)
+    config_dir = root / "config"
+    (config_dir / "nested").mkdir(parents=True)
+    (config_dir / "render.json").write_text('{"samples": 64}')
+    (config_dir / "nested" / "aovs.json").write_text('["beauty", "depth"]')
+    return {workfile: Path("workfile.hip"), config_dir: Path("config")}
+
+
+def submit(jobs_root: Path, paths: dict):
+    job_path = jobs_root / uuid4().hex
+    (job_path / "data").mkdir(parents=True)
+    files = job_data.expand_paths(paths)
+    stats = job_data.store_job_data(job_path, files, jobs_root)
+    return job_path, files, stats
+
+
+def sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def data_files(data_path: Path) -> list:
+    return sorted(
+        path.relative_to(data_path).as_posix()
+        for path in data_path.rglob("*")
+        if path.is_file()
+    )
+
+
+def age(path: Path, seconds: float):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def main():
+    os.environ.pop(job_data.STORE_ENV, None)
+    with tempfile.TemporaryDirectory(prefix="th_job_data_") as temp_dir:
+        temp = Path(temp_dir)
+        paths = write_sources(temp / "sources")
+        jobs_root = temp / "jobs"
+        jobs_root.mkdir()
+
+        # 1. First submit
+        first_path, files, first = submit(jobs_root, paths)
+        total = sum(source.stat().st_size for source in files.values())
+        first_data = first_path / "data"
+        linked = all(
+            (first_data / rel_path).stat().st_nlink > 1
+            and (first_data / rel_path).read_bytes() == source.read_bytes()
+            for rel_path, source in files.items()
+        )
+        check(
+            "first submit stores and links every file",
+            first.files == 3 and first.new_bytes == total
+            and first.reused_bytes == 0 and first.manifest_files == 0
+            and linked,
+            str(first),
+        )
+
+        # 2. Manifest
+        manifest = json.loads(
+            (first_path / job_data.MANIFEST_NAME).read_text()
+        )
+        expected = {
+            rel_path.as_posix(): sha256(source)
+            for rel_path, source in files.items()
+        }
+        check(
+            "manifest lists every file",
+            manifest == expected
+            and all(
+                job_data.blob_path(jobs_root, digest).exists()
+                for digest in manifest.values()
+            ),
+            str(sorted(manifest)),
+        )
+
+        # 3. Read-only blobs
+        blobs = [job_data.blob_path(jobs_root, digest) for digest in manifest.values()]
+        modes = {oct(stat.S_IMODE(blob.stat().st_mode)) for blob in blobs}
+        check("blobs are read-only", modes == {oct(0o444)}, str(modes))
+
+        # 4. Second submit
+        second_path, _, second = submit(jobs_root, paths)
+        check(
+            "second submit reuses every blob",
+            second.new_bytes == 0 and second.reused_bytes == total
+            and data_files(second_path / "data") == sorted(expected)
+            and all(blob.stat().st_nlink == 3 for blob in blobs),
+            str(second),
+        )
+
+        # 5. No hardlinks
+        unlinked_root = temp / "unlinked_jobs"
+        unlinked_root.mkdir()
+        job_data._LINK_SUPPORT[str(unlinked_root)] = False
+        unlinked_path, _, unlinked = submit(unlinked_root, paths)
+        unlinked_data = unlinked_path / "data"
+        left_empty = data_files(unlinked_data) == []
+        unlinked_manifest = json.loads(
+            (unlinked_path / job_data.MANIFEST_NAME).read_text()
+        )
+        copied = job_data.materialize(unlinked_data)
+        copied_again = job_data.materialize(unlinked_data)
+        check(
+            "without hardlinks the job resolves data from its manifest",
+            unlinked.new_bytes == total and unlinked.manifest_files == 3
+            and left_empty and unlinked_manifest == expected
+            and all(
+                job_data.blob_path(unlinked_root, digest).exists()
+                for digest in expected.values()
+            )
+            and copied == 3 and copied_again == 0
+            and all(
+                (unlinked_data / rel_path).read_bytes() == source.read_bytes()
+                for rel_path, source in files.items()
+            ),
+            f"{unlinked}, copied {copied} then {copied_again}",
+        )
+
+        # 6-7. GC. Age every blob past the grace period, then set up one of
+        # each case: linked but unlisted, listed but unlinked, unreferenced,
+        # unreferenced but recent, and a stale temp file.
+        (second_path / job_data.MANIFEST_NAME).unlink()
+        stale_source = temp / "sources" / "stale.bin"
+        stale_source.write_bytes(b"stale" * 100)
+        stale_blob = job_data.blob_path(jobs_root, sha256(stale_source))
+        job_data._store_blob(stale_source, stale_blob)
+        recent_source = temp / "sources" / "recent.bin"
+        recent_source.write_bytes(b"recent" * 100)
+        recent_blob = job_data.blob_path(jobs_root, sha256(recent_source))
+        job_data._store_blob(recent_source, recent_blob)
+        temp_blob = stale_blob.with_name(f"{stale_blob.name}.{uuid4().hex}.tmp")
+        temp_blob.write_bytes(b"partial")
+        for path in [*blobs, stale_blob, temp_blob]:
+            age(path, 2 * DAY)
+
+        shutil.rmtree(first_path)
+        gc_count, gc_size = job_data.collect_unreferenced_blobs(jobs_root, DAY)
+        check(
+            "GC keeps linked and recent blobs",
+            all(blob.exists() for blob in blobs) and recent_blob.exists(),
+            f"{gc_count} removed",
+        )
+        check(
+            "GC removes unreferenced blobs and stale temp files",
+            not stale_blob.exists() and not temp_blob.exists()
+            and gc_count == 2
+            and gc_size == stale_source.stat().st_size + len(b"partial"),
+            f"{gc_count} removed, {gc_size} bytes",
+        )
+
+        # 8. Listed but unlinked: the no-hardlink job keeps its blobs
+        unlinked_blobs = [
+            job_data.blob_path(unlinked_root, digest) for digest in expected.values()
+        ]
+        for path in unlinked_blobs:
+            age(path, 2 * DAY)
+        job_data.collect_unreferenced_blobs(unlinked_root, DAY)
+        check(
+            "GC keeps blobs only a manifest lists",
+            all(path.exists() for path in unlinked_blobs),
+        )
+
+        # 9. GC script
+        shutil.rmtree(second_path)
+        script = [sys.executable, str(ROOT / "gc_job_blobs.py"), str(jobs_root)]
+        dry_run = subprocess.run(script, capture_output=True, text=True)
+        kept = all(blob.exists() for blob in blobs)
+        deleted = subprocess.run(
+            [*script, "--delete"], capture_output=True, text=True
+        )
+        check(
+            "gc_job_blobs.py dry-runs, then deletes",
+            dry_run.returncode == 0 and "Would delete 3" in dry_run.stdout
+            and kept
+            and deleted.returncode == 0 and "Deleted 3" in deleted.stdout
+            and not any(blob.exists() for blob in blobs)
+            and recent_blob.exists(),
+            f"{dry_run.stdout.strip()} / {deleted.stdout.strip()}",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Verify the cached, parallel layer path analysis against the plain checks.
+
+Pins the contract of ``tumblepipe.pipe.usd.analyze_layer_paths``: over an
+export folder (a main layer plus its sidecar layers) it reports the same
+escaping and dangling arcs as running ``find_escaping_layer_paths`` and
+``find_dangling_layer_paths`` on each layer, serially or in parallel; it
+reuses a layer's arcs while the layer and the resolver are unchanged, and
+never answers the dangling question from a stale result.
+
+Needs ``pxr`` but no Houdini or project data — plain ``usd-core`` is
+enough, and everything is written to a throwaway tempdir:
+
+    python scripts/verify_layer_path_analysis.py
+
+Checks:
+  1. Results match the plain find_* checks for every layer.
+  2. A sidecar's arc to a sibling in the folder does not escape.
+  3. Parallel and serial analysis agree.
+  4. An unchanged layer is not reopened.
+  5. A rewritten layer is reopened.
+  6. A resolver generation change reopens every layer.
+  7. A target that disappears is reported dangling on a cache hit.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from tumblepipe import resolver  # noqa: E402
+from tumblepipe.pipe import usd  # noqa: E402
+
+FAILURES = []
+
+LAYER = """#usda 1.0
+(
+    subLayers = [{sublayers}]
+)
+
+def Xform "World" (
+    references = [{references}]
+)
+{{
+}}
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def write_layer(path: Path, sublayers=(), references=()):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(LAYER.format(
+        sublayers=", ".join(f"@{arc}@" for arc in sublayers),
+        references=", ".join(f"@{arc}@" for arc in references),
+    ))
+
+
+def write_folder(root: Path) -> Path:
+    """An export folder: a main layer and two sidecar layers."""
+    folder = root / "export"
+    outside = root / "outside.usda"
+    write_layer(outside)
+    write_layer(folder / "shared.usda")
+    write_layer(
+        folder / "geo" / "mesh.usda",
+        sublayers=["../shared.usda"],
+        references=["../../outside.usda", "./missing.usda"],
+    )
+    write_layer(folder / "geo" / "target.usda")
+    write_layer(
+        folder / "layer.usda",
+        sublayers=["geo/mesh.usda", "shared.usda"],
+        references=[str(outside), "./gone.usda", "geo/target.usda", "entity:/assets/prop/chair"],
+    )
+    return folder
+
+
+def plain(layer_paths, folder):
+    reports = []
+    for layer_path in layer_paths:
+        arcs = usd.collect_layer_composition_paths(layer_path)
+        reports.append((
+            layer_path,
+            tuple(usd.find_escaping_layer_paths(arcs, layer_path.parent, folder=folder)),
+            tuple(usd.find_dangling_layer_paths(arcs, layer_path.parent)),
+        ))
+    return reports
+
+
+def as_tuples(reports):
+    return [(report.layer_path, report.escaping, report.dangling) for report in reports]
+
+
+class CountingCollect:
+    """Counts the layers ``analyze_layer_paths`` actually opens."""
+
+    def __init__(self):
+        self.original = usd.collect_layer_composition_paths
+        self.opened = []
+
+    def __call__(self, layer_path):
+        self.opened.append(Path(layer_path).name)
+        return self.original(layer_path)
+
+    def take(self):
+        opened, self.opened = sorted(self.opened), []
+        return opened
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_layer_paths_") as temp_dir:
+        folder = write_folder(Path(temp_dir))
+        main_layer = folder / "layer.usda"
+        layer_paths = [main_layer] + [
+            path for path in usd.list_layer_files(folder) if path != main_layer
+        ]
+        names = sorted(path.name for path in layer_paths)
+
+        # 1. Against the plain checks
+        expected = plain(layer_paths, folder)
+        reports = usd.analyze_layer_paths(layer_paths, folder=folder)
+        check(
+            "matches find_escaping/find_dangling",
+            as_tuples(reports) == expected,
+            str([(path.name, escaping, dangling) for path, escaping, dangling in expected]),
+        )
+
+        # 2. Folder-relative escaping
+        mesh = dict(zip([path.name for path in layer_paths], reports))["mesh.usda"]
+        check(
+            "sidecar arcs escape only when leaving the folder",
+            mesh.escaping == ("../../outside.usda",)
+            and mesh.dangling == ("./missing.usda",),
+            f"{mesh.escaping}, {mesh.dangling}",
+        )
+
+        # 3. Serial
+        usd._LAYER_ARC_CACHE.clear()
+        serial = usd.analyze_layer_paths(layer_paths, folder=folder, max_workers=1)
+        check("parallel and serial agree", as_tuples(serial) == as_tuples(reports))
+
+        counting = CountingCollect()
+        usd.collect_layer_composition_paths = counting
+        try:
+            # 4. Cache hit
+            usd._LAYER_ARC_CACHE.clear()
+            usd.analyze_layer_paths(layer_paths, folder=folder)
+            first = counting.take()
+            again = usd.analyze_layer_paths(layer_paths, folder=folder)
+            check(
+                "unchanged layers are not reopened",
+                first == names and counting.take() == []
+                and as_tuples(again) == as_tuples(reports),
+                f"{first} then none",
+            )
+
+            # 5. Rewrite
+            write_layer(folder / "shared.usda", references=["./added.usda"])
+            rewritten = usd.analyze_layer_paths(layer_paths, folder=folder)
+            shared = dict(zip([path.name for path in layer_paths], rewritten))["shared.usda"]
+            check(
+                "a rewritten layer is reopened",
+                counting.take() == ["shared.usda"]
+                and shared.dangling == ("./added.usda",),
+                str(shared.dangling),
+            )
+
+            # 6. Resolver generation
+            previous = resolver.get_latest_mode()
+            resolver.set_latest_mode(not previous)
+            try:
+                usd.analyze_layer_paths(layer_paths, folder=folder)
+                flipped = counting.take()
+            finally:
+                resolver.set_latest_mode(previous)
+            check("a resolver generation change reopens every layer", flipped == names, str(flipped))
+
+            # 7. Dangling on a cache hit
+            usd.analyze_layer_paths(layer_paths, folder=folder)
+            counting.take()
+            (folder / "geo" / "target.usda").unlink()
+            remaining = [path for path in layer_paths if path.exists()]
+            gone = usd.analyze_layer_paths(remaining, folder=folder)
+            check(
+                "a vanished target is reported dangling",
+                counting.take() == []
+                and "geo/target.usda" in gone[0].dangling
+                and gone[0].dangling == tuple(plain([main_layer], folder)[0][2]),
+                str(gone[0].dangling),
+            )
+        finally:
+            usd.collect_layer_composition_paths = counting.original
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
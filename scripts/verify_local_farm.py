@@ -0,0 +1,178 @@
+"""Verify the local farm executor against throwaway task scripts.
+
+Pins the contract of ``tumblepipe.apps.local_farm.LocalFarm``: a batch runs
+as one process per frame chunk, jobs start only once their dependencies
+completed, a failed job leaves its dependents ``Pending``, the query surface
+matches ``Deadline.find_jobs`` / ``find_tasks``, and tasks reach the stub
+Houdini when asked to.
+
+Needs neither Deadline, Houdini nor project data:
+
+    python scripts/verify_local_farm.py
+
+Checks:
+  1. A 1-10 job with chunk size 4 runs as 3 tasks over the right frames.
+  2. A dependent job starts after every task of its dependency finished.
+  3. A failing job is Failed and its dependent stays Pending with no runs.
+  4. find_jobs / find_tasks filter like the Deadline queries.
+  5. Per-task timings are recorded and local_timings.json is written.
+  6. A task resolving Husk runs the stub executable.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+FAILURES = []
+
+TASK_SCRIPT = """
+import json, sys, time
+from pathlib import Path
+*args, first, last = sys.argv[1:]
+out_path = Path(args[0])
+out_path.mkdir(parents=True, exist_ok=True)
+start = time.time()
+time.sleep(0.05)
+(out_path / f"{first}_{last}.json").write_text(json.dumps(
+    {"frames": [int(first), int(last)], "start": start, "end": time.time()}
+))
+sys.exit(1 if "fail" in args else 0)
+"""
+
+HUSK_SCRIPT = """
+import sys
+from pathlib import Path
+from tumblepipe.apps.houdini import Husk
+sys.exit(Husk().run(Path("scene.usd"), ["--frame", sys.argv[-2]]))
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def make_job(deadline, script_path, name, out_path, *extra, chunk_size=4):
+    job = deadline.Job(script_path, None, str(out_path), *extra)
+    job.name = name
+    job.pool = "none"
+    job.group = "none"
+    job.start_frame = 1
+    job.end_frame = 10
+    job.chunk_size = chunk_size
+    return job
+
+
+def runs(out_path):
+    if not out_path.exists():
+        return []
+    return [json.loads(path.read_text()) for path in sorted(out_path.iterdir())]
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_local_farm_") as temp_dir:
+        temp = Path(temp_dir)
+        script_path = temp / "task.py"
+        script_path.write_text(TASK_SCRIPT)
+        husk_script_path = temp / "husk_task.py"
+        husk_script_path.write_text(HUSK_SCRIPT)
+        stub_log = temp / "stub.log"
+        os.environ["TH_STUB_LOG"] = str(stub_log)
+
+        from tumblepipe.apps import deadline
+        from tumblepipe.apps.local_farm import LocalFarm, TIMINGS_NAME
+
+        farm = LocalFarm(workers=3, stub_apps=True)
+        batch = deadline.Batch("local")
+        first = batch.add_job(make_job(deadline, script_path, "first", temp / "first"))
+        second = batch.add_job(make_job(deadline, script_path, "second", temp / "second"))
+        batch.add_dep(second, first)
+        failing = batch.add_job(
+            make_job(deadline, script_path, "failing", temp / "failing", "fail",
+                     chunk_size=10)
+        )
+        blocked = batch.add_job(make_job(deadline, script_path, "blocked", temp / "blocked"))
+        batch.add_dep(blocked, failing)
+        husk = deadline.Job(husk_script_path, None)
+        husk.name = "husk"
+        husk.pool = "none"
+        husk.group = "none"
+        batch.add_job(husk)
+        farm.submit(batch, temp / "jobs")
+        check("farm drained", farm.wait(timeout=60))
+        farm.shutdown()
+
+        # 1. Chunking
+        first_runs = runs(temp / "first")
+        check(
+            "chunked into 3 tasks",
+            sorted(run["frames"] for run in first_runs) == [[1, 4], [5, 8], [9, 10]],
+            str([run["frames"] for run in first_runs]),
+        )
+
+        # 2. Dependency gating
+        second_runs = runs(temp / "second")
+        check(
+            "dependent starts after its dependency",
+            len(second_runs) == 3
+            and min(run["start"] for run in second_runs)
+            >= max(run["end"] for run in first_runs),
+        )
+
+        # 3. Failure
+        jobs = {job["Name"]: job for job in farm.find_jobs()}
+        check("failing job is Failed", jobs["failing"]["Status"] == "Failed")
+        check(
+            "its dependent stays Pending",
+            jobs["blocked"]["Status"] == "Pending" and runs(temp / "blocked") == [],
+        )
+
+        # 4. Queries
+        completed = farm.find_jobs(BatchName="local", Status="Completed")
+        check(
+            "find_jobs filters",
+            sorted(job["Name"] for job in completed) == ["first", "husk", "second"],
+        )
+        tasks = farm.find_tasks(jobs["first"]["JobID"], Status="Completed")
+        check("find_tasks filters", len(tasks) == 3, f"{len(tasks)} tasks")
+
+        # 5. Timings
+        check(
+            "task timings recorded",
+            all(float(task["Seconds"]) > 0 for task in tasks),
+        )
+        timings_paths = list((temp / "jobs").glob(f"*/{TIMINGS_NAME}"))
+        timings = json.loads(timings_paths[0].read_text()) if timings_paths else []
+        check(
+            "timings file written",
+            sorted(job["Name"] for job in timings)
+            == ["failing", "first", "husk", "second"],
+        )
+
+        # 6. Stub apps
+        stub_calls = (
+            [json.loads(line) for line in stub_log.read_text().splitlines()]
+            if stub_log.exists() else []
+        )
+        check(
+            "task ran the stub husk",
+            len(stub_calls) == 1 and Path(stub_calls[0][0]).name == "husk.exe",
+            str(stub_calls),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
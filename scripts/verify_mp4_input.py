@@ -0,0 +1,189 @@
+"""Verify the input modes of ``tumblepipe.apps.mp4.from_jpg`` with a stub ffmpeg.
+
+Pins the contract of ``from_jpg``'s ``input_mode``: ``link`` stages links
+named as one contiguous sequence beside the frames, ``pipe`` streams the
+frame bytes to ffmpeg's stdin, and ``copy`` copies the frames into a temp dir
+as before. All three hand ffmpeg the same frames, with the same hold and gap
+filling.
+
+Needs neither Houdini nor real images. hffmpeg is replaced by a stub that
+reads its input (a numbered sequence, or JPEGs on stdin) and writes the
+frames it saw as the "movie":
+
+    python scripts/verify_mp4_input.py
+
+Checks:
+  1. Every mode encodes the same frames, gaps and step held.
+  2. link stages links, not copies, and leaves nothing behind.
+  3. pipe stages nothing and streams each frame's bytes.
+  4. A failed pipe encode raises and leaves no partial output.
+  5. repeat_missing_frames=False still raises on missing frames.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+# Frames are fake JPEGs: start and end markers around a text body
+FFMPEG_STUB = """#!PYTHON
+import json, os, sys
+args = sys.argv[1:]
+if os.environ.get('TH_STUB_FAIL') == '1':
+    sys.exit(1)
+source = args[args.index('-i') + 1]
+count = int(args[args.index('-frames:v') + 1])
+frames = []
+staged = []
+if source == '-':
+    data = sys.stdin.buffer.read()
+    frames = [part[2:].decode() for part in data.split(b'\\xff\\xd9') if part]
+else:
+    start = int(args[args.index('-start_number') + 1])
+    for frame_index in range(start, start + count):
+        frame_path = source.replace('%04d', str(frame_index).zfill(4))
+        with open(frame_path, 'rb') as frame_file:
+            frames.append(frame_file.read()[2:-2].decode())
+        staged.append(dict(
+            link=os.path.islink(frame_path) or os.stat(frame_path).st_nlink > 1,
+            dir=os.path.dirname(frame_path),
+        ))
+with open(args[-1], 'w') as output_file:
+    output_file.write(json.dumps(dict(frames=frames[:count])))
+with open(os.environ['TH_STUB_LOG'], 'a') as log_file:
+    log_file.write(json.dumps(dict(source=source, staged=staged)) + '\\n')
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def read_log(log_path):
+    if not log_path.exists():
+        return []
+    calls = [json.loads(line) for line in log_path.read_text().splitlines()]
+    log_path.unlink()
+    return calls
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_mp4_input_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        log_path = temp / "stub.log"
+        os.environ["TH_STUB_LOG"] = str(log_path)
+
+        from tumblepipe.apps.houdini import HOUDINI_ROOT_ENV
+        from tumblepipe.apps.local_farm import install_stub_houdini
+
+        bin_path = install_stub_houdini(temp / "houdini")
+        (bin_path / "hffmpeg.exe").write_text(FFMPEG_STUB.replace("PYTHON", sys.executable, 1))
+        os.environ[HOUDINI_ROOT_ENV] = str(temp / "houdini")
+
+        from tumblepipe.apps import mp4
+        from tumblepipe.config.timeline import BlockRange
+
+        # Frames 1003-1009 step 2, with 1007 missing and a frame before the range
+        frames_path = temp / "frames"
+        frames_path.mkdir()
+        for frame_index in (999, 1003, 1005, 1009):
+            (frames_path / f"shot.{frame_index:04d}.jpg").write_bytes(
+                b"\xff\xd8" + f"frame {frame_index}".encode() + b"\xff\xd9"
+            )
+        framestack_path = frames_path / "shot.*.jpg"
+        frame_range = BlockRange(1001, 1010, 2)
+        expected = [f"frame {index}" for index in (
+            999, 999, 1003, 1003, 1005, 1005, 1005, 1005, 1009, 1009,
+        )]
+
+        # 1. Same frames in every mode
+        movies = {}
+        calls = {}
+        for input_mode in mp4.INPUT_MODES:
+            output_path = temp / "movies" / f"{input_mode}.mp4"
+            mp4.from_jpg(framestack_path, frame_range, 24, output_path, input_mode=input_mode)
+            movies[input_mode] = json.loads(output_path.read_text())["frames"]
+            calls[input_mode] = read_log(log_path)
+        check(
+            "every mode encodes the same frames",
+            all(frames == expected for frames in movies.values()),
+            str(movies),
+        )
+
+        # 2. Links beside the frames
+        staged = calls["link"][0]["staged"] if calls["link"] else []
+        leftovers = [path.name for path in frames_path.iterdir() if path.is_dir()]
+        check(
+            "link stages links beside the frames",
+            len(staged) == 10
+            and all(frame["link"] for frame in staged)
+            and all(Path(frame["dir"]).parent == frames_path for frame in staged)
+            and leftovers == [],
+            f"{staged[:1]} {leftovers}",
+        )
+
+        # 3. Nothing staged
+        check(
+            "pipe stages nothing",
+            [call["source"] for call in calls["pipe"]] == ["-"]
+            and calls["pipe"][0]["staged"] == []
+            and sorted(path.name for path in (temp / "movies").iterdir())
+            == ["copy.mp4", "link.mp4", "pipe.mp4"],
+        )
+
+        # 4. Failed pipe encode
+        os.environ["TH_STUB_FAIL"] = "1"
+        failed_path = temp / "failed" / "pipe.mp4"
+        try:
+            mp4.from_jpg(framestack_path, frame_range, 24, failed_path, input_mode="pipe")
+            raised = False
+        except RuntimeError:
+            raised = True
+        os.environ.pop("TH_STUB_FAIL")
+        check(
+            "failed pipe encode raises, no partial output",
+            raised and list(failed_path.parent.iterdir()) == [],
+        )
+
+        # 5. Missing frames without repeats
+        try:
+            mp4.from_jpg(
+                framestack_path, BlockRange(1003, 1011, 2), 24, temp / "strict.mp4",
+                repeat_missing_frames=False,
+            )
+            raised = False
+        except ValueError:
+            raised = True
+        check("missing frames raise without repeats", raised)
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Verify the mp4 task's staleness model with stub iconvert and ffmpeg.
+
+Pins the contract of ``tumblepipe.farm.tasks.mp4.mp4``: the JPEGs and the
+encoded movie are kept in a cache dir with a manifest, so a rerun
+converts only the frames that changed, encodes only when a frame or the
+encode settings changed, copies only to outputs that are missing or were
+replaced, and does nothing when nothing changed.
+
+Needs neither Houdini nor real images. iconvert is replaced by a stub that
+"converts" a frame by copying its text, and hffmpeg by one that joins the
+frames it is given into the "movie"; both log their calls:
+
+    python scripts/verify_mp4_staleness.py
+
+Checks:
+  1. A first run converts every frame, encodes and writes every output.
+  2. A rerun with nothing changed converts, encodes and copies nothing.
+  3. A changed frame is converted alone, then encoded and copied out.
+  4. A touched frame with hashing on is not converted or encoded again.
+  5. A changed encode setting re-encodes without converting.
+  6. A missing or replaced output is copied again without encoding.
+  7. A shorter range drops the JPEGs outside it.
+  8. A task on a sequence waits for the one using its cache; a dead task's
+     lock is broken.
+  9. Cache dirs unused for too long are removed; used and locked ones kept.
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+STUB_HEADER = """#!PYTHON
+import json, os, sys
+args = sys.argv[1:]
+def log(app, **data):
+    with open(os.environ['TH_STUB_LOG'], 'a') as log_file:
+        log_file.write(json.dumps(dict(app=app, **data)) + '\\n')
+"""
+
+ICONVERT_STUB = STUB_HEADER + """
+input_path, output_path = args[-2], args[-1]
+with open(input_path) as input_file:
+    text = input_file.read()
+with open(output_path, 'w') as output_file:
+    output_file.write('jpg:' + text)
+log('iconvert', frame=os.path.basename(input_path))
+"""
+
+FFMPEG_STUB = STUB_HEADER + """
+pattern = args[args.index('-i') + 1]
+start = int(args[args.index('-start_number') + 1])
+count = int(args[args.index('-frames:v') + 1])
+frames = []
+for frame_index in range(start, start + count):
+    with open(pattern.replace('%04d', str(frame_index).zfill(4))) as frame_file:
+        frames.append(frame_file.read())
+with open(args[-1], 'w') as output_file:
+    output_file.write(json.dumps(dict(args=args[:-1], frames=frames)))
+log('ffmpeg', frames=count)
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def read_log(log_path):
+    if not log_path.exists():
+        return []
+    calls = [json.loads(line) for line in log_path.read_text().splitlines()]
+    log_path.unlink()
+    return calls
+
+
+def write_frame(frames_path, frame_index, text):
+    frame_path = frames_path / f"slapcomp.{frame_index:04d}.exr"
+    frame_path.write_text(text)
+    return frame_path
+
+
+def summary(calls):
+    return dict(
+        converted=sorted(call["frame"] for call in calls if call["app"] == "iconvert"),
+        encodes=sum(1 for call in calls if call["app"] == "ffmpeg"),
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_mp4_staleness_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        os.environ["TH_FARM_SCRATCH"] = str(temp / "scratch")
+        os.environ["TH_FARM_SCRATCH_MIN_FREE_GB"] = "0"
+        os.environ["OCIO"] = str(temp / "config.ocio")
+        log_path = temp / "stub.log"
+        os.environ["TH_STUB_LOG"] = str(log_path)
+
+        from tumblepipe.apps.houdini import HOUDINI_ROOT_ENV
+        from tumblepipe.apps.local_farm import install_stub_houdini
+
+        bin_path = install_stub_houdini(temp / "houdini")
+        for name, stub in (("iconvert.exe", ICONVERT_STUB), ("hffmpeg.exe", FFMPEG_STUB)):
+            (bin_path / name).write_text(stub.replace("PYTHON", sys.executable, 1))
+        os.environ[HOUDINI_ROOT_ENV] = str(temp / "houdini")
+
+        from tumblepipe.apps import mp4 as mp4_app
+        from tumblepipe.config.timeline import BlockRange
+        from tumblepipe.farm.tasks.mp4 import mp4
+
+        frames_path = temp / "render" / "slapcomp" / "v0001"
+        frames_path.mkdir(parents=True)
+        for frame_index in range(1001, 1006):
+            write_frame(frames_path, frame_index, f"frame {frame_index} v1")
+        input_path = frames_path / "slapcomp.*.exr"
+        playblast_path = temp / "playblast" / "v0001.mp4"
+        daily_path = temp / "daily" / "slapcomp.mp4"
+        output_paths = [playblast_path, daily_path]
+        render_range = BlockRange(1001, 1005)
+
+        def run(frame_range=render_range):
+            code = mp4.main(frame_range, input_path, output_paths)
+            return code, summary(read_log(log_path))
+
+        def movie_frames(path):
+            return json.loads(path.read_text())["frames"]
+
+        # 1. First run
+        code, calls = run()
+        check(
+            "first run converts, encodes and copies",
+            code == 0 and len(calls["converted"]) == 5 and calls["encodes"] == 1
+            and playblast_path.exists() and daily_path.exists()
+            and movie_frames(daily_path)[0] == "jpg:frame 1001 v1",
+            str(calls),
+        )
+
+        # 2. Nothing changed
+        stamp = playblast_path.stat().st_mtime_ns
+        code, calls = run()
+        check(
+            "unchanged rerun does nothing",
+            code == 0 and calls == dict(converted=[], encodes=0)
+            and playblast_path.stat().st_mtime_ns == stamp,
+            str(calls),
+        )
+
+        # 3. A re-rendered frame
+        write_frame(frames_path, 1003, "frame 1003 v2 longer")
+        code, calls = run()
+        check(
+            "changed frame converted alone",
+            code == 0 and calls == dict(converted=["slapcomp.1003.exr"], encodes=1)
+            and movie_frames(playblast_path)[2] == "jpg:frame 1003 v2 longer"
+            and movie_frames(daily_path)[2] == "jpg:frame 1003 v2 longer",
+            str(calls),
+        )
+
+        # 4. Touched, same content, with hashing
+        os.environ[mp4.HASH_ENV] = "1"
+        run()
+        frame_path = write_frame(frames_path, 1002, "frame 1002 v1")
+        later = frame_path.stat().st_mtime_ns + 5_000_000_000
+        os.utime(frame_path, ns=(later, later))
+        code, calls = run()
+        os.environ.pop(mp4.HASH_ENV)
+        check(
+            "touched frame not converted with hashing",
+            code == 0 and calls == dict(converted=[], encodes=0),
+            str(calls),
+        )
+
+        # 5. Encode settings
+        encode_args = list(mp4_app._JPG_ENCODE)
+        mp4_app._JPG_ENCODE[mp4_app._JPG_ENCODE.index("22")] = "18"
+        try:
+            code, calls = run()
+        finally:
+            mp4_app._JPG_ENCODE[:] = encode_args
+        check(
+            "changed setting re-encodes only",
+            code == 0 and calls == dict(converted=[], encodes=1)
+            and "18" in json.loads(daily_path.read_text())["args"],
+            str(calls),
+        )
+        run()
+
+        # 6. Missing and replaced outputs
+        playblast_path.unlink()
+        daily_path.write_text("another version")
+        code, calls = run()
+        check(
+            "outputs recopied without encoding",
+            code == 0 and calls == dict(converted=[], encodes=0)
+            and playblast_path.exists()
+            and daily_path.read_bytes() == playblast_path.read_bytes(),
+            str(calls),
+        )
+
+        # 7. Shorter range
+        code, calls = run(BlockRange(1001, 1003))
+        jpegs = sorted(path.name for path in mp4.cache_path(input_path).glob("frame.*.jpg"))
+        check(
+            "shorter range drops JPEGs outside it",
+            code == 0 and calls == dict(converted=[], encodes=1)
+            and jpegs == ["frame.1001.jpg", "frame.1002.jpg", "frame.1003.jpg"]
+            and len(movie_frames(daily_path)) == 3,
+            f"{calls} {jpegs}",
+        )
+
+        # 8. Concurrent tasks
+        mp4.LOCK_POLL_SECONDS = 0.1
+        cache_dir_path = mp4.cache_path(input_path)
+        held = threading.Event()
+
+        def hold():
+            with mp4.cache_lock(cache_dir_path):
+                held.set()
+                time.sleep(1.0)
+                (cache_dir_path / "held").write_text("")
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait()
+        write_frame(frames_path, 1001, "frame 1001 v2")
+        code, calls = run()
+        waited = (cache_dir_path / "held").exists()
+        holder.join()
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        lock_path = cache_dir_path.with_name(cache_dir_path.name + mp4.LOCK_SUFFIX)
+        lock_path.write_text(json.dumps(dict(host=platform.node(), pid=dead.pid)))
+        write_frame(frames_path, 1002, "frame 1002 v2")
+        broken_code, broken_calls = run()
+        check(
+            "tasks on a sequence take turns, dead locks broken",
+            code == 0 and waited and "slapcomp.1001.exr" in calls["converted"]
+            and broken_code == 0 and broken_calls["converted"] == ["slapcomp.1002.exr"]
+            and not lock_path.exists(),
+            f"{waited} {calls} {broken_calls}",
+        )
+
+        # 9. Eviction
+        cache_root = cache_dir_path.parent
+        old = time.time() - 30 * 24 * 60 * 60
+        old_path = cache_root / "old"
+        locked_path = cache_root / "locked"
+        for path in (old_path, locked_path):
+            path.mkdir()
+            (path / mp4.MANIFEST_NAME).write_text("{}")
+            os.utime(path / mp4.MANIFEST_NAME, (old, old))
+        locked_lock = locked_path.with_name(locked_path.name + mp4.LOCK_SUFFIX)
+        locked_lock.write_text(json.dumps(dict(host=platform.node(), pid=os.getpid())))
+        code, calls = run()
+        check(
+            "unused caches removed, used and locked ones kept",
+            code == 0 and calls == dict(converted=[], encodes=0)
+            and not old_path.exists() and locked_path.exists()
+            and cache_dir_path.exists() and locked_lock.exists(),
+            f"{sorted(path.name for path in cache_root.iterdir())}",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""Verify the pipelined render task against stub Houdini tools.
+
+Pins the contract of ``tumblepipe.farm.tasks.render.render.main``: frames are
+stitched, split, copied and receipted while husk renders the frames after
+them, at most ``TH_RENDER_PIPELINE_DEPTH`` frames are post-processed at once,
+and the outputs and receipts are the ones the phased task produced.
+
+Needs neither Houdini nor project data — husk, itilestitch and hoiiotool are
+replaced by small python stubs that write fake EXRs and log what they did:
+
+    python scripts/verify_render_pipeline.py
+
+Checks:
+  1. An untiled render writes every AOV and receipt of the range.
+  2. Frame 1 is post-processed before husk finished the last frame.
+  3. A tiled render stitches the tiles of each frame in order.
+  4. With a depth of 1, splits never overlap.
+  5. A frame missing a required AOV fails the task.
+  6. Frames husk never wrote fail the task.
+  7. A failed frame stops husk instead of waiting for the rest.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+STUB_HEADER = """#!PYTHON
+import json, os, sys, time
+def log(**entry):
+    with open(os.environ['TH_PIPELINE_LOG'], 'a') as log_file:
+        log_file.write(json.dumps(dict(entry, time=time.time())) + '\\n')
+"""
+
+# husk: one image per frame, or per frame and tile, a little time per frame
+HUSK_STUB = STUB_HEADER + """
+args = sys.argv[1:]
+def arg(name, default=None):
+    return args[args.index(name) + 1] if name in args else default
+first = int(arg('--frame'))
+count = int(arg('--frame-count'))
+output = arg('--output')
+tile = arg('--tile-index')
+for frame in range(first, first + count):
+    time.sleep(float(os.environ.get('TH_STUB_FRAME_SECONDS', '0.2')))
+    if os.environ.get('TH_STUB_NO_OUTPUT'): continue
+    path = output.replace('$F4', f'{frame:04d}')
+    if tile is not None:
+        path = path[:-len('.exr')] + f'.{int(tile):04d}.exr'
+    with open(path, 'w') as image_file:
+        image_file.write(f'frame {frame}' + ('' if tile is None else f' tile {tile}') + ';')
+    log(app='husk', frame=frame, tile=tile)
+"""
+
+ITILESTITCH_STUB = STUB_HEADER + """
+output, *tiles = sys.argv[1:]
+with open(output, 'w') as image_file:
+    for tile in tiles:
+        image_file.write(open(tile).read())
+log(app='itilestitch', output=output)
+"""
+
+# hoiiotool: header queries and subimage splits of the fake multi-part EXRs
+OIIOTOOL_STUB = STUB_HEADER + """
+args = sys.argv[1:]
+aovs = os.environ.get('TH_STUB_AOVS', 'beauty,normal,albedo').split(',')
+if args[0].startswith('--info'):
+    for aov in aovs:
+        print('<ImageSpec version="30">')
+        print('<width>4</width>')
+        print('<height>4</height>')
+        print('<channelnames>')
+        for channel in 'RGB':
+            print(f'<channelname>{aov}.{channel}</channelname>')
+        print('</channelnames>')
+        print(f'<attrib name="oiio:subimagename" type="string">{aov}</attrib>')
+        print('</ImageSpec>')
+    sys.exit(0)
+if '-sisplit' in args:
+    input_path = args[0]
+    name = os.path.basename(input_path)
+    log(app='split', event='start', name=name)
+    time.sleep(float(os.environ.get('TH_STUB_SPLIT_SECONDS', '0.05')))
+    content = open(input_path).read()
+    for index, aov in enumerate(aovs, 1):
+        with open(args[-1].replace('%04d', f'{index:04d}'), 'w') as image_file:
+            image_file.write(content + aov)
+    log(app='split', event='end', name=name)
+    sys.exit(0)
+sys.exit(1)
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def read_log(log_path):
+    if not log_path.exists():
+        return []
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    log_path.unlink()
+    return entries
+
+
+def run(render, temp, name, tile_count, last_frame, **env):
+    from tumblepipe.config.timeline import BlockRange
+
+    for key, value in env.items():
+        os.environ[key] = value
+    out_path = temp / name
+    output_paths = {
+        aov: out_path / aov / f"{aov}.*.exr"
+        for aov in ("beauty", "normal", "albedo")
+    }
+    try:
+        result = render.main(
+            tile_count,
+            BlockRange(1, last_frame),
+            temp / "scene.usda",
+            out_path / "main.*.json",
+            output_paths,
+        )
+    finally:
+        for key in env:
+            os.environ.pop(key, None)
+    return result, out_path
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_render_pipeline_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        (temp / "config.ocio").write_text("")
+        (temp / "scene.usda").write_text("#usda 1.0\n")
+        log_path = temp / "pipeline.log"
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ["OCIO"] = str(temp / "config.ocio")
+        os.environ["TH_PIPELINE_LOG"] = str(log_path)
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+
+        from tumblepipe.apps.houdini import HOUDINI_ROOT_ENV
+        from tumblepipe.apps.local_farm import install_stub_houdini
+
+        bin_path = install_stub_houdini(temp / "houdini")
+        for name, stub in (
+            ("husk.exe", HUSK_STUB),
+            ("itilestitch.exe", ITILESTITCH_STUB),
+            ("hoiiotool.exe", OIIOTOOL_STUB),
+        ):
+            (bin_path / name).write_text(stub.replace("PYTHON", sys.executable, 1))
+        os.environ[HOUDINI_ROOT_ENV] = str(temp / "houdini")
+
+        from tumblepipe.farm.tasks.render import render
+
+        # 1-2. Untiled
+        start = time.time()
+        result, out_path = run(render, temp, "untiled", 1, 6)
+        print(f"untiled render took {time.time() - start:.2f}s")
+        entries = read_log(log_path)
+        check("untiled render succeeds", result == 0)
+        expected = {
+            (aov, frame): f"frame {frame};{aov}"
+            for aov in ("beauty", "normal", "albedo")
+            for frame in range(1, 7)
+        }
+        found = {
+            (aov, frame): (out_path / aov / f"{aov}.{frame:04d}.exr").read_text()
+            for aov, frame in expected
+            if (out_path / aov / f"{aov}.{frame:04d}.exr").exists()
+        }
+        check("every AOV written", found == expected)
+        receipts = [
+            json.loads((out_path / f"main.{frame:04d}.json").read_text())
+            for frame in range(1, 7)
+            if (out_path / f"main.{frame:04d}.json").exists()
+        ]
+        check(
+            "every receipt written",
+            len(receipts) == 6 and all(set(receipt) == {"beauty", "normal", "albedo"} for receipt in receipts),
+        )
+        first_split = min(
+            (entry["time"] for entry in entries
+             if entry["app"] == "split" and entry["name"] == "render.0001.exr"),
+            default=None,
+        )
+        last_frame = max(
+            entry["time"] for entry in entries if entry["app"] == "husk"
+        )
+        check(
+            "frame 1 post-processed while husk renders",
+            first_split is not None and first_split < last_frame,
+            f"split at {first_split}, last frame at {last_frame}",
+        )
+
+        # 3. Tiled
+        result, out_path = run(
+            render, temp, "tiled", 4, 3, TH_STUB_FRAME_SECONDS="0.05"
+        )
+        read_log(log_path)
+        beauty = [
+            (out_path / "beauty" / f"beauty.{frame:04d}.exr").read_text()
+            if (out_path / "beauty" / f"beauty.{frame:04d}.exr").exists() else None
+            for frame in range(1, 4)
+        ]
+        check(
+            "tiles stitched in order",
+            result == 0 and beauty == [
+                "".join(f"frame {frame} tile {tile};" for tile in range(4)) + "beauty"
+                for frame in range(1, 4)
+            ],
+            str(beauty),
+        )
+
+        # 4. Depth
+        result, _ = run(
+            render, temp, "depth", 1, 6,
+            TH_RENDER_PIPELINE_DEPTH="1",
+            TH_STUB_FRAME_SECONDS="0.02",
+            TH_STUB_SPLIT_SECONDS="0.2",
+        )
+        splits = [entry for entry in read_log(log_path) if entry["app"] == "split"]
+        overlapping = any(
+            splits[index]["event"] == "start" and splits[index + 1]["event"] == "start"
+            for index in range(len(splits) - 1)
+        )
+        check("depth 1 splits one frame at a time", result == 0 and not overlapping)
+
+        # 5. Missing required AOV
+        result, out_path = run(
+            render, temp, "missing_aov", 1, 3, TH_STUB_AOVS="beauty,normal"
+        )
+        read_log(log_path)
+        check("missing required AOV fails", result == 1)
+
+        # 6. No output
+        result, _ = run(render, temp, "no_output", 1, 3, TH_STUB_NO_OUTPUT="1")
+        read_log(log_path)
+        check("missing frames fail", result == 1)
+
+        # 7. Failure stops husk
+        start = time.time()
+        result, _ = run(
+            render, temp, "stop_husk", 1, 20,
+            TH_STUB_AOVS="beauty,normal", TH_STUB_FRAME_SECONDS="0.2",
+        )
+        seconds = time.time() - start
+        husk_frames = [entry for entry in read_log(log_path) if entry["app"] == "husk"]
+        check(
+            "failure stops husk",
+            result == 1 and len(husk_frames) < 20 and seconds < 4,
+            f"{len(husk_frames)} frames rendered in {seconds:.1f}s",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
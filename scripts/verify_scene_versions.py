@@ -0,0 +1,184 @@
+"""Verify scene layer versioning against a throwaway copy of the project template.
+
+Pins the contract of ``tumblepipe.pipe.scene_build``: exports racing on one
+scene each claim a version of their own, however often they collide, and a
+bulk export with ``skip_unchanged`` only versions the scenes whose layer or
+context changed since their latest version.
+
+Needs neither Houdini nor project data:
+
+    python scripts/verify_scene_versions.py
+
+Checks:
+  1. Racing exports claim distinct, complete versions.
+  2. A first bulk export writes every scene.
+  3. A rerun writes nothing and resolves to the latest versions.
+  4. A context-only change re-versions just that scene.
+  5. An unknown scene fails alone.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+RACERS = 6
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def version_names(staged_path: Path) -> list:
+    if not staged_path.exists(): return []
+    return sorted(path.name for path in staged_path.iterdir() if path.is_dir())
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_scene_versions_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+
+        from tumblepipe.util.io import load_json
+        from tumblepipe.util.uri import Uri
+        from tumblepipe.config.scene import (
+            AssetEntry,
+            add_scene,
+            get_scene_by_uri,
+            set_scene_assets,
+        )
+        from tumblepipe.pipe import scene_build
+        from tumblepipe.pipe.paths import get_scene_layer_file_name, get_scene_staged_path
+
+        chair = AssetEntry(asset="entity:/assets/prop/chair", instances=1)
+        table = AssetEntry(asset="entity:/assets/prop/table", instances=2)
+        forest_uri = add_scene("outdoor/forest", [chair, table])
+        beach_uri = add_scene("outdoor/beach", [chair])
+        race_uri = add_scene("race", [table])
+        outdoor_uri = Uri.parse_unsafe("scenes:/outdoor")
+        scene_uris = [outdoor_uri, forest_uri, beach_uri]
+
+        # 1. Racing exports. Every racer plans its first attempt at once, so
+        # all of them collide on v0001 and the losers must re-plan.
+        scene = get_scene_by_uri(race_uri)
+        staged_path = get_scene_staged_path(race_uri)
+        staged_uris = scene_build._staged_sublayer_uris([scene])
+        barrier = threading.Barrier(RACERS)
+        results = [None] * RACERS
+
+        def race(index):
+            first = [True]
+
+            def plan():
+                if first[0]:
+                    first[0] = False
+                    barrier.wait()
+                return scene_build._plan_scene_version(scene, staged_path, staged_uris)
+
+            try:
+                results[index] = scene_build._write_version(plan, skip_unchanged=False)
+            except Exception as error:
+                results[index] = error
+
+        racers = [threading.Thread(target=race, args=(index,)) for index in range(RACERS)]
+        for racer in racers:
+            racer.start()
+        for racer in racers:
+            racer.join()
+        layer_paths = [
+            result[0] for result in results
+            if isinstance(result, tuple) and result[1]
+        ]
+        complete = all(
+            layer_path.exists()
+            and load_json(layer_path.parent / "context.json")["version"]
+            == layer_path.parent.name
+            and layer_path.name == get_scene_layer_file_name(race_uri, layer_path.parent.name)
+            for layer_path in layer_paths
+        )
+        check(
+            "racing exports claim distinct versions",
+            len(layer_paths) == RACERS
+            and len({path.parent for path in layer_paths}) == RACERS
+            and version_names(staged_path) == [f"v{index:04d}" for index in range(1, RACERS + 1)]
+            and complete,
+            str(version_names(staged_path)),
+        )
+
+        # 2. First bulk export
+        first = scene_build.export_scene_versions(scene_uris)
+        check(
+            "first export writes every scene",
+            set(first.written) == set(scene_uris)
+            and len(first.unchanged) == 0 and len(first.failed) == 0,
+            f"{len(first.written)} written, {first.failed}",
+        )
+
+        # 3. Rerun
+        rerun = scene_build.export_scene_versions(scene_uris)
+        check(
+            "unchanged rerun writes nothing",
+            len(rerun.written) == 0
+            and rerun.unchanged == first.written
+            and all(
+                version_names(get_scene_staged_path(uri)) == ["v0001"]
+                for uri in scene_uris
+            ),
+            f"{len(rerun.written)} written",
+        )
+
+        # 4. Context-only change
+        set_scene_assets(beach_uri, [AssetEntry(asset=chair.asset, instances=5)])
+        changed = scene_build.export_scene_versions(scene_uris)
+        beach_path = changed.written.get(beach_uri)
+        check(
+            "instance change re-versions only that scene",
+            set(changed.written) == {beach_uri}
+            and set(changed.unchanged) == {outdoor_uri, forest_uri}
+            and beach_path is not None and beach_path.parent.name == "v0002"
+            and beach_path.read_text() == first.written[beach_uri].read_text()
+            and load_json(beach_path.parent / "context.json")
+            ["parameters"]["assets"][0]["instances"] == 5,
+            str(sorted(str(uri) for uri in changed.written)),
+        )
+
+        # 5. Unknown scene
+        missing_uri = Uri.parse_unsafe("scenes:/missing")
+        partial = scene_build.export_scene_versions([missing_uri, forest_uri])
+        check(
+            "unknown scene fails alone",
+            set(partial.failed) == {missing_uri}
+            and set(partial.unchanged) == {forest_uri},
+            str(partial.failed),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Verify concurrent multi-entity submission against the fake deadlinecommand.
+
+Pins the contract of ``tumblepipe.farm.jobs.houdini.batch_submit.submit_entities``:
+entities are prepared and submitted on a bounded pool, a failing entity is
+reported in its own result without stopping the others, results come back
+in the order of the configs with their prepare and submit times, and
+``TH_SUBMIT_WORKERS=1`` submits one entity after the other.
+
+Needs neither Deadline, Houdini nor project data — it runs against a copy of
+the project template and ``scripts/fake_deadlinecommand.py``. Building a
+real render batch needs published shots, so each entity's batch is a small
+stand-in that ``submit_entity_batch`` is swapped for; the failing entity
+goes through the real one and fails its department validation:
+
+    python scripts/verify_submit_entities.py
+
+Checks:
+  1. A failing entity does not stop the others.
+  2. Results come back in config order, with prepare and submit times.
+  3. Every submitted batch reached Deadline.
+  4. Entities are prepared concurrently by default.
+  5. TH_SUBMIT_WORKERS=1 submits one entity at a time.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+ENTITIES = 5
+
+FAILING = 2
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def make_configs():
+    configs = []
+    for index in range(ENTITIES):
+        render_department = "missing" if index == FAILING else "lighting"
+        configs.append(dict(
+            entity=dict(
+                uri=f"entity:/shots/seq010/shot{index:03d}",
+                name=f"shot{index:03d}",
+                context="shots",
+            ),
+            settings=dict(render=True, render_department=render_department),
+        ))
+    return configs
+
+
+class StandIn:
+    """``submit_entity_batch`` for entities without published data.
+
+    Prepares for longer the earlier the entity, so entities finish out of
+    config order, then submits a two-job batch to the shared farm.
+    """
+
+    def __init__(self, batch_submit, deadline, script_path):
+        self.real = batch_submit.submit_entity_batch
+        self.deadline = deadline
+        self.script_path = script_path
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, config, shared, timings, dry_run, estimates):
+        if config["settings"]["render_department"] == "missing":
+            return self.real(config, shared, timings, dry_run, estimates)
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            start = time.perf_counter()
+            index = int(config["entity"]["name"][-3:])
+            time.sleep(0.05 * (ENTITIES - index))
+            batch = self.deadline.Batch(config["entity"]["uri"])
+            indices = []
+            for stage in ("render", "mp4"):
+                job = self.deadline.Job(self.script_path, None, stage)
+                job.name = f"{config['entity']['name']} {stage}"
+                job.pool = "general"
+                job.group = "houdini"
+                indices.append(batch.add_job(job))
+            batch.add_dep(indices[1], indices[0])
+            submit_start = time.perf_counter()
+            timings["prepare"] = submit_start - start
+            job_ids = shared.farm.submit(batch, shared.jobs_dir)
+            timings["submit"] = time.perf_counter() - submit_start
+            return job_ids
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def deadline_jobs(state_root: Path) -> dict:
+    """``{job id: job name}`` of the jobs the fake Deadline holds."""
+    jobs_path = state_root / "jobs.json"
+    if not jobs_path.exists(): return {}
+    return {job["JobID"]: job["Name"] for job in json.loads(jobs_path.read_text())}
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_submit_entities_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ["TH_DEADLINE_COMMAND"] = str(ROOT / "fake_deadlinecommand.py")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+        os.environ.pop("TH_SUBMIT_WORKERS", None)
+
+        from tumblepipe.apps import deadline
+        from tumblepipe.farm.jobs.houdini import batch_submit
+
+        script_path = temp / ".hpm/packages/tumblepipe@0.0.0/task.py"
+        script_path.parent.mkdir(parents=True)
+        script_path.write_text("")
+        stand_in = StandIn(batch_submit, deadline, script_path)
+        batch_submit.submit_entity_batch = stand_in
+        configs = make_configs()
+        uris = [config["entity"]["uri"] for config in configs]
+
+        try:
+            # Concurrent
+            os.environ["TH_FAKE_DEADLINE_ROOT"] = str(temp / "deadline_concurrent")
+            completed = []
+            results = batch_submit.submit_entities(
+                configs, on_result=lambda result: completed.append(result.entity_uri)
+            )
+            concurrent_active = stand_in.max_active
+
+            # Serial
+            stand_in.max_active = 0
+            os.environ["TH_FAKE_DEADLINE_ROOT"] = str(temp / "deadline_serial")
+            os.environ["TH_SUBMIT_WORKERS"] = "1"
+            serial_completed = []
+            serial = batch_submit.submit_entities(
+                configs, on_result=lambda result: serial_completed.append(result.entity_uri)
+            )
+            serial_active = stand_in.max_active
+            os.environ.pop("TH_SUBMIT_WORKERS")
+        finally:
+            batch_submit.submit_entity_batch = stand_in.real
+
+        # 1. Failure isolation
+        failed = [result for result in results if result.error is not None]
+        check(
+            "a failing entity does not stop the others",
+            [result.entity_uri for result in failed] == [uris[FAILING]]
+            and "Invalid render department" in failed[0].error
+            and failed[0].job_ids == []
+            and all(
+                len(result.job_ids) == 2
+                for index, result in enumerate(results) if index != FAILING
+            ),
+            str([(result.entity_uri, result.error) for result in failed]),
+        )
+
+        # 2. Order and timings
+        submitted = [result for result in results if result.error is None]
+        check(
+            "results in config order with timings",
+            [result.entity_uri for result in results] == uris
+            and completed != uris and sorted(completed) == uris
+            and all(result.prepare_seconds > 0 for result in results)
+            and all(result.submit_seconds > 0 for result in submitted),
+            f"completed {[uri[-3:] for uri in completed]}",
+        )
+
+        # 3. Deadline
+        jobs = deadline_jobs(temp / "deadline_concurrent")
+        expected_jobs = {
+            job_id: f"{result.entity_uri.rsplit('/', 1)[-1]} {stage}"
+            for result in submitted
+            for job_id, stage in zip(result.job_ids, ("render", "mp4"))
+        }
+        check(
+            "every submitted batch reached Deadline",
+            jobs == expected_jobs and len(jobs) == 2 * len(submitted),
+            f"{len(jobs)} jobs",
+        )
+
+        # 4-5. Worker count
+        check(
+            "entities prepared concurrently by default",
+            concurrent_active > 1,
+            f"{concurrent_active} at once",
+        )
+        check(
+            "TH_SUBMIT_WORKERS=1 submits one at a time",
+            serial_active == 1 and serial_completed == uris
+            and [result.entity_uri for result in serial] == uris
+            and [result.error is None for result in serial]
+            == [result.error is None for result in results]
+            and len(deadline_jobs(temp / "deadline_serial")) == 2 * len(submitted),
+            f"{serial_active} at once, completed {[uri[-3:] for uri in serial_completed]}",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
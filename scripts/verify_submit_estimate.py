@@ -0,0 +1,189 @@
+"""Verify dry-run batch estimates against throwaway history and renders.
+
+Pins the contract of ``tumblepipe.farm.estimate.estimate_batch``: tasks and
+frames follow the jobs' chunking, farm time comes from the task history of
+the job's key, job data is counted once per relative path (and only unseen
+blobs count as new), output size is scaled from the latest earlier version,
+and ``Deadline.submit(dry_run=True)`` neither writes nor submits anything.
+
+Needs neither Deadline, Houdini nor project data — it runs against a copy of
+the project template and ``scripts/fake_deadlinecommand.py``:
+
+    python scripts/verify_submit_estimate.py
+
+Checks:
+  1. A 1-10 job with chunk size 4 is estimated as 3 tasks and 10 frames.
+  2. Farm seconds follow the fitted overhead + per-frame cost.
+  3. A job without history is reported as unestimated.
+  4. Shared job data is counted once; stored blobs are not new bytes.
+  5. Output bytes scale the previous version's bytes per frame.
+  6. Deadline.submit(dry_run=True) returns the estimate and submits nothing.
+  7. Neither leaves a trace in the jobs root (no link probe, no touched blobs).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+TEMPLATE_CONFIG = ROOT / "project_template" / "_config"
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def make_job(deadline, script_path, name, chunk_size=4):
+    job = deadline.Job(script_path, None, "context.json")
+    job.name = name
+    job.pool = "none"
+    job.group = "none"
+    job.start_frame = 1
+    job.end_frame = 10
+    job.chunk_size = chunk_size
+    return job
+
+
+def snapshot(root: Path) -> dict:
+    """Every path under *root* with its size and mtime."""
+    return {
+        path.relative_to(root).as_posix(): (path.stat().st_size, path.stat().st_mtime_ns)
+        for path in root.rglob("*")
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_submit_estimate_") as temp_dir:
+        temp = Path(temp_dir)
+        project_path = temp / "project"
+        shutil.copytree(
+            TEMPLATE_CONFIG, project_path / "_config",
+            ignore=shutil.ignore_patterns("__pycache__", "ocio", "usd", "templates"),
+        )
+        (temp / "pipeline").mkdir()
+        os.environ["TH_PROJECT_PATH"] = str(project_path)
+        os.environ["TH_PIPELINE_PATH"] = str(temp / "pipeline")
+        os.environ["TH_CONFIG_PATH"] = str(project_path / "_config")
+        os.environ["TH_TASK_STATS_PATH"] = str(temp / "task_stats")
+        os.environ["TH_DEADLINE_COMMAND"] = str(ROOT / "fake_deadlinecommand.py")
+        os.environ["TH_FAKE_DEADLINE_ROOT"] = str(temp / "deadline")
+        os.environ.pop("TH_CONFIG_SNAPSHOT", None)
+
+        from tumblepipe.apps import deadline, job_data
+        from tumblepipe.farm import task_stats
+        from tumblepipe.farm.estimate import estimate_batch
+
+        # History: 30s overhead + 6s per frame
+        for frames in (2, 4, 8, 10):
+            task_stats.record_task("entity:/shots/a", "lighting", "render", frames, 30 + 6 * frames)
+
+        # Job data: one file shared by both jobs, one already in the store
+        jobs_root = temp / "jobs"
+        staging = temp / "staging"
+        staging.mkdir()
+        shared_file = staging / "stage.usda"
+        shared_file.write_bytes(b"s" * 1000)
+        stored_file = staging / "settings.json"
+        stored_file.write_bytes(b"x" * 200)
+        blob = job_data.blob_path(jobs_root, job_data.file_digest(stored_file))
+        blob.parent.mkdir(parents=True)
+        blob.write_bytes(stored_file.read_bytes())
+
+        # Previous render: v0001 holds 4 frames of 500 bytes in one AOV
+        renders = temp / "render" / "lighting" / "main"
+        previous = renders / "v0001"
+        (previous / "beauty").mkdir(parents=True)
+        for frame in range(1, 5):
+            (previous / "beauty" / f"beauty.{frame:04d}.exr").write_bytes(b"e" * 500)
+            (previous / f"main.{frame:04d}.json").write_text("{}")
+
+        script_path = temp / "task.py"
+        script_path.write_text("")
+        batch = deadline.Batch("estimate")
+        render = make_job(deadline, script_path, "render")
+        render.stats = dict(entity="entity:/shots/a", department="lighting", job_type="render")
+        render.paths[shared_file] = Path("stage.usda")
+        render.paths[stored_file] = Path("settings.json")
+        render.output_paths.append(renders / "v0002" / "main.####.json")
+        render_index = batch.add_job(render)
+        mp4 = make_job(deadline, script_path, "mp4", chunk_size=10)
+        mp4.paths[shared_file] = Path("stage.usda")
+        batch.add_dep(batch.add_job(mp4), render_index)
+
+        before = snapshot(jobs_root)
+        estimate = estimate_batch(batch, jobs_root)
+        jobs = {job.name: job for job in estimate.jobs}
+        print(estimate.format())
+
+        # 1. Chunking
+        check(
+            "tasks and frames",
+            (jobs["render"].tasks, jobs["render"].frames) == (3, 10),
+            f"{jobs['render'].tasks} tasks, {jobs['render'].frames} frames",
+        )
+
+        # 2. History
+        expected = 3 * 30 + 10 * 6
+        check(
+            "farm seconds from history",
+            abs(jobs["render"].farm_seconds - expected) < 1e-6,
+            f"{jobs['render'].farm_seconds} vs {expected}",
+        )
+
+        # 3. No history
+        check("job without history unestimated", estimate.unestimated_jobs == ["mp4"])
+
+        # 4. Job data
+        check(
+            "shared data counted once",
+            (jobs["render"].data_bytes, jobs["mp4"].data_bytes) == (1200, 0),
+        )
+        check("stored blobs are not new", estimate.new_data_bytes == 1000)
+
+        # 5. Output
+        check(
+            "output scaled from previous version",
+            jobs["render"].output_bytes == 10 * 500,
+            str(jobs["render"].output_bytes),
+        )
+
+        # 6. Deadline dry run
+        result = deadline.Deadline().submit(batch, jobs_root, dry_run=True)
+        check(
+            "Deadline dry run returns the estimate",
+            result.to_dict() == estimate.to_dict(),
+        )
+        calls_log = temp / "deadline" / "calls.log"
+        submitted = (
+            [line for line in calls_log.read_text().splitlines() if "Submit" in line]
+            if calls_log.exists() else []
+        )
+        job_dirs = [path for path in jobs_root.iterdir() if path.name != job_data.BLOBS_DIR]
+        check("nothing submitted or written", submitted == [] and job_dirs == [])
+
+        # 7. Jobs root untouched
+        after = snapshot(jobs_root)
+        check(
+            "jobs root untouched",
+            after == before and not job_data._LINK_SUPPORT,
+            str(sorted(set(after) ^ set(before))),
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
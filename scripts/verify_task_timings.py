@@ -0,0 +1,131 @@
+"""Verify the farm task timing reports.
+
+Pins the contract of ``tumblepipe.util.timing``: spans aggregate by their
+nesting path, self time is what nested spans do not cover, and spans that
+worker threads run at once never report more wall-clock or self time than
+the task took, however much their summed time exceeds it.
+
+Needs nothing but the standard library:
+
+    python scripts/verify_task_timings.py
+
+Checks:
+  1. Nested spans: the parent's self time excludes its children.
+  2. Concurrent spans: wall and self time fit within the task's time.
+  3. The summary names the phase with the most self time.
+  4. No span, no report file.
+  5. run_with_report writes the frame range's report with the task's status.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def spans_by_path(report):
+    return {entry["path"]: entry for entry in report["spans"]}
+
+
+def main():
+    from tumblepipe.util import timing
+
+    with tempfile.TemporaryDirectory(prefix="th_timings_") as temp_dir:
+        temp = Path(temp_dir)
+
+        # 1. Nested
+        with timing.timing_report("nested") as report:
+            report.path = temp / "nested.json"
+            with timing.span("render"):
+                time.sleep(0.1)
+                with timing.span("husk"):
+                    time.sleep(0.2)
+        nested = report.to_dict()
+        spans = spans_by_path(nested)
+        check(
+            "parent self time excludes children",
+            0.08 < spans["render"]["self_seconds"] < 0.15
+            and 0.18 < spans["render/husk"]["self_seconds"] < 0.25
+            and nested["unaccounted_seconds"] < 0.05
+            and (temp / "nested.json").exists(),
+            str({path: entry["self_seconds"] for path, entry in spans.items()}),
+        )
+
+        # 2. Concurrent
+        def work(frame):
+            with timing.span("copy", frame):
+                time.sleep(0.2)
+
+        with timing.timing_report("concurrent") as report:
+            with timing.span("post"):
+                workers = [threading.Thread(target=work, args=(frame,)) for frame in range(4)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+        concurrent = report.to_dict()
+        copy = spans_by_path(concurrent)["copy"]
+        check(
+            "concurrent spans fit within the task",
+            copy["count"] == 4 and copy["seconds"] > 0.7
+            and copy["wall_seconds"] <= concurrent["seconds"]
+            and copy["self_seconds"] <= concurrent["seconds"]
+            and len(copy["frames"]) == 4,
+            f"{copy['seconds']}s summed, {copy['wall_seconds']}s wall "
+            f"in {concurrent['seconds']}s",
+        )
+
+        # 3. Summary
+        summary = timing.summarize([nested])
+        check(
+            "summary names the dominant phase",
+            summary["nested"]["dominant"] == "render/husk"
+            and sum(phase["share"] for phase in summary["nested"]["phases"].values()) <= 1.01,
+            str(summary["nested"]["dominant"]),
+        )
+
+        # 4. Nothing timed
+        with timing.timing_report("empty") as report:
+            report.path = temp / "empty.json"
+        check("no report without spans", not (temp / "empty.json").exists())
+
+        # 5. Task CLI wrapper
+        def task(code):
+            with timing.span("work"):
+                pass
+            return code
+
+        ok = timing.run_with_report("cli", temp / "cli", 1, 10, lambda: task(0), tile_count=4)
+        failed = timing.run_with_report("cli", temp / "cli", 11, 20, lambda: task(3))
+        ok_report = timing.load_report(timing.report_path(temp / "cli", "cli", 1, 10))
+        failed_report = timing.load_report(timing.report_path(temp / "cli", "cli", 11, 20))
+        check(
+            "run_with_report writes the task's report",
+            (ok, failed) == (0, 3)
+            and ok_report is not None and failed_report is not None
+            and ok_report["status"] == "ok" and failed_report["status"] == "failed"
+            and ok_report["meta"] == dict(first_frame=1, last_frame=10, tile_count=4),
+            f"{ok}, {failed}",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Verify the shared copy engine used by farm tasks.
+
+Pins the contract of ``tumblepipe.util.transfer``: copies are byte-exact and
+atomic (a target is the old file or the whole new one, never a partial),
+transient errors are retried with backoff, a missing source fails at once,
+verification catches a corrupt copy, and ``copy_files`` runs copies several
+at a time and reports what it moved.
+
+Needs nothing but the standard library:
+
+    python scripts/verify_transfer.py
+
+Checks:
+  1. A file larger than one buffer is copied byte for byte.
+  2. The user-space fallback copies the same bytes, also where the kernel
+     call copies nothing; a kernel copy that stops midway fails.
+  3. A failed copy leaves the old target and no partial file.
+  4. Transient errors are retried and counted.
+  5. A missing source is raised without retries.
+  6. Verification retries a corrupt copy.
+  7. copy_files runs copies concurrently and totals them.
+  8. copy_files attempts every copy and raises the first error.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "python"))
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def main():
+    from tumblepipe.util import transfer
+
+    transfer.BACKOFF_SECONDS = 0.01
+    copy_once = transfer._copy_once
+
+    with tempfile.TemporaryDirectory(prefix="th_transfer_") as temp_dir:
+        temp = Path(temp_dir)
+        payload = os.urandom(transfer.BUFFER_SIZE * 2 + 12345)
+        source_path = temp / "source.exr"
+        source_path.write_bytes(payload)
+
+        # 1. Kernel copy, where the platform has one
+        target_path = temp / "out" / "frame.exr"
+        stats = transfer.TransferStats()
+        size = transfer.copy_file(source_path, target_path, stats=stats)
+        check(
+            "large file copied byte for byte",
+            size == len(payload) and target_path.read_bytes() == payload
+            and stats.files == 1 and stats.bytes == len(payload)
+            and not transfer.partial_path(target_path).exists(),
+        )
+
+        # 2. User space
+        copy_file_range = getattr(os, "copy_file_range", None)
+        sendfile = getattr(os, "sendfile", None)
+
+        def unsupported(*args):
+            raise OSError(22, "Invalid argument")
+
+        if copy_file_range is not None:
+            os.copy_file_range = unsupported
+        if sendfile is not None:
+            os.sendfile = unsupported
+        try:
+            fallback_path = temp / "out" / "fallback.exr"
+            transfer.copy_file(source_path, fallback_path)
+        finally:
+            if copy_file_range is not None:
+                os.copy_file_range = copy_file_range
+            if sendfile is not None:
+                os.sendfile = sendfile
+        check("user-space fallback", fallback_path.read_bytes() == payload)
+
+        if copy_file_range is not None:
+            calls = []
+
+            def copies_nothing(source_fd, target_fd, count, *args):
+                return 0
+
+            def stops_midway(source_fd, target_fd, count, *args):
+                calls.append(count)
+                if len(calls) % 2 == 0: return 0
+                return copy_file_range(source_fd, target_fd, count, *args)
+
+            os.copy_file_range = copies_nothing
+            try:
+                nothing_path = temp / "out" / "nothing.exr"
+                transfer.copy_file(source_path, nothing_path)
+                os.copy_file_range = stops_midway
+                try:
+                    transfer.copy_file(source_path, temp / "out" / "midway.exr", retries=1)
+                    stopped = False
+                except transfer.TransferError:
+                    stopped = True
+            finally:
+                os.copy_file_range = copy_file_range
+            check(
+                "empty kernel copy falls back, short one fails",
+                nothing_path.read_bytes() == payload and stopped and len(calls) == 4
+                and not (temp / "out" / "midway.exr").exists(),
+                f"{len(calls)} calls",
+            )
+
+        # 3. Atomic
+        old_path = temp / "out" / "old.exr"
+        old_path.write_bytes(b"old frame")
+
+        def broken(source, target):
+            target.write_bytes(b"half")
+            raise OSError(5, "Input/output error")
+
+        transfer._copy_once = broken
+        try:
+            transfer.copy_file(source_path, old_path, retries=1)
+            raised = False
+        except OSError:
+            raised = True
+        finally:
+            transfer._copy_once = copy_once
+        check(
+            "failed copy keeps the old target",
+            raised and old_path.read_bytes() == b"old frame"
+            and not transfer.partial_path(old_path).exists(),
+        )
+
+        # 4. Retries
+        attempts = []
+
+        def flaky(source, target):
+            attempts.append(target)
+            if len(attempts) <= 2:
+                raise OSError(64, "The specified network name is no longer available")
+            copy_once(source, target)
+
+        transfer._copy_once = flaky
+        stats = transfer.TransferStats()
+        try:
+            transfer.copy_file(source_path, temp / "out" / "flaky.exr", stats=stats)
+        finally:
+            transfer._copy_once = copy_once
+        check(
+            "transient errors retried",
+            len(attempts) == 3 and stats.retries == 2
+            and (temp / "out" / "flaky.exr").read_bytes() == payload,
+            f"{len(attempts)} attempts",
+        )
+
+        # 5. Missing source
+        attempts.clear()
+        transfer._copy_once = lambda source, target: attempts.append(target) or copy_once(source, target)
+        try:
+            transfer.copy_file(temp / "missing.exr", temp / "out" / "missing.exr")
+            raised = False
+        except FileNotFoundError:
+            raised = True
+        finally:
+            transfer._copy_once = copy_once
+        check("missing source not retried", raised and len(attempts) == 1)
+
+        # 6. Verification
+        corruptions = []
+
+        def corrupting(source, target):
+            copy_once(source, target)
+            if not corruptions:
+                corruptions.append(target)
+                data = bytearray(target.read_bytes())
+                data[100] ^= 0xFF
+                target.write_bytes(bytes(data))
+
+        transfer._copy_once = corrupting
+        stats = transfer.TransferStats()
+        try:
+            verified_path = temp / "out" / "verified.exr"
+            transfer.copy_file(source_path, verified_path, verify=True, stats=stats)
+        finally:
+            transfer._copy_once = copy_once
+        check(
+            "verification retries a corrupt copy",
+            stats.retries == 1 and verified_path.read_bytes() == payload,
+        )
+
+        # 7. Concurrency
+        small_paths = []
+        for index in range(12):
+            small_path = temp / "small" / f"frame.{index:04d}.exr"
+            small_path.parent.mkdir(exist_ok=True)
+            small_path.write_bytes(bytes([index]) * 1000)
+            small_paths.append(small_path)
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def slow(source, target):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.05)
+            copy_once(source, target)
+            with lock:
+                active[0] -= 1
+
+        transfer._copy_once = slow
+        try:
+            stats = transfer.copy_files(
+                [(path, temp / "copies" / path.name) for path in small_paths],
+                workers=4,
+            )
+        finally:
+            transfer._copy_once = copy_once
+        check(
+            "copies run concurrently",
+            active[1] == 4 and stats.files == 12 and stats.bytes == 12000
+            and all((temp / "copies" / path.name).read_bytes() == path.read_bytes() for path in small_paths),
+            f"{active[1]} at once, {stats.summary()}",
+        )
+
+        # 8. Errors
+        pairs = [(path, temp / "more" / path.name) for path in small_paths]
+        pairs.insert(3, (temp / "missing.exr", temp / "more" / "missing.exr"))
+        try:
+            transfer.copy_files(pairs, workers=2)
+            raised = False
+        except FileNotFoundError:
+            raised = True
+        check(
+            "every copy attempted, first error raised",
+            raised and len(list((temp / "more").iterdir())) == 12,
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
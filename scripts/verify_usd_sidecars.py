@@ -0,0 +1,225 @@
+"""Verify ``localize_external_sidecars`` on plain ``.usda`` fixtures.
+
+Pins the contract of ``tumblepipe.pipe.usd.localize_external_sidecars``:
+the reference and payload targets of a published layer that live outside
+its directory are copied beside it and the arcs rewritten to the copies,
+wherever in the layer they are authored, one copy per file however the
+arcs spell it, while sublayers stay exactly as authored.
+
+Needs ``pxr`` but no Houdini or project data — plain ``usd-core`` is
+enough, and everything is written to a throwaway tempdir:
+
+    python scripts/verify_usd_sidecars.py
+
+Checks:
+  1. Arcs inside variants are localized and rewritten.
+  2. Absolute and relative arcs to one file share one copy.
+  3. A reference to a sublayer's file is localized; the sublayer, with its
+     offset, is left as authored.
+  4. Missing files, URIs and files already beside the layer are left alone.
+  5. A different file of the same name gets a suffixed copy.
+  6. A rerun copies nothing; a same-size rewrite of a source is copied again.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from pxr import Sdf  # noqa: E402
+
+from tumblepipe.pipe import usd  # noqa: E402
+
+FAILURES = []
+
+LAYER = """#usda 1.0
+(
+    subLayers = [
+        @../ext/shared.usda@ (offset = 5; scale = 2)
+    ]
+)
+
+def "Variants" (
+    variants = {
+        string look = "a"
+    }
+    prepend variantSets = "look"
+)
+{
+    variantSet "look" = {
+        "a" (
+            prepend references = @../ext/look_a.usda@</Model>
+        ) {
+        }
+        "b" (
+            prepend payload = @../ext/look_b.usda@</Model>
+        ) {
+        }
+    }
+}
+
+def "Relative" (
+    prepend references = @../ext/geo.usda@</Model>
+)
+{
+}
+
+def "Absolute" (
+    prepend payload = @GEO_PATH@</Model>
+)
+{
+}
+
+def "Overlap" (
+    prepend references = @../ext/shared.usda@</Model>
+)
+{
+}
+
+def "Left" (
+    prepend references = [
+        @../ext/missing.usda@</Model>,
+        @entity:/assets/prop/chair?variant=default@</Model>,
+        @./beside.usda@</Model>
+    ]
+)
+{
+}
+
+def "Clash" (
+    prepend references = @../other/beside.usda@</Model>
+)
+{
+}
+"""
+
+MODEL = """#usda 1.0
+
+def "Model"
+{{
+    custom string source = "{name}"
+}}
+"""
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def write_model(path: Path, name: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(MODEL.format(name=name))
+
+
+def arcs(layer, prim_path: str) -> list:
+    """Asset paths of the references and payloads on ``prim_path``."""
+    spec = layer.GetPrimAtPath(prim_path)
+    return [
+        item.assetPath
+        for item in (
+            list(spec.referenceList.GetAddedOrExplicitItems())
+            + list(spec.payloadList.GetAddedOrExplicitItems())
+        )
+    ]
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix="th_sidecars_verify_") as temp_dir:
+        root = Path(temp_dir)
+        ext = root / "ext"
+        publish = root / "publish"
+        for name in ("look_a", "look_b", "geo", "shared"):
+            write_model(ext / f"{name}.usda", name)
+        write_model(root / "other" / "beside.usda", "other")
+        write_model(publish / "beside.usda", "beside")
+        layer_path = publish / "layer.usda"
+        layer_path.write_text(LAYER.replace("GEO_PATH", (ext / "geo.usda").as_posix()))
+
+        remap = usd.localize_external_sidecars(layer_path)
+        layer = Sdf.Layer.FindOrOpen(str(layer_path))
+        copies = sorted(path.name for path in publish.iterdir())
+
+        # 1. Variants
+        variant_a = layer.GetPrimAtPath("/Variants{look=a}")
+        variant_b = layer.GetPrimAtPath("/Variants{look=b}")
+        check(
+            "arcs in variants localized",
+            arcs(layer, variant_a.path) == ["look_a.usda"]
+            and arcs(layer, variant_b.path) == ["look_b.usda"]
+            and (publish / "look_a.usda").is_file()
+            and (publish / "look_b.usda").is_file(),
+            f"{arcs(layer, variant_a.path)} {arcs(layer, variant_b.path)}",
+        )
+
+        # 2. Absolute and relative
+        check(
+            "absolute and relative arcs share one copy",
+            arcs(layer, "/Relative") == ["geo.usda"]
+            and arcs(layer, "/Absolute") == ["geo.usda"]
+            and copies.count("geo.usda") == 1
+            and not any(name.startswith("geo_") for name in copies),
+            str(copies),
+        )
+
+        # 3. Sublayer overlap
+        offset = layer.subLayerOffsets[0]
+        check(
+            "reference to a sublayer's file localized, sublayer kept",
+            arcs(layer, "/Overlap") == ["shared.usda"]
+            and (publish / "shared.usda").is_file()
+            and list(layer.subLayerPaths) == ["../ext/shared.usda"]
+            and (offset.offset, offset.scale) == (5, 2),
+            f"{arcs(layer, '/Overlap')} {list(layer.subLayerPaths)} {offset}",
+        )
+
+        # 4. Left alone
+        check(
+            "missing, URI and sibling arcs left alone",
+            arcs(layer, "/Left") == [
+                "../ext/missing.usda",
+                "entity:/assets/prop/chair?variant=default",
+                "./beside.usda",
+            ],
+            str(arcs(layer, "/Left")),
+        )
+
+        # 5. Name clash
+        check(
+            "different file of the same name suffixed",
+            arcs(layer, "/Clash") == ["beside_1.usda"]
+            and "source = \"other\"" in (publish / "beside_1.usda").read_text()
+            and "source = \"beside\"" in (publish / "beside.usda").read_text(),
+            str(arcs(layer, "/Clash")),
+        )
+
+        # 6. Reruns
+        copied = [
+            usd._copy_if_changed(ext / f"{name}.usda", publish / f"{name}.usda")
+            for name in ("look_a", "look_b", "geo", "shared")
+        ]
+        source = ext / "geo.usda"
+        stat = source.stat()
+        source.write_text(source.read_text().replace("geo", "GEO"))
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        recopied = usd._copy_if_changed(source, publish / "geo.usda")
+        check(
+            "rerun copies nothing, same-size rewrite copied",
+            len(remap) == 6 and copied == [False] * 4 and recopied
+            and "GEO" in (publish / "geo.usda").read_text(),
+            f"{len(remap)} {copied} {recopied}",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Verify parallel ``stitch_usd_directories`` against the serial path.
+
+Pins the contract of ``tumblepipe.apps.houdini.stitch_usd_directories``:
+stitching the per-layer jobs of chunked export directories in worker
+processes must write the same output directory as stitching them one after
+the other — the same files, the same stitched layers and the same copies.
+
+Needs ``pxr`` but no Houdini, scene or project data — plain ``usd-core``
+is enough, and everything is written to a throwaway tempdir:
+
+    python scripts/verify_usd_stitch_directories.py [chunks] [frames_per_chunk] [workers]
+
+Checks:
+  1. Both runs write the same files.
+  2. Every stitched layer matches between the runs.
+  3. Stitched layers hold the time samples of every chunk.
+  4. Copied sidecars are carried through byte for byte.
+  5. Both runs time every output file.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from pxr import Sdf  # noqa: E402
+
+from tumblepipe.apps.houdini import stitch_usd_directories  # noqa: E402
+
+FAILURES = []
+
+MAIN_FILENAME = "layer.usd"
+
+# Sidecars every chunk exports, stitched across chunks. The nested
+# layer.usd shares the main file's name but is a layer of its own.
+STITCHED = ["layer.usd", "geo/mesh.usd", "geo/deep/layer.usd"]
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def write_layer(path: Path, first: int, last: int, prim_count: int = 20) -> None:
+    """One chunk of a layer: ``prim_count`` xforms sampled on [first, last]."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    layer = Sdf.Layer.CreateNew(str(path))
+    layer.startTimeCode = first
+    layer.endTimeCode = last
+    root = Sdf.PrimSpec(layer, "World", Sdf.SpecifierDef, "Xform")
+    for index in range(prim_count):
+        prim = Sdf.PrimSpec(root, f"p{index:04d}", Sdf.SpecifierDef, "Xform")
+        attr = Sdf.AttributeSpec(prim, "value", Sdf.ValueTypeNames.Double)
+        for frame in range(first, last + 1):
+            layer.SetTimeSample(attr.path, frame, index * 1000.0 + frame)
+    layer.Save()
+
+
+def write_chunks(root: Path, chunks: int, frames: int) -> list:
+    chunk_dirs = []
+    for index in range(chunks):
+        chunk_dir = root / f"chunk_{index:03d}"
+        first = index * frames + 1
+        last = first + frames - 1
+        for rel_path in STITCHED:
+            write_layer(chunk_dir / rel_path, first, last)
+        texture = chunk_dir / "layer.usd.textures" / "albedo.png"
+        texture.parent.mkdir(parents=True)
+        texture.write_bytes(b"albedo")
+        for frame in range(first, last + 1):
+            volume = chunk_dir / "geo" / f"smoke.{frame:04d}.vdb"
+            volume.write_bytes(f"smoke {frame}".encode())
+        chunk_dirs.append(chunk_dir)
+    write_layer(chunk_dirs[0] / "geo" / "static.usd", 1, 1)
+    return chunk_dirs
+
+
+def files(root: Path) -> list:
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob("*")
+        if path.is_file()
+    )
+
+
+def layer_text(path: Path) -> str:
+    return Sdf.Layer.OpenAsAnonymous(str(path)).ExportToString()
+
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    with tempfile.TemporaryDirectory(prefix="th_stitch_dirs_verify_") as temp_dir:
+        root = Path(temp_dir)
+        chunk_dirs = write_chunks(root / "chunks", chunks, frames)
+        serial = root / "serial"
+        parallel = root / "parallel"
+        serial_timings = stitch_usd_directories(
+            chunk_dirs, MAIN_FILENAME, serial, workers=1
+        )
+        parallel_timings = stitch_usd_directories(
+            chunk_dirs, MAIN_FILENAME, parallel, workers=workers
+        )
+        print(f"{chunks} chunks x {frames} frames, {workers} workers")
+
+        # 1. Files
+        serial_files = files(serial)
+        check(
+            "same files written",
+            serial_files == files(parallel)
+            and set(STITCHED) <= set(serial_files)
+            and "geo/static.usd" in serial_files,
+            f"{len(serial_files)} files",
+        )
+
+        # 2. Stitched layers
+        mismatched = [
+            rel_path for rel_path in STITCHED
+            if layer_text(serial / rel_path) != layer_text(parallel / rel_path)
+        ]
+        check("stitched layers match", len(mismatched) == 0, str(mismatched))
+
+        # 3. Time samples
+        expected = list(map(float, range(1, chunks * frames + 1)))
+        attr_path = Sdf.Path("/World/p0000.value")
+        sampled = {
+            rel_path: list(
+                Sdf.Layer.OpenAsAnonymous(str(parallel / rel_path))
+                .ListTimeSamplesForPath(attr_path)
+            )
+            for rel_path in STITCHED
+        }
+        check(
+            "every chunk's samples stitched",
+            all(samples == expected for samples in sampled.values()),
+            str({rel_path: len(samples) for rel_path, samples in sampled.items()}),
+        )
+
+        # 4. Copies
+        copied = [
+            rel_path for rel_path in serial_files
+            if rel_path not in STITCHED
+        ]
+        differing = [
+            rel_path for rel_path in copied
+            if (serial / rel_path).read_bytes() != (parallel / rel_path).read_bytes()
+        ]
+        check(
+            "copies carried through",
+            len(differing) == 0
+            and (parallel / "geo" / "static.usd").read_bytes()
+            == (chunk_dirs[0] / "geo" / "static.usd").read_bytes(),
+            f"{len(copied)} copied, {differing}",
+        )
+
+        # 5. Timings
+        timed = sorted(path.as_posix() for path in parallel_timings)
+        check(
+            "every output timed",
+            timed == serial_files
+            and sorted(path.as_posix() for path in serial_timings) == serial_files,
+            f"{len(timed)} timed",
+        )
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
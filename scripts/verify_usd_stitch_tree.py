@@ -0,0 +1,110 @@
+"""Verify and benchmark the pairwise-tree ``stitch_usd_files``.
+
+Pins the contract of the tree reduction in
+``tumblepipe.apps.houdini.stitch_usd_files``: stitching chunked exports as
+a pairwise tree through worker processes must produce the same layer as
+the one-by-one fold into a single accumulator. Also the tool for deciding
+``TH_STITCH_WORKERS`` on a given Houdini build: the tree only pays off
+where that build's StitchLayers re-copies the accumulator per merge.
+
+Needs ``pxr`` but no Houdini, scene or project data — plain ``usd-core``
+is enough, and everything is written to a throwaway tempdir:
+
+    python scripts/verify_usd_stitch_tree.py [chunks] [frames_per_chunk] [prims] [workers]
+
+Checks:
+  1. ``workers=1`` output matches the reference fold.
+  2. Worker-process tree output matches the reference fold.
+  3. Prints wall-clock for all three on the synthetic chunk set.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "python"))
+
+from pxr import Sdf, UsdUtils  # noqa: E402
+
+from tumblepipe.apps.houdini import stitch_usd_files  # noqa: E402
+
+FAILURES = []
+
+
+def check(label, ok, detail=""):
+    tag = "PASS" if ok else "FAIL"
+    print(f"[{tag}] {label}" + (f"  ({detail})" if detail else ""))
+    if not ok:
+        FAILURES.append(label)
+
+
+def write_chunk(path: Path, first: int, last: int, prim_count: int) -> None:
+    """One farm-export chunk: ``prim_count`` xforms sampled on [first, last]."""
+    layer = Sdf.Layer.CreateNew(str(path))
+    layer.startTimeCode = first
+    layer.endTimeCode = last
+    root = Sdf.PrimSpec(layer, "World", Sdf.SpecifierDef, "Xform")
+    for index in range(prim_count):
+        prim = Sdf.PrimSpec(root, f"p{index:04d}", Sdf.SpecifierDef, "Xform")
+        attr = Sdf.AttributeSpec(prim, "value", Sdf.ValueTypeNames.Double)
+        # The first chunk authors a default; later chunks must not win it.
+        if first == 1:
+            attr.default = float(index)
+        for frame in range(first, last + 1):
+            layer.SetTimeSample(attr.path, frame, index * 1000.0 + frame)
+    layer.Save()
+
+
+def sequential_fold(input_files, output_file):
+    """The original accumulator fold, kept verbatim as the reference."""
+    result_layer = Sdf.Layer.OpenAsAnonymous(str(input_files[0]))
+    for input_file in input_files[1:]:
+        UsdUtils.StitchLayers(result_layer, Sdf.Layer.FindOrOpen(str(input_file)))
+    result_layer.Export(str(output_file))
+
+
+def timed(label, fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed:8.3f}s")
+    return elapsed
+
+
+def main():
+    chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    prims = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+    with tempfile.TemporaryDirectory(prefix="th_stitch_verify_") as temp_dir:
+        root = Path(temp_dir)
+        inputs = []
+        for index in range(chunks):
+            first = index * frames + 1
+            path = root / f"chunk_{index:03d}.usda"
+            write_chunk(path, first, first + frames - 1, prims)
+            inputs.append(path)
+        print(f"{chunks} chunks x {frames} frames x {prims} prims")
+
+        reference = root / "sequential.usda"
+        single = root / "single.usda"
+        tree = root / "tree.usda"
+        timed("reference fold", sequential_fold, inputs, reference)
+        timed("workers=1", stitch_usd_files, inputs, single, workers=1)
+        timed(f"tree (workers={workers})", stitch_usd_files, inputs, tree, workers=workers)
+
+        expected = reference.read_text()
+        check("workers=1 matches fold", single.read_text() == expected)
+        check("worker tree matches fold", tree.read_text() == expected)
+
+    if FAILURES:
+        print(f"\n{len(FAILURES)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())